@@ -44,6 +44,9 @@
 xon, xoff = "\x11\n", "\x13\n"
 control = re.compile("(\x11\n|\x13\n)")
 
+#: maximum number of bytes the writer daemon reads from its pipe at once
+_READ_SIZE = 1 << 16
+
 
 @contextmanager
 def ignore_signal(signum):
@@ -884,7 +887,9 @@ def _writer_daemon(
     Within the ``log_output`` handler, the parent's output is redirected
     to a pipe from which the daemon reads.  The daemon writes each line
     from the pipe to a log file and (optionally) to ``stdout``.  The user
-    can hit ``v`` to toggle output on ``stdout``.
+    can hit ``v`` to toggle output on ``stdout``.  Output that is not
+    echoed is written to the log file in large chunks rather than line by
+    line, so that chatty builds are not slowed down by the daemon.
 
     In addition to the input and output file descriptors, the daemon
     interacts with the parent via ``control_pipe``.  It reports whether
@@ -913,10 +918,8 @@ def _writer_daemon(
     if sys.version_info < (3, 8) or sys.platform != "darwin":
         os.close(write_fd)
 
-    # 1. Use line buffering (3rd param = 1) since Python 3 has a bug
-    # that prevents unbuffered text I/O.
-    # 2. Python 3.x before 3.7 does not open with UTF-8 encoding by default
-    in_pipe = os.fdopen(read_multiprocess_fd.fd, "r", 1, encoding="utf-8")
+    # Read raw bytes, so that output can be written in large chunks instead of line by line.
+    in_pipe = os.fdopen(read_multiprocess_fd.fd, "rb", 0)
 
     if stdin_multiprocess_fd:
         stdin = os.fdopen(stdin_multiprocess_fd.fd)
@@ -929,6 +932,55 @@ def _writer_daemon(
 
     log_file = log_file_wrapper.unwrap()
 
+    # trailing output without newline, which is processed with the next chunk
+    pending = b""
+
+    def write_chunk(chunk):
+        """Write complete lines of output to the log and to stdout if echoing."""
+        nonlocal force_echo
+
+        # universal newlines, as in text mode
+        chunk = chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+        # Fast path: when nothing is echoed, the chunk is written at once. Python only
+        # processes individual lines to echo them, or to handle control characters and
+        # invalid UTF-8.
+        if not (echo or force_echo):
+            try:
+                text = chunk.decode("utf-8")
+            except UnicodeDecodeError:
+                text = None
+            if text is not None and not control.search(text):
+                log_file.write(_strip(text))
+                return
+
+        for raw_line in chunk.splitlines(keepends=True):
+            try:
+                line = raw_line.decode("utf-8")
+            except UnicodeDecodeError:
+                # installs like --test=root gpgme produce non-UTF8 logs
+                line = "<line lost: output was not encoded as UTF-8>\n"
+
+            # find control characters and strip them.
+            clean_line, num_controls = control.subn("", line)
+
+            # Echo to stdout if requested or forced.
+            if echo or force_echo:
+                output_line = clean_line
+                if filter_fn:
+                    output_line = filter_fn(clean_line)
+                sys.stdout.write(output_line)
+
+            # Stripped output to log file.
+            log_file.write(_strip(clean_line))
+
+            if num_controls > 0:
+                controls = control.findall(line)
+                if xon in controls:
+                    force_echo = True
+                if xoff in controls:
+                    force_echo = False
+
     try:
         with keyboard_input(stdin) as kb:
             while True:
@@ -958,44 +1010,32 @@ def _writer_daemon(
                                 raise
 
                 if in_pipe in rlist:
-                    line_count = 0
+                    chunk_count = 0
                     try:
-                        while line_count < 100:
+                        while chunk_count < 16:
                             # Handle output from the calling process.
-                            try:
-                                line = _retry(in_pipe.readline)()
-                            except UnicodeDecodeError:
-                                # installs like --test=root gpgme produce non-UTF8 logs
-                                line = "<line lost: output was not encoded as UTF-8>\n"
-
-                            if not line:
+                            data = _retry(in_pipe.read)(_READ_SIZE)
+                            if not data:
+                                if pending:
+                                    write_chunk(pending)
                                 return
-                            line_count += 1
-
-                            # find control characters and strip them.
-                            clean_line, num_controls = control.subn("", line)
-
-                            # Echo to stdout if requested or forced.
-                            if echo or force_echo:
-                                output_line = clean_line
-                                if filter_fn:
-                                    output_line = filter_fn(clean_line)
-                                sys.stdout.write(output_line)
-
-                            # Stripped output to log file.
-                            log_file.write(_strip(clean_line))
-
-                            if num_controls > 0:
-                                controls = control.findall(line)
-                                if xon in controls:
-                                    force_echo = True
-                                if xoff in controls:
-                                    force_echo = False
+                            chunk_count += 1
+
+                            # Only complete lines are written, unless a line gets too long. A
+                            # trailing carriage return may be followed by a newline.
+                            data = pending + data
+                            complete = data[:-1] if data.endswith(b"\r") else data
+                            end = max(complete.rfind(b"\n"), complete.rfind(b"\r")) + 1
+                            if end == 0 and len(data) >= _READ_SIZE:
+                                end = len(data)
+                            pending = data[end:]
+                            if end:
+                                write_chunk(data[:end])
 
                             if not _input_available(in_pipe):
                                 break
                     finally:
-                        if line_count > 0:
+                        if chunk_count > 0:
                             if echo or force_echo:
                                 sys.stdout.flush()
                             log_file.flush()
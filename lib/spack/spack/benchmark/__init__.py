@@ -0,0 +1,239 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Benchmarks of Spack's own performance.
+
+A benchmark is a function registered with the :func:`benchmark` decorator, that takes
+a :class:`Context` and a :class:`~spack.util.timer.Timer` as arguments. Only what is
+timed in the function contributes to the results, so setup code stays out of the
+measurements:
+
+.. code-block:: python
+
+   @benchmark("spec-parse", "parse abstract specs")
+   def _parse_specs(context, timer):
+       strings = [...]
+       with timer.measure("parse"):
+           specs = [spack.spec.Spec(s) for s in strings]
+
+Benchmarks run offline, with the ``builtin.mock`` repository, the test platform, and
+a configuration and a store that live in a temporary directory. Results are plain
+JSON data, so that the results of two runs can be compared with :func:`compare`.
+"""
+import contextlib
+import importlib
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+import spack
+import spack.concretize
+import spack.config
+import spack.paths
+import spack.platforms
+import spack.repo
+import spack.spec
+import spack.store
+import spack.util.timer as timer
+
+#: Version of the format of the results
+RESULTS_VERSION = 1
+
+#: Modules defining benchmarks, relative to this package
+BENCHMARK_MODULES = ("concretize", "spec", "database", "version", "view", "hooks")
+
+#: Specs concretized by the benchmarks, against the builtin.mock repository
+STACKS = ("mpileaks", "hdf5", "dyninst", "quantum-espresso", "dttop", "py-extension3")
+
+#: Map a benchmark name to the benchmark
+BENCHMARKS: Dict[str, "Benchmark"] = {}
+
+
+class Benchmark(NamedTuple):
+    name: str
+    description: str
+    function: Callable[["Context", timer.Timer], None]
+
+
+def benchmark(name: str, description: str):
+    """Return a decorator registering a benchmark with the name passed as argument."""
+
+    def _decorator(function):
+        if name in BENCHMARKS:
+            raise ValueError(f'benchmark "{name}" already registered')
+        BENCHMARKS[name] = Benchmark(name, description, function)
+        return function
+
+    return _decorator
+
+
+def all_benchmarks() -> Dict[str, Benchmark]:
+    """Return all the registered benchmarks, by name."""
+    for module in BENCHMARK_MODULES:
+        importlib.import_module(f"{__name__}.{module}")
+    return BENCHMARKS
+
+
+class Context:
+    """State shared by the benchmarks in a run.
+
+    Args:
+        root: directory where benchmarks can write files
+        scale: factor applied to the size of the workloads
+    """
+
+    def __init__(self, root: str, scale: float = 1.0) -> None:
+        self.root = root
+        self.scale = scale
+        self._concrete_specs: Optional[List[spack.spec.Spec]] = None
+
+    def size(self, n: int) -> int:
+        """Return the size of a workload whose size at scale 1 is ``n``."""
+        return max(1, int(n * self.scale))
+
+    def concrete_specs(self) -> List[spack.spec.Spec]:
+        """Return the ``STACKS``, concretized together. They are concretized only once
+        per run."""
+        if self._concrete_specs is None:
+            self._concrete_specs = spack.concretize.concretize_specs_together(
+                *(spack.spec.Spec(s) for s in STACKS)
+            )
+        return self._concrete_specs
+
+
+def _configuration(root: str) -> Dict[str, Any]:
+    test_platform = spack.platforms.host()
+    return {
+        "config": {
+            "build_stage": [os.path.join(root, "stage")],
+            "misc_cache": os.path.join(root, "cache"),
+            "source_cache": os.path.join(root, "source"),
+            "checksum": False,
+            "locks": sys.platform != "win32",
+        },
+        "concretizer": {"reuse": False, "targets": {"host_compatible": False}},
+        "packages": {"all": {"providers": {"mpi": ["mpich"]}}},
+        "compilers": [
+            {
+                "compiler": {
+                    "spec": "gcc@=10.2.1",
+                    "operating_system": str(test_platform.operating_system("default_os")),
+                    "target": str(test_platform.target("fe")),
+                    "paths": {
+                        "cc": "/path/to/gcc",
+                        "cxx": "/path/to/g++",
+                        "f77": "/path/to/gfortran",
+                        "fc": "/path/to/gfortran",
+                    },
+                    "modules": [],
+                }
+            }
+        ],
+    }
+
+
+@contextlib.contextmanager
+def mock_session(root: str):
+    """Context manager setting up the mock repository, test platform, configuration and
+    store used by benchmarks. Everything written by Spack goes under ``root``."""
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(spack.platforms.use_platform(spack.platforms.Test()))
+        scopes = [
+            spack.config.InternalConfigScope("_builtin", spack.config.CONFIG_DEFAULTS),
+            spack.config.ConfigScope(*spack.config.CONFIGURATION_DEFAULTS_PATH),
+            spack.config.InternalConfigScope("benchmark", _configuration(root)),
+            spack.config.InternalConfigScope("command_line"),
+        ]
+        stack.enter_context(spack.config.use_configuration(*scopes))
+        stack.enter_context(spack.repo.use_repositories(spack.paths.mock_packages_path))
+        stack.enter_context(spack.store.use_store(os.path.join(root, "store")))
+        yield
+
+
+def _summary(times: List[float]) -> Dict[str, Any]:
+    return {
+        "times": times,
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+    }
+
+
+def run(
+    benchmarks: Iterable[Benchmark],
+    context: Context,
+    repeat: int = 3,
+    callback: Optional[Callable[[Benchmark, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Run each benchmark ``repeat`` times, and return the results as JSON data.
+
+    Args:
+        benchmarks: benchmarks to be run
+        context: context passed to the benchmarks
+        repeat: number of times each benchmark is run
+        callback: function called with the results of each benchmark, once it is done
+    """
+    results: Dict[str, Any] = {
+        "version": RESULTS_VERSION,
+        "spack": spack.spack_version,
+        "python": platform.python_version(),
+        "host": platform.machine(),
+        "scale": context.scale,
+        "repeat": repeat,
+        "benchmarks": {},
+    }
+    for bench in benchmarks:
+        phases: Dict[str, List[float]] = {}
+        for _ in range(repeat):
+            # Results memoized by a previous run would make the next ones faster
+            spack.spec.SATISFIES_CACHE.clear()
+            t = timer.Timer(now=time.perf_counter)
+            bench.function(context, t)
+            t.stop()
+            for phase in t.phases:
+                phases.setdefault(phase, []).append(t.duration(phase))
+        result = {
+            "description": bench.description,
+            "phases": {phase: _summary(times) for phase, times in phases.items()},
+        }
+        results["benchmarks"][bench.name] = result
+        if callback:
+            callback(bench, result)
+    return results
+
+
+class Comparison(NamedTuple):
+    benchmark: str
+    phase: str
+    #: Minimum time in the baseline and in the current run
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Comparison]:
+    """Compare the minimum time of the phases that are in both results."""
+    result = []
+    for name, bench in current["benchmarks"].items():
+        if name not in baseline["benchmarks"]:
+            continue
+        baseline_phases = baseline["benchmarks"][name]["phases"]
+        for phase, summary in bench["phases"].items():
+            if phase in baseline_phases:
+                result.append(
+                    Comparison(name, phase, baseline_phases[phase]["min"], summary["min"])
+                )
+    return result
+
+
+def slowdowns(comparisons: Iterable[Comparison], threshold: float) -> List[Comparison]:
+    """Return the comparisons where the current run is slower by more than ``threshold``
+    (e.g. 0.1 for 10%) than the baseline."""
+    return [c for c in comparisons if c.ratio > 1.0 + threshold]
@@ -0,0 +1,19 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Benchmarks of concretization, against the builtin.mock repository."""
+import spack.concretize
+import spack.spec
+
+from . import STACKS, benchmark
+
+
+@benchmark("concretize", "concretize representative stacks, separately and together")
+def _concretize(context, timer):
+    for s in STACKS:
+        with timer.measure(s):
+            spack.spec.Spec(s).concretized()
+
+    with timer.measure("together"):
+        spack.concretize.concretize_specs_together(*(spack.spec.Spec(s) for s in STACKS))
@@ -0,0 +1,90 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Benchmarks of queries to a large, synthetic database."""
+import json
+import os
+import shutil
+import tempfile
+import uuid
+
+import llnl.util.filesystem as fs
+
+import spack.database
+import spack.util.hash
+
+from . import benchmark
+
+#: Number of records in the database, at scale 1
+NUMBER_OF_RECORDS = 50000
+
+
+def write_synthetic_database(root: str, specs, size: int) -> None:
+    """Write the index of a database with about ``size`` records under ``root``.
+
+    Records are copies of the nodes of the concrete specs passed as input. Each copy of
+    a DAG has its own hashes and prefixes, so that the database contains many
+    installations of the same packages, as a long-lived store does.
+    """
+    templates = []
+    for spec in specs:
+        records = {}
+        for node in spec.traverse():
+            path = os.path.join(root, node.name, node.dag_hash())
+            record = spack.database.InstallRecord(
+                node, path, installed=True, ref_count=0, explicit=node is spec
+            )
+            records[node.dag_hash()] = record.to_dict()
+        templates.append((list(records), json.dumps(records)))
+
+    installs = {}
+    copy = 0
+    while len(installs) < size:
+        hashes, text = templates[copy % len(templates)]
+        for h in hashes:
+            text = text.replace(h, spack.util.hash.b32_hash(f"{h}-{copy}")[:32])
+        installs.update(json.loads(text))
+        copy += 1
+
+    database_directory = os.path.join(root, spack.database._DB_DIRNAME)
+    fs.mkdirp(database_directory)
+    with open(os.path.join(database_directory, "index.json"), "w") as f:
+        data = {"database": {"version": str(spack.database._DB_VERSION), "installs": installs}}
+        json.dump(data, f)
+
+    # Without a verifier, every transaction would read the index again
+    with open(os.path.join(database_directory, "index_verifier"), "w") as f:
+        f.write(str(uuid.uuid4()))
+
+
+@benchmark("database", "read a large database, and query it")
+def _query_database(context, timer):
+    root = tempfile.mkdtemp(dir=context.root)
+    write_synthetic_database(root, context.concrete_specs(), context.size(NUMBER_OF_RECORDS))
+    db = spack.database.Database(root)
+
+    with timer.measure("read"):
+        with db.read_transaction():
+            pass
+
+    with timer.measure("query-all"):
+        specs = db.query()
+
+    with timer.measure("query-explicit"):
+        db.query(explicit=True)
+
+    with timer.measure("query-name"):
+        db.query("mpich")
+
+    with timer.measure("query-constraint"):
+        db.query("mpileaks ^mpich@3:")
+
+    with timer.measure("query-constraint-again"):
+        db.query("mpileaks ^mpich@3:")
+
+    with timer.measure("query-hash"):
+        for s in specs[:1000]:
+            db.get_by_hash(s.dag_hash(7))
+
+    shutil.rmtree(root)
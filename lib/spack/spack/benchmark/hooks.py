@@ -0,0 +1,35 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Benchmarks of the work done by post-install hooks on the files of a prefix."""
+import os
+
+import spack.store
+import spack.traverse
+import spack.verify
+from spack.util.prefix_scan import PrefixScan
+
+from . import benchmark
+from .view import FILES_PER_PREFIX, populate_prefixes
+
+
+@benchmark("post-install", "scan the prefixes of the concretized stacks, and write manifests")
+def _post_install(context, timer):
+    specs = context.concrete_specs()
+    populate_prefixes(specs, context.size(FILES_PER_PREFIX))
+    nodes = list(spack.traverse.traverse_nodes(specs, key=spack.traverse.by_dag_hash))
+    layout = spack.store.STORE.layout
+    for node in nodes:
+        manifest = os.path.join(node.prefix, layout.metadata_dir, layout.manifest_file_name)
+        if os.path.exists(manifest):
+            os.unlink(manifest)
+
+    scans = [PrefixScan(node.prefix) for node in nodes]
+    with timer.measure("scan"):
+        for scan in scans:
+            scan.files
+
+    with timer.measure("manifest"):
+        for node, scan in zip(nodes, scans):
+            spack.verify.write_manifest(node, scan=scan)
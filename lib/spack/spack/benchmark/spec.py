@@ -0,0 +1,126 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Benchmarks of spec parsing, formatting, hashing and serialization."""
+import itertools
+from typing import Any, Dict, List
+
+import spack.hash_types as ht
+import spack.spec
+import spack.spec_hashing
+
+from . import benchmark
+
+#: Abstract specs exercising most of the spec syntax
+SPEC_STRINGS = (
+    "mpileaks",
+    "mpileaks@2.3",
+    "mpileaks@2.3:2.5,3.1 +debug ~shared",
+    "hdf5+mpi ^mpich@3.0.4 %gcc@10.2.1",
+    "callpath@1.0 cflags='-O3 -g' ^dyninst@8.2 ^libelf@0.8.13",
+    "quantum-espresso+openmp arch=test-debian6-core2 ^openblas",
+    "dttop ^dtbuild1@=0.5 ^dtlink1 build_system=generic",
+    "py-extension3 ^python@3.8: ^py-extension1 target=x86_64:",
+    "zlib@1.2.11:1.2.13 ~optimize platform=test os=debian6",
+    "libdwarf@20130729 %clang@12.0.0 ldflags=-Wl,-rpath,/usr/lib",
+)
+
+#: Number of specs parsed and formatted, at scale 1
+NUMBER_OF_SPECS = 100000
+
+#: Number of nodes of the synthetic DAG, at scale 1
+DAG_SIZE = 10000
+
+
+@benchmark("spec-parse", "parse abstract specs and format them back to strings")
+def _parse_and_format(context, timer):
+    n = context.size(NUMBER_OF_SPECS)
+    strings = list(itertools.islice(itertools.cycle(SPEC_STRINGS), n))
+
+    with timer.measure("parse"):
+        specs = [spack.spec.Spec(s) for s in strings]
+
+    with timer.measure("format"):
+        for s in specs:
+            str(s)
+
+
+def synthetic_dag(size: int, width: int = 100) -> spack.spec.Spec:
+    """Return a concrete spec with about ``size`` nodes, arranged in layers of ``width``
+    nodes, without any of its hashes computed. Each node depends on three nodes of the
+    layer below."""
+
+    def _node(i, children) -> Dict[str, Any]:
+        node: Dict[str, Any] = {
+            "name": f"pkg-{i}",
+            "version": "1.0",
+            "arch": {"platform": "test", "platform_os": "debian6", "target": "x86_64"},
+            "compiler": {"name": "gcc", "version": "10.2.1"},
+            "namespace": "builtin.mock",
+            "parameters": {"shared": True, "cflags": [], "ldflags": []},
+            "package_hash": f"{i:056d}",
+            "hash": f"{i:032d}",
+        }
+        if children:
+            node["dependencies"] = [
+                {
+                    "name": f"pkg-{j}",
+                    "hash": f"{j:032d}",
+                    "parameters": {"deptypes": ["build", "link"], "virtuals": []},
+                }
+                for j in sorted(children)
+            ]
+        return node
+
+    nodes: List[Dict[str, Any]] = []
+    for i in range(size):
+        below = i - i % width - width
+        children = (
+            set() if below < 0 else {i - width, below + (7 * i) % width, below + (13 * i) % width}
+        )
+        nodes.append(_node(i, children))
+    nodes.append(_node(size, range(max(0, size - size % width - width), size)))
+    nodes.reverse()
+    root = spack.spec.Spec.from_dict({"spec": {"_meta": {"version": 4}, "nodes": nodes}})
+    for node in root.traverse():
+        node.clear_cached_hashes(ignore=(ht.package_hash.attr,))
+    return root
+
+
+@benchmark("spec-dag", "hash a large concrete DAG, and serialize it to and from JSON")
+def _hash_and_serialize(context, timer):
+    root = synthetic_dag(context.size(DAG_SIZE))
+
+    with timer.measure("hash"):
+        root.dag_hash()
+
+    with timer.measure("to_json"):
+        text = root.to_json()
+
+    with timer.measure("from_json"):
+        spack.spec.Spec.from_json(text)
+
+    # Concretized stacks have realistic nodes, with variants, flags and virtuals
+    texts = [s.to_json() for s in context.concrete_specs()]
+    with timer.measure("from_json-stacks"):
+        for _ in range(context.size(100)):
+            for text in texts:
+                spack.spec.Spec.from_json(text)
+
+
+@benchmark("spec-batch-hashes", "compute the DAG and process hashes of every node of a DAG")
+def _batch_hashes(context, timer):
+    root = synthetic_dag(context.size(DAG_SIZE))
+    nodes = list(root.traverse())
+
+    with timer.measure("per-node"):
+        for node in nodes:
+            node.dag_hash()
+            node.process_hash()
+
+    for node in nodes:
+        node.clear_cached_hashes(ignore=(ht.package_hash.attr,))
+
+    with timer.measure("batch"):
+        spack.spec_hashing.compute_hashes([root])
@@ -0,0 +1,77 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Benchmarks of version parsing, comparisons and operations on version lists."""
+import itertools
+
+import spack.solver.asp
+import spack.spec
+import spack.version as vn
+
+from . import STACKS, benchmark
+
+#: Number of versions parsed and compared, at scale 1
+NUMBER_OF_VERSIONS = 100000
+
+#: Number of pairs of version lists, at scale 1
+NUMBER_OF_LISTS = 20000
+
+
+def _version_strings(n):
+    suffixes = ("", "", "", "rc1", "-beta", "a", ".post1", "_2")
+    for i in range(n):
+        if i % 97 == 0:
+            yield ("develop", "main", "master")[i % 3]
+        else:
+            yield f"{i % 13}.{i % 7}.{i % 11}{suffixes[i % len(suffixes)]}"
+
+
+def _version_lists(n):
+    """Lists of ranges and versions, like the constraints on dependencies in packages."""
+    for i in range(n):
+        a, b = i % 5, i % 9
+        yield vn.VersionList(
+            [f"{a}.{b}:{a}.{b + 3}", f"{a + 1}.{b}", f"{a + 2}:{a + 3}.{b}", f"={a + 4}.{b}.1"]
+        )
+
+
+@benchmark("version", "parse, sort and compare versions, and set up the solver")
+def _versions(context, timer):
+    strings = list(_version_strings(context.size(NUMBER_OF_VERSIONS)))
+    with timer.measure("parse"):
+        versions = [vn.Version(s) for s in strings]
+
+    with timer.measure("sort"):
+        sorted(versions)
+
+    with timer.measure("hash"):
+        set(versions)
+
+    lists = list(_version_lists(context.size(NUMBER_OF_LISTS)))
+    pairs = list(zip(lists, itertools.islice(itertools.cycle(lists), 7, None)))
+    ranges = [vn.ver(f"{i % 6}.{i % 10}:") for i in range(len(lists))]
+
+    with timer.measure("list-intersects"):
+        for lhs, rhs in pairs:
+            lhs.intersects(rhs)
+        for lhs, v in zip(lists, versions):
+            lhs.intersects(v)
+
+    with timer.measure("list-satisfies"):
+        for lhs, rhs in pairs:
+            lhs.satisfies(rhs)
+        for lhs, r in zip(lists, ranges):
+            lhs.satisfies(r)
+
+    with timer.measure("list-intersection"):
+        for lhs, rhs in pairs:
+            lhs.intersection(rhs)
+
+    with timer.measure("list-contains"):
+        for lhs, v in zip(lists, versions):
+            v in lhs
+
+    specs = [spack.spec.Spec(s) for s in STACKS]
+    with timer.measure("solver-setup"):
+        spack.solver.asp.Solver().solve(specs, setup_only=True)
@@ -0,0 +1,83 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Benchmarks of the creation of filesystem views."""
+import os
+import shutil
+import tempfile
+
+import llnl.util.filesystem as fs
+
+import spack.filesystem_view
+import spack.store
+import spack.traverse
+
+from . import benchmark
+
+#: Number of files in the prefix of each package, at scale 1
+FILES_PER_PREFIX = 500
+
+
+def populate_prefixes(specs, files_per_prefix: int) -> None:
+    """Create the prefixes of all the nodes of the specs passed as input in the current
+    store, with files laid out like in typical installations."""
+    layout = spack.store.STORE.layout
+    for node in spack.traverse.traverse_nodes(specs, key=spack.traverse.by_dag_hash):
+        if os.path.exists(node.prefix):
+            continue
+        layout.create_install_directory(node)
+        for i in range(files_per_prefix):
+            if i % 10 == 0:
+                path = os.path.join("bin", f"{node.name}-{i}")
+            elif i % 10 < 4:
+                path = os.path.join("lib", f"lib{node.name}-{i}.so")
+            elif i % 10 < 8:
+                path = os.path.join("include", node.name, f"header-{i}.h")
+            else:
+                path = os.path.join("share", node.name, str(i % 7), f"data-{i}.txt")
+            path = os.path.join(node.prefix, path)
+            fs.mkdirp(os.path.dirname(path))
+            with open(path, "w") as f:
+                f.write(f"{node.prefix}\n")
+
+
+@benchmark("view", "create views of the concretized stacks, and update them incrementally")
+def _create_views(context, timer):
+    specs = context.concrete_specs()
+    populate_prefixes(specs, context.size(FILES_PER_PREFIX))
+    nodes = list(
+        spack.traverse.traverse_nodes(
+            specs, deptype=("link", "run"), key=spack.traverse.by_dag_hash
+        )
+    )
+    root = tempfile.mkdtemp(dir=context.root)
+    layout = spack.store.STORE.layout
+
+    def _view(name, link=spack.filesystem_view.view_symlink):
+        fs.mkdirp(os.path.join(root, name))
+        return spack.filesystem_view.SimpleFilesystemView(
+            os.path.join(root, name), layout, link=link, ignore_conflicts=True
+        )
+
+    symlinked = _view("symlink")
+    with timer.measure("symlink"):
+        symlinked.add_specs(*nodes)
+    symlinked.write_state(nodes)
+
+    # Copies relocate the content of each file, so only the first stack is copied
+    first = list(spack.traverse.traverse_nodes(specs[:1], deptype=("link", "run")))
+    with timer.measure("copy"):
+        _view("copy", link=spack.filesystem_view.view_copy).add_specs(*first)
+
+    # Derive a view with one less root from the symlinked one
+    updated = _view("update")
+    remaining = list(
+        spack.traverse.traverse_nodes(
+            specs[1:], deptype=("link", "run"), key=spack.traverse.by_dag_hash
+        )
+    )
+    with timer.measure("update"):
+        updated.update_specs(os.path.join(root, "symlink"), *remaining)
+
+    shutil.rmtree(root)
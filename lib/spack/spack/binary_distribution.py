@@ -5,6 +5,7 @@
 
 import codecs
 import collections
+import concurrent.futures
 import hashlib
 import io
 import itertools
@@ -21,6 +22,7 @@
 import urllib.error
 import urllib.parse
 import urllib.request
+import uuid
 import warnings
 from contextlib import closing
 from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
@@ -68,9 +70,30 @@
 BUILD_CACHE_RELATIVE_PATH = "build_cache"
 BUILD_CACHE_KEYS_RELATIVE_PATH = "_pgp"
 
+#: Directory, relative to the build cache, with the changes not yet applied to the index
+INDEX_DELTAS_RELATIVE_PATH = "index-deltas"
+
+#: Format of the files in ``INDEX_DELTAS_RELATIVE_PATH``
+INDEX_DELTA_VERSION = 1
+
+#: Directory, relative to the build cache, with the optional sharded index
+INDEX_SHARDS_RELATIVE_PATH = "index-shards"
+
+#: Format of the manifest of the sharded index
+INDEX_SHARDS_VERSION = 1
+
+#: Number of leading characters of the DAG hash that select the shard of a spec
+INDEX_SHARD_HASH_PREFIX = 2
+
 #: The build cache layout version that this version of Spack creates.
 #: Version 2: includes parent directories of the package prefix in the tarball
-CURRENT_BUILD_CACHE_LAYOUT_VERSION = 2
+#: Version 3: same as version 2, with the compression of the tarball in the spec file. It is
+#: only used for tarballs that are not compressed with gzip, so that older versions of Spack,
+#: which cannot extract them, ignore them and build from sources instead.
+CURRENT_BUILD_CACHE_LAYOUT_VERSION = 3
+
+#: The build cache layout version of gzip compressed tarballs
+GZIP_BUILD_CACHE_LAYOUT_VERSION = 2
 
 
 class BuildCacheDatabase(spack_db.Database):
@@ -164,6 +187,12 @@ def __init__(self, cache_root: Optional[str] = None):
         #           use the updated source if available)
         self._mirrors_for_spec: Dict[str, dict] = {}
 
+        # manifests of the sharded indices of the configured mirrors, fetched lazily
+        self._shard_manifests: Optional[Dict[str, dict]] = None
+
+        # mirror urls and hash prefixes for which a shard was already looked up
+        self._hash_prefixes_checked: Set[str] = set()
+
     def _init_local_index_cache(self):
         if not self._index_file_cache:
             self._index_file_cache = file_cache.FileCache(self._index_cache_root)
@@ -188,6 +217,8 @@ def clear(self):
         self._specs_already_associated = set()
         self._last_fetch_times = {}
         self._mirrors_for_spec = {}
+        self._shard_manifests = None
+        self._hash_prefixes_checked = set()
 
     def _write_local_index_cache(self):
         self._init_local_index_cache()
@@ -208,11 +239,19 @@ def regenerate_spec_cache(self, clear_existing=False):
 
         for mirror_url in self._local_index_cache:
             cache_entry = self._local_index_cache[mirror_url]
-            cached_index_path = cache_entry["index_path"]
-            cached_index_hash = cache_entry["index_hash"]
-            if cached_index_hash not in self._specs_already_associated:
+            cached_index_path = cache_entry.get("index_path")
+            cached_index_hash = cache_entry.get("index_hash")
+            if cached_index_path and cached_index_hash not in self._specs_already_associated:
                 self._associate_built_specs_with_mirror(cached_index_path, mirror_url)
                 self._specs_already_associated.add(cached_index_hash)
+            self._associate_shards(mirror_url, cache_entry.get("shards", []))
+
+    def _associate_shards(self, mirror_url: str, cache_keys: Iterable[str]) -> None:
+        for cache_key in cache_keys:
+            key = f"{mirror_url}#{cache_key}"
+            if key not in self._specs_already_associated:
+                self._associate_built_specs_with_mirror(cache_key, mirror_url)
+                self._specs_already_associated.add(key)
 
     def _associate_built_specs_with_mirror(self, cache_key, mirror_url):
         tmpdir = tempfile.mkdtemp()
@@ -276,8 +315,10 @@ def find_built_spec(self, spec, mirrors_to_check=None):
         of each mirror where it can be found.  Otherwise, ``None`` is
         returned.
 
-        This method does not trigger reading anything from remote mirrors, but
-        rather just checks if the concrete spec is found within the cache.
+        This method does not trigger reading the full index of remote mirrors,
+        but rather just checks if the concrete spec is found within the cache.
+        Only for mirrors with a sharded index, the shard that would contain the
+        spec is fetched, unless it was looked up already.
 
         The cache can be updated by calling ``update()`` on the cache.
 
@@ -309,6 +350,8 @@ def find_by_hash(self, find_hash, mirrors_to_check=None):
             mirrors_to_check: Optional mapping containing mirrors to check.  If
                 None, just assumes all configured mirrors.
         """
+        if find_hash not in self._mirrors_for_spec:
+            self._fetch_shards_for_hash(find_hash)
         if find_hash not in self._mirrors_for_spec:
             return []
         results = self._mirrors_for_spec[find_hash]
@@ -338,7 +381,12 @@ def update_spec(self, spec, found_list):
                         {"mirror_url": new_entry["mirror_url"], "spec": new_entry["spec"]}
                     )
 
-    def update(self, with_cooldown=False):
+    def update(
+        self,
+        with_cooldown=False,
+        names: Optional[Iterable[str]] = None,
+        hashes: Optional[Iterable[str]] = None,
+    ):
         """Make sure local cache of buildcache index files is up to date.
         If the same mirrors are configured as the last time this was called
         and none of the remote buildcache indices have changed, calling this
@@ -346,11 +394,21 @@ def update(self, with_cooldown=False):
         to confirm it is the same as what is stored locally.  Otherwise, the
         buildcache ``index.json`` and ``index.json.hash`` files are retrieved
         from each configured mirror and stored locally (both in memory and
-        on disk under ``_index_cache_root``)."""
+        on disk under ``_index_cache_root``).
+
+        When ``names`` or ``hashes`` are given, only the specs with these package names
+        or DAG hashes, and their dependencies, are needed. Mirrors with a sharded index
+        then only have the shards containing them fetched, instead of the whole index.
+        """
         self._init_local_index_cache()
         configured_mirror_urls = [
             m.fetch_url for m in spack.mirror.MirrorCollection(binary=True).values()
         ]
+        manifests = {}
+        if names is not None or hashes is not None:
+            manifests = self._fetch_shard_manifests(configured_mirror_urls)
+            self._shard_manifests = manifests
+            self._hash_prefixes_checked = set()
         items_to_remove = []
         spec_cache_clear_needed = False
         spec_cache_regenerate_needed = not self._mirrors_for_spec
@@ -385,8 +443,11 @@ def update(self, with_cooldown=False):
 
         for cached_mirror_url in self._local_index_cache:
             cache_entry = self._local_index_cache[cached_mirror_url]
-            cached_index_path = cache_entry["index_path"]
-            if cached_mirror_url in configured_mirror_urls:
+            cached_index_path = cache_entry.get("index_path")
+            if cached_mirror_url in manifests:
+                # The shards of this mirror are fetched below
+                continue
+            elif cached_mirror_url in configured_mirror_urls:
                 # Only do a fetch if the last fetch was longer than TTL ago
                 if (
                     with_cooldown
@@ -419,7 +480,11 @@ def update(self, with_cooldown=False):
                 items_to_remove.append(
                     {
                         "url": cached_mirror_url,
-                        "cache_key": os.path.join(self._index_cache_root, cached_index_path),
+                        "cache_keys": [
+                            os.path.join(self._index_cache_root, key)
+                            for key in [cached_index_path, *cache_entry.get("shards", [])]
+                            if key
+                        ],
                     }
                 )
                 if cached_mirror_url in self._last_fetch_times:
@@ -430,15 +495,15 @@ def update(self, with_cooldown=False):
         # Clean up items to be removed, identified above
         for item in items_to_remove:
             url = item["url"]
-            cache_key = item["cache_key"]
-            self._index_file_cache.remove(cache_key)
+            for cache_key in item["cache_keys"]:
+                self._index_file_cache.remove(cache_key)
             del self._local_index_cache[url]
 
         # Iterate the configured mirrors now.  Any mirror urls we do not
         # already have in our cache must be fetched, stored, and represented
         # locally.
         for mirror_url in configured_mirror_urls:
-            if mirror_url in self._local_index_cache:
+            if mirror_url in self._local_index_cache or mirror_url in manifests:
                 continue
 
             # Need to fetch the index and update the local caches
@@ -455,6 +520,20 @@ def update(self, with_cooldown=False):
             if needs_regen:
                 spec_cache_regenerate_needed = True
 
+        for mirror_url, manifest in manifests.items():
+            try:
+                cache_keys = self._fetch_index_shards(
+                    mirror_url, manifest, names or (), hashes or ()
+                )
+                all_methods_failed = False
+            except FetchIndexError as e:
+                fetch_errors.append(e)
+                continue
+            # Removing shards that are out of date implies clearing the spec cache
+            stale = self._record_shards(mirror_url, manifest, cache_keys)
+            spec_cache_clear_needed |= stale
+            spec_cache_regenerate_needed |= stale
+
         self._write_local_index_cache()
 
         if configured_mirror_urls and all_methods_failed:
@@ -467,6 +546,104 @@ def update(self, with_cooldown=False):
         if spec_cache_regenerate_needed:
             self.regenerate_spec_cache(clear_existing=spec_cache_clear_needed)
 
+        for mirror_url in manifests:
+            if mirror_url in self._local_index_cache:
+                self._associate_shards(mirror_url, self._local_index_cache[mirror_url]["shards"])
+
+    def _fetch_shard_manifests(self, mirror_urls: List[str]) -> Dict[str, dict]:
+        """Return the manifests of the sharded indices of the mirrors that have one."""
+        manifests = {}
+        for mirror_url in mirror_urls:
+            if urllib.parse.urlparse(mirror_url).scheme == "oci":
+                continue
+            url = url_util.join(
+                mirror_url, BUILD_CACHE_RELATIVE_PATH, INDEX_SHARDS_RELATIVE_PATH, "manifest.json"
+            )
+            try:
+                manifest = _read_json_from_url(url)["index-shards"]
+            except (web_util.SpackWebError, URLError, ValueError, KeyError) as e:
+                tty.debug(f"No sharded index at {mirror_url}: {e}", level=2)
+                continue
+            if manifest.get("version") == INDEX_SHARDS_VERSION:
+                manifests[mirror_url] = manifest
+        return manifests
+
+    def _fetch_index_shards(
+        self, mirror_url: str, manifest: dict, names: Iterable[str], hashes: Iterable[str]
+    ) -> List[str]:
+        """Fetch the shards with the given package names and DAG hashes, unless they are
+        already cached, and return their cache keys.
+
+        Shards are named after the hash of their content, so a cached shard is up to date
+        for as long as the manifest refers to it.
+        """
+        prefix = manifest["hash_prefix"]
+        keys = {f"name/{name}" for name in names} | {f"hash/{h[:prefix]}" for h in hashes}
+        files = sorted({manifest["shards"][key] for key in keys if key in manifest["shards"]})
+
+        cache_keys = []
+        for name in files:
+            cache_key = f"shard_{name}"
+            self._index_file_cache.init_entry(cache_key)
+            if not os.path.exists(self._index_file_cache.cache_path(cache_key)):
+                url = url_util.join(
+                    mirror_url, BUILD_CACHE_RELATIVE_PATH, INDEX_SHARDS_RELATIVE_PATH, name
+                )
+                try:
+                    _, _, response = web_util.read_from_url(url)
+                    data = codecs.getreader("utf-8")(response).read()
+                except (web_util.SpackWebError, URLError, ValueError) as e:
+                    raise FetchIndexError(f"Could not fetch index shard {url}", e) from e
+                if f"{compute_hash(data)}.json" != name:
+                    raise FetchIndexError(f"Index shard {url} does not match its hash")
+                with self._index_file_cache.write_transaction(cache_key) as (old, new):
+                    new.write(data)
+            cache_keys.append(cache_key)
+        return cache_keys
+
+    def _record_shards(self, mirror_url: str, manifest: dict, cache_keys: List[str]) -> bool:
+        """Record fetched shards in the local index cache, so that later processes do not
+        fetch them again, and remove the cached shards the manifest no longer refers to.
+
+        Returns:
+            True if any cached shard was removed.
+        """
+        entry = self._local_index_cache.setdefault(mirror_url, {})
+        current = {f"shard_{name}" for name in manifest["shards"].values()}
+        cached = set(entry.get("shards", []))
+        stale = cached - current
+        for cache_key in stale:
+            self._index_file_cache.remove(cache_key)
+        entry["shards"] = sorted((cached - stale) | set(cache_keys))
+        return bool(stale)
+
+    def _fetch_shards_for_hash(self, dag_hash: str) -> None:
+        """Fetch the shards for the prefix of a DAG hash from the mirrors with a sharded
+        index, once per process, and add the specs they contain to the spec cache."""
+        self._init_local_index_cache()
+        if self._shard_manifests is None:
+            self._shard_manifests = self._fetch_shard_manifests(
+                [m.fetch_url for m in spack.mirror.MirrorCollection(binary=True).values()]
+            )
+
+        fetched, stale = False, False
+        for mirror_url, manifest in self._shard_manifests.items():
+            key = f"{mirror_url}#{dag_hash[:manifest['hash_prefix']]}"
+            if key in self._hash_prefixes_checked:
+                continue
+            self._hash_prefixes_checked.add(key)
+            try:
+                cache_keys = self._fetch_index_shards(mirror_url, manifest, (), (dag_hash,))
+            except FetchIndexError as e:
+                tty.debug(f"Cannot fetch the index shard of {dag_hash}: {e}")
+                continue
+            stale |= self._record_shards(mirror_url, manifest, cache_keys)
+            fetched = True
+
+        if fetched:
+            self._write_local_index_cache()
+            self.regenerate_spec_cache(clear_existing=stale)
+
     def _fetch_and_cache_index(self, mirror_url, cache_entry={}):
         """Fetch a buildcache index file from a remote mirror and cache it.
 
@@ -521,10 +698,12 @@ def _fetch_and_cache_index(self, mirror_url, cache_entry={}):
             "etag": result.etag,
         }
 
-        # clean up the old cache_key if necessary
+        # clean up the old cache_key if necessary, and the shards superseded by the full index
         old_cache_key = cache_entry.get("index_path", None)
         if old_cache_key:
             self._index_file_cache.remove(old_cache_key)
+        for shard_cache_key in cache_entry.get("shards", []):
+            self._index_file_cache.remove(shard_cache_key)
 
         # We fetched an index and updated the local index cache, we should
         # regenerate the spec cache as a result.
@@ -714,6 +893,7 @@ def get_buildfile_manifest(spec):
         "link_to_relocate": [],
         "other": [],
         "binary_to_relocate_fullpath": [],
+        "binary_with_prefix": [],
         "hardlinks_deduped": True,
     }
 
@@ -733,6 +913,9 @@ def get_buildfile_manifest(spec):
     # Create a giant regex that matches all prefixes
     regex = utf8_paths_to_single_binary_regex(prefixes)
 
+    # Binary relocation replaces prefixes anywhere in the file, not just whole paths
+    binary_regex = re.compile(b"|".join(re.escape(str(p).encode("utf-8")) for p in prefixes))
+
     # Symlinks.
 
     # Obvious bugs:
@@ -761,6 +944,8 @@ def get_buildfile_manifest(spec):
             ):
                 data["binary_to_relocate"].append(rel_path)
                 data["binary_to_relocate_fullpath"].append(abs_path)
+                if file_matches(abs_path, binary_regex):
+                    data["binary_with_prefix"].append(rel_path)
                 continue
 
         elif relocate.needs_text_relocation(m_type, m_subtype) and file_matches(abs_path, regex):
@@ -794,6 +979,7 @@ def get_buildinfo_dict(spec):
         "relative_prefix": os.path.relpath(spec.prefix, spack.store.STORE.layout.root),
         "relocate_textfiles": manifest["text_to_relocate"],
         "relocate_binaries": manifest["binary_to_relocate"],
+        "relocate_binaries_with_prefix": manifest["binary_with_prefix"],
         "relocate_links": manifest["link_to_relocate"],
         "hardlinks_deduped": manifest["hardlinks_deduped"],
         "hash_to_prefix": hashes_to_prefixes(spec),
@@ -857,7 +1043,20 @@ def sign_specfile(key, force, specfile_path):
     spack.util.gpg.sign(key, specfile_path, signed_specfile_path, clearsign=True)
 
 
-def _read_specs_and_push_index(file_list, read_method, cache_prefix, db, temp_dir, concurrency):
+def _read_spec_file(file: str, read_method) -> Optional[Spec]:
+    contents = read_method(file)
+    # Need full spec.json name or this gets confused with index.json.
+    if file.endswith(".json.sig"):
+        specfile_json = Spec.extract_json_from_clearsig(contents)
+        return Spec.from_dict(specfile_json)
+    elif file.endswith(".json"):
+        return Spec.from_json(contents)
+    return None
+
+
+def _read_specs_and_push_index(
+    file_list, read_method, cache_prefix, db, temp_dir, concurrency, sharded=False
+):
     """Read all the specs listed in the provided list, using thread given thread parallelism,
         generate the index, and push it to the mirror.
 
@@ -869,20 +1068,24 @@ def _read_specs_and_push_index(file_list, read_method, cache_prefix, db, temp_di
         db: A spack database used for adding specs and then writing the index.
         temp_dir (str): Location to write index.json and hash for pushing
         concurrency (int): Number of parallel processes to use when fetching
+        sharded (bool): whether to also push the index split in shards
     """
-    for file in file_list:
-        contents = read_method(file)
-        # Need full spec.json name or this gets confused with index.json.
-        if file.endswith(".json.sig"):
-            specfile_json = Spec.extract_json_from_clearsig(contents)
-            fetched_spec = Spec.from_dict(specfile_json)
-        elif file.endswith(".json"):
-            fetched_spec = Spec.from_json(contents)
-        else:
-            continue
-
-        db.add(fetched_spec, None)
-        db.mark(fetched_spec, "in_buildcache", True)
+    # Spec files are read by a pool of threads, a few at a time ahead of the ones being
+    # added to the database, so that memory doesn't grow with the size of the mirror.
+    files = iter(file_list)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = collections.deque(
+            executor.submit(_read_spec_file, file, read_method)
+            for file in itertools.islice(files, 4 * concurrency)
+        )
+        while pending:
+            fetched_spec = pending.popleft().result()
+            for file in itertools.islice(files, 1):
+                pending.append(executor.submit(_read_spec_file, file, read_method))
+            if fetched_spec is None:
+                continue
+            db.add(fetched_spec, None)
+            db.mark(fetched_spec, "in_buildcache", True)
 
     # Now generate the index, compute its hash, and push the two files to
     # the mirror.
@@ -890,6 +1093,18 @@ def _read_specs_and_push_index(file_list, read_method, cache_prefix, db, temp_di
     with open(index_json_path, "w") as f:
         db._write_to_file(f)
 
+    if sharded:
+        with open(index_json_path) as f:
+            installs = json.load(f)["database"]["installs"]
+        _push_index_shards(installs, cache_prefix, temp_dir)
+    else:
+        _remove_index_shards(cache_prefix)
+
+    _push_index(index_json_path, cache_prefix, temp_dir)
+
+
+def _push_index(index_json_path: str, cache_prefix: str, temp_dir: str) -> None:
+    """Compute the hash of the index file passed as input, and push both to the mirror."""
     # Read the index back in and compute its hash
     with open(index_json_path) as f:
         index_string = f.read()
@@ -917,6 +1132,261 @@ def _read_specs_and_push_index(file_list, read_method, cache_prefix, db, temp_di
     )
 
 
+def push_index_delta(
+    cache_prefix: str,
+    added: Iterable[Spec] = (),
+    removed: Iterable[str] = (),
+    tmpdir: Optional[str] = None,
+) -> None:
+    """Record on the mirror that specs were added to, or removed from, the build cache,
+    so that the next incremental update of the index doesn't need to read every spec file.
+
+    Args:
+        cache_prefix: base url of the build cache
+        added: concrete specs that were pushed to the build cache
+        removed: DAG hashes of the specs that were removed from the build cache
+        tmpdir: directory where the delta is written before being pushed
+    """
+    added = list(added)
+    nodes = {
+        node.dag_hash(): node.node_dict_with_hashes()
+        for node in traverse.traverse_nodes(
+            added, deptype=spack_db._TRACKED_DEPENDENCIES, key=traverse.by_dag_hash
+        )
+    }
+    delta = {
+        "index-delta": {
+            "version": INDEX_DELTA_VERSION,
+            "added": [s.dag_hash() for s in added],
+            "removed": list(removed),
+            "nodes": nodes,
+        }
+    }
+    # Names sort in the order deltas are created, and are unique across concurrent pushes
+    name = f"{int(time.time() * 1e9):020d}-{uuid.uuid4().hex}.json"
+    with tempfile.TemporaryDirectory(dir=tmpdir) as tmp:
+        delta_path = os.path.join(tmp, name)
+        with open(delta_path, "w") as f:
+            json.dump(delta, f, separators=(",", ":"))
+        web_util.push_to_url(
+            delta_path,
+            url_util.join(cache_prefix, INDEX_DELTAS_RELATIVE_PATH, name),
+            keep_original=False,
+            extra_args={"ContentType": "application/json"},
+        )
+
+
+def _index_delta_urls(cache_prefix: str) -> List[str]:
+    """Return the urls of the deltas not yet applied to the index, oldest first."""
+    deltas_url = url_util.join(cache_prefix, INDEX_DELTAS_RELATIVE_PATH)
+    try:
+        entries = web_util.list_url(deltas_url)
+    except Exception as e:
+        tty.debug(f"No index deltas found at {deltas_url}: {e}")
+        return []
+    return [url_util.join(deltas_url, e) for e in sorted(entries) if e.endswith(".json")]
+
+
+def _read_json_from_url(url: str):
+    _, _, response = web_util.read_from_url(url)
+    with closing(response):
+        return json.load(codecs.getreader("utf-8")(response))
+
+
+def _remove_index_deltas(delta_urls: List[str]) -> None:
+    for url in delta_urls:
+        try:
+            web_util.remove_url(url)
+        except Exception as e:
+            tty.debug(f"Cannot remove index delta {url}: {e}")
+
+
+def _apply_index_deltas(installs: Dict[str, dict], deltas: Iterable[dict]) -> None:
+    """Apply deltas to the records of a build cache index, in place.
+
+    Records are the JSON objects stored in ``index.json``, and are never turned into
+    ``Spec`` objects. Records that are neither in the build cache, nor a dependency of
+    a spec in the build cache, are dropped, and reference counts are computed again.
+    """
+    for delta in deltas:
+        for h, node in delta["nodes"].items():
+            if h not in installs:
+                installs[h] = {"spec": node, "ref_count": 0, "in_buildcache": False}
+        for h in delta["added"]:
+            installs[h]["in_buildcache"] = True
+        for h in delta["removed"]:
+            if h in installs:
+                installs[h]["in_buildcache"] = False
+
+    # Keep only the records reachable from the specs in the build cache
+    stack = [h for h, record in installs.items() if record.get("in_buildcache")]
+    reachable = set(stack)
+    while stack:
+        for dep in installs[stack.pop()]["spec"].get("dependencies", ()):
+            if dep["hash"] in installs and dep["hash"] not in reachable:
+                reachable.add(dep["hash"])
+                stack.append(dep["hash"])
+
+    for h in [h for h in installs if h not in reachable]:
+        del installs[h]
+
+    for record in installs.values():
+        record["ref_count"] = 0
+    for record in installs.values():
+        for dep in record["spec"].get("dependencies", ()):
+            if dep["hash"] in installs:
+                installs[dep["hash"]]["ref_count"] += 1
+
+
+def _write_index(installs: Dict[str, dict], stream) -> None:
+    """Write the records of a build cache index one at a time, like
+    ``Database._write_to_file()`` does."""
+    stream.write('{"database":{"version":%s,"installs":{' % json.dumps(str(spack_db._DB_VERSION)))
+    for i, (h, record) in enumerate(installs.items()):
+        if i:
+            stream.write(",")
+        stream.write(json.dumps(h))
+        stream.write(":")
+        stream.write(json.dumps(record, separators=(",", ":")))
+    stream.write("}}}")
+
+
+def _index_shards(installs: Dict[str, dict]) -> Dict[str, Dict[str, dict]]:
+    """Group the records of a build cache index by DAG hash prefix, as ``hash/<prefix>``,
+    and by package name, as ``name/<name>``. Each shard also contains the records of all
+    the dependencies of its specs, so that it can be read on its own."""
+    keys: Dict[str, List[str]] = collections.defaultdict(list)
+    for h, record in installs.items():
+        keys[f"hash/{h[:INDEX_SHARD_HASH_PREFIX]}"].append(h)
+        keys[f"name/{record['spec']['name']}"].append(h)
+
+    shards = {}
+    for key, hashes in keys.items():
+        records: Dict[str, dict] = {}
+        stack = list(hashes)
+        while stack:
+            h = stack.pop()
+            if h in records or h not in installs:
+                continue
+            records[h] = installs[h]
+            stack.extend(dep["hash"] for dep in installs[h]["spec"].get("dependencies", ()))
+        shards[key] = records
+    return shards
+
+
+def _push_index_shards(installs: Dict[str, dict], cache_prefix: str, temp_dir: str) -> None:
+    """Push the index split in shards, and the manifest mapping shard keys to file names.
+
+    Shard files are named after the hash of their content, so clients can keep them for
+    as long as the manifest refers to them, and only new shards are pushed.
+    """
+    shards_url = url_util.join(cache_prefix, INDEX_SHARDS_RELATIVE_PATH)
+    try:
+        existing = set(web_util.list_url(shards_url))
+    except Exception:
+        existing = set()
+
+    files = {}
+    for key, records in _index_shards(installs).items():
+        stream = io.StringIO()
+        _write_index(records, stream)
+        contents = stream.getvalue()
+        name = f"{compute_hash(contents)}.json"
+        files[key] = name
+        if name in existing:
+            continue
+        shard_path = os.path.join(temp_dir, name)
+        with open(shard_path, "w") as f:
+            f.write(contents)
+        web_util.push_to_url(
+            shard_path,
+            url_util.join(shards_url, name),
+            keep_original=False,
+            extra_args={"ContentType": "application/json"},
+        )
+
+    manifest_path = os.path.join(temp_dir, "manifest.json")
+    with open(manifest_path, "w") as f:
+        json.dump(
+            {
+                "index-shards": {
+                    "version": INDEX_SHARDS_VERSION,
+                    "hash_prefix": INDEX_SHARD_HASH_PREFIX,
+                    "shards": files,
+                }
+            },
+            f,
+        )
+    web_util.push_to_url(
+        manifest_path,
+        url_util.join(shards_url, "manifest.json"),
+        keep_original=False,
+        extra_args={"ContentType": "application/json", "CacheControl": "no-cache"},
+    )
+
+    # Shards the manifest doesn't refer to anymore
+    for name in existing - set(files.values()) - {"manifest.json"}:
+        try:
+            web_util.remove_url(url_util.join(shards_url, name))
+        except Exception as e:
+            tty.debug(f"Cannot remove index shard {name}: {e}")
+
+
+def _remove_index_shards(cache_prefix: str) -> None:
+    """Remove a sharded index, which would be out of date once the index is updated."""
+    shards_url = url_util.join(cache_prefix, INDEX_SHARDS_RELATIVE_PATH)
+    if not web_util.url_exists(url_util.join(shards_url, "manifest.json")):
+        return
+    try:
+        web_util.remove_url(shards_url, recursive=True)
+    except Exception as e:
+        tty.warn(f"Cannot remove the out of date sharded index at {shards_url}: {e}")
+
+
+def _update_package_index(cache_prefix: str, temp_dir: str, sharded: bool = False) -> bool:
+    """Apply the pending deltas to the index of the build cache.
+
+    Return:
+        False if there is no up to date index the deltas can be applied to, True otherwise
+    """
+    delta_urls = _index_delta_urls(cache_prefix)
+    try:
+        index = _read_json_from_url(url_util.join(cache_prefix, "index.json"))
+    except (web_util.SpackWebError, URLError, ValueError) as e:
+        tty.debug(f"Cannot read the index of {cache_prefix}: {e}")
+        return False
+
+    if index["database"]["version"] != str(spack_db._DB_VERSION):
+        return False
+
+    if not delta_urls and not sharded:
+        tty.debug(f"The index of {cache_prefix} is up to date")
+        _remove_index_shards(cache_prefix)
+        return True
+
+    deltas = []
+    for url in delta_urls:
+        delta = _read_json_from_url(url)["index-delta"]
+        if delta["version"] != INDEX_DELTA_VERSION:
+            return False
+        deltas.append(delta)
+
+    installs = index["database"]["installs"]
+    _apply_index_deltas(installs, deltas)
+
+    index_json_path = os.path.join(temp_dir, "index.json")
+    with open(index_json_path, "w") as f:
+        _write_index(installs, f)
+    if sharded:
+        _push_index_shards(installs, cache_prefix, temp_dir)
+    else:
+        _remove_index_shards(cache_prefix)
+    _push_index(index_json_path, cache_prefix, temp_dir)
+
+    _remove_index_deltas(delta_urls)
+    return True
+
+
 def _specs_from_cache_aws_cli(cache_prefix):
     """Use aws cli to sync all the specs into a local temporary directory.
 
@@ -1032,7 +1502,7 @@ def _spec_files_from_cache(cache_prefix):
     raise ListMirrorSpecsError("Failed to get list of specs from {0}".format(cache_prefix))
 
 
-def generate_package_index(cache_prefix, concurrency=32):
+def generate_package_index(cache_prefix, concurrency=32, incremental=False, sharded=False):
     """Create or replace the build cache index on the given mirror.  The
     buildcache index contains an entry for each binary package under the
     cache_prefix.
@@ -1041,10 +1511,28 @@ def generate_package_index(cache_prefix, concurrency=32):
         cache_prefix(str): Base url of binary mirror.
         concurrency: (int): The desired threading concurrency to use when
             fetching the spec files from the mirror.
+        incremental (bool): if True, only apply the deltas recorded by ``push`` to the
+            existing index, and rebuild it from all the spec files only if that fails.
+        sharded (bool): if True, also push the index split in shards by DAG hash prefix and
+            by package name, so that clients can fetch only the part they need. Otherwise,
+            remove any sharded index.
 
     Return:
         None
     """
+    if incremental:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            try:
+                if _update_package_index(cache_prefix, tmpdir, sharded=sharded):
+                    return
+            except Exception as err:
+                tty.warn(f"Cannot update the package index of {cache_prefix} incrementally: {err}")
+                tty.debug("\n" + traceback.format_exc())
+        tty.debug(f"Rebuilding the package index of {cache_prefix} from all the spec files")
+
+    # Deltas recorded before the spec files are listed are superseded by the new index
+    delta_urls = _index_delta_urls(cache_prefix)
+
     try:
         file_list, read_fn = _spec_files_from_cache(cache_prefix)
     except ListMirrorSpecsError as err:
@@ -1060,7 +1548,10 @@ def generate_package_index(cache_prefix, concurrency=32):
     db_root_dir = db.database_directory
 
     try:
-        _read_specs_and_push_index(file_list, read_fn, cache_prefix, db, db_root_dir, concurrency)
+        _read_specs_and_push_index(
+            file_list, read_fn, cache_prefix, db, db_root_dir, concurrency, sharded=sharded
+        )
+        _remove_index_deltas(delta_urls)
     except Exception as err:
         msg = "Encountered problem pushing package index to {0}: {1}".format(cache_prefix, err)
         tty.warn(msg)
@@ -1133,7 +1624,8 @@ def generate_key_index(key_prefix, tmpdir=None):
 
 
 def tarfile_of_spec_prefix(tar: tarfile.TarFile, prefix: str) -> None:
-    """Create a tarfile of an install prefix of a spec. Skips existing buildinfo file.
+    """Create a tarfile of an install prefix of a spec. Skips existing buildinfo file, and the
+    cached run environment, which contains absolute paths.
 
     Args:
         tar: tarfile object to add files to
@@ -1142,10 +1634,19 @@ def tarfile_of_spec_prefix(tar: tarfile.TarFile, prefix: str) -> None:
         raise ValueError(f"prefix '{prefix}' must be an absolute path to a directory")
     stat_key = lambda stat: (stat.st_dev, stat.st_ino)
 
-    try:  # skip buildinfo file if it exists
-        files_to_skip = [stat_key(os.lstat(buildinfo_file_name(prefix)))]
+    files_to_skip = set()
+    layout = spack.store.STORE.layout
+    for path in (
+        buildinfo_file_name(prefix),
+        os.path.join(prefix, layout.metadata_dir, layout.env_modifications_file_name),
+    ):
+        try:
+            files_to_skip.add(stat_key(os.lstat(path)))
+        except OSError:
+            pass
+    if files_to_skip:
         skip = lambda entry: stat_key(entry.stat(follow_symlinks=False)) in files_to_skip
-    except OSError:
+    else:
         skip = lambda entry: False
 
     spack.util.archive.reproducible_tarfile_from_prefix(
@@ -1158,8 +1659,10 @@ def tarfile_of_spec_prefix(tar: tarfile.TarFile, prefix: str) -> None:
     )
 
 
-def _do_create_tarball(tarfile_path: str, binaries_dir: str, buildinfo: dict):
-    with spack.util.archive.gzip_compressed_tarfile(tarfile_path) as (
+def _do_create_tarball(
+    tarfile_path: str, binaries_dir: str, buildinfo: dict, compression: str = "gzip"
+):
+    with spack.util.archive.compressed_tarfile(tarfile_path, compression) as (
         tar,
         inner_checksum,
         outer_checksum,
@@ -1193,6 +1696,9 @@ class PushOptions(NamedTuple):
     #: What key to use for signing
     key: Optional[str] = None
 
+    #: Compression of the tarball, one of ``spack.util.archive.COMPRESSIONS``
+    compression: str = "gzip"
+
 
 def push_or_raise(spec: Spec, out_url: str, options: PushOptions):
     """
@@ -1254,7 +1760,7 @@ def _build_tarball_in_stage_dir(spec: Spec, out_url: str, stage_dir: str, option
     # create info for later relocation and create tar
     buildinfo = get_buildinfo_dict(spec)
 
-    checksum, _ = _do_create_tarball(tarfile_path, binaries_dir, buildinfo)
+    checksum, _ = _do_create_tarball(tarfile_path, binaries_dir, buildinfo, options.compression)
 
     # add sha256 checksum to spec.json
     with open(spec_file, "r") as inputfile:
@@ -1263,7 +1769,11 @@ def _build_tarball_in_stage_dir(spec: Spec, out_url: str, stage_dir: str, option
             spec_dict = sjson.load(content)
         else:
             raise ValueError("{0} not a valid spec file type".format(spec_file))
-    spec_dict["buildcache_layout_version"] = CURRENT_BUILD_CACHE_LAYOUT_VERSION
+    if options.compression == "gzip":
+        spec_dict["buildcache_layout_version"] = GZIP_BUILD_CACHE_LAYOUT_VERSION
+    else:
+        spec_dict["buildcache_layout_version"] = CURRENT_BUILD_CACHE_LAYOUT_VERSION
+        spec_dict["binary_cache_compression"] = options.compression
     spec_dict["binary_cache_checksum"] = {"hash_algorithm": "sha256", "hash": checksum}
 
     with open(specfile_path, "w") as outfile:
@@ -1286,6 +1796,13 @@ def _build_tarball_in_stage_dir(spec: Spec, out_url: str, stage_dir: str, option
         keep_original=False,
     )
 
+    # record the new spec, so that the index can be updated without reading all spec files
+    push_index_delta(
+        url_util.join(out_url, os.path.relpath(cache_prefix, stage_dir)),
+        added=[spec],
+        tmpdir=stage_dir,
+    )
+
     # push the key to the build cache's _pgp directory so it can be
     # imported
     if not options.unsigned:
@@ -1420,6 +1937,8 @@ def _delete_staged_downloads(download_result):
     """Clean up stages used to download tarball and specfile"""
     download_result["tarball_stage"].destroy()
     download_result["specfile_stage"].destroy()
+    if "tmpdir" in download_result:
+        shutil.rmtree(download_result.pop("tmpdir"), ignore_errors=True)
 
 
 def _get_valid_spec_file(path: str, max_supported_layout: int) -> Tuple[Dict, int]:
@@ -1455,6 +1974,12 @@ def _get_valid_spec_file(path: str, max_supported_layout: int) -> Tuple[Dict, in
             f"Layout version {layout_version} is too new for this version of Spack"
         )
 
+    compression = spec_dict.get("binary_cache_compression", "gzip")
+    if compression == "zstd" and not spack.util.archive.ZSTD_SUPPORTED:
+        raise InvalidMetadataFile("zstd compressed tarballs require the zstandard Python module")
+    elif compression not in spack.util.archive.COMPRESSIONS:
+        raise InvalidMetadataFile(f"Unknown compression of the tarball: {compression}")
+
     return spec_dict, layout_version
 
 
@@ -1797,6 +2322,14 @@ def is_backup_file(file):
         files_to_relocate = [
             os.path.join(workdir, filename) for filename in buildinfo.get("relocate_binaries")
         ]
+        # Binaries without any of the old prefixes can be skipped when replacing prefixes.
+        # Older tarballs don't record which binaries contain them.
+        binaries_with_prefix = [
+            os.path.join(workdir, filename)
+            for filename in buildinfo.get(
+                "relocate_binaries_with_prefix", buildinfo.get("relocate_binaries")
+            )
+        ]
         # If the buildcache was not created with relativized rpaths
         # do the relocation of path in binaries
         platform = spack.platforms.by_name(spec.platform)
@@ -1813,7 +2346,7 @@ def is_backup_file(file):
         elif "elf" in platform.binary_formats and not rel:
             # The new ELF dynamic section relocation logic only handles absolute to
             # absolute relocation.
-            relocate.new_relocate_elf_binaries(files_to_relocate, prefix_to_prefix_bin)
+            relocate.new_relocate_elf_binaries(binaries_with_prefix, prefix_to_prefix_bin)
         elif "elf" in platform.binary_formats and rel:
             relocate.relocate_elf_binaries(
                 files_to_relocate,
@@ -1829,19 +2362,19 @@ def is_backup_file(file):
         links = [os.path.join(workdir, f) for f in buildinfo.get("relocate_links", [])]
         relocate.relocate_links(links, prefix_to_prefix_bin)
 
-        # For all buildcaches
-        # relocate the install prefixes in text files including dependencies
-        relocate.relocate_text(text_names, prefix_to_prefix_text)
-
-        # relocate the install prefixes in binary files including dependencies
-        changed_files = relocate.relocate_text_bin(files_to_relocate, prefix_to_prefix_bin)
+        # For all buildcaches relocate the install prefixes in text files and in binary
+        # files, including the ones of dependencies
+        relocate.relocate_text_and_binaries(
+            text_names, prefix_to_prefix_text, binaries_with_prefix, prefix_to_prefix_bin
+        )
 
-        # Add ad-hoc signatures to patched macho files when on macOS.
+        # Add ad-hoc signatures to patched macho files when on macOS. All of them may
+        # have been modified by relocate_macho_binaries.
         if "macho" in platform.binary_formats and sys.platform == "darwin":
             codesign = which("codesign")
             if not codesign:
                 return
-            for binary in changed_files:
+            for binary in files_to_relocate:
                 codesign("-fs-", binary)
 
     # If we are installing back to the same location
@@ -1911,7 +2444,7 @@ def _tar_strip_component(tar: tarfile.TarFile, prefix: str):
     # to ensure that those are updated too.
     # Absolute symlinks are copied verbatim -- relocation should take care of
     # them.
-    for m in tar.getmembers():
+    for m in tar:
         result = regex.match(m.name)
         if not result:
             continue
@@ -1923,25 +2456,9 @@ def _tar_strip_component(tar: tarfile.TarFile, prefix: str):
         yield m
 
 
-def extract_tarball(spec, download_result, force=False, timer=timer.NULL_TIMER):
-    """
-    extract binary tarball for given package into install area
-    """
-    timer.start("extract")
-    if os.path.exists(spec.prefix):
-        if force:
-            shutil.rmtree(spec.prefix)
-        else:
-            raise NoOverwriteException(str(spec.prefix))
-
-    # Create the install prefix
-    fsys.mkdirp(
-        spec.prefix,
-        mode=get_package_dir_permissions(spec),
-        group=get_package_group(spec),
-        default_perms="parents",
-    )
-
+def _verify_tarball(spec, download_result) -> str:
+    """Check the signature and the checksum of a downloaded binary package, and return
+    the path of the tarball with the install tree."""
     specfile_path = download_result["specfile_stage"].save_filename
     spec_dict, layout_version = _get_valid_spec_file(
         specfile_path, CURRENT_BUILD_CACHE_LAYOUT_VERSION
@@ -1951,86 +2468,166 @@ def extract_tarball(spec, download_result, force=False, timer=timer.NULL_TIMER):
     filename = download_result["tarball_stage"].save_filename
     signature_verified: bool = download_result["signature_verified"]
     signature_required: bool = download_result["signature_required"]
-    tmpdir = None
 
     if layout_version == 0:
         # Handle the older buildcache layout where the .spack file
         # contains a spec json, maybe an .asc file (signature),
         # and another tarball containing the actual install tree.
         tmpdir = tempfile.mkdtemp()
-        try:
-            tarfile_path = _extract_inner_tarball(
-                spec, filename, tmpdir, signature_required, bchecksum
-            )
-        except Exception as e:
-            _delete_staged_downloads(download_result)
-            shutil.rmtree(tmpdir)
-            raise e
-    elif 1 <= layout_version <= 2:
-        # Newer buildcache layout: the .spack file contains just
-        # in the install tree, the signature, if it exists, is
-        # wrapped around the spec.json at the root.  If sig verify
-        # was required, it was already done before downloading
-        # the tarball.
-        tarfile_path = filename
-
-        if signature_required and not signature_verified:
-            raise UnsignedPackageException(
-                "To install unsigned packages, use the --no-check-signature option, "
-                "or configure the mirror with signed: false."
-            )
+        download_result["tmpdir"] = tmpdir
+        return _extract_inner_tarball(spec, filename, tmpdir, signature_required, bchecksum)
+
+    # Newer buildcache layout: the .spack file contains just
+    # in the install tree, the signature, if it exists, is
+    # wrapped around the spec.json at the root.  If sig verify
+    # was required, it was already done before downloading
+    # the tarball.
+    tarfile_path = filename
+
+    if signature_required and not signature_verified:
+        raise UnsignedPackageException(
+            "To install unsigned packages, use the --no-check-signature option, "
+            "or configure the mirror with signed: false."
+        )
 
-        # compute the sha256 checksum of the tarball
-        local_checksum = spack.util.crypto.checksum(hashlib.sha256, tarfile_path)
-        expected = bchecksum["hash"]
+    # compute the sha256 checksum of the tarball
+    local_checksum = spack.util.crypto.checksum(hashlib.sha256, tarfile_path)
+    expected = bchecksum["hash"]
 
-        # if the checksums don't match don't install
-        if local_checksum != expected:
-            size, contents = fsys.filesummary(tarfile_path)
-            _delete_staged_downloads(download_result)
-            raise NoChecksumException(
-                tarfile_path, size, contents, "sha256", expected, local_checksum
-            )
+    # if the checksums don't match don't install
+    if local_checksum != expected:
+        size, contents = fsys.filesummary(tarfile_path)
+        raise NoChecksumException(tarfile_path, size, contents, "sha256", expected, local_checksum)
+
+    return tarfile_path
+
+
+def _unpack_tarball(tarfile_path: str, destination: str) -> None:
+    # The tarball is read twice as a stream: once to validate its members, and once to extract
+    # them. Each pass decompresses the tarball in parallel, when its format allows it.
+    with spack.util.archive.tarfile_stream(tarfile_path) as tar:
+        prefix = _ensure_common_prefix(tar)
+
+    with spack.util.archive.tarfile_stream(tarfile_path) as tar:
+        # Remove install prefix from tarfil to extract directly into the destination
+        tar.extractall(path=destination, members=_tar_strip_component(tar, prefix=prefix))
+
+
+def _relocate_extracted_prefix(spec) -> None:
     try:
-        with closing(tarfile.open(tarfile_path, "r")) as tar:
-            # Remove install prefix from tarfil to extract directly into spec.prefix
-            tar.extractall(
-                path=spec.prefix,
-                members=_tar_strip_component(tar, prefix=_ensure_common_prefix(tar)),
-            )
+        relocate_package(spec)
     except Exception:
         shutil.rmtree(spec.prefix, ignore_errors=True)
-        _delete_staged_downloads(download_result)
         raise
 
-    os.remove(tarfile_path)
-    os.remove(specfile_path)
+    manifest_file = os.path.join(
+        spec.prefix,
+        spack.store.STORE.layout.metadata_dir,
+        spack.store.STORE.layout.manifest_file_name,
+    )
+    if not os.path.exists(manifest_file):
+        spec_id = spec.format("{name}/{hash:7}")
+        tty.warn("No manifest file in tarball for spec %s" % spec_id)
+
+
+def _make_prefix_dir(spec, path: str) -> None:
+    fsys.mkdirp(
+        path,
+        mode=get_package_dir_permissions(spec),
+        group=get_package_group(spec),
+        default_perms="parents",
+    )
+
+
+def extract_tarball(spec, download_result, force=False, timer=timer.NULL_TIMER):
+    """
+    extract binary tarball for given package into install area
+    """
+    timer.start("extract")
+    if os.path.exists(spec.prefix):
+        if force:
+            shutil.rmtree(spec.prefix)
+        else:
+            raise NoOverwriteException(str(spec.prefix))
+
+    # Create the install prefix
+    _make_prefix_dir(spec, spec.prefix)
+
+    try:
+        tarfile_path = _verify_tarball(spec, download_result)
+        _unpack_tarball(tarfile_path, spec.prefix)
+    except Exception:
+        shutil.rmtree(spec.prefix, ignore_errors=True)
+        _delete_staged_downloads(download_result)
+        raise
     timer.stop("extract")
 
     timer.start("relocate")
     try:
-        relocate_package(spec)
-    except Exception as e:
-        shutil.rmtree(spec.prefix, ignore_errors=True)
-        raise e
-    else:
-        manifest_file = os.path.join(
-            spec.prefix,
-            spack.store.STORE.layout.metadata_dir,
-            spack.store.STORE.layout.manifest_file_name,
-        )
-        if not os.path.exists(manifest_file):
-            spec_id = spec.format("{name}/{hash:7}")
-            tty.warn("No manifest file in tarball for spec %s" % spec_id)
+        _relocate_extracted_prefix(spec)
     finally:
-        if tmpdir:
-            shutil.rmtree(tmpdir, ignore_errors=True)
-        if os.path.exists(filename):
-            os.remove(filename)
         _delete_staged_downloads(download_result)
     timer.stop("relocate")
 
 
+def verify_tarball(spec, download_result) -> str:
+    """Check the signature and the checksum of a binary package downloaded by
+    :func:`download_tarball`, without installing it.
+
+    The staged downloads are removed if the verification fails.
+
+    Returns:
+        Path of the verified tarball containing the install tree
+    """
+    try:
+        return _verify_tarball(spec, download_result)
+    except Exception:
+        _delete_staged_downloads(download_result)
+        raise
+
+
+def stage_tarball(spec, download_result, tarfile_path: str) -> str:
+    """Extract a tarball verified by :func:`verify_tarball` into a staging directory next
+    to the install prefix of the spec, and remove the staged downloads.
+
+    Since the staging directory is unique, this can be done without holding a lock on the
+    install prefix. The staged install tree is moved into place, and relocated, by
+    :func:`install_staged_tarball`.
+
+    Returns:
+        Path of the staging directory
+    """
+    prefix = str(spec.prefix)
+    staging_dir = os.path.join(
+        os.path.dirname(prefix), f".{os.path.basename(prefix)}-{uuid.uuid4().hex[:8]}.staging"
+    )
+    try:
+        _make_prefix_dir(spec, staging_dir)
+        _unpack_tarball(tarfile_path, staging_dir)
+    except Exception:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    finally:
+        _delete_staged_downloads(download_result)
+    return staging_dir
+
+
+def install_staged_tarball(spec, staging_dir: str, timer=timer.NULL_TIMER) -> None:
+    """Move an install tree extracted by :func:`stage_tarball` to the install prefix of the
+    spec, and relocate it."""
+    try:
+        if os.path.exists(spec.prefix):
+            raise NoOverwriteException(str(spec.prefix))
+        os.rename(staging_dir, spec.prefix)
+    except Exception:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    timer.start("relocate")
+    _relocate_extracted_prefix(spec)
+    timer.stop("relocate")
+
+
 def _ensure_common_prefix(tar: tarfile.TarFile) -> str:
     # Find the lowest `binary_distribution` file (hard-coded forward slash is on purpose).
     binary_distribution = min(
@@ -2202,7 +2799,8 @@ def get_mirrors_for_spec(spec=None, mirrors_to_check=None, index_only=False):
         mirrors_to_check (dict): Optionally override the configured mirrors
             with the mirrors in this dictionary.
         index_only (bool): When ``index_only`` is set to ``True``, only the local
-            cache is checked, no requests are made.
+            cache is checked, and the index shard of the spec in mirrors with a
+            sharded index. Spec files are not fetched directly.
 
     Return:
         A list of objects, each containing a ``mirror_url`` and ``spec`` key
@@ -2229,7 +2827,7 @@ def get_mirrors_for_spec(spec=None, mirrors_to_check=None, index_only=False):
     return results
 
 
-def update_cache_and_get_specs():
+def update_cache_and_get_specs(names: Optional[Iterable[str]] = None):
     """
     Get all concrete specs for build caches available on configured mirrors.
     Initialization of internal cache data structures is done as lazily as
@@ -2237,10 +2835,15 @@ def update_cache_and_get_specs():
     local index cache (essentially a no-op if it has been done already and
     nothing has changed on the configured mirrors.)
 
+    Args:
+        names: if given, only the specs with these package names are needed. Mirrors with
+            a sharded index only have the corresponding shards fetched, so the specs
+            returned may be a subset of those available.
+
     Throws:
         FetchCacheError
     """
-    BINARY_INDEX.update()
+    BINARY_INDEX.update(names=names)
     return BINARY_INDEX.get_all_built_specs()
 
 
@@ -43,12 +43,12 @@
 from collections import defaultdict
 from enum import Flag, auto
 from itertools import chain
-from typing import List, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import llnl.util.tty as tty
 from llnl.string import plural
 from llnl.util.filesystem import join_path
-from llnl.util.lang import dedupe, stable_partition
+from llnl.util.lang import dedupe, memoized, stable_partition
 from llnl.util.symlink import symlink
 from llnl.util.tty.color import cescape, colorize
 from llnl.util.tty.log import MultiProcessFd
@@ -69,8 +69,11 @@
 import spack.store
 import spack.subprocess_context
 import spack.user_environment
+import spack.util.file_permissions as fp
+import spack.util.hash
 import spack.util.path
 import spack.util.pattern
+import spack.util.spack_json as sjson
 from spack import traverse
 from spack.context import Context
 from spack.error import NoHeadersError, NoLibrariesError
@@ -933,6 +936,150 @@ def effective_deptypes(
     return nodes_with_type
 
 
+@memoized
+def _spack_version() -> str:
+    """Version of Spack, including the commit of a git checkout"""
+    return spack.main.get_version()
+
+
+#: Hashes of files keyed by (path, mtime, size)
+_file_hashes: Dict[Tuple[str, int, int], str] = {}
+
+
+def _file_hash(path: str) -> str:
+    """Hash of the content of a file, read only once while the file is unchanged"""
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    if key not in _file_hashes:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            _file_hashes[key] = spack.util.hash.b32_hash(f.read())
+    return _file_hashes[key]
+
+
+class RunEnvironmentCache:
+    """Modifications to the run environment made by package methods, cached in the metadata
+    directory of installed specs.
+
+    The file in the metadata directory of a spec holds the modifications from its own
+    ``setup_run_environment``, and those from the ``setup_dependent_run_environment`` of each of
+    its dependencies. Replaying them avoids executing the methods of packages. An entry is
+    recomputed when the files defining the package class of either spec or any of its bases,
+    their prefixes, or the version of Spack, including its commit, change. Modifications
+    involving external specs are never cached, since Spack does not manage their prefix.
+    """
+
+    def __init__(self, specs: Iterable[spack.spec.Spec]) -> None:
+        with spack.store.STORE.db.read_transaction():
+            self._cacheable = {id(s) for s in specs if not s.external and s.installed}
+        #: content of the cache files, by DAG hash of the spec they belong to
+        self._files: Dict[str, Dict[str, Any]] = {}
+        #: specs whose cache file has new entries
+        self._modified: Dict[str, spack.spec.Spec] = {}
+        self._package_hashes: Dict[str, Optional[str]] = {}
+
+    @staticmethod
+    def cache_file(spec: spack.spec.Spec) -> str:
+        """Path of the cache file in the metadata directory of an installed spec"""
+        layout = spack.store.STORE.layout
+        return os.path.join(spec.prefix, layout.metadata_dir, layout.env_modifications_file_name)
+
+    def get(
+        self, method: str, provider: spack.spec.Spec, owner: spack.spec.Spec
+    ) -> Optional[EnvironmentModifications]:
+        """Return the cached modifications from ``provider.package.<method>``, called for
+        ``owner``, or None if they are not cached."""
+        signature = self._signature(provider, owner)
+        if signature is None:
+            return None
+        entry = self._entries(owner).get(f"{method}/{provider.dag_hash()}")
+        if not isinstance(entry, dict) or entry.get("signature") != signature:
+            return None
+        try:
+            return EnvironmentModifications.from_list(entry["modifications"])
+        except (KeyError, TypeError):
+            return None
+
+    def modifications(
+        self,
+        method: str,
+        provider: spack.spec.Spec,
+        owner: spack.spec.Spec,
+        compute: Callable[[EnvironmentModifications], None],
+    ) -> EnvironmentModifications:
+        """Return the modifications from ``provider.package.<method>`` called for ``owner``,
+        from the cache if possible. Otherwise they are computed by ``compute``, and cached."""
+        env = self.get(method, provider, owner)
+        if env is not None:
+            return env
+        env = EnvironmentModifications()
+        compute(env)
+        signature = self._signature(provider, owner)
+        if signature is not None:
+            self._entries(owner)[f"{method}/{provider.dag_hash()}"] = {
+                "signature": signature,
+                "modifications": env.to_list(),
+            }
+            self._modified[owner.dag_hash()] = owner
+        return env
+
+    def write(self) -> None:
+        """Write the cache files with new entries. Failures, for instance in read-only upstream
+        stores, are ignored."""
+        for key, owner in self._modified.items():
+            path = self.cache_file(owner)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp, "w") as f:
+                    sjson.dump(self._files[key], f)
+                fp.set_permissions_by_spec(tmp, owner)
+                os.replace(tmp, path)
+            except OSError as e:
+                tty.debug(f"Cannot cache the run environment of {owner.cshort_spec}: {e}")
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+        self._modified.clear()
+
+    def _entries(self, owner: spack.spec.Spec) -> Dict[str, Any]:
+        key = owner.dag_hash()
+        if key not in self._files:
+            try:
+                with open(self.cache_file(owner)) as f:
+                    data = sjson.load(f)
+            except (OSError, ValueError):
+                data = {}
+            self._files[key] = data if isinstance(data, dict) else {}
+        return self._files[key]
+
+    def _signature(self, provider: spack.spec.Spec, owner: spack.spec.Spec) -> Optional[str]:
+        if id(provider) not in self._cacheable or id(owner) not in self._cacheable:
+            return None
+        package_hashes = [self._package_hash(provider), self._package_hash(owner)]
+        if None in package_hashes:
+            return None
+        return spack.util.hash.b32_hash(
+            ":".join([_spack_version(), provider.prefix, owner.prefix, *package_hashes])
+        )
+
+    def _package_hash(self, spec: spack.spec.Spec) -> Optional[str]:
+        """Hash of the files defining the package class of a spec and its bases, such as build
+        systems, mixins and packages it derives from, which may all define the cached methods.
+        Unlike the canonical package hash, it does not need to parse the files."""
+        if spec.fullname not in self._package_hashes:
+            try:
+                pkg_cls = spack.repo.PATH.get_pkg_class(spec.fullname)
+                paths = dedupe(
+                    inspect.getfile(cls) for cls in pkg_cls.__mro__ if cls.__module__ != "builtins"
+                )
+                self._package_hashes[spec.fullname] = spack.util.hash.b32_hash(
+                    ":".join(_file_hash(path) for path in paths)
+                )
+            except (OSError, TypeError, spack.repo.RepoError):
+                self._package_hashes[spec.fullname] = None
+        return self._package_hashes[spec.fullname]
+
+
 class SetupContext:
     """This class encapsulates the logic to determine environment modifications, and is used as
     well to set globals in modules of package.py."""
@@ -974,6 +1121,34 @@ def __init__(self, *specs: spack.spec.Spec, context: Context) -> None:
         )
         # In a build context, the root needs build-specific globals set.
         self.needs_build_context = UseMode.ROOT
+        self._run_env_cache: Optional[RunEnvironmentCache] = None
+
+    @property
+    def run_env_cache(self) -> RunEnvironmentCache:
+        """Cache of the modifications from setup_run_environment and
+        setup_dependent_run_environment"""
+        if self._run_env_cache is None:
+            nodes = [s for s, _ in chain(self.external, self.nonexternal)]
+            # The prefix of a spec being built is not complete, even when it is reinstalled
+            if self.context == Context.BUILD:
+                nodes = [s for s in nodes if all(s is not root for root in self.specs)]
+            self._run_env_cache = RunEnvironmentCache(nodes)
+        return self._run_env_cache
+
+    def run_env_modifications_are_cached(self) -> bool:
+        """Whether all the modifications from package methods are cached, in which case package
+        globals need not be set to compute them."""
+        for dspec, flag in chain(self.external, self.nonexternal):
+            if (self.should_setup_dependent_build_env | self.should_setup_build_env) & flag:
+                return False
+            if not self.should_setup_run_env & flag:
+                continue
+            for spec in self._run_env_dependents(dspec):
+                if self.run_env_cache.get("setup_dependent_run_environment", dspec, spec) is None:
+                    return False
+            if self.run_env_cache.get("setup_run_environment", dspec, dspec) is None:
+                return False
+        return True
 
     def set_all_package_py_globals(self):
         """Set the globals in modules of package.py files."""
@@ -1012,26 +1187,22 @@ def get_env_modifications(self) -> EnvironmentModifications:
         env = EnvironmentModifications()
         for dspec, flag in chain(self.external, self.nonexternal):
             tty.debug(f"Adding env modifications for {dspec.name}")
-            pkg = dspec.package
 
             if self.should_setup_dependent_build_env & flag:
                 self._make_buildtime_detectable(dspec, env)
 
                 for root in self.specs:  # there is only one root in build context
-                    spack.builder.create(pkg).setup_dependent_build_environment(env, root)
+                    builder = spack.builder.create(dspec.package)
+                    builder.setup_dependent_build_environment(env, root)
 
             if self.should_setup_build_env & flag:
-                spack.builder.create(pkg).setup_build_environment(env)
+                spack.builder.create(dspec.package).setup_build_environment(env)
 
             if self.should_be_runnable & flag:
                 self._make_runnable(dspec, env)
 
             if self.should_setup_run_env & flag:
-                run_env_mods = EnvironmentModifications()
-                for spec in dspec.dependents(deptype=dt.LINK | dt.RUN):
-                    if id(spec) in self.nodes_in_subdag:
-                        pkg.setup_dependent_run_environment(run_env_mods, spec)
-                pkg.setup_run_environment(run_env_mods)
+                run_env_mods = self._run_env_modifications(dspec)
 
                 external_env = (dspec.extra_attributes or {}).get("environment", {})
                 if external_env:
@@ -1043,6 +1214,35 @@ def get_env_modifications(self) -> EnvironmentModifications:
                     run_env_mods.drop("CC", "CXX", "F77", "FC")
                 env.extend(run_env_mods)
 
+        self.run_env_cache.write()
+        return env
+
+    def _run_env_dependents(self, dspec: spack.spec.Spec) -> List[spack.spec.Spec]:
+        return [
+            s for s in dspec.dependents(deptype=dt.LINK | dt.RUN) if id(s) in self.nodes_in_subdag
+        ]
+
+    def _run_env_modifications(self, dspec: spack.spec.Spec) -> EnvironmentModifications:
+        """Modifications from setup_dependent_run_environment for the dependents of a spec, and
+        from its own setup_run_environment, replayed from the cache when possible."""
+        cache, env = self.run_env_cache, EnvironmentModifications()
+        for spec in self._run_env_dependents(dspec):
+            env.extend(
+                cache.modifications(
+                    "setup_dependent_run_environment",
+                    dspec,
+                    spec,
+                    lambda mods: dspec.package.setup_dependent_run_environment(mods, spec),
+                )
+            )
+        env.extend(
+            cache.modifications(
+                "setup_run_environment",
+                dspec,
+                dspec,
+                lambda mods: dspec.package.setup_run_environment(mods),
+            )
+        )
         return env
 
     def _make_buildtime_detectable(self, dep: spack.spec.Spec, env: EnvironmentModifications):
@@ -1107,6 +1307,14 @@ def _setup_pkg_and_run(
 
         pkg = serialized_pkg.restore()
 
+        # When several builds run concurrently, the parent process gives each of them
+        # a share of the global job budget, which overrides even the command line
+        build_jobs = kwargs.get("build_jobs")
+        if build_jobs is not None:
+            if "command_line" not in spack.config.CONFIG.scopes:
+                spack.config.CONFIG.push_scope(spack.config.InternalConfigScope("command_line"))
+            spack.config.set("config:build_jobs", build_jobs, scope="command_line")
+
         if not kwargs.get("fake", False):
             kwargs["unmodified_env"] = os.environ.copy()
             kwargs["env_modifications"] = setup_package(
@@ -1175,44 +1383,92 @@ def _setup_pkg_and_run(
             input_multiprocess_fd.close()
 
 
-def start_build_process(pkg, function, kwargs):
-    """Create a child process to do part of a spack build.
+class BuildProcess:
+    """Handle on a child process started by :func:`spawn_build_process`.
 
-    Args:
+    The parent process can either block on :meth:`complete`, or keep a number of these
+    handles around and use :attr:`connection` with ``multiprocessing.connection.wait``
+    to be notified of the first one that is done.
+    """
 
-        pkg (spack.package_base.PackageBase): package whose environment we should set up the
-            child process for.
-        function (typing.Callable): argless function to run in the child
-            process.
+    def __init__(self, pkg, process, read_pipe):
+        self.pkg = pkg
+        self.process = process
+        self.read_pipe = read_pipe
 
-    Usage::
+    @property
+    def connection(self):
+        """Readable end of the pipe the child sends its result on"""
+        return self.read_pipe
 
-        def child_fun():
-            # do stuff
-        build_env.start_build_process(pkg, child_fun)
+    @property
+    def pid(self):
+        return self.process.pid
 
-    The child process is run with the build environment set up by
-    spack.build_environment.  This allows package authors to have full
-    control over the environment, etc. without affecting other builds
-    that might be executed in the same spack call.
+    def _exitcode_msg(self):
+        typ = "exit" if self.process.exitcode >= 0 else "signal"
+        return f"{typ} {abs(self.process.exitcode)}"
 
-    If something goes wrong, the child process catches the error and
-    passes it to the parent wrapped in a ChildError.  The parent is
-    expected to handle (or re-raise) the ChildError.
+    def terminate(self):
+        """Terminate the child process and wait for it to exit."""
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.read_pipe.close()
 
-    This uses `multiprocessing.Process` to create the child process. The
-    mechanism used to create the process differs on different operating
-    systems and for different versions of Python. In some cases "fork"
-    is used (i.e. the "fork" system call) and some cases it starts an
-    entirely new Python interpreter process (in the docs this is referred
-    to as the "spawn" start method). Breaking it down by OS:
+    def complete(self):
+        """Wait for the child process to finish, and return its result.
 
-    - Linux always uses fork.
-    - Mac OS uses fork before Python 3.8 and "spawn" for 3.8 and after.
-    - Windows always uses the "spawn" start method.
+        Errors in the child process are re-raised in the parent."""
+        try:
+            child_result = self.read_pipe.recv()
+        except EOFError:
+            self.process.join()
+            raise InstallError(f"The process has stopped unexpectedly ({self._exitcode_msg()})")
+        finally:
+            self.read_pipe.close()
 
-    For more information on `multiprocessing` child process creation
-    mechanisms, see https://docs.python.org/3/library/multiprocessing.html#contexts-and-start-methods
+        self.process.join()
+
+        # If returns a StopPhase, raise it
+        if isinstance(child_result, StopPhase):
+            # do not print
+            raise child_result
+
+        # let the caller know which package went wrong.
+        if isinstance(child_result, InstallError):
+            child_result.pkg = self.pkg
+
+        if isinstance(child_result, ChildError):
+            # If the child process raised an error, print its output here rather
+            # than waiting until the call to SpackError.die() in main(). This
+            # allows exception handling output to be logged from within Spack.
+            # see spack.main.SpackCommand.
+            child_result.print_context()
+            raise child_result
+
+        # Fallback. Usually caught beforehand in EOFError above.
+        if self.process.exitcode != 0:
+            raise InstallError(f"The process failed unexpectedly ({self._exitcode_msg()})")
+
+        return child_result
+
+
+def spawn_build_process(pkg, function, kwargs, forward_stdin=True) -> BuildProcess:
+    """Create a child process to do part of a spack build, without waiting for it.
+
+    See :func:`start_build_process` for details on how the child process is set up.
+
+    Args:
+        pkg (spack.package_base.PackageBase): package whose environment we should set up the
+            child process for.
+        function (typing.Callable): function to run in the child process.
+        kwargs (dict): keyword arguments passed to ``function``
+        forward_stdin (bool): whether the child may read from the terminal, e.g. to
+            toggle verbosity. Should be disabled when more than one child runs at a time.
+
+    Returns:
+        A handle on the running child process
     """
     read_pipe, write_pipe = multiprocessing.Pipe(duplex=False)
     input_multiprocess_fd = None
@@ -1223,7 +1479,12 @@ def child_fun():
 
     try:
         # Forward sys.stdin when appropriate, to allow toggling verbosity
-        if sys.platform != "win32" and sys.stdin.isatty() and hasattr(sys.stdin, "fileno"):
+        if (
+            forward_stdin
+            and sys.platform != "win32"
+            and sys.stdin.isatty()
+            and hasattr(sys.stdin, "fileno")
+        ):
             input_fd = os.dup(sys.stdin.fileno())
             input_multiprocess_fd = MultiProcessFd(input_fd)
         mflags = os.environ.get("MAKEFLAGS", False)
@@ -1263,40 +1524,49 @@ def child_fun():
         if input_multiprocess_fd is not None:
             input_multiprocess_fd.close()
 
-    def exitcode_msg(p):
-        typ = "exit" if p.exitcode >= 0 else "signal"
-        return f"{typ} {abs(p.exitcode)}"
+    return BuildProcess(pkg, p, read_pipe)
 
-    try:
-        child_result = read_pipe.recv()
-    except EOFError:
-        p.join()
-        raise InstallError(f"The process has stopped unexpectedly ({exitcode_msg(p)})")
-
-    p.join()
-
-    # If returns a StopPhase, raise it
-    if isinstance(child_result, StopPhase):
-        # do not print
-        raise child_result
-
-    # let the caller know which package went wrong.
-    if isinstance(child_result, InstallError):
-        child_result.pkg = pkg
-
-    if isinstance(child_result, ChildError):
-        # If the child process raised an error, print its output here rather
-        # than waiting until the call to SpackError.die() in main(). This
-        # allows exception handling output to be logged from within Spack.
-        # see spack.main.SpackCommand.
-        child_result.print_context()
-        raise child_result
-
-    # Fallback. Usually caught beforehand in EOFError above.
-    if p.exitcode != 0:
-        raise InstallError(f"The process failed unexpectedly ({exitcode_msg(p)})")
-
-    return child_result
+
+def start_build_process(pkg, function, kwargs):
+    """Create a child process to do part of a spack build.
+
+    Args:
+
+        pkg (spack.package_base.PackageBase): package whose environment we should set up the
+            child process for.
+        function (typing.Callable): argless function to run in the child
+            process.
+
+    Usage::
+
+        def child_fun():
+            # do stuff
+        build_env.start_build_process(pkg, child_fun)
+
+    The child process is run with the build environment set up by
+    spack.build_environment.  This allows package authors to have full
+    control over the environment, etc. without affecting other builds
+    that might be executed in the same spack call.
+
+    If something goes wrong, the child process catches the error and
+    passes it to the parent wrapped in a ChildError.  The parent is
+    expected to handle (or re-raise) the ChildError.
+
+    This uses `multiprocessing.Process` to create the child process. The
+    mechanism used to create the process differs on different operating
+    systems and for different versions of Python. In some cases "fork"
+    is used (i.e. the "fork" system call) and some cases it starts an
+    entirely new Python interpreter process (in the docs this is referred
+    to as the "spawn" start method). Breaking it down by OS:
+
+    - Linux always uses fork.
+    - Mac OS uses fork before Python 3.8 and "spawn" for 3.8 and after.
+    - Windows always uses the "spawn" start method.
+
+    For more information on `multiprocessing` child process creation
+    mechanisms, see https://docs.python.org/3/library/multiprocessing.html#contexts-and-start-methods
+    """
+    return spawn_build_process(pkg, function, kwargs).complete()
 
 
 CONTEXT_BASES = (spack.package_base.PackageBase, spack.build_systems._checks.BaseBuilder)
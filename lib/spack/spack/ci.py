@@ -939,7 +939,7 @@ def generate_gitlab_ci_yaml(
 
     # Speed up staging by first fetching binary indices from all mirrors
     try:
-        bindist.BINARY_INDEX.update()
+        bindist.BINARY_INDEX.update(hashes=[s.dag_hash() for s in env.all_specs()])
     except bindist.FetchCacheError as e:
         tty.warn(e)
 
@@ -69,26 +69,40 @@ def require_cmd_name(cname):
 #: global, cached list of all commands -- access through all_commands()
 _all_commands = None
 
+#: global, cached map from command names to their files -- access through command_files()
+_command_files = None
 
-def all_commands():
-    """Get a sorted list of all spack commands.
 
-    This will list the lib/spack/spack/cmd directory and find the
-    commands there to construct the list.  It does not actually import
-    the python files -- just gets the names.
+def command_files():
+    """Get a dictionary mapping the name of each spack command to the file defining it.
+
+    Like ``all_commands()``, this only lists the command directories and does not
+    import any command module.
     """
-    global _all_commands
-    if _all_commands is None:
-        _all_commands = []
+    global _command_files
+    if _command_files is None:
+        _command_files = {}
         command_paths = [spack.paths.command_path]  # Built-in commands
         command_paths += spack.extensions.get_command_paths()  # Extensions
         for path in command_paths:
             for file in os.listdir(path):
                 if file.endswith(".py") and not re.search(ignore_files, file):
                     cmd = re.sub(r".py$", "", file)
-                    _all_commands.append(cmd_name(cmd))
+                    _command_files.setdefault(cmd_name(cmd), os.path.join(path, file))
+
+    return _command_files
+
 
-        _all_commands.sort()
+def all_commands():
+    """Get a sorted list of all spack commands.
+
+    This will list the lib/spack/spack/cmd directory and find the
+    commands there to construct the list.  It does not actually import
+    the python files -- just gets the names.
+    """
+    global _all_commands
+    if _all_commands is None:
+        _all_commands = sorted(command_files())
 
     return _all_commands
 
@@ -0,0 +1,129 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import json
+import shutil
+import sys
+import tempfile
+
+import llnl.util.tty as tty
+import llnl.util.tty.color as color
+from llnl.util.lang import pretty_seconds
+
+import spack.benchmark
+
+description = "measure the performance of Spack on synthetic workloads"
+section = "developer"
+level = "long"
+
+
+def setup_parser(subparser):
+    sp = subparser.add_subparsers(metavar="SUBCOMMAND", dest="benchmark_command")
+
+    sp.add_parser("list", help="list the available benchmarks")
+
+    run_parser = sp.add_parser("run", help="run benchmarks")
+    run_parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=3,
+        help="number of times each benchmark is run (default: %(default)s)",
+    )
+    run_parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="factor applied to the size of the workloads (default: %(default)s)",
+    )
+    run_parser.add_argument(
+        "-o", "--output", metavar="FILE", help="write the results as JSON to this file"
+    )
+    run_parser.add_argument(
+        "names", metavar="BENCHMARK", nargs="*", help="benchmarks to run (default: all)"
+    )
+
+    compare_parser = sp.add_parser("compare", help="compare the results of two runs")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown reported as a regression (default: %(default)s)",
+    )
+    compare_parser.add_argument("baseline", help="JSON results of the baseline run")
+    compare_parser.add_argument("current", help="JSON results of the run to be checked")
+
+
+def benchmark_list(args):
+    for name, bench in sorted(spack.benchmark.all_benchmarks().items()):
+        print(f"{name:16} {bench.description}")
+
+
+def _print_result(bench, result):
+    tty.msg(f"{bench.name}: {bench.description}")
+    for phase, summary in result["phases"].items():
+        print(f"    {phase:24} {pretty_seconds(summary['min']):>10}")
+
+
+def benchmark_run(args):
+    benchmarks = spack.benchmark.all_benchmarks()
+    unknown = [name for name in args.names if name not in benchmarks]
+    if unknown:
+        tty.die(f"no such benchmark: {', '.join(unknown)}")
+    if args.repeat < 1:
+        tty.die("the number of repetitions must be at least 1")
+
+    selected = [benchmarks[name] for name in args.names or benchmarks]
+    root = tempfile.mkdtemp(prefix="spack-benchmark-")
+    try:
+        with spack.benchmark.mock_session(root):
+            context = spack.benchmark.Context(root, scale=args.scale)
+            results = spack.benchmark.run(
+                selected, context, repeat=args.repeat, callback=_print_result
+            )
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        tty.msg(f"Results written to {args.output}")
+
+
+def _read_results(filename):
+    try:
+        with open(filename) as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        tty.die(f"cannot read benchmark results from {filename}: {e}")
+    if data.get("version") != spack.benchmark.RESULTS_VERSION:
+        tty.die(f"{filename} has results in an unsupported format")
+    return data
+
+
+def benchmark_compare(args):
+    baseline, current = _read_results(args.baseline), _read_results(args.current)
+    if baseline["scale"] != current["scale"]:
+        tty.warn(f"comparing runs at different scales: {baseline['scale']} and {current['scale']}")
+
+    comparisons = spack.benchmark.compare(baseline, current)
+    if not comparisons:
+        tty.die("the two runs have no benchmark in common")
+
+    slow = set(spack.benchmark.slowdowns(comparisons, args.threshold))
+    for c in comparisons:
+        line = (
+            f"{c.benchmark + '/' + c.phase:40} {pretty_seconds(c.baseline):>10} "
+            f"{pretty_seconds(c.current):>10} {c.ratio:8.2f}x"
+        )
+        print(color.colorize(f"@R{{{color.cescape(line)}}}") if c in slow else line)
+
+    if slow:
+        tty.error(f"{len(slow)} phases are slower by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+def benchmark(parser, args):
+    action = {"list": benchmark_list, "run": benchmark_run, "compare": benchmark_compare}
+    action[args.benchmark_command](args)
@@ -35,6 +35,7 @@
 import spack.stage
 import spack.store
 import spack.user_environment
+import spack.util.archive
 import spack.util.crypto
 import spack.util.url as url_util
 import spack.util.web as web_util
@@ -123,6 +124,14 @@ def setup_parser(subparser: argparse.ArgumentParser):
         action="store_true",
         help="stop pushing on first failure (default is best effort)",
     )
+    push.add_argument(
+        "--compression",
+        default="gzip",
+        choices=spack.util.archive.COMPRESSIONS,
+        help="compression of the tarballs. zstd requires the zstandard Python module, and "
+        "tarballs compressed with it use build cache layout version 3, which older versions "
+        "of Spack ignore",
+    )
     push.add_argument(
         "--base-image", default=None, help="specify the base image for the buildcache"
     )
@@ -308,6 +317,16 @@ def setup_parser(subparser: argparse.ArgumentParser):
         action="store_true",
         help="if provided, key index will be updated as well as package index",
     )
+    update_index.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only apply the specs pushed since the last update to the existing index",
+    )
+    update_index.add_argument(
+        "--sharded",
+        action="store_true",
+        help="also split the index in shards, so clients fetch only the specs they need",
+    )
     update_index.set_defaults(func=update_index_fn)
 
 
@@ -387,10 +406,15 @@ def push_fn(args):
     else:
         unsigned = not (args.key or args.signed)
 
+    if args.compression == "zstd" and not spack.util.archive.ZSTD_SUPPORTED:
+        tty.die("zstd compression requires the zstandard Python module")
+
     # For OCI images, we require dependencies to be pushed for now.
     if target_image:
         if "dependencies" not in args.things_to_install:
             tty.die("Dependencies must be pushed for OCI images.")
+        if args.compression != "gzip":
+            tty.die("Only gzip compression is supported for OCI images.")
         if not unsigned:
             tty.warn(
                 "Code signing is currently not supported for OCI images. "
@@ -454,6 +478,7 @@ def push_fn(args):
                         unsigned=unsigned,
                         key=args.key,
                         regenerate_index=args.update_index,
+                        compression=args.compression,
                     ),
                 )
 
@@ -1141,7 +1166,7 @@ def manifest_copy(manifest_file_list):
             copy_buildcache_file(copy_file["src"], copy_file["dest"])
 
 
-def update_index(mirror: spack.mirror.Mirror, update_keys=False):
+def update_index(mirror: spack.mirror.Mirror, update_keys=False, incremental=False, sharded=False):
     # Special case OCI images for now.
     try:
         image_ref = spack.oci.oci.image_from_mirror(mirror)
@@ -1158,7 +1183,11 @@ def update_index(mirror: spack.mirror.Mirror, update_keys=False):
     # Otherwise, assume a normal mirror.
     url = mirror.push_url
 
-    bindist.generate_package_index(url_util.join(url, bindist.build_cache_relative_path()))
+    bindist.generate_package_index(
+        url_util.join(url, bindist.build_cache_relative_path()),
+        incremental=incremental,
+        sharded=sharded,
+    )
 
     if update_keys:
         keys_url = url_util.join(
@@ -1170,7 +1199,9 @@ def update_index(mirror: spack.mirror.Mirror, update_keys=False):
 
 def update_index_fn(args):
     """update a buildcache index"""
-    update_index(args.mirror, update_keys=args.keys)
+    update_index(
+        args.mirror, update_keys=args.keys, incremental=args.incremental, sharded=args.sharded
+    )
 
 
 def buildcache(parser, args):
@@ -127,6 +127,8 @@ def clean(parser, args):
     if args.misc_cache:
         tty.msg("Removing cached information on repositories")
         spack.caches.MISC_CACHE.destroy()
+        if spack.config.CONFIG_FILE_CACHE is not None:
+            spack.config.CONFIG_FILE_CACHE.destroy()
 
     if args.python_cache:
         tty.msg("Removing python cache files")
@@ -10,6 +10,7 @@
 from llnl.util.tty.colify import colify
 
 import spack.cmd
+import spack.deptypes as dt
 import spack.environment as ev
 import spack.repo
 import spack.store
@@ -47,28 +48,17 @@ def inverted_dependencies():
     dependents of, e.g., `mpi`, but virtuals are not included as
     actual dependents.
     """
-    dag = {}
-    for pkg_cls in spack.repo.PATH.all_package_classes():
-        dag.setdefault(pkg_cls.name, set())
-        for dep in pkg_cls.dependencies_by_name():
+    dag = collections.defaultdict(set)
+    for pkg in spack.repo.PATH.all_package_metadata():
+        for dep in pkg.dependencies_of_type(dt.ALL):
             deps = [dep]
 
             # expand virtuals if necessary
             if spack.repo.PATH.is_virtual(dep):
                 deps += [s.name for s in spack.repo.PATH.providers_for(dep)]
 
-    dag = collections.defaultdict(set)
-    for pkg_cls in spack.repo.PATH.all_package_classes():
-        for _, deps_by_name in pkg_cls.dependencies.items():
-            for dep in deps_by_name:
-                deps = [dep]
-
-                # expand virtuals if necessary
-                if spack.repo.PATH.is_virtual(dep):
-                    deps += [s.name for s in spack.repo.PATH.providers_for(dep)]
-
-                for d in deps:
-                    dag[d].add(pkg_cls.name)
+            for d in deps:
+                dag[d].add(pkg.name)
     return dag
 
 
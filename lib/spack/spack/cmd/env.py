@@ -344,22 +344,39 @@ def env_activate(args):
         cmds = spack.environment.shell.deactivate_header(shell=args.shell)
         env_mods = spack.environment.shell.deactivate()
 
-    # Activate new environment
-    active_env = ev.Environment(env_path)
-
-    # Check if runtime environment variables are requested, and if so, for what view.
+    # Activate new environment. The modifications are cached, so that the environment does not
+    # need to be read when nothing changed since the last activation.
+    env_path = os.path.abspath(env_path)
+    cache_file = spack.environment.shell.activation_cache_file(
+        env_path, "activate", args.with_view, "without-view" if args.without_view else None
+    )
+    cached = spack.environment.shell.read_activation_cache(cache_file)
     view: Optional[str] = None
-    if args.with_view:
-        view = args.with_view
-        if not active_env.has_view(view):
-            tty.die(f"The environment does not have a view named '{view}'")
-    elif not args.without_view and active_env.has_view(ev.default_view_name):
-        view = ev.default_view_name
+    if cached is not None:
+        view = cached["view"]
+        env_mods.extend(EnvironmentModifications.from_list(cached["modifications"]))
+    else:
+        active_env = ev.Environment(env_path)
+
+        # Check if runtime environment variables are requested, and if so, for what view.
+        if args.with_view:
+            view = args.with_view
+            if not active_env.has_view(view):
+                tty.die(f"The environment does not have a view named '{view}'")
+        elif not args.without_view and active_env.has_view(ev.default_view_name):
+            view = ev.default_view_name
+
+        with active_env.read_transaction():
+            activate_mods = spack.environment.shell.activate(env=active_env, view=view)
+            if not active_env.view_env_failed:
+                spack.environment.shell.write_activation_cache(
+                    cache_file, {"view": view, "modifications": activate_mods.to_list()}
+                )
+        env_mods.extend(activate_mods)
 
     cmds += spack.environment.shell.activate_header(
-        env=active_env, shell=args.shell, prompt=env_prompt if args.prompt else None, view=view
+        env_path=env_path, shell=args.shell, prompt=env_prompt if args.prompt else None, view=view
     )
-    env_mods.extend(spack.environment.shell.activate(env=active_env, view=view))
     cmds += env_mods.shell_modifications(args.shell)
     sys.stdout.write(cmds)
 
@@ -699,6 +716,16 @@ def env_depfile_setup_parser(subparser):
         dest="jobserver",
         help="disable POSIX jobserver support",
     )
+    subparser.add_argument(
+        "--make-batch-size",
+        default=0,
+        type=int,
+        metavar="N",
+        dest="batch_size",
+        help="install specs from a build cache in batches of at most N specs\n\n"
+        "each batch is installed by a single spack process. in auto mode, specs found in the "
+        "build cache index are installed from the build cache only",
+    )
     subparser.add_argument(
         "--use-buildcache",
         dest="use_buildcache",
@@ -748,6 +775,7 @@ def env_depfile(args):
         dep_buildcache=depfile.UseBuildCache.from_string(args.use_buildcache[1]),
         make_prefix=args.make_prefix,
         jobserver=args.jobserver,
+        batch_size=args.batch_size,
     )
 
     # Warn in case we're generating a depfile for an empty environment. We don't automatically
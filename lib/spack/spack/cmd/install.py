@@ -88,6 +88,13 @@ def setup_parser(subparser):
         help="phase to stop after when installing (default None)",
     )
     arguments.add_common_arguments(subparser, ["jobs"])
+    subparser.add_argument(
+        "-p",
+        "--concurrent-packages",
+        type=int,
+        default=None,
+        help="maximum number of packages to build concurrently",
+    )
     subparser.add_argument(
         "--overwrite",
         action="store_true",
@@ -329,6 +336,13 @@ def install(parser, args):
     if args.deprecated:
         spack.config.set("config:deprecated", True, scope="command_line")
 
+    if args.concurrent_packages is not None:
+        if args.concurrent_packages < 1:
+            tty.die("the number of concurrent packages must be a positive integer")
+        spack.config.set(
+            "config:concurrent_packages", args.concurrent_packages, scope="command_line"
+        )
+
     if args.log_file and not args.log_format:
         msg = "the '--log-format' must be specified when using '--log-file'"
         tty.die(msg)
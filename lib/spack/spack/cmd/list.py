@@ -117,9 +117,9 @@ def match(p, f):
                 if f.match(p):
                     return True
 
-                pkg_cls = spack.repo.PATH.get_pkg_class(p)
-                if pkg_cls.__doc__:
-                    return f.match(pkg_cls.__doc__)
+                pkg = spack.repo.PATH.package_metadata(p)
+                if pkg.__doc__:
+                    return f.match(pkg.__doc__)
                 return False
 
         else:
@@ -169,7 +169,7 @@ def get_dependencies(pkg):
 @formatter
 def version_json(pkg_names, out):
     """Print all packages with their latest versions."""
-    pkg_classes = [spack.repo.PATH.get_pkg_class(name) for name in pkg_names]
+    pkgs = [spack.repo.PATH.package_metadata(name) for name in pkg_names]
 
     out.write("[\n")
 
@@ -184,15 +184,15 @@ def version_json(pkg_names, out):
             '   "maintainers": {5},\n'
             '   "dependencies": {6}'
             "}}".format(
-                pkg_cls.name,
-                VersionList(pkg_cls.versions).preferred(),
-                json.dumps([str(v) for v in reversed(sorted(pkg_cls.versions))]),
-                pkg_cls.homepage,
-                github_url(pkg_cls),
-                json.dumps(pkg_cls.maintainers),
-                json.dumps(get_dependencies(pkg_cls)),
+                pkg.name,
+                VersionList(pkg.versions).preferred(),
+                json.dumps([str(v) for v in reversed(sorted(pkg.versions))]),
+                pkg.homepage,
+                github_url(pkg),
+                json.dumps(pkg.maintainers),
+                json.dumps(get_dependencies(pkg)),
             )
-            for pkg_cls in pkg_classes
+            for pkg in pkgs
         ]
     )
     out.write(pkg_latest)
@@ -211,7 +211,7 @@ def html(pkg_names, out):
     """
 
     # Read in all packages
-    pkg_classes = [spack.repo.PATH.get_pkg_class(name) for name in pkg_names]
+    pkgs = [spack.repo.PATH.package_metadata(name) for name in pkg_names]
 
     # Start at 2 because the title of the page from Sphinx is id1.
     span_id = 2
@@ -233,7 +233,7 @@ def head(n, span_id, title, anchor=None):
     # Start with the number of packages, skipping the title and intro
     # blurb, which we maintain in the RST file.
     out.write("<p>\n")
-    out.write("Spack currently has %d mainline packages:\n" % len(pkg_classes))
+    out.write("Spack currently has %d mainline packages:\n" % len(pkgs))
     out.write("</p>\n")
 
     # Table of links to all packages
@@ -251,9 +251,9 @@ def head(n, span_id, title, anchor=None):
     out.write('<hr class="docutils"/>\n')
 
     # Output some text for each package.
-    for pkg_cls in pkg_classes:
-        out.write('<div class="section" id="%s">\n' % pkg_cls.name)
-        head(2, span_id, pkg_cls.name)
+    for pkg in pkgs:
+        out.write('<div class="section" id="%s">\n' % pkg.name)
+        head(2, span_id, pkg.name)
         span_id += 1
 
         out.write('<dl class="docutils">\n')
@@ -261,10 +261,10 @@ def head(n, span_id, title, anchor=None):
         out.write("<dt>Homepage:</dt>\n")
         out.write('<dd><ul class="first last simple">\n')
 
-        if pkg_cls.homepage:
+        if pkg.homepage:
             out.write(
                 ("<li>" '<a class="reference external" href="%s">%s</a>' "</li>\n")
-                % (pkg_cls.homepage, escape(pkg_cls.homepage, True))
+                % (pkg.homepage, escape(pkg.homepage, True))
             )
         else:
             out.write("No homepage\n")
@@ -274,19 +274,19 @@ def head(n, span_id, title, anchor=None):
         out.write('<dd><ul class="first last simple">\n')
         out.write(
             ("<li>" '<a class="reference external" href="%s">%s/package.py</a>' "</li>\n")
-            % (github_url(pkg_cls), pkg_cls.name)
+            % (github_url(pkg), pkg.name)
         )
         out.write("</ul></dd>\n")
 
-        if pkg_cls.versions:
+        if pkg.versions:
             out.write("<dt>Versions:</dt>\n")
             out.write("<dd>\n")
-            out.write(", ".join(str(v) for v in reversed(sorted(pkg_cls.versions))))
+            out.write(", ".join(str(v) for v in reversed(sorted(pkg.versions))))
             out.write("\n")
             out.write("</dd>\n")
 
         for deptype in dt.ALL_TYPES:
-            deps = pkg_cls.dependencies_of_type(dt.flag_from_string(deptype))
+            deps = pkg.dependencies_of_type(dt.flag_from_string(deptype))
             if deps:
                 out.write("<dt>%s Dependencies:</dt>\n" % deptype.capitalize())
                 out.write("<dd>\n")
@@ -305,7 +305,7 @@ def head(n, span_id, title, anchor=None):
 
         out.write("<dt>Description:</dt>\n")
         out.write("<dd>\n")
-        out.write(escape(pkg_cls.format_doc(indent=2), True))
+        out.write(escape(pkg.format_doc(indent=2), True))
         out.write("\n")
         out.write("</dd>\n")
         out.write("</dl>\n")
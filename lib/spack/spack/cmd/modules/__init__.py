@@ -9,6 +9,7 @@
 import os.path
 import shutil
 import sys
+from typing import Dict, Optional
 
 from llnl.util import filesystem, tty
 from llnl.util.tty import color
@@ -18,6 +19,7 @@
 import spack.modules
 import spack.modules.common
 import spack.repo
+import spack.util.cpus
 from spack.cmd.common import arguments
 
 description = "manipulate module files"
@@ -45,7 +47,12 @@ def setup_parser(subparser):
         help="generate modules for packages installed upstream",
         action="store_true",
     )
-    arguments.add_common_arguments(refresh_parser, ["constraint", "yes_to_all"])
+    refresh_parser.add_argument(
+        "--force",
+        help="regenerate module files even when what they are generated from did not change",
+        action="store_true",
+    )
+    arguments.add_common_arguments(refresh_parser, ["constraint", "yes_to_all", "jobs"])
 
     find_parser = sp.add_parser("find", help="find module files for packages")
     find_parser.add_argument(
@@ -340,25 +347,64 @@ def refresh(module_type, specs, args):
     module_type_root = writers[0].layout.dirname()
 
     # Proceed regenerating module files
-    tty.msg("Regenerating {name} module files".format(name=module_type))
     if os.path.isdir(module_type_root) and args.delete_tree:
         shutil.rmtree(module_type_root, ignore_errors=False)
     filesystem.mkdirp(module_type_root)
 
-    # Dump module index after potentially removing module tree
-    spack.modules.common.generate_module_index(
-        module_type_root, writers, overwrite=args.delete_tree
-    )
-    errors = []
+    # Skip module files whose inputs did not change since they were written
+    index = {}
+    if not args.delete_tree and not args.force:
+        index = spack.modules.common.read_module_index(module_type_root)
+    digests, outdated = {}, []
+    memo: Dict[str, Optional[str]] = {}
     for x in writers:
         try:
-            x.write(overwrite=True)
+            digest = x.inputs_digest(memo)
+        except Exception as e:
+            # The error is reported when writing the module file
+            tty.debug(f"{x.layout.filename}: cannot compute the digest of its inputs: {e}")
+            outdated.append((x, None))
+            continue
+        entry = index.get(x.spec.dag_hash())
+        if (
+            entry
+            and entry.digest == digest
+            and entry.path == x.layout.filename
+            and os.path.exists(entry.path)
+        ):
+            digests[x.spec.dag_hash()] = digest
+        else:
+            outdated.append((x, digest))
+
+    msg = f"Regenerating {len(outdated)} {module_type} module files"
+    if len(outdated) < len(writers):
+        msg += f" ({len(writers) - len(outdated)} are up to date)"
+    tty.msg(msg)
+
+    errors = []
+    jobs = spack.util.cpus.determine_number_of_jobs(parallel=True)
+    rendered = spack.modules.common.render_module_files([x for x, _ in outdated], processes=jobs)
+    for (x, text, error), (_, digest) in zip(rendered, outdated):
+        if error is not None:
+            errors.append(f"{x.layout.filename}: {error}")
+            continue
+        try:
+            x.write(overwrite=True, text=text)
         except spack.error.SpackError as e:
             msg = f"{x.layout.filename}: {e.message}"
             errors.append(msg)
+            continue
         except Exception as e:
             msg = f"{x.layout.filename}: {str(e)}"
             errors.append(msg)
+            continue
+        if digest:
+            digests[x.spec.dag_hash()] = digest
+
+    # Dump module index once all module files are written
+    spack.modules.common.generate_module_index(
+        module_type_root, writers, overwrite=args.delete_tree, digests=digests
+    )
 
     if errors:
         errors.insert(0, color.colorize("@*{some module files could not be written}"))
@@ -32,13 +32,20 @@
 import contextlib
 import copy
 import functools
+import hashlib
+import json
 import os
+import pickle
 import re
+import shutil
+import stat
 import sys
+import tempfile
 from typing import Any, Callable, Dict, Generator, List, Optional, Tuple, Type, Union
 
 from llnl.util import filesystem, lang, tty
 
+import spack
 import spack.compilers
 import spack.paths
 import spack.platforms
@@ -1068,6 +1075,123 @@ def validate(
     return test_data
 
 
+#: Version of the format of the entries in the configuration file cache
+_CONFIG_FILE_CACHE_VERSION = 1
+
+
+#: Digests of the schemas used to validate cached files, keyed by the id of the schema
+_schema_digests: Dict[int, Tuple[Any, str]] = {}
+
+
+def _schema_digest(schema: Optional[YamlConfigDict]) -> str:
+    """Returns a digest of a schema, or of all of them if the schema is inferred."""
+    if id(schema) not in _schema_digests:
+        text = json.dumps(_ALL_SCHEMAS if schema is None else schema, sort_keys=True, default=repr)
+        # Keep a reference to the schema, so that its id is not reused
+        _schema_digests[id(schema)] = (schema, hashlib.sha256(text.encode("utf-8")).hexdigest())
+    return _schema_digests[id(schema)][1]
+
+
+class ConfigFileCache:
+    """Persistent cache of parsed and validated configuration files.
+
+    Entries are pickled YAML data, so they preserve the line information that is
+    used to report errors and by ``spack config blame``, and the comments that are
+    kept when Spack writes configuration files. Entries are read only if they are
+    owned by the current user and are not writable by others. An entry is used only if
+    the file still has the modification time, size and inode it had when the entry
+    was written, and if it was validated against the same schema by the same
+    version of Spack.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+    def _entry_path(self, filename: str) -> str:
+        digest = hashlib.sha256(os.path.abspath(filename).encode("utf-8")).hexdigest()
+        return os.path.join(self.root, f"{digest}.pickle")
+
+    @staticmethod
+    def _key(filename: str, schema: Optional[YamlConfigDict]) -> Optional[tuple]:
+        try:
+            st = os.stat(filename)
+        except OSError:
+            return None
+        return (
+            _CONFIG_FILE_CACHE_VERSION,
+            spack.spack_version,
+            filename,
+            st.st_mtime_ns,
+            st.st_size,
+            st.st_ino,
+            _schema_digest(schema),
+        )
+
+    def read(
+        self, filename: str, schema: Optional[YamlConfigDict]
+    ) -> Tuple[Optional[tuple], Optional[YamlConfigDict]]:
+        """Returns the key of the file, and the cached data if it is up to date."""
+        key = self._key(filename, schema)
+        if key is None:
+            return None, None
+        try:
+            with open(self._entry_path(filename), "rb") as f:
+                if not _is_trusted_cache_file(os.fstat(f.fileno())):
+                    tty.debug(f"Ignoring cached configuration for {filename}: untrusted file")
+                    return key, None
+                entry_key, data = pickle.load(f)
+        except FileNotFoundError:
+            return key, None
+        except Exception as e:
+            tty.debug(f"Ignoring cached configuration for {filename}: {e}")
+            return key, None
+        return key, (data if entry_key == key else None)
+
+    def write(
+        self,
+        filename: str,
+        schema: Optional[YamlConfigDict],
+        key: Optional[tuple],
+        data: YamlConfigDict,
+    ) -> None:
+        """Caches the data read from a file, if the file did not change while reading it."""
+        if key is None or key != self._key(filename, schema):
+            return
+        tmp = None
+        try:
+            filesystem.mkdirp(self.root)
+            with tempfile.NamedTemporaryFile("wb", dir=self.root, delete=False) as f:
+                tmp = f.name
+                pickle.dump((key, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._entry_path(filename))
+        except Exception as e:
+            tty.debug(f"Cannot cache configuration for {filename}: {e}")
+            if tmp is not None and os.path.exists(tmp):
+                os.unlink(tmp)
+
+    def destroy(self) -> None:
+        """Removes all the cached configuration files."""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def _is_trusted_cache_file(st: os.stat_result) -> bool:
+    """Whether a cache entry can be unpickled, i.e. it can only have been written by the
+    current user. The cache directory may be shared, and unpickling runs arbitrary code."""
+    if sys.platform == "win32":
+        return True
+    return st.st_uid == os.getuid() and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _config_file_cache() -> Optional[ConfigFileCache]:
+    if os.environ.get("SPACK_DISABLE_CONFIG_CACHE"):
+        return None
+    return ConfigFileCache(spack.paths.config_cache_path)
+
+
+#: Cache of parsed configuration files, or None if it is disabled
+CONFIG_FILE_CACHE: Optional[ConfigFileCache] = _config_file_cache()
+
+
 def read_config_file(
     filename: str, schema: Optional[YamlConfigDict] = None
 ) -> Optional[YamlConfigDict]:
@@ -1091,6 +1215,13 @@ def read_config_file(
     elif not os.access(filename, os.R_OK):
         raise ConfigFileError(f"Config file is not readable: {filename}")
 
+    cache, cache_key = CONFIG_FILE_CACHE, None
+    if cache is not None:
+        cache_key, data = cache.read(filename, schema)
+        if data is not None:
+            tty.debug(f"Reading config for file {filename} from cache")
+            return data
+
     try:
         tty.debug(f"Reading config from file {filename}")
         with open(filename) as f:
@@ -1099,8 +1230,12 @@ def read_config_file(
         if data:
             if schema is None:
                 key = next(iter(data))
-                schema = _ALL_SCHEMAS[key]
-            validate(data, schema)
+                validate(data, _ALL_SCHEMAS[key])
+            else:
+                validate(data, schema)
+
+            if cache is not None:
+                cache.write(filename, schema, cache_key, data)
 
         return data
 
@@ -18,11 +18,16 @@
 provides a cache and a sanity checking mechanism for what is in the
 filesystem.
 """
+import bisect
+import collections
 import contextlib
 import datetime
+import json
+import mmap
 import os
 import pathlib
 import socket
+import struct
 import sys
 import time
 from typing import (
@@ -31,7 +36,10 @@
     Container,
     Dict,
     Generator,
+    Iterable,
+    Iterator,
     List,
+    MutableMapping,
     NamedTuple,
     Optional,
     Set,
@@ -53,6 +61,7 @@
 
 import spack.deptypes as dt
 import spack.hash_types as ht
+import spack.repo
 import spack.spec
 import spack.traverse as tr
 import spack.util.lock as lk
@@ -104,6 +113,15 @@
 #: We store by DAG hash, so we track the dependencies that the DAG hash includes.
 _TRACKED_DEPENDENCIES = ht.dag_hash.depflag
 
+#: Name of the optional binary index, written next to index.json
+_BINARY_INDEX_NAME = "index.bin"
+
+#: Bump when the layout of the binary index changes
+_BINARY_INDEX_FORMAT = 2
+
+#: Length of the DAG hashes used as keys in the binary index
+_BINARY_INDEX_HASH_LENGTH = 32
+
 #: Default list of fields written for each install record
 DEFAULT_INSTALL_RECORD_FIELDS = (
     "spec",
@@ -221,14 +239,17 @@ def __init__(
         self.in_buildcache = in_buildcache
         self.origin = origin
 
-    def install_type_matches(self, installed):
-        installed = InstallStatuses.canonicalize(installed)
+    @property
+    def install_status(self) -> InstallStatus:
         if self.installed:
-            return InstallStatuses.INSTALLED in installed
+            return InstallStatuses.INSTALLED
         elif self.deprecated_for:
-            return InstallStatuses.DEPRECATED in installed
+            return InstallStatuses.DEPRECATED
         else:
-            return InstallStatuses.MISSING in installed
+            return InstallStatuses.MISSING
+
+    def install_type_matches(self, installed):
+        return self.install_status in InstallStatuses.canonicalize(installed)
 
     def to_dict(self, include_fields=DEFAULT_INSTALL_RECORD_FIELDS):
         rec_dict = {}
@@ -587,6 +608,453 @@ def _path(self, spec: "spack.spec.Spec") -> pathlib.Path:
         return self.dir / f"{spec.name}-{spec.dag_hash()}"
 
 
+class RecordSummary(NamedTuple):
+    """Fields of an install record that are used to narrow down queries"""
+
+    name: str
+    install_status: InstallStatus
+    explicit: bool
+    installation_time: float
+
+    @staticmethod
+    def from_record(record: InstallRecord) -> "RecordSummary":
+        return RecordSummary(
+            record.spec.name,
+            record.install_status,
+            bool(record.explicit),
+            record.installation_time,
+        )
+
+
+#: Install statuses, in the order they are encoded in the binary index
+_INSTALL_STATUSES = (
+    InstallStatuses.INSTALLED,
+    InstallStatuses.DEPRECATED,
+    InstallStatuses.MISSING,
+)
+
+
+def _encode_record(record: InstallRecord, include_fields) -> bytes:
+    return json.dumps(record.to_dict(include_fields=include_fields), separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+class BinaryIndex:
+    """Compact, memory-mappable representation of the records in ``index.json``.
+
+    The file starts with a header, followed by a table of ``(hash, offset, size, flags,
+    installation time)`` entries sorted by DAG hash, the records themselves as JSON
+    objects, a table of entry indices grouped by package name, a directory of package
+    names and the list of installed prefixes. Lookups by hash bisect the table in place,
+    and only the records that are actually needed are decoded.
+    """
+
+    _magic = b"SPACKDB\0"
+
+    #: magic, format, count, verifier, index.json mtime and size, db version,
+    #: then offsets of the records, of the name table and of the prefixes
+    _header = struct.Struct("<8sII64sqQ16sQQQ")
+
+    #: hash, offset and size of a record, its install status and explicit flag, and
+    #: its installation time
+    _entry = struct.Struct(f"<{_BINARY_INDEX_HASH_LENGTH}sQIBd")
+
+    #: bit of the flags set for explicit records, the others encode the install status
+    _explicit_flag = 0x80
+
+    #: length of a name, start and number of its entries in the name table
+    _name = struct.Struct("<HII")
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            if sys.platform == "win32":
+                # Windows can't replace a file that is mapped in memory
+                self._buffer: Union[bytes, mmap.mmap] = f.read()
+            else:
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic,
+            version,
+            self._count,
+            verifier,
+            self.json_mtime_ns,
+            self.json_size,
+            db_version,
+            self._names_offset,
+            self._prefixes_offset,
+            self._end,
+        ) = self._header.unpack_from(self._buffer, 0)
+
+        if magic != self._magic or version != _BINARY_INDEX_FORMAT:
+            raise ValueError(f"{path} is not a binary database index")
+
+        self.verifier = verifier.rstrip(b"\0").decode("utf-8")
+        self.db_version = vn.Version(db_version.rstrip(b"\0").decode("utf-8"))
+        self._names: Dict[str, Tuple[int, int]] = {}
+        offset = self._names_offset + 4 * self._count
+        while offset < self._prefixes_offset:
+            size, start, count = self._name.unpack_from(self._buffer, offset)
+            offset += self._name.size
+            name = bytes(self._buffer[offset : offset + size]).decode("utf-8")
+            self._names[name] = (start, count)
+            offset += size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _hash_at(self, i: int) -> str:
+        offset = self._header.size + i * self._entry.size
+        return bytes(self._buffer[offset : offset + _BINARY_INDEX_HASH_LENGTH]).decode("ascii")
+
+    def find(self, dag_hash: str) -> Optional[int]:
+        """Return the position of a hash in the index, or None if it's not there"""
+        if len(dag_hash) != _BINARY_INDEX_HASH_LENGTH:
+            return None
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            current = self._hash_at(mid)
+            if current == dag_hash:
+                return mid
+            elif current < dag_hash:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def hashes(self) -> Iterator[str]:
+        for i in range(self._count):
+            yield self._hash_at(i)
+
+    def hashes_with_name(self, name: str) -> List[str]:
+        """Return the hashes of the records of a package"""
+        start, count = self._names.get(name, (0, 0))
+        offset = self._names_offset + 4 * start
+        indices = struct.unpack_from(f"<{count}I", self._buffer, offset)
+        return [self._hash_at(i) for i in indices]
+
+    def summaries(self) -> Iterator[Tuple[int, str, RecordSummary]]:
+        """Yield the position, hash and summary of every record, without decoding them"""
+        names: Dict[int, str] = {}
+        for name, (start, count) in self._names.items():
+            offset = self._names_offset + 4 * start
+            for i in struct.unpack_from(f"<{count}I", self._buffer, offset):
+                names[i] = name
+
+        offset = self._header.size
+        for i in range(self._count):
+            hash_bytes, _, _, flags, installation_time = self._entry.unpack_from(
+                self._buffer, offset
+            )
+            offset += self._entry.size
+            yield i, hash_bytes.decode("ascii"), RecordSummary(
+                names[i],
+                _INSTALL_STATUSES[flags & ~self._explicit_flag],
+                bool(flags & self._explicit_flag),
+                installation_time,
+            )
+
+    def encoded_record(self, i: int) -> bytes:
+        """Return the JSON encoded record at a given position"""
+        _, offset, size, _, _ = self._entry.unpack_from(
+            self._buffer, self._header.size + i * self._entry.size
+        )
+        return bytes(self._buffer[offset : offset + size])
+
+    def record(self, i: int) -> dict:
+        """Return the record at a given position"""
+        return sjson.load(self.encoded_record(i).decode("utf-8"))
+
+    def installed_prefixes(self) -> Set[str]:
+        data = bytes(self._buffer[self._prefixes_offset : self._end]).decode("utf-8")
+        return set(data.split("\0")) if data else set()
+
+    @staticmethod
+    def write(
+        stream,
+        records: Dict[str, bytes],
+        summaries: Dict[str, RecordSummary],
+        installed_prefixes: Set[str],
+        verifier: str,
+        json_stat: os.stat_result,
+    ) -> None:
+        """Write a binary index to a stream.
+
+        Args:
+            stream: binary stream to write to
+            records: JSON encoded install records, keyed by DAG hash
+            summaries: summary of the install records, keyed by DAG hash
+            installed_prefixes: prefixes of the installed specs
+            verifier: verifier of the corresponding ``index.json``
+            json_stat: stat of the corresponding ``index.json``
+        """
+        hashes = sorted(records)
+        if any(len(h) != _BINARY_INDEX_HASH_LENGTH for h in hashes):
+            raise ValueError("cannot write a binary index of abbreviated hashes")
+
+        by_name: Dict[str, List[int]] = collections.defaultdict(list)
+        for i, h in enumerate(hashes):
+            by_name[summaries[h].name].append(i)
+
+        header = BinaryIndex._header
+        entry = BinaryIndex._entry
+
+        # Records come right after the header and the table of entries
+        offset = header.size + len(hashes) * entry.size
+        table = []
+        for h in hashes:
+            summary = summaries[h]
+            flags = _INSTALL_STATUSES.index(summary.install_status)
+            if summary.explicit:
+                flags |= BinaryIndex._explicit_flag
+            table.append(
+                entry.pack(
+                    h.encode("ascii"), offset, len(records[h]), flags, summary.installation_time
+                )
+            )
+            offset += len(records[h])
+
+        names_offset = offset
+        name_table = []
+        name_directory = []
+        for name in sorted(by_name):
+            encoded = name.encode("utf-8")
+            name_directory.append(
+                BinaryIndex._name.pack(len(encoded), len(name_table), len(by_name[name])) + encoded
+            )
+            name_table.extend(by_name[name])
+        name_data = struct.pack(f"<{len(name_table)}I", *name_table) + b"".join(name_directory)
+
+        prefixes_offset = names_offset + len(name_data)
+        prefix_data = "\0".join(sorted(installed_prefixes)).encode("utf-8")
+
+        stream.write(
+            header.pack(
+                BinaryIndex._magic,
+                _BINARY_INDEX_FORMAT,
+                len(hashes),
+                verifier.encode("utf-8"),
+                json_stat.st_mtime_ns,
+                json_stat.st_size,
+                str(_DB_VERSION).encode("utf-8"),
+                names_offset,
+                prefixes_offset,
+                prefixes_offset + len(prefix_data),
+            )
+        )
+        stream.write(b"".join(table))
+        for h in hashes:
+            stream.write(records[h])
+        stream.write(name_data)
+        stream.write(prefix_data)
+
+
+class LazyInstallRecords(MutableMapping[str, InstallRecord]):
+    """Install records backed by a binary index.
+
+    Records are decoded, and their specs constructed, the first time they are accessed.
+    The specs of the dependencies are constructed along with them, so that all the
+    specs that were materialized share nodes as in a fully read database.
+    """
+
+    def __init__(self, db: "Database", index: BinaryIndex) -> None:
+        self.db = db
+        self.index = index
+        #: records that have been materialized, or added after reading the index
+        self._records: Dict[str, InstallRecord] = {}
+        #: hash and name of the records that are not in the index
+        self._added: Dict[str, str] = {}
+        #: hashes in the index that have been removed
+        self._removed: Set[str] = set()
+        self._spec_reader = reader(_DB_VERSION)
+
+    def __getitem__(self, hash_key: str) -> InstallRecord:
+        record = self._records.get(hash_key)
+        if record is not None:
+            return record
+
+        i = None if hash_key in self._removed else self.index.find(hash_key)
+        if i is None:
+            raise KeyError(hash_key)
+
+        return self._materialize(hash_key, i)
+
+    def _materialize(self, hash_key: str, i: int) -> InstallRecord:
+        installs = {hash_key: self.index.record(i)}
+        try:
+            spec = self.db._read_spec_from_dict(self._spec_reader, hash_key, installs)
+            record = InstallRecord.from_dict(spec, installs[hash_key])
+            self._records[hash_key] = record
+            # Dependencies are materialized recursively, and are concrete by now
+            self.db._assign_dependencies(self._spec_reader, hash_key, installs, self)
+        except MissingDependenciesError:
+            self._records.pop(hash_key, None)
+            raise
+        except Exception as e:
+            self._records.pop(hash_key, None)
+            raise CorruptDatabaseError(
+                f"Invalid record in Spack database: hash: {hash_key}, cause: "
+                f"{type(e).__name__}: {e}",
+                self.db._index_path,
+            ) from e
+
+        spec._mark_root_concrete()
+        return record
+
+    def __setitem__(self, hash_key: str, record: InstallRecord) -> None:
+        self._records[hash_key] = record
+        self._removed.discard(hash_key)
+        if self.index.find(hash_key) is None:
+            self._added[hash_key] = record.spec.name
+
+    def __delitem__(self, hash_key: str) -> None:
+        if hash_key not in self:
+            raise KeyError(hash_key)
+        self._records.pop(hash_key, None)
+        if self._added.pop(hash_key, None) is None:
+            self._removed.add(hash_key)
+
+    def __contains__(self, hash_key: object) -> bool:
+        if not isinstance(hash_key, str):
+            return False
+        if hash_key in self._records:
+            return True
+        return hash_key not in self._removed and self.index.find(hash_key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for hash_key in self.index.hashes():
+            if hash_key not in self._removed:
+                yield hash_key
+        yield from list(self._added)
+
+    def __len__(self) -> int:
+        return len(self.index) - len(self._removed) + len(self._added)
+
+    def encoded_records(self, include_fields) -> Dict[str, bytes]:
+        """Return all the records encoded as JSON, reusing the bytes in the index for the
+        records that were never materialized."""
+        result = {}
+        for i, hash_key in enumerate(self.index.hashes()):
+            if hash_key in self._removed:
+                continue
+            record = self._records.get(hash_key)
+            if record is None:
+                result[hash_key] = self.index.encoded_record(i)
+            else:
+                result[hash_key] = _encode_record(record, include_fields)
+        for hash_key in self._added:
+            result[hash_key] = _encode_record(self._records[hash_key], include_fields)
+        return result
+
+    def summaries(self) -> Dict[str, RecordSummary]:
+        """Return the summary of every record, keyed by hash, materializing none"""
+        result = {}
+        for _, hash_key, summary in self.index.summaries():
+            if hash_key in self._removed:
+                continue
+            record = self._records.get(hash_key)
+            result[hash_key] = summary if record is None else RecordSummary.from_record(record)
+        for hash_key in self._added:
+            result[hash_key] = RecordSummary.from_record(self._records[hash_key])
+        return result
+
+
+class QueryIndex:
+    """Secondary indexes on the install records of a database, used to narrow down the
+    records that a query needs to look at.
+
+    The indexes are built from the summaries of the records, so they don't need to
+    materialize records read lazily from a binary index. They must be updated whenever
+    a record is added, removed or modified.
+    """
+
+    def __init__(self, data: MutableMapping[str, InstallRecord]) -> None:
+        #: records the index was built from
+        self.data = data
+        self._summaries: Dict[str, RecordSummary] = {}
+        self._by_name: Dict[str, Set[str]] = collections.defaultdict(set)
+        self._by_status: Dict[InstallStatus, Set[str]] = {s: set() for s in _INSTALL_STATUSES}
+        self._explicit: Set[str] = set()
+        #: (installation time, hash) of every record, sorted
+        self._by_time: List[Tuple[float, str]] = []
+
+        if isinstance(data, LazyInstallRecords):
+            summaries = data.summaries()
+        else:
+            summaries = {k: RecordSummary.from_record(v) for k, v in data.items()}
+        for key, summary in summaries.items():
+            self._insert(key, summary)
+        self._by_time.sort()
+
+    def _insert(self, key: str, summary: RecordSummary) -> None:
+        self._summaries[key] = summary
+        self._by_name[summary.name].add(key)
+        self._by_status[summary.install_status].add(key)
+        if summary.explicit:
+            self._explicit.add(key)
+        self._by_time.append((summary.installation_time, key))
+
+    def update(self, key: str, record: InstallRecord) -> None:
+        """Update the indexes after a record was added or modified"""
+        summary = RecordSummary.from_record(record)
+        if self._summaries.get(key) == summary:
+            return
+        self.discard(key)
+        self._insert(key, summary)
+        # Keep the time index sorted, the new entry was appended at the end
+        entry = self._by_time.pop()
+        bisect.insort(self._by_time, entry)
+
+    def discard(self, key: str) -> None:
+        """Update the indexes after a record was removed"""
+        summary = self._summaries.pop(key, None)
+        if summary is None:
+            return
+        self._by_name[summary.name].discard(key)
+        if not self._by_name[summary.name]:
+            del self._by_name[summary.name]
+        self._by_status[summary.install_status].discard(key)
+        self._explicit.discard(key)
+        entry = (summary.installation_time, key)
+        i = bisect.bisect_left(self._by_time, entry)
+        if i < len(self._by_time) and self._by_time[i] == entry:
+            del self._by_time[i]
+
+    def names(self) -> Set[str]:
+        return set(self._by_name)
+
+    def with_name(self, name: str) -> Set[str]:
+        return self._by_name.get(name, set())
+
+    def with_status(self, statuses: List[InstallStatus]) -> Set[str]:
+        result: Set[str] = set()
+        for status in statuses:
+            result |= self._by_status[status]
+        return result
+
+    def explicit(self) -> Set[str]:
+        return self._explicit
+
+    def installed_between(
+        self, start: Optional[datetime.datetime], end: Optional[datetime.datetime]
+    ) -> Set[str]:
+        """Return the records that may have been installed in a time window. The window
+        is padded on both sides, since converting local times to timestamps is ambiguous
+        around daylight saving time changes."""
+        lo, hi = 0, len(self._by_time)
+        try:
+            if start is not None:
+                lo = bisect.bisect_left(self._by_time, (start.timestamp() - 3600.0,))
+            if end is not None:
+                hi = bisect.bisect_right(self._by_time, (end.timestamp() + 3600.0,))
+        except (ValueError, OverflowError, OSError):
+            # Dates out of the range of timestamps don't narrow down the window
+            pass
+        return {key for _, key in self._by_time[lo:hi]}
+
+
 class Database:
     #: Fields written for each install record
     record_fields: Tuple[str, ...] = DEFAULT_INSTALL_RECORD_FIELDS
@@ -597,6 +1065,7 @@ def __init__(
         upstream_dbs: Optional[List["Database"]] = None,
         is_upstream: bool = False,
         lock_cfg: LockConfiguration = DEFAULT_LOCK_CFG,
+        binary_index: bool = False,
     ) -> None:
         """Database for Spack installations.
 
@@ -610,12 +1079,16 @@ def __init__(
         If that does not exist, it will create a database when needed by scanning the entire
         store root for ``spec.json`` files according to Spack's directory layout.
 
+        If a binary index is found next to ``index.json``, and it is up to date, records are
+        read lazily from it instead.
+
         Args:
             root: root directory where to create the database directory.
             upstream_dbs: upstream databases for this repository.
             is_upstream: whether this repository is an upstream.
             lock_cfg: configuration for the locks to be used by this repository.
                 Relevant only if the repository is not an upstream.
+            binary_index: whether to write a binary index next to ``index.json``
         """
         self.root = root
         self.database_directory = os.path.join(self.root, _DB_DIRNAME)
@@ -623,6 +1096,8 @@ def __init__(
         # Set up layout of database files within the db dir
         self._index_path = os.path.join(self.database_directory, "index.json")
         self._verifier_path = os.path.join(self.database_directory, "index_verifier")
+        self._binary_index_path = os.path.join(self.database_directory, _BINARY_INDEX_NAME)
+        self.binary_index = binary_index
         self._lock_path = os.path.join(self.database_directory, "lock")
 
         # Create needed directories and files
@@ -654,7 +1129,10 @@ def __init__(
                 desc="database",
                 enable=lock_cfg.enable,
             )
-        self._data: Dict[str, InstallRecord] = {}
+        self._data: MutableMapping[str, InstallRecord] = {}
+
+        # Secondary indexes on the records, built on the first query
+        self._query_index: Optional[QueryIndex] = None
 
         # For every installed spec we keep track of its install prefix, so that
         # we can answer the simple query whether a given path is already taken
@@ -688,31 +1166,34 @@ def _write_to_file(self, stream):
 
         This function does not do any locking or transactions.
         """
-        # map from per-spec hash code to installation record.
-        installs = dict(
-            (k, v.to_dict(include_fields=self.record_fields)) for k, v in self._data.items()
-        )
+        self._write_records_to_file(self._encoded_records(), stream)
+
+    def _encoded_records(self) -> Dict[str, bytes]:
+        """Map from per-spec hash code to JSON encoded installation record."""
+        try:
+            if isinstance(self._data, LazyInstallRecords):
+                return self._data.encoded_records(self.record_fields)
+            return {k: _encode_record(v, self.record_fields) for k, v in self._data.items()}
+        except (TypeError, ValueError) as e:
+            raise sjson.SpackJSONError("error writing JSON database:", str(e))
 
+    def _write_records_to_file(self, records: Dict[str, bytes], stream):
         # database includes installation list and version.
 
         # NOTE: this DB version does not handle multiple installs of
         # the same spec well.  If there are 2 identical specs with
         # different paths, it can't differentiate.
         # TODO: fix this before we support multiple install locations.
-        database = {
-            "database": {
-                # TODO: move this to a top-level _meta section if we ever
-                # TODO: bump the DB version to 7
-                "version": str(_DB_VERSION),
-                # dictionary of installation records, keyed by DAG hash
-                "installs": installs,
-            }
-        }
-
-        try:
-            sjson.dump(database, stream)
-        except (TypeError, ValueError) as e:
-            raise sjson.SpackJSONError("error writing JSON database:", str(e))
+        # Records are already encoded, so the JSON document is assembled here. The
+        # result is the same as dumping {"database": {"version": ..., "installs": ...}}
+        stream.write('{"database":{"version":%s,"installs":{' % json.dumps(str(_DB_VERSION)))
+        for i, (k, v) in enumerate(records.items()):
+            if i:
+                stream.write(",")
+            stream.write(json.dumps(k))
+            stream.write(":")
+            stream.write(v.decode("utf-8"))
+        stream.write("}}}")
 
     def _read_spec_from_dict(self, spec_reader, hash_key, installs, hash=ht.dag_hash):
         """Recursively construct a spec from a hash in a YAML database.
@@ -1076,16 +1557,21 @@ def _write(self, type, value, traceback):
             return
 
         temp_file = self._index_path + (".%s.%s.temp" % (socket.getfqdn(), os.getpid()))
+        new_verifier = str(uuid.uuid4()) if _use_uuid else ""
 
         # Write a temporary database file them move it into place
         try:
+            records = self._encoded_records()
             with open(temp_file, "w") as f:
-                self._write_to_file(f)
+                self._write_records_to_file(records, f)
             fs.rename(temp_file, self._index_path)
 
+            # The binary index is written before the verifier, so that it's never
+            # considered up to date with an index.json it doesn't correspond to
+            self._write_binary_index(records, new_verifier)
+
             if _use_uuid:
                 with open(self._verifier_path, "w") as f:
-                    new_verifier = str(uuid.uuid4())
                     f.write(new_verifier)
                     self.last_seen_verifier = new_verifier
         except BaseException as e:
@@ -1095,6 +1581,72 @@ def _write(self, type, value, traceback):
                 os.remove(temp_file)
             raise
 
+    def _write_binary_index(self, records: Dict[str, bytes], verifier: str) -> None:
+        """Write the binary index next to index.json, or remove a stale one if the binary
+        index is disabled. Failures are not fatal, since index.json is authoritative.
+        """
+        if not self.binary_index:
+            if os.path.exists(self._binary_index_path):
+                os.remove(self._binary_index_path)
+            return
+
+        temp_file = self._binary_index_path + (".%s.%s.temp" % (socket.getfqdn(), os.getpid()))
+        try:
+            if isinstance(self._data, LazyInstallRecords):
+                summaries = self._data.summaries()
+            else:
+                summaries = {k: RecordSummary.from_record(v) for k, v in self._data.items()}
+            with open(temp_file, "wb") as f:
+                BinaryIndex.write(
+                    f,
+                    records,
+                    summaries,
+                    self._installed_prefixes,
+                    verifier,
+                    os.stat(self._index_path),
+                )
+            fs.rename(temp_file, self._binary_index_path)
+        except (OSError, ValueError, struct.error) as e:
+            tty.debug(f"cannot write binary database index: {e}")
+            for path in (temp_file, self._binary_index_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _read_from_binary_index(self, verifier: str) -> bool:
+        """Set up lazy reading of records from the binary index, if it exists and is up to
+        date with index.json. Return True on success, False otherwise.
+
+        Does not do any locking.
+        """
+        if not os.path.exists(self._binary_index_path):
+            return False
+
+        try:
+            index = BinaryIndex(self._binary_index_path)
+            json_stat = os.stat(self._index_path)
+        except (OSError, ValueError, struct.error) as e:
+            tty.debug(f"cannot read binary database index: {e}")
+            return False
+
+        if (
+            index.db_version != _DB_VERSION
+            or index.verifier != verifier
+            or index.json_mtime_ns != json_stat.st_mtime_ns
+            or index.json_size != json_stat.st_size
+        ):
+            tty.debug("binary database index is out of date, reading index.json")
+            return False
+
+        self._data = LazyInstallRecords(self, index)
+        self._installed_prefixes = index.installed_prefixes()
+        return True
+
+    def _read_index(self, verifier: str) -> None:
+        """Read the database, from the binary index if possible"""
+        if verifier and self._read_from_binary_index(verifier):
+            return
+        self._read_from_file(self._index_path)
+
     def _read(self):
         """Re-read Database from the data in the set location. This does no locking."""
         if os.path.isfile(self._index_path):
@@ -1108,9 +1660,9 @@ def _read(self):
             if (current_verifier != self.last_seen_verifier) or (current_verifier == ""):
                 self.last_seen_verifier = current_verifier
                 # Read from file if a database exists
-                self._read_from_file(self._index_path)
+                self._read_index(current_verifier)
             elif self._state_is_inconsistent:
-                self._read_from_file(self._index_path)
+                self._read_index(current_verifier)
                 self._state_is_inconsistent = False
             return
         elif self.is_upstream:
@@ -1230,6 +1782,7 @@ def _add(
             self._data[key].installation_time = _now()
 
         self._data[key].explicit = explicit
+        self._update_query_index(key)
 
     @_autospec
     def add(self, spec, directory_layout, explicit=False):
@@ -1273,6 +1826,7 @@ def _decrement_ref_count(self, spec):
 
         if rec.ref_count == 0 and not rec.installed:
             del self._data[key]
+            self._update_query_index(key)
 
             for dep in spec.dependencies(deptype=_TRACKED_DEPENDENCIES):
                 self._decrement_ref_count(dep)
@@ -1298,9 +1852,11 @@ def _remove(self, spec):
 
         if rec.ref_count > 0:
             rec.installed = False
+            self._update_query_index(key)
             return rec.spec
 
         del self._data[key]
+        self._update_query_index(key)
 
         # Remove any reference to this node from dependencies and
         # decrement the reference count
@@ -1366,6 +1922,7 @@ def _deprecate(self, spec, deprecator):
         spec_rec.deprecated_for = deprecator_key
         spec_rec.installed = False
         self._data[spec_key] = spec_rec
+        self._update_query_index(spec_key)
 
     @_autospec
     def mark(self, spec, key, value):
@@ -1374,8 +1931,10 @@ def mark(self, spec, key, value):
             return self._mark(spec, key, value)
 
     def _mark(self, spec, key, value):
-        record = self._data[self._get_matching_spec_key(spec)]
+        spec_key = self._get_matching_spec_key(spec)
+        record = self._data[spec_key]
         setattr(record, key, value)
+        self._update_query_index(spec_key)
 
     @_autospec
     def deprecate(self, spec, deprecator):
@@ -1444,9 +2003,9 @@ def _get_by_hash_local(self, dag_hash, default=None, installed=any):
         # check if hash is a prefix of some installed (or previously
         # installed) spec.
         matches = [
-            record.spec
-            for h, record in self._data.items()
-            if h.startswith(dag_hash) and record.install_type_matches(installed)
+            self._data[h].spec
+            for h in self._data
+            if h.startswith(dag_hash) and self._data[h].install_type_matches(installed)
         ]
         if matches:
             return matches
@@ -1546,8 +2105,12 @@ def _query(
                 else:
                     return []
 
-        # Abstract specs require more work -- currently we test
-        # against everything.
+        # Abstract specs require more work -- we use the secondary indexes to narrow
+        # down the records to test.
+        candidates = self._query_candidates(
+            query_spec, installed, explicit, start_date, end_date, hashes
+        )
+
         results = []
         start_date = start_date or datetime.datetime.min
         end_date = end_date or datetime.datetime.max
@@ -1555,7 +2118,8 @@ def _query(
         # save specs whose name doesn't match for last, to avoid a virtual check
         deferred = []
 
-        for key, rec in self._data.items():
+        for key in candidates:
+            rec = self._data[key]
             if hashes is not None and rec.spec.dag_hash() not in hashes:
                 continue
 
@@ -1602,6 +2166,60 @@ def _query(
 
         return results
 
+    def _get_query_index(self) -> QueryIndex:
+        """Return the secondary indexes on the records, building them if needed"""
+        if self._query_index is None or self._query_index.data is not self._data:
+            self._query_index = QueryIndex(self._data)
+        return self._query_index
+
+    def _update_query_index(self, key: str) -> None:
+        """Update the secondary indexes after the record of a hash was modified"""
+        if self._query_index is None or self._query_index.data is not self._data:
+            return
+        record = self._data.get(key)
+        if record is None:
+            self._query_index.discard(key)
+        else:
+            self._query_index.update(key, record)
+
+    def _query_candidates(
+        self, query_spec, installed, explicit, start_date, end_date, hashes
+    ) -> Iterable[str]:
+        """Return the hashes of the records that may match a query. The records still need
+        to be checked against the query."""
+        index = self._get_query_index()
+        selections: List[Set[str]] = []
+
+        if query_spec is not any and query_spec.name:
+            if query_spec.name in index.names():
+                selections.append(index.with_name(query_spec.name))
+            elif query_spec.virtual:
+                providers = spack.repo.PATH.provider_index.providers_for(query_spec.name)
+                selections.append(set().union(*(index.with_name(p.name) for p in providers)))
+            else:
+                return []
+
+        statuses = InstallStatuses.canonicalize(installed)
+        if len(set(statuses)) < len(_INSTALL_STATUSES):
+            selections.append(index.with_status(statuses))
+
+        if explicit is True:
+            selections.append(index.explicit())
+
+        if start_date or end_date:
+            selections.append(index.installed_between(start_date, end_date))
+
+        if hashes is not None:
+            selections.append({h for h in hashes if h in self._data})
+
+        if not selections:
+            return list(self._data)
+
+        selections.sort(key=len)
+        candidates = set(selections[0]).intersection(*selections[1:])
+        # Keep the order of the records, so that results don't depend on hash randomization
+        return [h for h in self._data if h in candidates]
+
     if _query.__doc__ is None:
         _query.__doc__ = ""
     _query.__doc__ += _QUERY_DOCSTRING
@@ -1710,6 +2328,7 @@ def update_explicit(self, spec, explicit):
                 status = "explicit" if explicit else "implicit"
                 tty.debug(message.format(status, s=spec))
                 rec.explicit = explicit
+                self._update_query_index(spec.dag_hash())
 
 
 class UpstreamDatabaseLockingError(SpackError):
@@ -9,8 +9,6 @@
 import tempfile
 from typing import Any, Deque, Dict, Generator, List, NamedTuple, Tuple
 
-import jinja2
-
 from llnl.util import filesystem
 
 import spack.repo
@@ -87,6 +85,8 @@ def _mock_layout(self) -> Generator[List[str], None, None]:
     def _create_executable_scripts(self, mock_executables: MockExecutables) -> List[pathlib.Path]:
         relative_paths = mock_executables.executables
         script = mock_executables.script
+        import jinja2  # only needed to test detection, and slow to import
+
         script_template = jinja2.Template("#!/bin/bash\n{{ script }}\n")
         result = []
         for mock_exe_path in relative_paths:
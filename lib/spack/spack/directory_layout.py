@@ -95,6 +95,7 @@ def __init__(self, root, **kwargs):
         self.extension_file_name = "extensions.yaml"
         self.packages_dir = "repos"  # archive of package.py files
         self.manifest_file_name = "install_manifest.json"
+        self.env_modifications_file_name = "run_environment.json"
 
     @property
     def hidden_file_regexes(self):
@@ -343,6 +343,7 @@
     SpackEnvironmentError,
     SpackEnvironmentViewError,
     activate,
+    activation_cache_path,
     active,
     active_environment,
     all_environment_names,
@@ -377,6 +378,7 @@
     "SpackEnvironmentError",
     "SpackEnvironmentViewError",
     "activate",
+    "activation_cache_path",
     "active",
     "active_environment",
     "all_environment_names",
@@ -10,8 +10,9 @@
 import os
 import re
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional, Set
 
+import spack.binary_distribution
 import spack.deptypes as dt
 import spack.environment.environment as ev
 import spack.spec
@@ -51,6 +52,7 @@ def __init__(
     ):
         self.target = MakefileSpec(target)
         self.prereqs = list(MakefileSpec(x) for x in prereqs)
+        self.buildcache = buildcache
         if buildcache == UseBuildCache.ONLY:
             self.buildcache_flag = "--use-buildcache=only"
         elif buildcache == UseBuildCache.NEVER:
@@ -66,18 +68,36 @@ class DepfileSpecVisitor:
 
     Note that the DAG could be reduced even more by dropping build edges of specs
     installed at the moment the depfile is generated, but that would produce
-    stateful depfiles that would not fail when the database is wiped later."""
+    stateful depfiles that would not fail when the database is wiped later.
 
-    def __init__(self, pkg_buildcache: UseBuildCache, deps_buildcache: UseBuildCache):
+    When ``binary_hashes`` is given, specs in auto mode whose hash is in it are
+    installed from a build cache only, so their build deps are dropped too."""
+
+    def __init__(
+        self,
+        pkg_buildcache: UseBuildCache,
+        deps_buildcache: UseBuildCache,
+        binary_hashes: Optional[Set[str]] = None,
+    ):
         self.adjacency_list: List[DepfileNode] = []
         self.pkg_buildcache = pkg_buildcache
         self.deps_buildcache = deps_buildcache
-        self.depflag_root = _deptypes(pkg_buildcache)
-        self.depflag_deps = _deptypes(deps_buildcache)
+        self.binary_hashes = binary_hashes
+
+    def buildcache(self, node) -> UseBuildCache:
+        """Whether the spec of node should be installed from a build cache"""
+        buildcache = self.pkg_buildcache if node.depth == 0 else self.deps_buildcache
+        if (
+            buildcache == UseBuildCache.AUTO
+            and self.binary_hashes
+            and node.edge.spec.dag_hash() in self.binary_hashes
+        ):
+            return UseBuildCache.ONLY
+        return buildcache
 
     def neighbors(self, node):
         """Produce a list of spec to follow from node"""
-        depflag = self.depflag_root if node.depth == 0 else self.depflag_deps
+        depflag = _deptypes(self.buildcache(node))
         return traverse.sort_edges(node.edge.spec.edges_to_dependencies(depflag=depflag))
 
     def accept(self, node):
@@ -85,7 +105,7 @@ def accept(self, node):
             DepfileNode(
                 target=node.edge.spec,
                 prereqs=[edge.spec for edge in self.neighbors(node)],
-                buildcache=self.pkg_buildcache if node.depth == 0 else self.deps_buildcache,
+                buildcache=self.buildcache(node),
             )
         )
 
@@ -119,6 +139,82 @@ def unsafe_format(self, format_str):
         return self.spec.format(format_str)
 
 
+def _dependencies_first(graph: Dict[str, List[str]]) -> List[str]:
+    """Return the nodes of a DAG, given as adjacency lists, such that every node comes
+    after its prerequisites."""
+    result: List[str] = []
+    visited: Set[str] = set()
+    for start in graph:
+        if start in visited:
+            continue
+        visited.add(start)
+        stack = [(start, iter(graph[start]))]
+        while stack:
+            node, prereqs = stack[-1]
+            for prereq in prereqs:
+                if prereq not in visited:
+                    visited.add(prereq)
+                    stack.append((prereq, iter(graph[prereq])))
+                    break
+            else:
+                stack.pop()
+                result.append(node)
+    return result
+
+
+def _install_batches(adjacency_list: List[DepfileNode], batch_size: int) -> List[List[str]]:
+    """Group the hashes of specs installed from a build cache only into batches of at most
+    ``batch_size`` specs, such that specs in a batch don't depend on each other, and only
+    depend on specs of earlier batches."""
+    graph = {n.target.spec_hash(): [p.spec_hash() for p in n.prereqs] for n in adjacency_list}
+    order = _dependencies_first(graph)
+
+    # A spec can only be batched if all its prerequisites are batched too, otherwise a batch
+    # could wait for a long source build to finish.
+    batched = set(
+        n.target.spec_hash() for n in adjacency_list if n.buildcache == UseBuildCache.ONLY
+    )
+    for node in order:
+        if node in batched and any(p not in batched for p in graph[node]):
+            batched.discard(node)
+
+    # Specs at the same level of the batched sub-DAG are independent.
+    levels: Dict[str, int] = {}
+    for node in order:
+        if node in batched:
+            levels[node] = 1 + max((levels[p] for p in graph[node]), default=-1)
+
+    batches: List[List[str]] = []
+    for level in sorted(set(levels.values())):
+        specs = [node for node in order if levels.get(node) == level]
+        batches.extend(specs[i : i + batch_size] for i in range(0, len(specs), batch_size))
+    return batches
+
+
+def _critical_paths(adjacency_list: List[DepfileNode], batched: Set[str]) -> Dict[str, int]:
+    """Estimate for every spec the number of source builds on the longest chain of builds
+    that ends with it. Installs from a build cache are considered to be free."""
+    graph = {n.target.spec_hash(): [p.spec_hash() for p in n.prereqs] for n in adjacency_list}
+    result: Dict[str, int] = {}
+    for node in _dependencies_first(graph):
+        cost = 0 if node in batched else 1
+        result[node] = cost + max((result[p] for p in graph[node]), default=0)
+    return result
+
+
+def _binary_hashes(roots: List[spack.spec.Spec]) -> Set[str]:
+    """Return the hashes of the specs in the DAG of the roots that are found in the index of
+    a build cache."""
+    names = set(s.name for s in traverse.traverse_nodes(roots, key=lambda s: s.dag_hash()))
+    try:
+        available = spack.binary_distribution.update_cache_and_get_specs(names=names)
+    except (spack.binary_distribution.FetchCacheError, IndexError):
+        # IndexError is raised when no mirror has an index: the update then fails without
+        # errors, and FetchCacheError can't be constructed from an empty list of them.
+        return set()
+    return set(s.dag_hash() for s in available)
+
+
 class MakefileModel:
     """This class produces all data to render a makefile for specs of an environment."""
 
@@ -129,6 +225,7 @@ def __init__(
         adjacency_list: List[DepfileNode],
         make_prefix: Optional[str],
         jobserver: bool,
+        batch_size: int = 0,
     ):
         """
         Args:
@@ -138,6 +235,8 @@ def __init__(
             make_prefix: prefix for makefile targets
             jobserver: when enabled, make will invoke Spack with jobserver support. For
                 dry-run this should be disabled.
+            batch_size: when positive, specs installed from a build cache only are installed
+                by a single Spack process per batch of at most this many specs.
         """
         # Currently we can only use depfile with an environment since Spack needs to
         # find the concrete specs somewhere.
@@ -158,11 +257,25 @@ def __init__(
             self.make_prefix = make_prefix
             self.pkg_identifier_variable = os.path.join(make_prefix, "SPACK_PACKAGE_IDS")
 
+        # Installs from a build cache are cheap compared to the startup of a Spack process,
+        # so optionally they are done in batches.
+        batches = _install_batches(adjacency_list, batch_size) if batch_size > 0 else []
+        batched = set(h for batch in batches for h in batch)
+
+        # Make starts prerequisites in the order they are listed, so list the ones on the
+        # longest chains of source builds first to avoid waiting for them at the end.
+        critical_path = _critical_paths(adjacency_list, batched)
+
+        def by_critical_path(specs: List[MakefileSpec]) -> List[MakefileSpec]:
+            return sorted(specs, key=lambda s: -critical_path[s.spec_hash()])
+
         # And here we collect a tuple of (target, prereqs, dag_hash, nice_name, buildcache_flag)
         self.make_adjacency_list = [
             (
                 item.target.safe_name(),
-                " ".join(self._install_target(s.safe_name()) for s in item.prereqs),
+                " ".join(
+                    self._install_target(s.safe_name()) for s in by_critical_path(item.prereqs)
+                ),
                 item.target.spec_hash(),
                 item.target.unsafe_format(
                     "{name}{@version}{%compiler}{variants}{arch=architecture}"
@@ -173,7 +286,24 @@ def __init__(
         ]
 
         # Root specs without deps are the prereqs for the environment target
-        self.root_install_targets = [self._install_target(s.safe_name()) for s in self.roots]
+        self.root_install_targets = [
+            self._install_target(s.safe_name()) for s in by_critical_path(self.roots)
+        ]
+
+        # And a tuple of (batch, prereqs, hashes, names, members) for each batch
+        specs_by_hash = {item.target.spec_hash(): item.target for item in adjacency_list}
+        self.batches = []
+        for i, batch in enumerate(batches):
+            members = [specs_by_hash[h] for h in batch]
+            self.batches.append(
+                (
+                    f"batch-{i}",
+                    " ".join(self._install_deps_target(s.safe_name()) for s in members),
+                    " ".join(f"/{h}" for h in batch),
+                    " ".join(s.unsafe_format("{name}{@version}") for s in members),
+                    [s.safe_name() for s in members],
+                )
+            )
 
         self.jobserver_support = "+" if jobserver else ""
 
@@ -197,6 +327,9 @@ def __init__(
                 self.phony_convenience_targets.append(os.path.join("install", tgt))
                 self.phony_convenience_targets.append(os.path.join("install-deps", tgt))
 
+        for batch, *_ in self.batches:
+            self.all_install_related_targets.append(self._install_batch_target(batch))
+
     def _target(self, name: str) -> str:
         # The `all` and `clean` targets are phony. It doesn't make sense to
         # have /abs/path/to/env/metadir/{all,clean} targets. But it *does* make
@@ -213,6 +346,9 @@ def _install_target(self, name: str) -> str:
     def _install_deps_target(self, name: str) -> str:
         return os.path.join(self.make_prefix, "install-deps", name)
 
+    def _install_batch_target(self, name: str) -> str:
+        return os.path.join(self.make_prefix, "install-batch", name)
+
     def to_dict(self):
         return {
             "all_target": self._target("all"),
@@ -224,9 +360,11 @@ def to_dict(self):
             "environment": self.env_path,
             "install_target": self._target("install"),
             "install_deps_target": self._target("install-deps"),
+            "install_batch_target": self._target("install-batch"),
             "any_hash_target": self._target("%"),
             "jobserver_support": self.jobserver_support,
             "adjacency_list": self.make_adjacency_list,
+            "batches": self.batches,
             "phony_convenience_targets": " ".join(self.phony_convenience_targets),
             "pkg_ids_variable": self.pkg_identifier_variable,
             "pkg_ids": " ".join(self.all_pkg_identifiers),
@@ -245,6 +383,7 @@ def from_env(
         dep_buildcache: UseBuildCache = UseBuildCache.AUTO,
         make_prefix: Optional[str] = None,
         jobserver: bool = True,
+        batch_size: int = 0,
     ) -> "MakefileModel":
         """Produces a MakefileModel from an environment and a list of specs.
 
@@ -257,11 +396,19 @@ def from_env(
             make_prefix: the prefix for the makefile targets
             jobserver: when enabled, make will invoke Spack with jobserver support. For
                 dry-run this should be disabled.
+            batch_size: when positive, specs installed from a build cache only are installed
+                in batches of at most this many specs. Specs in auto mode are installed from
+                a build cache only if they are found in the index of a mirror.
         """
         roots = env.all_matching_specs(*filter_specs) if filter_specs else env.concrete_roots()
-        visitor = DepfileSpecVisitor(pkg_buildcache, dep_buildcache)
+        binary_hashes = None
+        if batch_size > 0 and UseBuildCache.AUTO in (pkg_buildcache, dep_buildcache):
+            binary_hashes = _binary_hashes(roots)
+        visitor = DepfileSpecVisitor(pkg_buildcache, dep_buildcache, binary_hashes)
         traverse.traverse_breadth_first_with_visitor(
             roots, traverse.CoverNodesVisitor(visitor, key=lambda s: s.dag_hash())
         )
 
-        return MakefileModel(env, roots, visitor.adjacency_list, make_prefix, jobserver)
+        return MakefileModel(
+            env, roots, visitor.adjacency_list, make_prefix, jobserver, batch_size
+        )
@@ -523,6 +523,7 @@ def __init__(
         exclude=[],
         link=default_view_link,
         link_type="symlink",
+        incremental=False,
     ):
         self.base = base_path
         self.raw_root = root
@@ -532,6 +533,7 @@ def __init__(
         self.exclude = exclude
         self.link_type = view_func_parser(link_type)
         self.link = link
+        self.incremental = incremental
 
     def select_fn(self, spec):
         return any(spec.satisfies(s) for s in self.select)
@@ -552,6 +554,7 @@ def __eq__(self, other):
                 self.exclude == other.exclude,
                 self.link == other.link,
                 self.link_type == other.link_type,
+                self.incremental == other.incremental,
             ]
         )
 
@@ -567,6 +570,8 @@ def to_dict(self):
             ret["link_type"] = inverse_view_func_parser(self.link_type)
         if self.link != default_view_link:
             ret["link"] = self.link
+        if self.incremental:
+            ret["incremental"] = True
         return ret
 
     @staticmethod
@@ -579,6 +584,7 @@ def from_dict(base_path, d):
             d.get("exclude", []),
             d.get("link", default_view_link),
             d.get("link_type", "symlink"),
+            d.get("incremental", False),
         )
 
     @property
@@ -690,7 +696,9 @@ def regenerate(self, concrete_roots: List[Spec]) -> None:
         # in a directory by hash, and then having a symlink to the real
         # view in the root. The real root for a view at /dirname/basename
         # will be /dirname/._basename_<hash>.
-        # This allows for atomic swaps when we update the view
+        # This allows for atomic swaps when we update the view.
+        # Incremental views are still created in a new directory, but start
+        # from a copy of the current one, and only link the specs that changed.
 
         # cache the roots because the way we determine which is which does
         # not work while we are updating
@@ -715,7 +723,10 @@ def regenerate(self, concrete_roots: List[Spec]) -> None:
         # Create a new view
         try:
             fs.mkdirp(new_root)
-            view.add_specs(*specs)
+            if not (self.incremental and old_root and view.update_specs(old_root, *specs)):
+                view.add_specs(*specs)
+            if self.incremental:
+                view.write_state(specs)
 
             # create symlink from tmp_symlink_name to new_root
             if os.path.exists(tmp_symlink_name):
@@ -781,6 +792,16 @@ def env_subdir_path(manifest_dir: Union[str, pathlib.Path]) -> str:
     return os.path.join(str(manifest_dir), env_subdir_name)
 
 
+def activation_cache_path(manifest_dir: Union[str, pathlib.Path]) -> str:
+    """Path to the directory where the environment caches the modifications to activate and
+    deactivate it.
+
+    Args:
+        manifest_dir:  directory containing the environment manifest file
+    """
+    return os.path.join(env_subdir_path(manifest_dir), "activation")
+
+
 class Environment:
     """A Spack environment, which bundles together configuration and a list of specs."""
 
@@ -814,6 +835,8 @@ def __init__(self, manifest_dir: Union[str, pathlib.Path]) -> None:
         #: Previously active environment
         self._previous_active = None
         self._dev_specs = None
+        #: Whether the runtime environment of a view could not be computed
+        self.view_env_failed = False
 
         # Load the manifest file contents into memory
         self._load_manifest_file()
@@ -858,6 +881,10 @@ def write_transaction(self):
         """Get a write lock context manager for use in a `with` block."""
         return lk.WriteTransaction(self.txlock, acquire=self._re_read)
 
+    def read_transaction(self):
+        """Get a read lock context manager for use in a `with` block."""
+        return lk.ReadTransaction(self.txlock)
+
     def _process_definition(self, item):
         """Process a single spec definition item."""
         entry = copy.deepcopy(item)
@@ -1345,10 +1372,17 @@ def _concretize_together(
         self.concretized_order = []
         self.specs_by_hash = {}
 
+        concrete_specs: Optional[List[spack.spec.Spec]] = None
+        split = not tests and spack.config.get("concretizer:split_independent_roots", False)
+        if split:
+            concrete_specs = self._concretize_independent_roots(specs_to_concretize)
+        split = concrete_specs is not None
+
         try:
-            concrete_specs: List[spack.spec.Spec] = spack.concretize.concretize_specs_together(
-                *specs_to_concretize, tests=tests
-            )
+            if concrete_specs is None:
+                concrete_specs = spack.concretize.concretize_specs_together(
+                    *specs_to_concretize, tests=tests
+                )
         except spack.error.UnsatisfiableSpecError as e:
             # "Enhance" the error message for multiple root specs, suggest a less strict
             # form of concretization.
@@ -1371,15 +1405,76 @@ def _concretize_together(
         for abstract, concrete in concretized_specs:
             self._add_concrete_spec(abstract, concrete)
 
+        if split:
+            # Unify the specs objects from different processes, so that common nodes
+            # are shared, like after a single solve
+            self._read_lockfile_dict(self._to_lockfile_dict())
+            concrete_specs = [self.specs_by_hash[h] for h in self.concretized_order]
+
         # zip truncates the longer list, which is exactly what we want here
         return list(zip(new_user_specs, concrete_specs))
 
+    def _concretize_independent_roots(
+        self, specs_to_concretize: List[spack.spec.Spec]
+    ) -> Optional[List[spack.spec.Spec]]:
+        """Concretize together, in parallel processes, clusters of roots that can't share
+        any link or run dependency, and merge the results.
+
+        Returns the concrete specs, in the same order as the input, or None if the roots
+        can't be split, or if the merged results are not a unified concretization. In that
+        case, the caller should concretize all the roots together.
+        """
+        try:
+            clusters = _independent_root_clusters(specs_to_concretize)
+        except spack.error.SpackError as e:
+            tty.debug(f"cannot split the root specs in independent groups: {e}")
+            return None
+
+        if len(clusters) < 2:
+            return None
+
+        _prepare_parallel_concretization()
+
+        args = [
+            (i, [specs_to_concretize[j] for j in cluster]) for i, cluster in enumerate(clusters)
+        ]
+        num_procs = min(len(args), spack.util.cpus.determine_number_of_jobs(parallel=True))
+        tty.msg(f"Concretizing {len(clusters)} independent groups of root specs")
+
+        start = time.time()
+        concrete_specs: List[Optional[spack.spec.Spec]] = [None] * len(specs_to_concretize)
+        try:
+            for i, concrete, duration in spack.util.parallel.imap_unordered(
+                _concretize_together_task,
+                args,
+                processes=num_procs,
+                debug=tty.is_debug(),
+                maxtaskperchild=1,
+            ):
+                tty.debug(f"{duration:6.1f}s [group {i + 1}/{len(clusters)}]")
+                for j, spec in zip(clusters[i], concrete):
+                    concrete_specs[j] = spec
+        except (RuntimeError, spack.error.SpackError) as e:
+            # Let the unified solve report errors, with its own messages
+            tty.debug(f"cannot concretize independent groups of root specs: {e}")
+            return None
+
+        result = [s for s in concrete_specs if s is not None]
+        duplicates = _conflicting_packages([[result[j] for j in cluster] for cluster in clusters])
+        if duplicates:
+            tty.debug(
+                "independent groups of root specs have different nodes for "
+                f"{', '.join(sorted(duplicates))}, concretizing them together"
+            )
+            return None
+
+        tty.msg(f"Environment concretized in {time.time() - start:.2f} seconds")
+        return result
+
     def _concretize_separately(self, tests=False):
         """Concretization strategy that concretizes separately one
         user spec after the other.
         """
-        import spack.bootstrap
-
         # keep any concretized specs whose user specs are still in the manifest
         old_concretized_user_specs = self.concretized_user_specs
         old_concretized_order = self.concretized_order
@@ -1402,21 +1497,7 @@ def _concretize_separately(self, tests=False):
                 args.append((i, [str(x) for x in uspec_constraints], tests))
                 i += 1
 
-        # Ensure we don't try to bootstrap clingo in parallel
-        if spack.config.get("config:concretizer", "clingo") == "clingo":
-            with spack.bootstrap.ensure_bootstrap_configuration():
-                spack.bootstrap.ensure_core_dependencies()
-
-        # Ensure all the indexes have been built or updated, since
-        # otherwise the processes in the pool may timeout on waiting
-        # for a write lock. We do this indirectly by retrieving the
-        # provider index, which should in turn trigger the update of
-        # all the indexes if there's any need for that.
-        _ = spack.repo.PATH.provider_index
-
-        # Ensure we have compilers in compilers.yaml to avoid that
-        # processes try to write the config file in parallel
-        _ = spack.compilers.get_compiler_config()
+        _prepare_parallel_concretization()
 
         # Early return if there is nothing to do
         if len(args) == 0:
@@ -1555,6 +1636,7 @@ def delete_default_view(self) -> None:
             tty.debug(msg)
 
     def regenerate_views(self):
+        self.clear_activation_cache()
         if not self.views:
             tty.debug("Skip view update, this environment does not maintain a view")
             return
@@ -1589,6 +1671,7 @@ def _env_modifications_for_view(
             mods = uenv.environment_modifications_for_specs(*installed_roots, view=view)
         except Exception as e:
             # Failing to setup spec-specific changes shouldn't be a hard error.
+            self.view_env_failed = True
             tty.warn(
                 f"could not {'unload' if reverse else 'load'} runtime environment due "
                 f"to {e.__class__.__name__}: {e}"
@@ -2036,6 +2119,7 @@ def write(self, regenerate: bool = True) -> None:
             regenerate: regenerate views and run post-write hooks as well as writing if True.
         """
         self.manifest_uptodate_or_warn()
+        self.clear_activation_cache()
         if self.specs_by_hash:
             self.ensure_env_directory_exists(dot_env=True)
             self.update_environment_repository()
@@ -2055,6 +2139,11 @@ def write(self, regenerate: bool = True) -> None:
 
         self.new_specs.clear()
 
+    def clear_activation_cache(self) -> None:
+        """Remove the cached modifications to activate and deactivate the environment, which
+        are outdated when the environment is written or its views are regenerated."""
+        shutil.rmtree(activation_cache_path(self.path), ignore_errors=True)
+
     def update_lockfile(self) -> None:
         with fs.write_tmp_and_move(self.lock_path) as f:
             sjson.dump(self._to_lockfile_dict(), stream=f)
@@ -2234,6 +2323,92 @@ def _concretize_task(packed_arguments) -> Tuple[int, Spec, float]:
         return index, spec, time.time() - start
 
 
+def _concretize_together_task(packed_arguments) -> Tuple[int, List[Spec], float]:
+    index, specs = packed_arguments
+    with tty.SuppressOutput(msg_enabled=False):
+        start = time.time()
+        concrete_specs = spack.concretize.concretize_specs_together(*specs)
+        return index, concrete_specs, time.time() - start
+
+
+def _prepare_parallel_concretization() -> None:
+    """Set up what worker processes would otherwise race to set up, before starting
+    parallel concretization."""
+    import spack.bootstrap
+
+    # Ensure we don't try to bootstrap clingo in parallel
+    if spack.config.get("config:concretizer", "clingo") == "clingo":
+        with spack.bootstrap.ensure_bootstrap_configuration():
+            spack.bootstrap.ensure_core_dependencies()
+
+    # Ensure all the indexes have been built or updated, since
+    # otherwise the processes in the pool may timeout on waiting
+    # for a write lock. We do this indirectly by retrieving the
+    # provider index, which should in turn trigger the update of
+    # all the indexes if there's any need for that.
+    _ = spack.repo.PATH.provider_index
+
+    # Ensure we have compilers in compilers.yaml to avoid that
+    # processes try to write the config file in parallel
+    _ = spack.compilers.get_compiler_config()
+
+
+def _independent_root_clusters(specs: List[Spec]) -> List[List[int]]:
+    """Group root specs so that roots in different groups can't have any link or run
+    dependency in common.
+
+    Two roots are in the same group if their possible link and run dependencies (with
+    virtuals expanded to all their providers) overlap, or if their constraints mention
+    the same package. Concrete roots contribute the nodes in their link/run sub-DAG.
+
+    Returns:
+        Lists of indices into ``specs``, one list per group.
+    """
+    import spack.package_base
+
+    parent = list(range(len(specs)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    owner: Dict[str, int] = {}
+    for i, spec in enumerate(specs):
+        if spec.concrete:
+            names = {node.name for node in spec.traverse(deptype=dt.LINK | dt.RUN)}
+        else:
+            names = {node.name for node in spec.traverse() if node.name}
+            names.update(
+                spack.package_base.possible_dependencies(spec.name, depflag=dt.LINK | dt.RUN)
+            )
+
+        for name in names:
+            j = owner.setdefault(name, i)
+            parent[find(j)] = find(i)
+
+    clusters: Dict[int, List[int]] = collections.defaultdict(list)
+    for i in range(len(specs)):
+        clusters[find(i)].append(i)
+    return list(clusters.values())
+
+
+def _conflicting_packages(groups: List[List[Spec]]) -> Set[str]:
+    """Return the names of the packages whose nodes differ between groups of DAGs that
+    were concretized separately."""
+    nodes_by_name: Dict[str, Set[str]] = {}
+    result = set()
+    for group in groups:
+        group_nodes: Dict[str, Set[str]] = collections.defaultdict(set)
+        for node in traverse.traverse_nodes(group, key=traverse.by_dag_hash):
+            group_nodes[node.name].add(node.dag_hash())
+        for name, hashes in group_nodes.items():
+            if nodes_by_name.setdefault(name, hashes) != hashes:
+                result.add(name)
+    return result
+
+
 def make_repo_path(root):
     """Make a RepoPath from the repo subdirectories in an environment."""
     path = spack.repo.RepoPath()
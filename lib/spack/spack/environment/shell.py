@@ -2,25 +2,158 @@
 # Spack Project Developers. See the top-level COPYRIGHT file for details.
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import hashlib
+import json
 import os
+import sys
 import textwrap
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
+import llnl.util.filesystem as fs
 import llnl.util.tty as tty
 from llnl.util.tty.color import colorize
 
+import spack.config
 import spack.environment as ev
+import spack.error
+import spack.main
 import spack.repo
 import spack.store
+import spack.util.spack_json as sjson
 from spack.util.environment import EnvironmentModifications
 
 
-def activate_header(env, shell, prompt=None, view: Optional[str] = None):
+def activation_cache_file(env_path: str, *args: Optional[str]) -> str:
+    """Path of the file caching modifications to activate or deactivate an environment.
+
+    The name of the file is a hash of the manifest and lockfile of the environment, of the
+    arguments, of the version of Spack including its commit, of the configuration affecting the
+    modifications, of the content of the ``package.py`` files of the locked specs and of the
+    included configuration files, and of the state of the indexes of the installation databases,
+    which determine the installed roots. It can be computed without reading the environment.
+    The cache is removed when the environment is written, or its views are regenerated.
+
+    Args:
+        env_path: directory of the environment
+        args: arguments determining the modifications, like the name of the view
+    """
+    hasher = hashlib.sha256()
+    contents = {}
+    for name in (ev.manifest_name, ev.lockfile_name):
+        try:
+            with open(os.path.join(env_path, name), "rb") as f:
+                contents[name] = f.read()
+        except OSError:
+            contents[name] = b""
+        hasher.update(contents[name])
+        hasher.update(b"\0")
+    files = _package_files(contents[ev.lockfile_name]) + _included_config_files(env_path)
+    relevant = {
+        "args": args,
+        "spack": spack.main.get_version(),
+        "platform": sys.platform,
+        "prefix_inspections": spack.config.get("modules:prefix_inspections"),
+        "install_tree": spack.config.get("config:install_tree"),
+        "upstreams": spack.config.get("upstreams"),
+        "files": [[path, _file_digest(path)] for path in files],
+        "databases": _database_indexes(),
+    }
+    hasher.update(json.dumps(relevant, sort_keys=True, default=str).encode())
+    return os.path.join(ev.activation_cache_path(env_path), f"{hasher.hexdigest()}.json")
+
+
+def _file_digest(path: str) -> Optional[str]:
+    """Digest of the content of a file, or None if it cannot be read"""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _database_indexes() -> List[List[Any]]:
+    """Path, modification time and size of the index of the local and upstream databases,
+    which change whenever specs are installed or uninstalled."""
+    db = spack.store.STORE.db
+    result = []
+    for path in [db._index_path] + [u._index_path for u in db.upstream_dbs]:
+        try:
+            st = os.stat(path)
+            result.append([path, st.st_mtime_ns, st.st_size])
+        except OSError:
+            result.append([path, None, None])
+    return result
+
+
+def _package_files(lockfile: bytes) -> List[str]:
+    """Paths of the current ``package.py`` files of the specs in a lockfile, whose methods
+    compute the modifications. Base classes defined in other files are not included."""
+    try:
+        nodes = json.loads(lockfile)["concrete_specs"].values()
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return []
+    paths = set()
+    for node in nodes:
+        try:
+            fullname = f"{node['namespace']}.{node['name']}"
+            paths.add(spack.repo.PATH.filename_for_package_name(fullname))
+        except (KeyError, TypeError, spack.repo.RepoError):
+            continue
+    return sorted(paths)
+
+
+def _included_config_files(env_path: str) -> List[str]:
+    """Paths of the configuration files included by the manifest of an environment"""
+    try:
+        scopes = ev.environment.EnvironmentManifestFile(env_path).included_config_scopes
+    except (spack.error.SpackError, ValueError, OSError):
+        return []
+    paths = []
+    for scope in scopes:
+        if isinstance(scope, spack.config.SingleFileScope):
+            paths.append(scope.path)
+            continue
+        try:
+            names = sorted(os.listdir(scope.path))
+        except OSError:
+            names = []
+        paths.extend(os.path.join(scope.path, name) for name in names if name.endswith(".yaml"))
+    return paths
+
+
+def read_activation_cache(path: str) -> Optional[Dict[str, Any]]:
+    """Return the content of an activation cache file, or None if it is missing or invalid."""
+    try:
+        with open(path) as f:
+            data = sjson.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def write_activation_cache(path: str, data: Dict[str, Any]) -> None:
+    """Write an activation cache file. Failures, for instance in read-only environments, are
+    ignored."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        fs.mkdirp(os.path.dirname(path))
+        with open(tmp, "w") as f:
+            sjson.dump(data, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        tty.debug(f"Cannot cache the activation of the environment: {e}")
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def activate_header(env_path: str, shell, prompt=None, view: Optional[str] = None):
     # Construct the commands to run
     cmds = ""
     if shell == "csh":
         # TODO: figure out how to make color work for csh
-        cmds += "setenv SPACK_ENV %s;\n" % env.path
+        cmds += "setenv SPACK_ENV %s;\n" % env_path
         if view:
             cmds += "setenv SPACK_ENV_VIEW %s;\n" % view
         cmds += 'alias despacktivate "spack env deactivate";\n'
@@ -32,7 +165,7 @@ def activate_header(env, shell, prompt=None, view: Optional[str] = None):
         if "color" in os.getenv("TERM", "") and prompt:
             prompt = colorize("@G{%s} " % prompt, color=True)
 
-        cmds += "set -gx SPACK_ENV %s;\n" % env.path
+        cmds += "set -gx SPACK_ENV %s;\n" % env_path
         if view:
             cmds += "set -gx SPACK_ENV_VIEW %s;\n" % view
         cmds += "function despacktivate;\n"
@@ -45,20 +178,20 @@ def activate_header(env, shell, prompt=None, view: Optional[str] = None):
         #
     elif shell == "bat":
         # TODO: Color
-        cmds += 'set "SPACK_ENV=%s"\n' % env.path
+        cmds += 'set "SPACK_ENV=%s"\n' % env_path
         if view:
             cmds += 'set "SPACK_ENV_VIEW=%s"\n' % view
         # TODO: despacktivate
         # TODO: prompt
     elif shell == "pwsh":
-        cmds += "$Env:SPACK_ENV='%s'\n" % env.path
+        cmds += "$Env:SPACK_ENV='%s'\n" % env_path
         if view:
             cmds += "$Env:SPACK_ENV_VIEW='%s'\n" % view
     else:
         bash_color_prompt = colorize(f"@G{{{prompt}}}", color=True, enclose=True)
         zsh_color_prompt = colorize(f"@G{{{prompt}}}", color=True, enclose=False, zsh=True)
 
-        cmds += "export SPACK_ENV=%s;\n" % env.path
+        cmds += "export SPACK_ENV=%s;\n" % env_path
         if view:
             cmds += "export SPACK_ENV_VIEW=%s;\n" % view
         cmds += "alias despacktivate='spack env deactivate';\n"
@@ -195,15 +328,24 @@ def deactivate() -> EnvironmentModifications:
     active_view = os.getenv(ev.spack_env_view_var)
 
     if active_view and active.has_view(active_view):
-        try:
-            with spack.store.STORE.db.read_transaction():
-                active.rm_view_from_env(env_mods, active_view)
-        except (spack.repo.UnknownPackageError, spack.repo.UnknownNamespaceError) as e:
-            tty.warn(e)
-            tty.warn(
-                "Could not fully deactivate view due to missing package "
-                "or repo, shell environment may be corrupt."
-            )
+        cache_file = activation_cache_file(active.path, "deactivate", active_view)
+        cached = read_activation_cache(cache_file)
+        if cached is not None:
+            env_mods.extend(EnvironmentModifications.from_list(cached["modifications"]))
+        else:
+            view_mods = EnvironmentModifications()
+            try:
+                with active.read_transaction(), spack.store.STORE.db.read_transaction():
+                    active.rm_view_from_env(view_mods, active_view)
+                    if not active.view_env_failed:
+                        write_activation_cache(cache_file, {"modifications": view_mods.to_list()})
+            except (spack.repo.UnknownPackageError, spack.repo.UnknownNamespaceError) as e:
+                tty.warn(e)
+                tty.warn(
+                    "Could not fully deactivate view due to missing package "
+                    "or repo, shell environment may be corrupt."
+                )
+            env_mods.extend(view_mods)
 
     ev.deactivate()
 
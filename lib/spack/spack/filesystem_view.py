@@ -10,10 +10,11 @@
 import shutil
 import stat
 import sys
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 from llnl.util import tty
 from llnl.util.filesystem import (
+    BaseDirectoryVisitor,
     mkdirp,
     remove_dead_links,
     remove_empty_directories,
@@ -48,6 +49,10 @@
 
 _projections_path = ".spack/projections.yaml"
 
+#: Where a SimpleFilesystemView records its specs, relative to its root
+_view_state_path = os.path.join(".spack", "view-state.json")
+_view_state_version = 1
+
 
 def view_symlink(src, dst, **kwargs):
     # keyword arguments are irrelevant
@@ -634,13 +639,128 @@ def unlink_meta_folder(self, spec):
         shutil.rmtree(path)
 
 
+def _is_metadata_dir(file):
+    # Ignore spack meta data folder.
+    return os.path.basename(file) == spack.store.STORE.layout.metadata_dir
+
+
+def _normalized_projection(projection: str) -> str:
+    """Projection as stored by SourceMergeVisitor.set_projection"""
+    projection = os.path.normpath(projection)
+    return "" if projection == "." else projection
+
+
+class _SharedFilesVisitor(SourceMergeVisitor):
+    """A SourceMergeVisitor that also records all the sources of destination files that are
+    provided by more than one source, so that a view knows which specs still provide a file
+    after one of them is removed."""
+
+    def __init__(self, ignore=None):
+        super().__init__(ignore=ignore)
+
+        # Maps dst_rel to all its (src_root, src_rel) in the order they were visited.
+        self.shared: Dict[str, List[Tuple[str, str]]] = {}
+
+    def visit_file(self, root: str, rel_path: str, depth: int, *, symlink: bool = False) -> None:
+        proj_rel_path = os.path.join(self.projection, rel_path)
+        if proj_rel_path in self.files and not self.ignore(rel_path):
+            sources = self.shared.setdefault(proj_rel_path, [self.files[proj_rel_path]])
+            sources.append((root, rel_path))
+        super().visit_file(root, rel_path, depth, symlink=symlink)
+
+
+class _ViewCopyVisitor(BaseDirectoryVisitor):
+    """Copies the directories and links of a view to another root, except for the given files
+    and directories (relative to the view root)."""
+
+    def __init__(self, dst_root: str, skip_files, skip_dirs):
+        self.dst_root = dst_root
+        self.skip_files = skip_files
+        self.skip_dirs = skip_dirs
+
+    def before_visit_dir(self, root: str, rel_path: str, depth: int) -> bool:
+        if rel_path in self.skip_dirs:
+            return False
+        os.mkdir(os.path.join(self.dst_root, rel_path))
+        return True
+
+    def before_visit_symlinked_dir(self, root: str, rel_path: str, depth: int) -> bool:
+        self.visit_symlinked_file(root, rel_path, depth)
+        return False
+
+    def visit_file(self, root: str, rel_path: str, depth: int) -> None:
+        if rel_path not in self.skip_files:
+            shutil.copy2(os.path.join(root, rel_path), os.path.join(self.dst_root, rel_path))
+
+    def visit_symlinked_file(self, root: str, rel_path: str, depth: int) -> None:
+        if rel_path not in self.skip_files:
+            target = os.readlink(os.path.join(root, rel_path))
+            os.symlink(target, os.path.join(self.dst_root, rel_path))
+
+
+def _read_view_state(root: str) -> Optional[dict]:
+    """Read the state recorded by SimpleFilesystemView.write_state, or return None"""
+    try:
+        with open(os.path.join(root, _view_state_path)) as f:
+            state = s_json.load(f)
+    except (OSError, ValueError) as e:
+        tty.debug(f"Cannot read the state of the view at {root}: {e}")
+        return None
+    if state.get("version") != _view_state_version:
+        return None
+    return state
+
+
+def _view_file_source(
+    view_root: str, dst: str, entries: Dict[str, Dict[str, str]]
+) -> List[Tuple[str, str]]:
+    """Return the source of the file ``dst`` in a symlink view, which must be one of the specs
+    in ``entries`` (keyed by view source), or an empty list if the file doesn't exist."""
+    path = os.path.join(view_root, dst)
+    if not os.path.islink(path):
+        if os.path.isfile(path):
+            raise ValueError(f"{path} is not a link")
+        return []
+    target = os.readlink(path)
+    prefix = os.path.dirname(target)
+    while prefix not in entries:
+        parent = os.path.dirname(prefix)
+        if parent == prefix:
+            raise ValueError(f"{path} does not link to any spec in the view")
+        prefix = parent
+    return [(prefix, os.path.relpath(target, prefix))]
+
+
+def _view_entry_provides_dir(entry: Dict[str, str], dst_dir: str) -> bool:
+    """Whether the spec of a view state entry contributes the directory ``dst_dir`` (relative to
+    the view root)."""
+    if entry["metadata"].startswith(dst_dir + os.sep):
+        return True
+    projection = entry["projection"]
+    if not projection:
+        rel_path = dst_dir
+    elif projection == dst_dir or projection.startswith(dst_dir + os.sep):
+        return True
+    elif dst_dir.startswith(projection + os.sep):
+        rel_path = dst_dir[len(projection) + 1 :]
+    else:
+        return False
+    if spack.store.STORE.layout.metadata_dir in rel_path.split(os.sep):
+        return False
+    return os.path.isdir(os.path.join(entry["prefix"], rel_path))
+
+
 class SimpleFilesystemView(FilesystemView):
     """A simple and partial implementation of FilesystemView focused on performance and immutable
-    views, where specs cannot be removed after they were added."""
+    views, where specs cannot be removed after they were added. A new view can be derived from an
+    existing one with :py:meth:`update_specs`."""
 
     def __init__(self, root, layout, **kwargs):
         super().__init__(root, layout, **kwargs)
 
+        #: Destination files provided by more than one spec, mapped to all their sources
+        self.shared_files: Dict[str, List[Tuple[str, str]]] = {}
+
     def _sanity_check_view_projection(self, specs):
         """A very common issue is that we end up with two specs of the same package, that project
         to the same prefix. We want to catch that as early as possible and give a sensible error to
@@ -669,11 +789,7 @@ def add_specs(self, *specs: spack.spec.Spec) -> None:
 
         self._sanity_check_view_projection(specs)
 
-        # Ignore spack meta data folder.
-        def skip_list(file):
-            return os.path.basename(file) == spack.store.STORE.layout.metadata_dir
-
-        visitor = SourceMergeVisitor(ignore=skip_list)
+        visitor = _SharedFilesVisitor(ignore=_is_metadata_dir)
 
         # Gather all the directories to be made and files to be linked
         for spec in specs:
@@ -713,6 +829,8 @@ def skip_list(file):
         # Finally create the metadata dirs.
         self.link_metadata(specs)
 
+        self.shared_files.update(visitor.shared)
+
     def _source_merge_visitor_to_merge_map(self, visitor: SourceMergeVisitor):
         # For compatibility with add_files_to_view, we have to create a
         # merge_map of the form join(src_root, src_rel) => join(dst_root, dst_rel),
@@ -764,6 +882,199 @@ def link_metadata(self, specs):
         for dst_relpath, (src_root, src_relpath) in metadata_visitor.files.items():
             self.link(os.path.join(src_root, src_relpath), os.path.join(self._root, dst_relpath))
 
+    def _view_state_entry(self, spec: spack.spec.Spec) -> Dict[str, str]:
+        return {
+            "hash": spec.dag_hash(),
+            "prefix": spec.package.view_source(),
+            "projection": _normalized_projection(self.get_relative_projection_for_spec(spec)),
+            "metadata": self.relative_metadata_dir_for_spec(spec),
+        }
+
+    def write_state(self, specs: List[spack.spec.Spec]) -> None:
+        """Record the specs linked in the view, and the files provided by more than one of them,
+        so that a later view can be derived from this one with :py:meth:`update_specs`."""
+        state = {
+            "version": _view_state_version,
+            "link_type": inverse_view_func_parser(self.link.func),
+            "projections": self.projections,
+            "specs": [self._view_state_entry(s) for s in specs if not s.external],
+            "shared_files": self.shared_files,
+        }
+        path = os.path.join(self._root, _view_state_path)
+        mkdirp(os.path.dirname(path))
+        with open(path, "w") as f:
+            s_json.dump(state, f)
+
+    def update_specs(self, base: str, *specs: spack.spec.Spec) -> bool:
+        """Populate this empty view with a root-to-leaf topologically ordered list of specs,
+        starting from the view at ``base``, whose state was recorded with :py:meth:`write_state`.
+
+        Directories and links of specs in both views are copied from ``base``, and only the specs
+        that were added or removed are visited. Files with more than one source are linked from
+        the first spec in the new order, so the result is the same as with :py:meth:`add_specs`.
+        Packages that customize ``add_files_to_view`` may write the view root into files, so they
+        are always linked again.
+
+        Returns False, without modifying the view, when ``base`` cannot be updated this way: no
+        recorded state, different projections, a link type other than symlink, or specs to remove
+        that are not installed anymore.
+        """
+        import spack.package_base
+
+        if sys.platform == "win32" or self.link.func is not view_symlink:
+            return False
+
+        state = _read_view_state(base)
+        if (
+            state is None
+            or state["link_type"] != "symlink"
+            or list(state["projections"].items()) != list(self.projections.items())
+        ):
+            return False
+
+        for s in specs:
+            if s.external:
+                tty.warn("Skipping external package: " + s.short_spec)
+        specs = tuple(s for s in specs if not s.external)
+
+        self._sanity_check_view_projection(specs)
+
+        def can_be_copied(spec):
+            return (
+                type(spec.package).add_files_to_view
+                is spack.package_base.PackageViewMixin.add_files_to_view
+            )
+
+        old_entries = {entry["hash"]: entry for entry in state["specs"]}
+        new_entries = [self._view_state_entry(s) for s in specs]
+        kept: Dict[str, Dict[str, str]] = {}  # view source => entry
+        added = []
+        for spec, entry in zip(specs, new_entries):
+            if old_entries.get(entry["hash"]) == entry and can_be_copied(spec):
+                kept[entry["prefix"]] = entry
+            else:
+                added.append(spec)
+        removed = [entry for entry in state["specs"] if entry["prefix"] not in kept]
+
+        if not all(os.path.isdir(entry["prefix"]) for entry in removed):
+            tty.debug(f"Cannot update {base}: some of its specs are not installed anymore")
+            return False
+
+        # Files of the removed specs, which are not copied over
+        removed_visitor = SourceMergeVisitor(ignore=_is_metadata_dir)
+        for entry in removed:
+            removed_visitor.set_projection(entry["projection"])
+            visit_directory_tree(entry["prefix"], removed_visitor)
+
+        added_visitor = _SharedFilesVisitor(ignore=_is_metadata_dir)
+        for spec in added:
+            added_visitor.set_projection(self.get_relative_projection_for_spec(spec))
+            visit_directory_tree(spec.package.view_source(), added_visitor)
+
+        if added_visitor.fatal_conflicts:
+            raise MergeConflictSummary(added_visitor.fatal_conflicts)
+
+        # Gather all the sources of the files that may change: the ones from the old view that
+        # are still around, and the ones of the added specs. Files with multiple sources are
+        # always resolved again, since the order of the specs may have changed.
+        old_shared = {
+            dst: [(src_root, src_rel) for src_root, src_rel in sources]
+            for dst, sources in state["shared_files"].items()
+        }
+        changed = set(removed_visitor.files)
+        changed.update(added_visitor.files)
+        changed.update(old_shared)
+        sources: List[Tuple[str, str, str]] = []  # (dst_rel, src_root, src_rel)
+        for dst in changed:
+            if dst in old_shared:
+                old_sources = [s for s in old_shared[dst] if s[0] in kept]
+            elif dst in removed_visitor.files:
+                old_sources = []
+            else:
+                try:
+                    old_sources = _view_file_source(base, dst, kept)
+                except ValueError as e:
+                    tty.debug(f"Cannot update {base}: {e}")
+                    return False
+            sources.extend((dst, src_root, src_rel) for src_root, src_rel in old_sources)
+            if dst in added_visitor.shared:
+                sources.extend((dst, *source) for source in added_visitor.shared[dst])
+            elif dst in added_visitor.files:
+                sources.append((dst, *added_visitor.files[dst]))
+
+        # Resolve conflicts in the same way as add_specs, by visiting the sources in view order.
+        order = {entry["prefix"]: i for i, entry in enumerate(new_entries)}
+        projection = {entry["prefix"]: entry["projection"] for entry in new_entries}
+        resolver = _SharedFilesVisitor()
+        for dst, src_root, src_rel in sorted(sources, key=lambda x: order[x[1]]):
+            resolver.projection = projection[src_root]
+            if os.path.islink(os.path.join(src_root, src_rel)):
+                resolver.visit_symlinked_file(src_root, src_rel, 0)
+            else:
+                resolver.visit_file(src_root, src_rel, 0)
+
+        if resolver.file_conflicts:
+            if self.ignore_conflicts:
+                tty.debug(f"{len(resolver.file_conflicts)} file conflicts")
+            else:
+                raise MergeConflictSummary(resolver.file_conflicts)
+
+        tty.debug(
+            f"Updating view {self._root} from {base}: {len(added)} specs added, "
+            f"{len(removed)} removed, {len(changed)} files to update"
+        )
+
+        # Copy everything else from the old view
+        removed_metadata = {entry["metadata"] for entry in removed}
+        visit_directory_tree(
+            base,
+            _ViewCopyVisitor(
+                self._root, skip_files=changed | {_view_state_path}, skip_dirs=removed_metadata
+            ),
+        )
+
+        # Drop the directories that only the removed specs contributed, deepest first
+        empty_candidates = set(removed_visitor.directories)
+        for metadata_dir in removed_metadata:
+            parent = os.path.dirname(metadata_dir)
+            while parent:
+                empty_candidates.add(parent)
+                parent = os.path.dirname(parent)
+        for dst in sorted(empty_candidates, reverse=True):
+            path = os.path.join(self._root, dst)
+            if (
+                dst not in added_visitor.directories
+                and os.path.isdir(path)
+                and not os.path.islink(path)
+                and not os.listdir(path)
+                and not any(_view_entry_provides_dir(e, dst) for e in kept.values())
+            ):
+                os.rmdir(path)
+
+        # Check for conflicts with the copied directories and links
+        visit_directory_tree(self._root, DestinationMergeVisitor(added_visitor))
+
+        if added_visitor.fatal_conflicts:
+            raise MergeConflictSummary(added_visitor.fatal_conflicts)
+
+        for dst in added_visitor.directories:
+            os.mkdir(os.path.join(self._root, dst))
+
+        merge_map_per_prefix: Dict[str, Dict[str, str]] = {}
+        for dst, (src_root, src_rel) in resolver.files.items():
+            merge_map = merge_map_per_prefix.setdefault(src_root, {})
+            merge_map[os.path.join(src_root, src_rel)] = os.path.join(self._root, dst)
+        for spec in specs:
+            merge_map = merge_map_per_prefix.get(spec.package.view_source(), None)
+            if not merge_map:
+                continue
+            spec.package.add_files_to_view(self, merge_map, skip_if_exists=False)
+
+        self.link_metadata(added)
+
+        self.shared_files = resolver.shared
+        return True
+
     def get_relative_projection_for_spec(self, spec):
         # Extensions are placed by their extendee, not by their own spec
         if spec.package.extendee_spec:
@@ -19,11 +19,17 @@
 This can be used to implement support for things like module
 systems (e.g. modules, lmod, etc.) or to add other custom
 features.
+
+Hooks that look at the files in a prefix should use ``prefix_scan(spec)``,
+so that the prefix is walked only once by all the hooks that are run.
 """
+from typing import Dict, Optional
 
 from llnl.util.lang import ensure_last, list_modules
 
 import spack.paths
+import spack.util.timer
+from spack.util.prefix_scan import PrefixScan
 
 
 class _HookRunner:
@@ -31,6 +37,9 @@ class _HookRunner:
     #: all HookRunner objects
     _hooks = None
 
+    #: Scans of the prefixes shared by the hooks being run, by prefix
+    _scans: Optional[Dict[str, PrefixScan]] = None
+
     def __init__(self, hook_name):
         self.hook_name = hook_name
 
@@ -59,12 +68,34 @@ def hooks(self):
             self._populate_hooks()
         return self._hooks
 
-    def __call__(self, *args, **kwargs):
-        for _, module in self.hooks:
-            if hasattr(module, self.hook_name):
-                hook = getattr(module, self.hook_name)
-                if hasattr(hook, "__call__"):
-                    hook(*args, **kwargs)
+    def __call__(
+        self, *args, timer: spack.util.timer.BaseTimer = spack.util.timer.NULL_TIMER, **kwargs
+    ):
+        """Run the hooks, and time each of them with the timer passed as input."""
+        outermost = _HookRunner._scans is None
+        if outermost:
+            _HookRunner._scans = {}
+        try:
+            for module_name, module in self.hooks:
+                if hasattr(module, self.hook_name):
+                    hook = getattr(module, self.hook_name)
+                    if hasattr(hook, "__call__"):
+                        with timer.measure(module_name.rsplit(".", 1)[-1]):
+                            hook(*args, **kwargs)
+        finally:
+            if outermost:
+                _HookRunner._scans = None
+
+
+def prefix_scan(spec) -> PrefixScan:
+    """Return the scan of the prefix of a spec. While hooks are being run, the same scan is
+    returned to all of them."""
+    if _HookRunner._scans is None:
+        return PrefixScan(spec.prefix)
+    prefix = str(spec.prefix)
+    if prefix not in _HookRunner._scans:
+        _HookRunner._scans[prefix] = PrefixScan(prefix)
+    return _HookRunner._scans[prefix]
 
 
 # pre/post install and run by the install subprocess
@@ -6,14 +6,16 @@
 import os
 
 import llnl.util.tty as tty
-from llnl.util.filesystem import BaseDirectoryVisitor, visit_directory_tree
+from llnl.util.filesystem import BaseDirectoryVisitor
 from llnl.util.lang import elide_list
 
 import spack.bootstrap
 import spack.config
+import spack.hooks
 import spack.relocate
 from spack.util.elf import ElfParsingError, parse_elf
 from spack.util.executable import Executable
+from spack.util.prefix_scan import ELF, PrefixScan
 
 
 def is_shared_library_elf(filepath):
@@ -120,14 +122,44 @@ def patch_sonames(patchelf, root, rel_paths):
     return fixed
 
 
-def find_and_patch_sonames(prefix, exclude_list, patchelf):
+def shared_libraries(scan, exclude_list):
+    """Return the paths relative to the prefix of the shared libraries in a scanned prefix,
+    with the same exclusion rules as ``SharedLibrariesVisitor``."""
+    exclude_list = frozenset(exclude_list)
+
+    def _excluded(rel_path):
+        return any(part in exclude_list for part in rel_path.split(os.sep))
+
+    # Exclude the targets of symlinks with an excluded name, outside of excluded directories
+    excluded_through_symlink = set()
+    for path in scan.symlinks:
+        rel_dir, name = os.path.split(os.path.relpath(path, scan.prefix))
+        if name not in exclude_list or _excluded(rel_dir):
+            continue
+        try:
+            s = os.stat(path)
+        except OSError:
+            continue
+        excluded_through_symlink.add((s.st_ino, s.st_dev))
+
+    candidates = [
+        f
+        for f in scan.files_of_kind(ELF, unique=True)
+        if not _excluded(f.rel_path)
+        and (f.stat.st_ino, f.stat.st_dev) not in excluded_through_symlink
+    ]
+    is_library = scan.map(is_shared_library_elf, [f.path for f in candidates])
+    return [f.rel_path for f, library in zip(candidates, is_library) if library]
+
+
+def find_and_patch_sonames(prefix, exclude_list, patchelf, scan=None):
     # Locate all shared libraries in the prefix dir of the spec, excluding
     # the ones set in the non_bindable_shared_objects property.
-    visitor = SharedLibrariesVisitor(exclude_list)
-    visit_directory_tree(prefix, visitor)
+    scan = scan or PrefixScan(prefix)
+    relative_paths = shared_libraries(scan, exclude_list)
 
-    # Patch all sonames.
-    relative_paths = visitor.get_shared_libraries_relative_paths()
+    # Patch all sonames. This is done serially, since there are few shared
+    # libraries compared to the files in the prefix.
     return patch_sonames(patchelf, prefix, relative_paths)
 
 
@@ -154,7 +186,12 @@ def post_install(spec, explicit=None):
         return
     patchelf = Executable(patchelf_path)
 
-    fixes = find_and_patch_sonames(spec.prefix, spec.package.non_bindable_shared_objects, patchelf)
+    fixes = find_and_patch_sonames(
+        spec.prefix,
+        spec.package.non_bindable_shared_objects,
+        patchelf,
+        scan=spack.hooks.prefix_scan(spec),
+    )
 
     if not fixes:
         return
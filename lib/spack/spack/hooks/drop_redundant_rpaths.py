@@ -7,9 +7,10 @@
 from typing import BinaryIO, Optional, Tuple
 
 import llnl.util.tty as tty
-from llnl.util.filesystem import BaseDirectoryVisitor, visit_directory_tree
 
+import spack.hooks
 from spack.util.elf import ElfParsingError, parse_elf
+from spack.util.prefix_scan import ELF, ScannedFile
 
 
 def should_keep(path: bytes) -> bool:
@@ -75,40 +76,11 @@ def drop_redundant_rpaths(path: str) -> Optional[Tuple[bytes, bytes]]:
         return None
 
 
-class ElfFilesWithRPathVisitor(BaseDirectoryVisitor):
-    """Visitor that collects all elf files that have an rpath"""
-
-    def __init__(self):
-        # Keep track of what hardlinked files we've already visited.
-        self.visited = set()
-
-    def visit_file(self, root, rel_path, depth):
-        filepath = os.path.join(root, rel_path)
-        s = os.lstat(filepath)
-        identifier = (s.st_ino, s.st_dev)
-
-        # We're hitting a hardlink or symlink of an excluded lib, no need to parse.
-        if s.st_nlink > 1:
-            if identifier in self.visited:
-                return
-            self.visited.add(identifier)
-
-        result = drop_redundant_rpaths(filepath)
-
-        if result is not None:
-            old, new = result
-            tty.debug(f"Patched rpath in {rel_path} from {old!r} to {new!r}")
-
-    def visit_symlinked_file(self, root, rel_path, depth):
-        pass
-
-    def before_visit_dir(self, root, rel_path, depth):
-        # Always enter dirs
-        return True
-
-    def before_visit_symlinked_dir(self, root, rel_path, depth):
-        # Never enter symlinked dirs
-        return False
+def _drop_redundant_rpaths_and_report(f: ScannedFile) -> None:
+    result = drop_redundant_rpaths(f.path)
+    if result is not None:
+        old, new = result
+        tty.debug(f"Patched rpath in {f.rel_path} from {old!r} to {new!r}")
 
 
 def post_install(spec, explicit=None):
@@ -120,4 +92,5 @@ def post_install(spec, explicit=None):
     if not spec.satisfies("platform=linux") and not spec.satisfies("platform=cray"):
         return
 
-    visit_directory_tree(spec.prefix, ElfFilesWithRPathVisitor())
+    scan = spack.hooks.prefix_scan(spec)
+    scan.map(_drop_redundant_rpaths_and_report, scan.files_of_kind(ELF, unique=True))
@@ -9,6 +9,7 @@
 from llnl.util.filesystem import mkdirp
 from llnl.util.symlink import symlink
 
+import spack.hooks
 import spack.util.editor as ed
 
 
@@ -155,6 +156,7 @@ def post_install(spec, explicit=None):
     pkg = spec.package
     if pkg.license_required and not pkg.spec.external:
         symlink_license(pkg)
+        spack.hooks.prefix_scan(spec).invalidate()
 
 
 def symlink_license(pkg):
@@ -3,8 +3,8 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
-import os
-
+import spack.hooks
+import spack.package_prefs as pp
 import spack.util.file_permissions as fp
 
 
@@ -12,11 +12,10 @@ def post_install(spec, explicit=None):
     if not spec.external:
         fp.set_permissions_by_spec(spec.prefix, spec)
 
-        # os.walk explicitly set not to follow links
-        for root, dirs, files in os.walk(spec.prefix, followlinks=False):
-            for d in dirs:
-                if not os.path.islink(os.path.join(root, d)):
-                    fp.set_permissions_by_spec(os.path.join(root, d), spec)
-            for f in files:
-                if not os.path.islink(os.path.join(root, f)):
-                    fp.set_permissions_by_spec(os.path.join(root, f), spec)
+        # Symlinks are not followed, and their permissions are left alone
+        scan = spack.hooks.prefix_scan(spec)
+        group = pp.get_package_group(spec)
+        dir_perms = pp.get_package_dir_permissions(spec)
+        scan.map(lambda d: fp.set_permissions(d, dir_perms, group), scan.dirs)
+        perms = pp.get_package_permissions(spec)
+        scan.map(lambda f: fp.set_permissions(f.path, perms, group), scan.files)
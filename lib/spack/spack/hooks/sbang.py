@@ -15,10 +15,12 @@
 import llnl.util.tty as tty
 
 import spack.error
+import spack.hooks
 import spack.package_prefs
 import spack.paths
 import spack.spec
 import spack.store
+from spack.util.prefix_scan import SCRIPT
 
 #: OS-imposed character limit for shebang line: 127 for Linux; 511 for Mac.
 #: Different Linux distributions have different limits, but 127 is the
@@ -155,27 +157,30 @@ def filter_shebang(path):
     return True
 
 
-def filter_shebangs_in_directory(directory, filenames=None):
-    if filenames is None:
-        filenames = os.listdir(directory)
-
+def filter_shebang_if_executable(path):
+    """Filter the shebang of a file, if it is executable and not a symlink."""
     is_exe = stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH
 
-    for file in filenames:
-        path = os.path.join(directory, file)
+    # Only look at executable, non-symlink files.
+    try:
+        st = os.lstat(path)
+    except (IOError, OSError):
+        return
 
-        # Only look at executable, non-symlink files.
-        try:
-            st = os.lstat(path)
-        except (IOError, OSError):
-            continue
+    if stat.S_ISLNK(st.st_mode) or stat.S_ISDIR(st.st_mode) or not st.st_mode & is_exe:
+        return
 
-        if stat.S_ISLNK(st.st_mode) or stat.S_ISDIR(st.st_mode) or not st.st_mode & is_exe:
-            continue
+    # test the file for a long shebang, and filter
+    if filter_shebang(path):
+        tty.debug("Patched overlong shebang in %s" % path)
 
-        # test the file for a long shebang, and filter
-        if filter_shebang(path):
-            tty.debug("Patched overlong shebang in %s" % path)
+
+def filter_shebangs_in_directory(directory, filenames=None):
+    if filenames is None:
+        filenames = os.listdir(directory)
+
+    for file in filenames:
+        filter_shebang_if_executable(os.path.join(directory, file))
 
 
 def install_sbang():
@@ -237,8 +242,9 @@ def post_install(spec, explicit=None):
 
     install_sbang()
 
-    for directory, _, filenames in os.walk(spec.prefix):
-        filter_shebangs_in_directory(directory, filenames)
+    # Only scripts can have a shebang
+    scan = spack.hooks.prefix_scan(spec)
+    scan.map(filter_shebang_if_executable, [f.path for f in scan.files_of_kind(SCRIPT)])
 
 
 class SbangPathError(spack.error.SpackError):
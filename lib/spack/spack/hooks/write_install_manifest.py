@@ -3,9 +3,10 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+import spack.hooks
 import spack.verify
 
 
 def post_install(spec, explicit=None):
     if not spec.external:
-        spack.verify.write_manifest(spec)
+        spack.verify.write_manifest(spec, scan=spack.hooks.prefix_scan(spec))
@@ -26,18 +26,21 @@
 installations of packages in a Spack instance.
 """
 
+import concurrent.futures
 import copy
 import glob
 import heapq
 import io
 import itertools
+import multiprocessing.connection
 import os
 import shutil
 import sys
+import threading
 import time
 from collections import defaultdict
 from gzip import GzipFile
-from typing import Dict, Iterator, List, Optional, Set, Tuple
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
 
 import llnl.util.filesystem as fs
 import llnl.util.lock as lk
@@ -60,6 +63,7 @@
 import spack.repo
 import spack.spec
 import spack.store
+import spack.util.cpus
 import spack.util.executable
 import spack.util.path
 import spack.util.timer as timer
@@ -91,6 +95,9 @@
 #: queue invariants).
 STATUS_REMOVED = "removed"
 
+#: Error message when terminating after the first install failure
+FAIL_FAST_ERR = "Terminating after first install failure"
+
 
 def _write_timer_json(pkg, timer, cache):
     extra_attributes = {"name": pkg.name, "cache": cache, "hash": pkg.spec.dag_hash()}
@@ -376,7 +383,12 @@ def print_install_test_log(pkg: "spack.package_base.PackageBase") -> None:
 
 
 def _print_timer(pre: str, pkg_id: str, timer: timer.BaseTimer) -> None:
-    phases = [f"{p.capitalize()}: {_hms(timer.duration(p))}." for p in timer.phases]
+    # Each post-install hook is timed, but only their total is printed
+    phases = [
+        f"{p.capitalize()}: {_hms(timer.duration(p))}."
+        for p in timer.phases
+        if not timer.path(p).startswith("post-install/")
+    ]
     phases.append(f"Total: {_hms(timer.duration())}")
     tty.msg(f"{pre} Successfully installed {pkg_id}", "  ".join(phases))
 
@@ -523,6 +535,34 @@ def _try_install_from_binary_cache(
     )
 
 
+def _install_prefetched_binary(
+    pkg: "spack.package_base.PackageBase", explicit: bool, prefetched: "PrefetchedBinary"
+) -> None:
+    """
+    Install a package that was downloaded and extracted by a ``BinaryInstallPipeline``.
+
+    Args:
+        pkg: package to install from the binary cache
+        explicit: ``True`` if installing the package was explicitly
+            requested by the user, otherwise, ``False``
+        prefetched: the extracted binary package
+    """
+    t = prefetched.timer
+    pkg_id = package_id(pkg)
+    tty.msg(f"Extracting {pkg_id} from binary cache")
+
+    with t.measure("install"), spack.util.path.filter_padding():
+        binary_distribution.install_staged_tarball(pkg.spec, prefetched.staging_dir, timer=t)
+        pkg.installed_from_binary_cache = True
+        spack.store.STORE.db.add(pkg.spec, spack.store.STORE.layout, explicit=explicit)
+    t.stop()
+
+    _write_timer_json(pkg, t, True)
+    _print_timer(pre=_log_prefix(pkg.name), pkg_id=pkg_id, timer=t)
+    _print_installed_pkg(pkg.spec.prefix)
+    spack.hooks.post_install(pkg.spec, explicit)
+
+
 def combine_phase_logs(phase_log_files: List[str], log_path: str) -> None:
     """
     Read set or list of logs and combine them into one file.
@@ -1112,6 +1152,149 @@ def priority(self):
         return len(self.uninstalled_deps)
 
 
+class PrefetchedBinary(NamedTuple):
+    """A binary package extracted into a staging directory by a ``BinaryInstallPipeline``"""
+
+    #: Directory containing the install tree, to be moved to the install prefix
+    staging_dir: str
+    #: Timer with the phases already done in the pipeline
+    timer: timer.Timer
+
+
+class StageThroughput:
+    """Amount of data processed by a stage of a ``BinaryInstallPipeline``, and time during
+    which at least one worker was busy with it."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.nbytes = 0
+        self.intervals: List[Tuple[float, float]] = []
+        self._lock = threading.Lock()
+
+    def record(self, nbytes: int, start: float, end: float) -> None:
+        with self._lock:
+            self.nbytes += nbytes
+            self.intervals.append((start, end))
+
+    @property
+    def packages(self) -> int:
+        return len(self.intervals)
+
+    @property
+    def elapsed(self) -> float:
+        """Length of the union of the intervals during which the stage was busy"""
+        total, busy_until = 0.0, 0.0
+        for start, end in sorted(self.intervals):
+            start = max(start, busy_until)
+            if end > start:
+                total += end - start
+                busy_until = end
+        return total
+
+    def __str__(self) -> str:
+        elapsed = self.elapsed
+        rate = self.nbytes / elapsed if elapsed else 0.0
+        return (
+            f"{self.name}: {self.packages} packages, {self.nbytes / 1e6:.1f} MB in "
+            f"{pretty_seconds(elapsed)} ({rate / 1e6:.1f} MB/s)"
+        )
+
+
+class BinaryInstallPipeline:
+    """
+    Download, verify and extract binary packages ahead of their installation.
+
+    Packages submitted to the pipeline go through three stages in a pool of worker
+    threads: their tarball is fetched from a mirror, its signature and checksum are
+    verified, and it is extracted into a staging directory next to the install prefix.
+    Since workers pick up packages in the order they were submitted, several packages can
+    be in different stages at the same time.
+
+    What is left to the installer is done serially, while holding the write lock on the
+    install prefix: moving the staging directory in place, relocating it, and adding the
+    spec to the database.
+    """
+
+    def __init__(self, jobs: int):
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=jobs)
+        self.prefetched: Dict[str, concurrent.futures.Future] = {}
+        self.stages = {name: StageThroughput(name) for name in ("fetch", "verify", "extract")}
+
+    def __contains__(self, pkg_id: str) -> bool:
+        return pkg_id in self.prefetched
+
+    def submit(self, pkg_id: str, spec: "spack.spec.Spec", unsigned: Optional[bool]) -> None:
+        """Queue a package to go through the pipeline.
+
+        Args:
+            pkg_id: unique id of the package
+            spec: concrete spec of the package
+            unsigned: if ``True`` or ``False`` override the mirror signature verification
+                defaults
+        """
+        # The local cache of buildcache indices is not thread safe, so look the spec up here
+        matches = binary_distribution.get_mirrors_for_spec(spec, index_only=True)
+        self.prefetched[pkg_id] = self.executor.submit(self._prefetch, spec, unsigned, matches)
+
+    def result(self, pkg_id: str) -> Optional[PrefetchedBinary]:
+        """Wait for a package to go through the pipeline.
+
+        Errors in the pipeline, e.g. a checksum that doesn't match, are re-raised here.
+
+        Args:
+            pkg_id: unique id of the package
+
+        Return:
+            The extracted package, or ``None`` if no binary was found for it
+        """
+        return self.prefetched.pop(pkg_id).result()
+
+    def _prefetch(
+        self, spec: "spack.spec.Spec", unsigned: Optional[bool], matches: list
+    ) -> Optional[PrefetchedBinary]:
+        t = timer.Timer()
+
+        start = time.time()
+        with t.measure("fetch"):
+            download_result = binary_distribution.download_tarball(spec, unsigned, matches)
+        if download_result is None:
+            return None
+        nbytes = os.path.getsize(download_result["tarball_stage"].save_filename)
+        self.stages["fetch"].record(nbytes, start, time.time())
+
+        start = time.time()
+        with t.measure("verify"):
+            tarfile_path = binary_distribution.verify_tarball(spec, download_result)
+        self.stages["verify"].record(nbytes, start, time.time())
+
+        start = time.time()
+        with t.measure("stage"):
+            staging_dir = binary_distribution.stage_tarball(spec, download_result, tarfile_path)
+        self.stages["extract"].record(nbytes, start, time.time())
+
+        return PrefetchedBinary(staging_dir, t)
+
+    def shutdown(self) -> None:
+        """Stop the workers, and remove the packages that were extracted but not installed."""
+        for future in self.prefetched.values():
+            future.cancel()
+        self.executor.shutdown(wait=True)
+
+        for future in self.prefetched.values():
+            if future.cancelled() or future.exception() is not None:
+                continue
+            prefetched = future.result()
+            if prefetched is not None:
+                shutil.rmtree(prefetched.staging_dir, ignore_errors=True)
+        self.prefetched.clear()
+
+    def report(self) -> None:
+        """Print the throughput of each stage of the pipeline."""
+        if not self.stages["fetch"].packages:
+            return
+        tty.msg("Binary install pipeline throughput", *(str(s) for s in self.stages.values()))
+
+
 class PackageInstaller:
     """
     Class for managing the install process for a Spack instance based on a
@@ -1158,6 +1341,15 @@ def __init__(self, installs: List[Tuple["spack.package_base.PackageBase", dict]]
         # fast then that option applies to all build requests.
         self.fail_fast = False
 
+        # Maximum number of packages built at the same time in child processes
+        self.max_active_tasks: int = spack.config.get("config:concurrent_packages", 1)
+
+        # Build processes running in the background, keyed on the package's unique id
+        self.active_tasks: Dict[str, Tuple[BuildTask, "spack.build_environment.BuildProcess"]] = {}
+
+        # Pipeline fetching binary packages ahead of their installation, if enabled
+        self.binary_pipeline: Optional[BinaryInstallPipeline] = None
+
     def __repr__(self) -> str:
         """Returns a formal representation of the package installer."""
         rep = f"{self.__class__.__name__}("
@@ -1641,7 +1833,94 @@ def _install_task(self, task: BuildTask, install_status: InstallStatus) -> None:
         Args:
             task: the installation build task for a package
             install_status: the installation status for the package"""
+        if not self._prepare_build(task, install_status):
+            return
 
+        pkg = task.pkg
+        install_args = task.request.install_args
+
+        # Injecting information to know if this installation request is the root one
+        # to determine in BuildProcessInstaller whether installation is explicit or not
+        install_args["is_root"] = task.is_root
+
+        try:
+            self._setup_install_dir(pkg)
+
+            # Create stage object now and let it be serialized for the child process. That
+            # way monkeypatch in tests works correctly.
+            pkg.stage
+
+            # Create a child process to do the actual installation.
+            # Preserve verbosity settings across installs.
+            spack.package_base.PackageBase._verbose = spack.build_environment.start_build_process(
+                pkg, build_process, install_args
+            )
+            self._finalize_build(task)
+        except spack.build_environment.StopPhase as e:
+            self._stopped_build(task, e)
+
+    def _start_install_task(
+        self, task: BuildTask, install_status: InstallStatus
+    ) -> Optional["spack.build_environment.BuildProcess"]:
+        """
+        Start the installation of the spec represented by the build task without
+        waiting for it to complete.
+
+        Installations from a binary cache are still done synchronously, since they
+        happen in this process.
+
+        Args:
+            task: the installation build task for a package
+            install_status: the installation status for the package
+
+        Return:
+            The running build process, or None if nothing is left to be done
+        """
+        if not self._prepare_build(task, install_status):
+            return None
+
+        pkg = task.pkg
+        install_args = dict(task.request.install_args)
+        install_args["is_root"] = task.is_root
+        install_args["build_jobs"] = self._build_jobs_share()
+
+        self._setup_install_dir(pkg)
+        pkg.stage
+
+        # Builds running concurrently must not compete for the terminal
+        return spack.build_environment.spawn_build_process(
+            pkg, build_process, install_args, forward_stdin=False
+        )
+
+    def _complete_install_task(
+        self, task: BuildTask, process: "spack.build_environment.BuildProcess"
+    ) -> None:
+        """
+        Wait for the build process of a task started by ``_start_install_task``
+        and record its result.
+
+        Args:
+            task: the installation build task for a package
+            process: the build process running the installation
+        """
+        try:
+            spack.package_base.PackageBase._verbose = process.complete()
+            self._finalize_build(task)
+        except spack.build_environment.StopPhase as e:
+            self._stopped_build(task, e)
+
+    def _prepare_build(self, task: BuildTask, install_status: InstallStatus) -> bool:
+        """
+        Try to install the task from a binary cache, and otherwise prepare the
+        package for a build from sources.
+
+        Args:
+            task: the installation build task for a package
+            install_status: the installation status for the package
+
+        Return:
+            True if the package has to be built from sources, False otherwise
+        """
         explicit = task.explicit
         install_args = task.request.install_args
         cache_only = task.cache_only
@@ -1657,12 +1936,24 @@ def _install_task(self, task: BuildTask, install_status: InstallStatus) -> None:
         task.status = STATUS_INSTALLING
 
         # Use the binary cache if requested
-        if use_cache:
+        if use_cache and self.binary_pipeline and pkg_id in self.binary_pipeline:
+            prefetched = self.binary_pipeline.result(pkg_id)
+            if prefetched is not None:
+                _install_prefetched_binary(pkg, explicit, prefetched)
+                self._update_installed(task)
+                if task.compiler:
+                    self._add_compiler_package_to_config(pkg)
+                return False
+            elif cache_only:
+                raise InstallError("No binary found when cache-only was specified", pkg=pkg)
+            else:
+                tty.msg(f"No binary for {pkg_id} found: installing from source")
+        elif use_cache:
             if _install_from_cache(pkg, explicit, unsigned):
                 self._update_installed(task)
                 if task.compiler:
                     self._add_compiler_package_to_config(pkg)
-                return
+                return False
             elif cache_only:
                 raise InstallError("No binary found when cache-only was specified", pkg=pkg)
             else:
@@ -1672,42 +1963,41 @@ def _install_task(self, task: BuildTask, install_status: InstallStatus) -> None:
 
         # hook that allows tests to inspect the Package before installation
         # see unit_test_check() docs.
-        if not pkg.unit_test_check():
-            return
-
-        # Injecting information to know if this installation request is the root one
-        # to determine in BuildProcessInstaller whether installation is explicit or not
-        install_args["is_root"] = task.is_root
+        return pkg.unit_test_check()
 
-        try:
-            self._setup_install_dir(pkg)
-
-            # Create stage object now and let it be serialized for the child process. That
-            # way monkeypatch in tests works correctly.
-            pkg.stage
+    def _finalize_build(self, task: BuildTask) -> None:
+        """
+        Register a package that was successfully built by a child process.
 
-            # Create a child process to do the actual installation.
-            # Preserve verbosity settings across installs.
-            spack.package_base.PackageBase._verbose = spack.build_environment.start_build_process(
-                pkg, build_process, install_args
-            )
-            # Currently this is how RPATH-like behavior is achieved on Windows, after install
-            # establish runtime linkage via Windows Runtime link object
-            # Note: this is a no-op on non Windows platforms
-            pkg.windows_establish_runtime_linkage()
-            # Note: PARENT of the build process adds the new package to
-            # the database, so that we don't need to re-read from file.
-            spack.store.STORE.db.add(pkg.spec, spack.store.STORE.layout, explicit=explicit)
-
-            # If a compiler, ensure it is added to the configuration
-            if task.compiler:
-                self._add_compiler_package_to_config(pkg)
-        except spack.build_environment.StopPhase as e:
-            # A StopPhase exception means that do_install was asked to
-            # stop early from clients, and is not an error at this point
-            pid = f"{self.pid}: " if tty.show_pid() else ""
-            tty.debug(f"{pid}{str(e)}")
-            tty.debug(f"Package stage directory: {pkg.stage.source_path}")
+        Args:
+            task: the installation build task for the package
+        """
+        pkg = task.pkg
+
+        # Currently this is how RPATH-like behavior is achieved on Windows, after install
+        # establish runtime linkage via Windows Runtime link object
+        # Note: this is a no-op on non Windows platforms
+        pkg.windows_establish_runtime_linkage()
+        # Note: PARENT of the build process adds the new package to
+        # the database, so that we don't need to re-read from file.
+        spack.store.STORE.db.add(pkg.spec, spack.store.STORE.layout, explicit=task.explicit)
+
+        # If a compiler, ensure it is added to the configuration
+        if task.compiler:
+            self._add_compiler_package_to_config(pkg)
+
+    def _stopped_build(self, task: BuildTask, e: "spack.build_environment.StopPhase") -> None:
+        # A StopPhase exception means that do_install was asked to
+        # stop early from clients, and is not an error at this point
+        pid = f"{self.pid}: " if tty.show_pid() else ""
+        tty.debug(f"{pid}{str(e)}")
+        tty.debug(f"Package stage directory: {task.pkg.stage.source_path}")
+
+    def _build_jobs_share(self) -> int:
+        """Return the number of jobs each concurrent build may use, so that the
+        builds together do not exceed the global job budget."""
+        budget = spack.util.cpus.determine_number_of_jobs(parallel=True)
+        return max(1, budget // self.max_active_tasks)
 
     def _next_is_pri0(self) -> bool:
         """
@@ -1953,6 +2243,29 @@ def _init_queue(self) -> None:
                 for dependent_id in dependents.difference(task.dependents):
                     task.add_dependent(dependent_id)
 
+    def _start_binary_pipeline(self) -> None:
+        """Start fetching the binaries of all the tasks that can be installed from a
+        binary cache, if ``config:binary_install_jobs`` allows more than one at a time."""
+        jobs = spack.config.get("config:binary_install_jobs", 1)
+        if jobs < 2 or not spack.mirror.MirrorCollection(binary=True):
+            return
+
+        # Tasks are created dependencies first, so submit them in the same order
+        tasks = sorted(self.build_tasks.values(), key=lambda task: task.sequence)
+        for task in tasks:
+            spec = task.pkg.spec
+            if not task.use_cache or spec.external or spec.installed_upstream:
+                continue
+            if task.pkg_id in self.installed or spec.dag_hash() in task.request.overwrite:
+                continue
+            if self._check_db(spec)[1]:
+                continue
+            if self.binary_pipeline is None:
+                self.binary_pipeline = BinaryInstallPipeline(jobs)
+            self.binary_pipeline.submit(
+                task.pkg_id, spec, task.request.install_args.get("unsigned")
+            )
+
     def _install_action(self, task: BuildTask) -> int:
         """
         Determine whether the installation should be overwritten (if it already
@@ -1993,9 +2306,8 @@ def install(self) -> None:
         """Install the requested package(s) and or associated dependencies."""
 
         self._init_queue()
-        fail_fast_err = "Terminating after first install failure"
-        single_explicit_spec = len(self.build_requests) == 1
-        failed_explicits = []
+        failed_explicits: List[Tuple["spack.package_base.PackageBase", str, str]] = []
+        self._start_binary_pipeline()
 
         install_status = InstallStatus(len(self.build_pq))
 
@@ -2005,14 +2317,85 @@ def install(self) -> None:
             enabled=sys.stdout.isatty() and tty.msg_enabled() and not tty.is_debug()
         )
 
-        while self.build_pq:
+        try:
+            self._install_tasks(install_status, term_status, failed_explicits)
+        except BaseException:
+            # Do not leave builds running in the background
+            self._terminate_active_tasks()
+            raise
+        finally:
+            if self.binary_pipeline:
+                self.binary_pipeline.shutdown()
+
+        if self.binary_pipeline:
+            self.binary_pipeline.report()
+
+        # Cleanup, which includes releasing all of the read locks
+        self._cleanup_all_tasks()
+
+        # Ensure we properly report if one or more explicit specs failed
+        # or were not installed when should have been.
+        missing = [
+            (request.pkg, request.pkg_id)
+            for request in self.build_requests
+            if request.install_args.get("install_package") and request.pkg_id not in self.installed
+        ]
+
+        if failed_explicits or missing:
+            for _, pkg_id, err in failed_explicits:
+                tty.error(f"{pkg_id}: {err}")
+
+            for _, pkg_id in missing:
+                tty.error(f"{pkg_id}: Package was not installed")
+
+            if len(failed_explicits) > 0:
+                pkg = failed_explicits[0][0]
+                ids = [pkg_id for _, pkg_id, _ in failed_explicits]
+                tty.debug(
+                    "Associating installation failure with first failed "
+                    f"explicit package ({ids[0]}) from {', '.join(ids)}"
+                )
+
+            elif len(missing) > 0:
+                pkg = missing[0][0]
+                ids = [pkg_id for _, pkg_id in missing]
+                tty.debug(
+                    "Associating installation failure with first "
+                    f"missing package ({ids[0]}) from {', '.join(ids)}"
+                )
+
+            raise InstallError(
+                "Installation request failed.  Refer to reported errors for failing package(s).",
+                pkg=pkg,
+            )
+
+    def _install_tasks(
+        self,
+        install_status: InstallStatus,
+        term_status: TermStatusLine,
+        failed_explicits: List[Tuple["spack.package_base.PackageBase", str, str]],
+    ) -> None:
+        """
+        Process the build queue until all tasks are done, running up to
+        ``max_active_tasks`` builds at the same time.
+
+        Args:
+            install_status: the installation status
+            term_status: the terminal status line
+            failed_explicits: list where failed explicit packages are recorded
+        """
+        while self.build_pq or self.active_tasks:
+            # With builds running in the background, wait for one of them to
+            # complete if no other task can be started right now.
+            if self.active_tasks and not self._can_start_task():
+                task, process = self._wait_for_active_task()
+                self._perform_install(task, install_status, failed_explicits, process)
+                continue
+
             task = self._pop_task()
             if task is None:
                 continue
 
-            install_args = task.request.install_args
-            keep_prefix = install_args.get("keep_prefix")
-
             pkg, pkg_id, spec = task.pkg, task.pkg_id, task.pkg.spec
             install_status.next_pkg(pkg)
             install_status.set_term_title(f"Processing {pkg.name}")
@@ -2058,7 +2441,7 @@ def install(self) -> None:
                 self._update_failed(task)
 
                 if self.fail_fast:
-                    raise InstallError(fail_fast_err, pkg=pkg)
+                    raise InstallError(FAIL_FAST_ERR, pkg=pkg)
 
                 continue
 
@@ -2136,120 +2519,154 @@ def install(self) -> None:
             # Proceed with the installation since we have an exclusive write
             # lock on the package.
             install_status.set_term_title(f"Installing {pkg.name}")
-            try:
+            self._perform_install(task, install_status, failed_explicits)
+
+    def _perform_install(
+        self,
+        task: BuildTask,
+        install_status: InstallStatus,
+        failed_explicits: List[Tuple["spack.package_base.PackageBase", str, str]],
+        process: Optional["spack.build_environment.BuildProcess"] = None,
+    ) -> None:
+        """
+        Install the package of a task for which an exclusive write lock is held,
+        or complete its installation if it was started in the background.
+
+        Args:
+            task: the installation build task for a package
+            install_status: the installation status for the package
+            failed_explicits: list where failed explicit packages are recorded
+            process: build process of a task started in the background, if any
+        """
+        pkg, pkg_id = task.pkg, task.pkg_id
+        keep_prefix = task.request.install_args.get("keep_prefix")
+        single_explicit_spec = len(self.build_requests) == 1
+        action = InstallAction.INSTALL
+        in_progress = False
+        try:
+            if process is not None:
+                self._complete_install_task(task, process)
+            else:
                 action = self._install_action(task)
 
-                if action == InstallAction.INSTALL:
+                if action == InstallAction.INSTALL and self.max_active_tasks > 1:
+                    process = self._start_install_task(task, install_status)
+                    if process is not None:
+                        # Completed later on by ``_install_tasks``
+                        self.active_tasks[pkg_id] = (task, process)
+                        in_progress = True
+                        return
+                elif action == InstallAction.INSTALL:
                     self._install_task(task, install_status)
                 elif action == InstallAction.OVERWRITE:
                     # spack.store.STORE.db is not really a Database object, but a small
                     # wrapper -- silence mypy
                     OverwriteInstall(self, spack.store.STORE.db, task, install_status).install()  # type: ignore[arg-type] # noqa: E501
 
-                self._update_installed(task)
+            self._update_installed(task)
 
-                # If we installed then we should keep the prefix
-                stop_before_phase = getattr(pkg, "stop_before_phase", None)
-                last_phase = getattr(pkg, "last_phase", None)
-                keep_prefix = keep_prefix or (stop_before_phase is None and last_phase is None)
+            # If we installed then we should keep the prefix
+            stop_before_phase = getattr(pkg, "stop_before_phase", None)
+            last_phase = getattr(pkg, "last_phase", None)
+            keep_prefix = keep_prefix or (stop_before_phase is None and last_phase is None)
 
-            except KeyboardInterrupt as exc:
-                # The build has been terminated with a Ctrl-C so terminate
-                # regardless of the number of remaining specs.
-                tty.error(
-                    f"Failed to install {pkg.name} due to " f"{exc.__class__.__name__}: {str(exc)}"
-                )
+        except KeyboardInterrupt as exc:
+            # The build has been terminated with a Ctrl-C so terminate
+            # regardless of the number of remaining specs.
+            tty.error(
+                f"Failed to install {pkg.name} due to " f"{exc.__class__.__name__}: {str(exc)}"
+            )
+            raise
+
+        except binary_distribution.NoChecksumException as exc:
+            if task.cache_only:
                 raise
 
-            except binary_distribution.NoChecksumException as exc:
-                if task.cache_only:
-                    raise
+            # Checking hash on downloaded binary failed.
+            tty.error(
+                f"Failed to install {pkg.name} from binary cache due "
+                f"to {str(exc)}: Requeueing to install from source."
+            )
+            # this overrides a full method, which is ugly.
+            task.use_cache = False  # type: ignore[misc]
+            self._requeue_task(task, install_status)
+            return
 
-                # Checking hash on downloaded binary failed.
+        except (Exception, SystemExit) as exc:
+            self._update_failed(task, True, exc)
+
+            # Best effort installs suppress the exception and mark the
+            # package as a failure.
+            if not isinstance(exc, spack.error.SpackError) or not exc.printed:  # type: ignore[union-attr] # noqa: E501
+                exc.printed = True  # type: ignore[union-attr]
+                # SpackErrors can be printed by the build process or at
+                # lower levels -- skip printing if already printed.
+                # TODO: sort out this and SpackError.print_context()
                 tty.error(
-                    f"Failed to install {pkg.name} from binary cache due "
-                    f"to {str(exc)}: Requeueing to install from source."
+                    f"Failed to install {pkg.name} due to " f"{exc.__class__.__name__}: {str(exc)}"
                 )
-                # this overrides a full method, which is ugly.
-                task.use_cache = False  # type: ignore[misc]
-                self._requeue_task(task, install_status)
-                continue
-
-            except (Exception, SystemExit) as exc:
-                self._update_failed(task, True, exc)
-
-                # Best effort installs suppress the exception and mark the
-                # package as a failure.
-                if not isinstance(exc, spack.error.SpackError) or not exc.printed:  # type: ignore[union-attr] # noqa: E501
-                    exc.printed = True  # type: ignore[union-attr]
-                    # SpackErrors can be printed by the build process or at
-                    # lower levels -- skip printing if already printed.
-                    # TODO: sort out this and SpackError.print_context()
-                    tty.error(
-                        f"Failed to install {pkg.name} due to "
-                        f"{exc.__class__.__name__}: {str(exc)}"
-                    )
-                # Terminate if requested to do so on the first failure.
-                if self.fail_fast:
-                    raise InstallError(f"{fail_fast_err}: {str(exc)}", pkg=pkg)
+            # Terminate if requested to do so on the first failure.
+            if self.fail_fast:
+                raise InstallError(f"{FAIL_FAST_ERR}: {str(exc)}", pkg=pkg)
 
-                # Terminate at this point if the single explicit spec has
-                # failed to install.
-                if single_explicit_spec and task.explicit:
-                    raise
+            # Terminate at this point if the single explicit spec has
+            # failed to install.
+            if single_explicit_spec and task.explicit:
+                raise
 
-                # Track explicit spec id and error to summarize when done
-                if task.explicit:
-                    failed_explicits.append((pkg, pkg_id, str(exc)))
+            # Track explicit spec id and error to summarize when done
+            if task.explicit:
+                failed_explicits.append((pkg, pkg_id, str(exc)))
 
-            finally:
-                # Remove the install prefix if anything went wrong during
-                # install.
-                if not keep_prefix and not action == InstallAction.OVERWRITE:
-                    pkg.remove_prefix()
+        finally:
+            # Remove the install prefix if anything went wrong during
+            # install.
+            if not keep_prefix and not in_progress and not action == InstallAction.OVERWRITE:
+                pkg.remove_prefix()
 
-            # Perform basic task cleanup for the installed spec to
-            # include downgrading the write to a read lock
-            self._cleanup_task(pkg)
+        # Perform basic task cleanup for the installed spec to
+        # include downgrading the write to a read lock
+        self._cleanup_task(pkg)
 
-        # Cleanup, which includes releasing all of the read locks
-        self._cleanup_all_tasks()
-
-        # Ensure we properly report if one or more explicit specs failed
-        # or were not installed when should have been.
-        missing = [
-            (request.pkg, request.pkg_id)
-            for request in self.build_requests
-            if request.install_args.get("install_package") and request.pkg_id not in self.installed
-        ]
+    def _can_start_task(self) -> bool:
+        """
+        Determine if another build can be started while builds are running
+        in the background.
 
-        if failed_explicits or missing:
-            for _, pkg_id, err in failed_explicits:
-                tty.error(f"{pkg_id}: {err}")
+        Return:
+            True if there is room for another build and the next build task
+            has no uninstalled dependencies, False otherwise
+        """
+        if len(self.active_tasks) >= self.max_active_tasks:
+            return False
 
-            for _, pkg_id in missing:
-                tty.error(f"{pkg_id}: Package was not installed")
+        # Discard removed tasks so the first entry is the next one to process
+        while self.build_pq and self.build_pq[0][1].status == STATUS_REMOVED:
+            heapq.heappop(self.build_pq)
 
-            if len(failed_explicits) > 0:
-                pkg = failed_explicits[0][0]
-                ids = [pkg_id for _, pkg_id, _ in failed_explicits]
-                tty.debug(
-                    "Associating installation failure with first failed "
-                    f"explicit package ({ids[0]}) from {', '.join(ids)}"
-                )
+        return bool(self.build_pq) and self._next_is_pri0()
 
-            elif len(missing) > 0:
-                pkg = missing[0][0]
-                ids = [pkg_id for _, pkg_id in missing]
-                tty.debug(
-                    "Associating installation failure with first "
-                    f"missing package ({ids[0]}) from {', '.join(ids)}"
-                )
+    def _wait_for_active_task(self) -> Tuple[BuildTask, "spack.build_environment.BuildProcess"]:
+        """
+        Wait until one of the builds running in the background is done.
 
-            raise InstallError(
-                "Installation request failed.  Refer to reported errors for failing package(s).",
-                pkg=pkg,
-            )
+        Return:
+            The build task and the process of the completed build
+        """
+        pkg_ids = {
+            process.connection: pkg_id for pkg_id, (_, process) in self.active_tasks.items()
+        }
+        ready = multiprocessing.connection.wait(list(pkg_ids))
+        return self.active_tasks.pop(pkg_ids[ready[0]])
+
+    def _terminate_active_tasks(self) -> None:
+        """Terminate all builds running in the background."""
+        for pkg_id, (task, process) in self.active_tasks.items():
+            tty.debug(f"Terminating the build of {pkg_id}")
+            process.terminate()
+            if not task.request.install_args.get("keep_prefix"):
+                task.pkg.remove_prefix()
+        self.active_tasks.clear()
 
 
 class BuildProcessInstaller:
@@ -2349,7 +2766,7 @@ def run(self) -> bool:
 
             # Run post install hooks before build stage is removed.
             self.timer.start("post-install")
-            spack.hooks.post_install(self.pkg.spec, self.explicit)
+            spack.hooks.post_install(self.pkg.spec, self.explicit, timer=self.timer)
             self.timer.stop("post-install")
 
             # Stop the timer and save results
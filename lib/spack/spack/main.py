@@ -9,6 +9,7 @@
 after the system path is set up.
 """
 import argparse
+import hashlib
 import inspect
 import io
 import operator
@@ -22,7 +23,7 @@
 import sys
 import traceback
 import warnings
-from typing import List, Tuple
+from typing import Any, Dict, List, NamedTuple, Set, Tuple
 
 import archspec.cpu
 
@@ -32,6 +33,7 @@
 import llnl.util.tty.color as color
 from llnl.util.tty.log import log_output
 
+import spack.caches
 import spack.cmd
 import spack.config
 import spack.environment as ev
@@ -39,13 +41,14 @@
 import spack.paths
 import spack.platforms
 import spack.repo
-import spack.solver.asp
 import spack.spec
 import spack.store
 import spack.util.debug
 import spack.util.environment
+import spack.util.file_cache
 import spack.util.git
 import spack.util.path
+import spack.util.spack_json as sjson
 from spack.error import SpackError
 
 #: names of profile statistics
@@ -167,9 +170,30 @@ def get_version():
     return version
 
 
-def index_commands():
-    """create an index of commands by section for this help level"""
-    index = {}
+def _command_index_key() -> str:
+    """Key of the command index in the misc cache, specific to this Spack instance"""
+    prefix_hash = hashlib.sha256(spack.paths.prefix.encode("utf-8")).hexdigest()[:16]
+    return f"commands/{prefix_hash}-index.json"
+
+
+def command_descriptions() -> Dict[str, Dict[str, Any]]:
+    """Get the level, section and description of every command.
+
+    Reading them requires importing all the command modules, so they are stored in the
+    misc cache, and read from there until a command file is added, removed or modified.
+    """
+    stamps = {cmd: os.path.getmtime(path) for cmd, path in spack.cmd.command_files().items()}
+    cache, key = spack.caches.MISC_CACHE, _command_index_key()
+    try:
+        if cache.init_entry(key):
+            with cache.read_transaction(key) as f:
+                data = sjson.load(f)
+            if data.get("stamps") == stamps:
+                return data["commands"]
+    except (OSError, ValueError, spack.util.file_cache.CacheError) as e:
+        tty.debug(f"cannot read the command index: {e}")
+
+    commands = {}
     for command in spack.cmd.all_commands():
         cmd_module = spack.cmd.get_module(command)
 
@@ -179,12 +203,27 @@ def index_commands():
             if not prop:
                 tty.die("Command doesn't define a property '%s': %s" % (p, command))
 
+        commands[command] = {p: getattr(cmd_module, p) for p in required_command_properties}
+
+    try:
+        with cache.write_transaction(key) as (old, new):
+            sjson.dump({"stamps": stamps, "commands": commands}, new)
+    except (OSError, spack.util.file_cache.CacheError) as e:
+        tty.debug(f"cannot write the command index: {e}")
+
+    return commands
+
+
+def index_commands():
+    """create an index of commands by section for this help level"""
+    index = {}
+    for command, properties in command_descriptions().items():
         # add commands to lists for their level and higher levels
         for level in reversed(levels):
             level_sections = index.setdefault(level, {})
-            commands = level_sections.setdefault(cmd_module.section, [])
+            commands = level_sections.setdefault(properties["section"], [])
             commands.append(command)
-            if level == cmd_module.level:
+            if level == properties["level"]:
                 break
 
     return index
@@ -212,6 +251,11 @@ def add_arguments(self, actions):
 
 
 class SpackArgumentParser(argparse.ArgumentParser):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        #: commands added to the parser with their description, but without their arguments
+        self.command_placeholders: Set[str] = set()
+
     def format_help_sections(self, level):
         """Format help on sections for a particular verbosity level.
 
@@ -221,8 +265,9 @@ def format_help_sections(self, level):
         if level not in levels:
             raise ValueError("level must be one of: %s" % levels)
 
-        # lazily add all commands to the parser when needed.
-        add_all_commands(self)
+        # lazily add all commands to the parser when needed. Their arguments are not
+        # needed here, so avoid importing every command module.
+        self.add_command_placeholders()
 
         """Print help on subcommands in neatly formatted sections."""
         formatter = self._get_formatter()
@@ -343,37 +388,68 @@ def add_parser(name, **kwargs):
         sp.add_parser = add_parser
         return sp
 
-    def add_command(self, cmd_name):
-        """Add one subcommand to this parser."""
-        # lazily initialize any subparsers
+    def _init_subparsers(self):
+        """Lazily initialize the subparsers of this parser."""
         if not hasattr(self, "subparsers"):
             # remove the dummy "command" argument.
             if self._actions[-1].dest == "command":
                 self._remove_action(self._actions[-1])
             self.subparsers = self.add_subparsers(metavar="COMMAND", dest="command")
 
+    def _aliases(self, cmd_name):
+        """Aliases of a command, from the configuration."""
+        aliases = spack.config.get("config:aliases")
+        if not aliases:
+            return []
+        return [k for k, v in aliases.items() if shlex.split(v)[0] == cmd_name]
+
+    def add_command(self, cmd_name):
+        """Add one subcommand to this parser."""
+        self._init_subparsers()
+
         if cmd_name not in self.subparsers._name_parser_map:
             # each command module implements a parser() function, to which we
             # pass its subparser for setup.
             module = spack.cmd.get_module(cmd_name)
 
-            # build a list of aliases
-            alias_list = []
-            aliases = spack.config.get("config:aliases")
-            if aliases:
-                alias_list = [k for k, v in aliases.items() if shlex.split(v)[0] == cmd_name]
-
             subparser = self.subparsers.add_parser(
                 cmd_name,
-                aliases=alias_list,
+                aliases=self._aliases(cmd_name),
                 help=module.description,
                 description=module.description,
             )
             module.setup_parser(subparser)
 
+        elif cmd_name in self.command_placeholders:
+            module = spack.cmd.get_module(cmd_name)
+            module.setup_parser(self.subparsers._name_parser_map[cmd_name])
+            self.command_placeholders.remove(cmd_name)
+
         # return the callable function for the command
         return spack.cmd.get_command(cmd_name)
 
+    def add_command_placeholders(self):
+        """Add all the subcommands that are not in this parser yet, without importing
+        their modules.
+
+        Placeholders only have a description, which is enough to list commands in the
+        help message. They are completed if the command is later added with
+        ``add_command()``.
+        """
+        self._init_subparsers()
+
+        for cmd_name, properties in command_descriptions().items():
+            if cmd_name in self.subparsers._name_parser_map:
+                continue
+
+            self.subparsers.add_parser(
+                cmd_name,
+                aliases=self._aliases(cmd_name),
+                help=properties["description"],
+                description=properties["description"],
+            )
+            self.command_placeholders.add(cmd_name)
+
     def format_help(self, level="short"):
         if self.prog == "spack":
             # use format_help_sections for the main spack parser, but not
@@ -536,6 +612,11 @@ def make_argument_parser(**kwargs):
         action="store",
         help="lines of profile output or 'all' (default: 20)",
     )
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="report the time spent importing each module during startup",
+    )
     parser.add_argument(
         "-v", "--verbose", action="store_true", help="print additional output during builds"
     )
@@ -647,6 +728,13 @@ def _invoke_command(command, parser, args, unknown_args):
             tty.die("unrecognized arguments: %s" % " ".join(unknown_args))
         return_val = command(parser, args)
 
+    info = spack.spec.SATISFIES_CACHE.cache_info()
+    if info.hits or info.misses:
+        tty.debug(
+            f"Spec.satisfies cache: {info.hits} hits, {info.misses} misses, "
+            f"{info.currsize} entries"
+        )
+
     # Allow commands to return and error code if they want
     return 0 if return_val is None else return_val
 
@@ -748,15 +836,20 @@ def _log_command_output(self, out):
                     tty.verbose(fmt.format(ln.replace("==> ", "")))
 
 
-def _profile_wrapper(command, parser, args, unknown_args):
-    import cProfile
-
+def _profile_lines(args):
+    """Number of lines of profile output requested, or -1 for all of them"""
     try:
-        nlines = int(args.lines)
+        return int(args.lines)
     except ValueError:
         if args.lines != "all":
             tty.die("Invalid number for --lines: %s" % args.lines)
-        nlines = -1
+        return -1
+
+
+def _profile_wrapper(command, parser, args, unknown_args):
+    import cProfile
+
+    nlines = _profile_lines(args)
 
     # allow comma-separated list of fields
     sortby = ["time"]
@@ -781,6 +874,88 @@ def _profile_wrapper(command, parser, args, unknown_args):
         stats.print_stats(nlines)
 
 
+class ImportTime(NamedTuple):
+    """Time spent importing a module, as reported by ``python -X importtime``"""
+
+    #: name of the module
+    module: str
+    #: microseconds spent importing the module, excluding nested imports
+    self_us: int
+    #: microseconds spent importing the module, including nested imports
+    cumulative_us: int
+    #: module that first imported this one, if any
+    parent: str
+
+
+def parse_import_times(lines: List[str]) -> List[ImportTime]:
+    """Parse the report written on stderr by ``python -X importtime``.
+
+    Nested imports are indented, and reported before the module importing them.
+    """
+    entries = []
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except (IndexError, ValueError):
+            continue  # header line
+        name = fields[2].rstrip()
+        depth = len(name) - len(name.lstrip())
+        entries.append((name.strip(), self_us, cumulative_us, depth))
+
+    result = []
+    # The parent is the first module after this one, at a smaller depth
+    pending: List[Tuple[str, int, int, int]] = []
+    for name, self_us, cumulative_us, depth in entries:
+        while pending and pending[-1][3] > depth:
+            child = pending.pop()
+            result.append(ImportTime(child[0], child[1], child[2], name))
+        pending.append((name, self_us, cumulative_us, depth))
+    result.extend(ImportTime(x[0], x[1], x[2], "") for x in pending)
+    return result
+
+
+def _startup_profile(argv, args):
+    """Run the same command in a new interpreter reporting import times, and print the
+    time spent importing each module, in decreasing order."""
+    if sys.version_info[:2] < (3, 7):
+        tty.die("--startup-profile requires Python 3.7 or later")
+
+    nlines = _profile_lines(args)
+    argv = sys.argv[1:] if argv is None else list(argv)
+    argv = [x for x in argv if x != "--startup-profile"]
+    cmd = [sys.executable, "-X", "importtime", spack.paths.spack_script] + argv
+    proc = sp.run(cmd, stderr=sp.PIPE, universal_newlines=True)
+
+    stderr_lines = proc.stderr.splitlines()
+    for line in stderr_lines:
+        if not line.startswith("import time:"):
+            sys.stderr.write(line + "\n")
+
+    times = parse_import_times(stderr_lines)
+    nmodules = len(times)
+    total_us = sum(x.self_us for x in times)
+    spack_us = sum(x.self_us for x in times if x.module.split(".")[0] in ("spack", "llnl"))
+    times.sort(key=lambda x: x.self_us, reverse=True)
+    if nlines >= 0:
+        times = times[:nlines]
+
+    out = sys.stderr
+    out.write(
+        f"\nimported {nmodules} modules in {total_us / 1e6:.3f}s "
+        f"({spack_us / 1e6:.3f}s in spack and llnl modules)\n\n"
+    )
+    out.write(f"{'self [ms]':>10}  {'cumulative [ms]':>15}  {'module':<40}  imported by\n")
+    for x in times:
+        out.write(
+            f"{x.self_us / 1e3:10.1f}  {x.cumulative_us / 1e3:15.1f}  {x.module:<40}  "
+            f"{x.parent or '-'}\n"
+        )
+    return proc.returncode
+
+
 @llnl.util.lang.memoized
 def _compatible_sys_types():
     """Return a list of all the platform-os-target tuples compatible
@@ -944,6 +1119,10 @@ def _main(argv=None):
     parser.add_argument("command", nargs=argparse.REMAINDER)
     args, unknown = parser.parse_known_args(argv)
 
+    # Imports already happened in this process, so we need a new one to profile them
+    if args.startup_profile:
+        return _startup_profile(argv, args)
+
     # Just print help and exit if run with no arguments at all
     no_args = (len(sys.argv) == 1) if argv is None else (len(argv) == 0)
     if no_args:
@@ -31,11 +31,14 @@
 import contextlib
 import copy
 import datetime
+import hashlib
 import inspect
+import json
+import multiprocessing
 import os.path
 import re
 import string
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import llnl.util.filesystem
 import llnl.util.tty as tty
@@ -51,6 +54,7 @@
 import spack.projections as proj
 import spack.repo
 import spack.schema.environment
+import spack.schema.modules
 import spack.spec
 import spack.store
 import spack.tengine as tengine
@@ -230,7 +234,17 @@ def root_path(name, module_set_name):
     return spack.util.path.canonicalize_path(path)
 
 
-def generate_module_index(root, modules, overwrite=False):
+def generate_module_index(root, modules, overwrite=False, digests=None):
+    """Write the index of the module files in ``root``, mapping each spec hash to the path and
+    the use name of its module file.
+
+    Args:
+        root: root of the module files of a given type
+        modules: writers of the module files to add to the index
+        overwrite: if True drop the entries already in the index, otherwise update them
+        digests: optional map from spec hash to the digest of the inputs of its module file
+    """
+    digests = digests or {}
     index_path = os.path.join(root, "module-index.yaml")
     if overwrite or not os.path.exists(index_path):
         entries = syaml.syaml_dict()
@@ -241,6 +255,9 @@ def generate_module_index(root, modules, overwrite=False):
 
     for m in modules:
         entry = {"path": m.layout.filename, "use_name": m.layout.use_name}
+        digest = digests.get(m.spec.dag_hash())
+        if digest:
+            entry["digest"] = digest
         entries[m.spec.dag_hash()] = entry
     index = {"module_index": entries}
     llnl.util.filesystem.mkdirp(root)
@@ -257,7 +274,8 @@ def _generate_upstream_module_index():
 upstream_module_index = llnl.util.lang.Singleton(_generate_upstream_module_index)
 
 
-ModuleIndexEntry = collections.namedtuple("ModuleIndexEntry", ["path", "use_name"])
+ModuleIndexEntry = collections.namedtuple("ModuleIndexEntry", ["path", "use_name", "digest"])
+ModuleIndexEntry.__new__.__defaults__ = (None,)
 
 
 def read_module_index(root):
@@ -277,7 +295,9 @@ def _read_module_index(str_or_file):
     yaml_index = yaml_content["module_index"]
     for dag_hash, module_properties in yaml_index.items():
         index[dag_hash] = ModuleIndexEntry(
-            module_properties["path"], module_properties["use_name"]
+            module_properties["path"],
+            module_properties["use_name"],
+            module_properties.get("digest"),
         )
     return index
 
@@ -841,6 +861,71 @@ def verbose(self):
         return self.conf.verbose
 
 
+@memoized
+def _spack_version() -> str:
+    import spack.main
+
+    return spack.main.get_version()
+
+
+#: Digests of files keyed by (path, mtime, size)
+_file_digests: Dict[Tuple[str, int, int], str] = {}
+
+
+def _file_digest(path: str) -> Optional[str]:
+    """Digest of the content of a file, or None if the file can't be read"""
+    try:
+        st = os.stat(path)
+        key = (path, st.st_mtime_ns, st.st_size)
+        if key not in _file_digests:
+            with open(path, "rb") as f:
+                _file_digests[key] = hashlib.sha256(f.read()).hexdigest()
+        return _file_digests[key]
+    except OSError:
+        return None
+
+
+def _package_class_digest(spec: spack.spec.Spec) -> Optional[str]:
+    """Digest of the files defining the current package class of a spec and its bases, like
+    build systems, mixins and packages it derives from. The package hash of the spec refers to
+    the recipe it was installed with, while module files are generated with the current one."""
+    try:
+        pkg_cls = spack.repo.PATH.get_pkg_class(spec.fullname)
+        paths = dedupe(
+            inspect.getfile(cls) for cls in pkg_cls.__mro__ if cls.__module__ != "builtins"
+        )
+    except (spack.repo.RepoError, TypeError):
+        return None
+    sha = hashlib.sha256()
+    for path in paths:
+        sha.update(path.encode())
+        sha.update(str(_file_digest(path)).encode())
+    return sha.hexdigest()
+
+
+def _templates_digest() -> str:
+    """Digest of all the templates that module files may be rendered from"""
+    loader = tengine.make_environment().loader
+    sha = hashlib.sha256()
+    for template_dir in loader.searchpath:
+        for root, dirs, files in os.walk(template_dir):
+            dirs.sort()
+            for f in sorted(files):
+                path = os.path.join(root, f)
+                sha.update(path.encode())
+                sha.update(str(_file_digest(path)).encode())
+    return sha.hexdigest()
+
+
+def _is_configuration_rule(key: str) -> bool:
+    """Whether a key of a module type configuration is a rule for the specs matching it"""
+    return (
+        key == "all"
+        or re.match(spack.schema.modules.anonymous_spec_regex, key) is not None
+        or re.match(spack.schema.modules.spec_regex, key) is not None
+    )
+
+
 class BaseModuleFileWriter:
     default_template: str
     hide_cmd_format: str
@@ -910,37 +995,67 @@ def _get_template(self):
         # ... and return the first match
         return choices.pop(0)
 
-    def write(self, overwrite=False):
-        """Writes the module file.
+    def inputs_digest(self, memo: Optional[Dict[str, Optional[str]]] = None) -> str:
+        """Returns a digest of what the module file is generated from: the spec, its merged
+        configuration rules, the template and the settings of the module set. A module file
+        whose inputs did not change doesn't need to be regenerated.
 
         Args:
-            overwrite (bool): if True it is fine to overwrite an already
-                existing file. If False the operation is skipped an we print
-                a warning to the user.
+            memo: digests of the templates and of package classes, shared by the writers of
+                a refresh so that they are computed only once
         """
-        # Return immediately if the module is excluded
-        if self.conf.excluded:
-            msg = "\tNOT WRITING: {0} [EXCLUDED]"
-            tty.debug(msg.format(self.spec.cshort_spec))
-            return
-
-        # Print a warning in case I am accidentally overwriting
-        # a module file that is already there (name clash)
-        if not overwrite and os.path.exists(self.layout.filename):
-            message = "Module file {0.filename} exists and will not be overwritten"
-            tty.warn(message.format(self.layout))
-            return
-
-        # If we are here it means it's ok to write the module file
-        msg = "\tWRITE: {0} [{1}]"
-        tty.debug(msg.format(self.spec.cshort_spec, self.layout.filename))
+        memo = {} if memo is None else memo
+        if "templates" not in memo:
+            memo["templates"] = _templates_digest()
+        packages = []
+        for s in self.spec.traverse(deptype=("link", "run")):
+            key = f"package:{s.fullname}"
+            if key not in memo:
+                memo[key] = _package_class_digest(s)
+            packages.append(memo[key])
 
-        # If the directory where the module should reside does not exist
-        # create it
-        module_dir = os.path.dirname(self.layout.filename)
-        if not os.path.exists(module_dir):
-            llnl.util.filesystem.mkdirp(module_dir)
+        name = self.conf.name
+        rules = dict(self.conf.conf)
+        for key in ("autoload", "prerequisites"):
+            rules[key] = [s.dag_hash() for s in rules.get(key, [])]
 
+        use_view = spack.config.get(f"modules:{name}:use_view", False)
+        view = None
+        if use_view:
+            env = spack.environment.active_environment()
+            view_name = spack.environment.default_view_name if use_view is True else use_view
+            if env and env.has_view(view_name):
+                view = env.views[view_name].to_dict()
+
+        inputs = {
+            "spack": _spack_version(),
+            "module_type": self.module.__name__,
+            "spec": self.spec.dag_hash(),
+            "packages": packages,
+            "explicit": self.conf.explicit,
+            "rules": rules,
+            "settings": {
+                key: value
+                for key, value in self.module.configuration(name).items()
+                if not _is_configuration_rule(key)
+            },
+            "module_set": {
+                key: value
+                for key, value in configuration(name).items()
+                if key not in ("tcl", "lmod")
+            },
+            "prefix_inspections": spack.config.get("modules:prefix_inspections", {}),
+            "view": view,
+            "filename": self.layout.filename,
+            "autoload": self.context.autoload,
+            "template": self._get_template(),
+            "templates": memo["templates"],
+        }
+        text = json.dumps(inputs, sort_keys=True, default=str)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def render(self) -> str:
+        """Renders the text of the module file."""
         # Get the template for the module
         template_name = self._get_template()
         import jinja2
@@ -974,7 +1089,44 @@ def write(self, overwrite=False):
         context.update(conf_update)
 
         # Render the template
-        text = template.render(context)
+        return template.render(context)
+
+    def write(self, overwrite=False, text=None):
+        """Writes the module file.
+
+        Args:
+            overwrite (bool): if True it is fine to overwrite an already
+                existing file. If False the operation is skipped an we print
+                a warning to the user.
+            text (str): the module file already rendered with ``render``, if
+                available. If None the module file is rendered here.
+        """
+        # Return immediately if the module is excluded
+        if self.conf.excluded:
+            msg = "\tNOT WRITING: {0} [EXCLUDED]"
+            tty.debug(msg.format(self.spec.cshort_spec))
+            return
+
+        # Print a warning in case I am accidentally overwriting
+        # a module file that is already there (name clash)
+        if not overwrite and os.path.exists(self.layout.filename):
+            message = "Module file {0.filename} exists and will not be overwritten"
+            tty.warn(message.format(self.layout))
+            return
+
+        # If we are here it means it's ok to write the module file
+        msg = "\tWRITE: {0} [{1}]"
+        tty.debug(msg.format(self.spec.cshort_spec, self.layout.filename))
+
+        # If the directory where the module should reside does not exist
+        # create it
+        module_dir = os.path.dirname(self.layout.filename)
+        if not os.path.exists(module_dir):
+            llnl.util.filesystem.mkdirp(module_dir)
+
+        if text is None:
+            text = self.render()
+
         # Write it to file
         with open(self.layout.filename, "w") as f:
             f.write(text)
@@ -1081,6 +1233,58 @@ def remove_module_defaults(self):
             pass
 
 
+#: Writers of the module files being rendered by render_module_files. Worker processes
+#: inherit them when they are forked.
+_writers_to_render: List["BaseModuleFileWriter"] = []
+
+
+def _render(writer: "BaseModuleFileWriter") -> Tuple[Optional[str], Optional[str]]:
+    try:
+        return writer.render(), None
+    except spack.error.SpackError as e:
+        return None, e.message
+    except Exception as e:
+        return None, str(e)
+
+
+def _render_task(i: int) -> Tuple[Optional[str], Optional[str]]:
+    return _render(_writers_to_render[i])
+
+
+def render_module_files(
+    writers: List["BaseModuleFileWriter"], *, processes: int = 1
+) -> Iterator[Tuple["BaseModuleFileWriter", Optional[str], Optional[str]]]:
+    """Render the module files of many writers, in a pool of worker processes where processes
+    can be forked. Module files are only rendered, so that they can be written in order by the
+    caller: writing a module file also updates files shared with other modules.
+
+    Args:
+        writers: writers of the module files to render
+        processes: maximum number of worker processes
+
+    Returns:
+        A (writer, text, error message) triplet for each writer, in order, where either the text
+        or the error message is None.
+    """
+    global _writers_to_render
+
+    processes = min(processes, len(writers))
+    if processes < 2 or multiprocessing.get_start_method() != "fork":
+        for writer in writers:
+            yield (writer, *_render(writer))
+        return
+
+    _writers_to_render = writers
+    try:
+        chunksize = max(1, len(writers) // (4 * processes))
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.imap(_render_task, range(len(writers)), chunksize=chunksize)
+            for writer, (text, error) in zip(writers, results):
+                yield writer, text, error
+    finally:
+        _writers_to_render = []
+
+
 @contextlib.contextmanager
 def disable_modules():
     """Disable the generation of modulefiles within the context manager."""
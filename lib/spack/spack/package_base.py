@@ -21,7 +21,6 @@
 import re
 import shutil
 import sys
-import textwrap
 import time
 import traceback
 import typing
@@ -45,6 +44,7 @@
 import spack.mirror
 import spack.mixins
 import spack.multimethod
+import spack.package_metadata
 import spack.patch
 import spack.paths
 import spack.repo
@@ -2338,17 +2338,7 @@ def do_clean(self):
     @classmethod
     def format_doc(cls, **kwargs):
         """Wrap doc string at 72 characters and format nicely"""
-        indent = kwargs.get("indent", 0)
-
-        if not cls.__doc__:
-            return ""
-
-        doc = re.sub(r"\s+", " ", cls.__doc__)
-        lines = textwrap.wrap(doc, 72)
-        results = io.StringIO()
-        for line in lines:
-            results.write((" " * indent) + line + "\n")
-        return results.getvalue()
+        return spack.package_metadata.format_doc(cls.__doc__, indent=kwargs.get("indent", 0))
 
     @property
     def all_urls(self) -> List[str]:
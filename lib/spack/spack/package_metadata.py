@@ -0,0 +1,277 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Declarative package metadata that can be read without importing ``package.py`` files.
+
+Commands like ``spack list`` or ``spack maintainers`` only need what directives stored on a
+package class: versions, variants, dependencies, provided virtuals, tags, etc. The
+``PackageMetadataIndex`` stores a serialized copy of that data for each package in a
+repository, so it can be retrieved from the repository index cache instead of executing
+Python code.
+"""
+import collections.abc
+import io
+import re
+import textwrap
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import spack.deptypes as dt
+import spack.error
+import spack.spec
+import spack.util.spack_json as sjson
+import spack.variant
+import spack.version
+
+#: Version of the format of the serialized index. Bump it whenever the data stored for
+#: each package changes, to force a regeneration of the cache.
+_INDEX_FORMAT = 1
+
+
+def _json_value(value: Any) -> Any:
+    """Return the value unchanged, if it can be stored as a JSON scalar, or its string
+    representation otherwise."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+class VariantMetadata(NamedTuple):
+    """The parts of a ``spack.variant.Variant`` that are needed to display it."""
+
+    name: str
+    default: Any
+    description: str
+    values: Tuple[Any, ...]
+    multi: bool
+
+
+def _variant_to_dict(variant: spack.variant.Variant) -> Dict[str, Any]:
+    if isinstance(variant.values, (tuple, list, spack.variant.DisjointSetsOfValues)):
+        values = [_json_value(x) for x in variant.values]
+    else:
+        values = [_json_value(variant.values)]
+
+    return {
+        "default": _json_value(variant.default),
+        "description": variant.description,
+        "values": values,
+        "multi": bool(variant.multi),
+    }
+
+
+def format_doc(doc: Optional[str], indent: int = 0) -> str:
+    """Wrap the doc string of a package at 72 characters and indent each line"""
+    if not doc:
+        return ""
+
+    lines = textwrap.wrap(re.sub(r"\s+", " ", doc), 72)
+    results = io.StringIO()
+    for line in lines:
+        results.write((" " * indent) + line + "\n")
+    return results.getvalue()
+
+
+class PackageMetadata:
+    """Read-only view of the declarative attributes of a package class.
+
+    Attribute names and shapes mirror the ones of ``spack.package_base.PackageBase``, so
+    that code only reading directive data can accept either this object or a package class.
+    """
+
+    def __init__(self, name: str, namespace: str, data: Dict[str, Any]):
+        self.name = name
+        self.namespace = namespace
+        self._data = data
+        self.__doc__ = data["doc"]
+
+        # Parsed attributes, computed on first access
+        self._versions: Optional[Dict[spack.version.StandardVersion, Dict[str, bool]]] = None
+        self._variants: Optional[Dict[str, Tuple[VariantMetadata, List["spack.spec.Spec"]]]] = None
+        self._provided: Optional[Dict["spack.spec.Spec", Set["spack.spec.Spec"]]] = None
+
+    @staticmethod
+    def from_package_class(pkg_cls) -> "PackageMetadata":
+        """Extract the metadata from a package class."""
+        # Attributes set from packages.yaml are not part of the package definition
+        overridden = getattr(pkg_cls, "overridden_attrs", {})
+
+        def original(attr, default=None):
+            if attr in overridden:
+                return overridden[attr]
+            if attr in getattr(pkg_cls, "attrs_exclusively_from_config", ()):
+                return default
+            return getattr(pkg_cls, attr, default)
+
+        dependency_types: Dict[str, int] = collections.defaultdict(int)
+        for name, dependencies in pkg_cls.dependencies_by_name().items():
+            for dependency in dependencies:
+                dependency_types[name] |= dependency.depflag
+
+        variants = {
+            name: dict(_variant_to_dict(variant), when=[str(w) for w in whens])
+            for name, (variant, whens) in pkg_cls.variants.items()
+        }
+
+        data = {
+            "doc": pkg_cls.__doc__,
+            "homepage": original("homepage"),
+            "maintainers": list(original("maintainers", [])),
+            "tags": list(original("tags", [])),
+            "build_system_class": original("build_system_class", ""),
+            "has_code": bool(pkg_cls.has_code),
+            "virtual": bool(pkg_cls.virtual),
+            "versions": {
+                str(v): {
+                    "deprecated": bool(args.get("deprecated", False)),
+                    "preferred": bool(args.get("preferred", False)),
+                }
+                for v, args in pkg_cls.versions.items()
+            },
+            "variants": variants,
+            "dependency_types": dict(dependency_types),
+            "provided": {
+                str(when): sorted(str(s) for s in specs)
+                for when, specs in pkg_cls.provided.items()
+            },
+            "licenses": {str(when): lic for when, lic in pkg_cls.licenses.items()},
+        }
+        return PackageMetadata(pkg_cls.name, pkg_cls.namespace, data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._data
+
+    @property
+    def fullname(self) -> str:
+        return f"{self.namespace}.{self.name}"
+
+    @property
+    def homepage(self) -> Optional[str]:
+        return self._data["homepage"]
+
+    @property
+    def maintainers(self) -> List[str]:
+        return self._data["maintainers"]
+
+    @property
+    def tags(self) -> List[str]:
+        return self._data["tags"]
+
+    @property
+    def build_system_class(self) -> str:
+        return self._data["build_system_class"]
+
+    @property
+    def has_code(self) -> bool:
+        return self._data["has_code"]
+
+    @property
+    def virtual(self) -> bool:
+        return self._data["virtual"]
+
+    @property
+    def versions(self) -> Dict[spack.version.StandardVersion, Dict[str, bool]]:
+        """Versions of the package, mapped to their ``deprecated`` and ``preferred``
+        attributes."""
+        if self._versions is None:
+            self._versions = {
+                spack.version.Version(v): args for v, args in self._data["versions"].items()
+            }
+        return self._versions
+
+    @property
+    def variants(self) -> Dict[str, Tuple[VariantMetadata, List["spack.spec.Spec"]]]:
+        if self._variants is not None:
+            return self._variants
+
+        result = {}
+        for name, entry in self._data["variants"].items():
+            variant = VariantMetadata(
+                name=name,
+                default=entry["default"],
+                description=entry["description"],
+                values=tuple(entry["values"]),
+                multi=entry["multi"],
+            )
+            result[name] = (variant, [spack.spec.Spec(w) for w in entry["when"]])
+        self._variants = result
+        return result
+
+    @property
+    def provided(self) -> Dict["spack.spec.Spec", Set["spack.spec.Spec"]]:
+        if self._provided is None:
+            self._provided = {
+                spack.spec.Spec(when): {spack.spec.Spec(s) for s in specs}
+                for when, specs in self._data["provided"].items()
+            }
+        return self._provided
+
+    @property
+    def licenses(self) -> Dict[str, str]:
+        return self._data["licenses"]
+
+    def dependencies_of_type(self, deptypes: dt.DepFlag) -> Set[str]:
+        """Get names of dependencies that can possibly have these deptypes."""
+        return {
+            name for name, depflag in self._data["dependency_types"].items() if deptypes & depflag
+        }
+
+    def format_doc(self, **kwargs) -> str:
+        """Wrap doc string at 72 characters and format nicely"""
+        return format_doc(self.__doc__, indent=kwargs.get("indent", 0))
+
+
+class PackageMetadataIndex(collections.abc.Mapping):
+    """Maps package names to their ``PackageMetadata``."""
+
+    def __init__(self, repository):
+        self.repository = repository
+        self._packages: Dict[str, Dict[str, Any]] = {}
+        #: Whether the data was read from an index in an unsupported format
+        self.outdated = False
+
+    def to_json(self, stream):
+        sjson.dump({"format": _INDEX_FORMAT, "packages": self._packages}, stream)
+
+    @staticmethod
+    def from_json(stream, repository):
+        d = sjson.load(stream)
+
+        if not isinstance(d, dict):
+            raise PackageMetadataIndexError("PackageMetadataIndex data was not a dict.")
+
+        if "packages" not in d:
+            raise PackageMetadataIndexError("PackageMetadataIndex data has no 'packages'")
+
+        r = PackageMetadataIndex(repository=repository)
+        if d.get("format") != _INDEX_FORMAT:
+            r.outdated = True
+            return r
+
+        r._packages = d["packages"]
+        return r
+
+    def __getitem__(self, pkg_name: str) -> PackageMetadata:
+        return PackageMetadata(pkg_name, self.repository.namespace, self._packages[pkg_name])
+
+    def __iter__(self):
+        return iter(self._packages)
+
+    def __len__(self):
+        return len(self._packages)
+
+    def update_package(self, pkg_name: str):
+        """Updates a package in the index, or removes it if it doesn't exist anymore.
+
+        Args:
+            pkg_name: name of the package to be updated
+        """
+        self._packages.pop(pkg_name, None)
+        if not self.repository.exists(pkg_name):
+            return
+        pkg_cls = self.repository.get_pkg_class(pkg_name)
+        self._packages[pkg_name] = PackageMetadata.from_package_class(pkg_cls).to_dict()
+
+
+class PackageMetadataIndexError(spack.error.SpackError):
+    """Raised when there is a problem with a PackageMetadataIndex."""
@@ -109,6 +109,9 @@ def _get_user_cache_path():
 #: transient caches for Spack data (virtual cache, patch sha256 lookup, etc.)
 default_misc_cache_path = os.path.join(user_cache_path, "cache")
 
+#: parsed and validated configuration files, keyed by their path
+config_cache_path = os.path.join(user_cache_path, "config-cache")
+
 
 # Below paths pull configuration from the host environment.
 #
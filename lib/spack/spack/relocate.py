@@ -23,10 +23,11 @@
 import spack.repo
 import spack.spec
 import spack.store
+import spack.util.cpus
 import spack.util.elf as elf
 import spack.util.executable as executable
 
-from .relocate_text import BinaryFilePrefixReplacer, TextFilePrefixReplacer
+from .relocate_text import BinaryFilePrefixReplacer, TextFilePrefixReplacer, apply_to_files
 
 is_macos = str(spack.platforms.real_host()) == "darwin"
 
@@ -636,7 +637,7 @@ def relocate_text(files, prefixes):
         files (list): Text files to be relocated
         prefixes (OrderedDict): String prefixes which need to be changed
     """
-    TextFilePrefixReplacer.from_strings_or_bytes(prefixes).apply(files)
+    relocate_text_and_binaries(files, prefixes, [], {})
 
 
 def relocate_text_bin(binaries, prefixes):
@@ -651,7 +652,43 @@ def relocate_text_bin(binaries, prefixes):
     Raises:
       spack.relocate_text.BinaryTextReplaceError: when the new path is longer than the old path
     """
-    return BinaryFilePrefixReplacer.from_strings_or_bytes(prefixes).apply(binaries)
+    return relocate_text_and_binaries([], {}, binaries, prefixes)
+
+
+def relocate_text_and_binaries(text_files, text_prefixes, binaries, binary_prefixes):
+    """Relocate text files, and the path strings hard-coded into binaries, in a single
+    pass over a pool of worker processes.
+
+    Args:
+        text_files (list): text files to be relocated
+        text_prefixes (OrderedDict): string prefixes which need to be changed in text files
+        binaries (list): binaries to be relocated
+        binary_prefixes (OrderedDict): string prefixes which need to be changed in binaries
+
+    Returns:
+        The binaries that were modified
+
+    Raises:
+      spack.relocate_text.BinaryTextReplaceError: when the new path is longer than the old path
+    """
+    result = apply_to_files(
+        [
+            (TextFilePrefixReplacer.from_strings_or_bytes(text_prefixes), text_files),
+            (BinaryFilePrefixReplacer.from_strings_or_bytes(binary_prefixes), binaries),
+        ],
+        processes=spack.util.cpus.determine_number_of_jobs(parallel=True),
+    )
+
+    if result.bytes_scanned:
+        rate = result.bytes_scanned / result.elapsed if result.elapsed else 0.0
+        tty.debug(
+            f"Relocated {len(result.changed_files)} of {len(text_files) + len(binaries)} "
+            f"files: scanned {result.bytes_scanned / 1e6:.1f} MB in "
+            f"{llnl.util.lang.pretty_seconds(result.elapsed)} ({rate / 1e6:.1f} MB/s)"
+        )
+
+    binaries = set(binaries)
+    return [f for f in result.changed_files if f in binaries]
 
 
 def is_binary(filename):
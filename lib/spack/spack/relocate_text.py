@@ -6,14 +6,26 @@
 """This module contains pure-Python classes and functions for replacing
 paths inside text files and binaries."""
 
+import concurrent.futures
+import mmap
+import os
 import re
+import sys
+import time
 from collections import OrderedDict
-from typing import Dict, Union
+from typing import Dict, List, NamedTuple, Sequence, Tuple, Union
 
 import spack.error
 
 Prefix = Union[str, bytes]
 
+#: Binaries at least this large are memory-mapped and patched in place, instead of being
+#: read in memory
+MMAP_MIN_SIZE = 1 << 20
+
+#: Below this total size, files are relocated in the current process
+PARALLEL_MIN_SIZE = 1 << 24
+
 
 def encode_path(p: Prefix) -> bytes:
     return p if isinstance(p, bytes) else p.encode("utf-8")
@@ -204,14 +216,27 @@ def _apply_to_file(self, f):
             bool: True if file was modified
         """
         assert f.tell() == 0
+        return self._apply_to_buffer(f.read(), f)
 
-        # We *could* read binary data in chunks to avoid loading all in memory,
-        # but it's nasty to deal with matches across boundaries, so let's stick to
-        # something simple.
-
-        modified = True
-
-        for match in self.regex.finditer(f.read()):
+    def apply_to_filename(self, filename):
+        """Large binaries are memory-mapped and modified in place, so that only the pages
+        containing a prefix are written back."""
+        if self.is_noop:
+            return False
+        with open(filename, "rb+") as f:
+            if os.fstat(f.fileno()).st_size < MMAP_MIN_SIZE:
+                return self.apply_to_file(f)
+            with mmap.mmap(f.fileno(), 0) as data:
+                return self._apply_to_buffer(data, data)
+
+    def _apply_to_buffer(self, data, out):
+        """Replace the prefixes found in ``data`` by writing to ``out``, which is either
+        the file the data was read from, or the memory map ``data`` itself. Replacements
+        never extend past the end of the match, so matches are not affected by previous
+        writes."""
+        modified = False
+
+        for match in self.regex.finditer(data):
             # The matching prefix (old) and its replacement (new)
             old = match.group(1)
             new = self.prefix_to_prefix[old]
@@ -251,13 +276,93 @@ def _apply_to_file(self, f):
             else:
                 raise CannotShrinkCString(old, new, match.group()[:-1])
 
-            f.seek(match.start())
-            f.write(replacement)
+            out.seek(match.start())
+            out.write(replacement)
             modified = True
 
         return modified
 
 
+class ReplacementResult(NamedTuple):
+    """Outcome of :func:`apply_to_files`"""
+
+    #: Files that were modified
+    changed_files: List[str]
+    #: Total size of the files that were scanned for prefixes
+    bytes_scanned: int
+    #: Wall clock time spent scanning the files, in seconds
+    elapsed: float
+
+
+def _apply_to_filenames(replacer: PrefixReplacer, filenames: List[str]) -> Tuple[List[str], int]:
+    changed_files, bytes_scanned = [], 0
+    for filename in filenames:
+        bytes_scanned += os.path.getsize(filename)
+        if replacer.apply_to_filename(filename):
+            changed_files.append(filename)
+    return changed_files, bytes_scanned
+
+
+def apply_to_files(
+    work: Sequence[Tuple[PrefixReplacer, List[str]]], processes: int = 1
+) -> ReplacementResult:
+    """Apply prefix replacers to lists of files, in a single pass over a pool of worker
+    processes.
+
+    Files are grouped in chunks of similar total size, so that large binaries are spread
+    over different workers, while small files don't each cost a round trip. When there is
+    not enough data to make up for starting workers, or on platforms that don't fork, the
+    files are processed in the current process.
+
+    Arguments:
+        work: pairs of a replacer and the files it should be applied to
+        processes: maximum number of worker processes
+
+    Returns:
+        The modified files, and how much data was scanned
+    """
+    start = time.time()
+    sizes = {
+        filename: os.path.getsize(filename)
+        for replacer, filenames in work
+        if not replacer.is_noop
+        for filename in filenames
+    }
+    total_size = sum(sizes.values())
+
+    if processes < 2 or total_size < PARALLEL_MIN_SIZE or sys.platform in ("darwin", "win32"):
+        changed_files: List[str] = []
+        for replacer, filenames in work:
+            changed_files.extend(replacer.apply(filenames))
+        return ReplacementResult(changed_files, total_size, time.time() - start)
+
+    # Largest files first, so that the last chunks to be processed are the small ones
+    chunk_size = total_size // (4 * processes)
+    chunks: List[Tuple[PrefixReplacer, List[str]]] = []
+    for replacer, filenames in work:
+        if replacer.is_noop:
+            continue
+        current: List[str] = []
+        current_size = 0
+        for filename in sorted(filenames, key=lambda f: sizes[f], reverse=True):
+            current.append(filename)
+            current_size += sizes[filename]
+            if current_size >= chunk_size:
+                chunks.append((replacer, current))
+                current, current_size = [], 0
+        if current:
+            chunks.append((replacer, current))
+
+    changed_files, bytes_scanned = [], 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(processes, len(chunks))) as e:
+        futures = [e.submit(_apply_to_filenames, replacer, chunk) for replacer, chunk in chunks]
+        for future in futures:
+            changed, nbytes = future.result()
+            changed_files.extend(changed)
+            bytes_scanned += nbytes
+    return ReplacementResult(changed_files, bytes_scanned, time.time() - start)
+
+
 class BinaryStringReplacementError(spack.error.SpackError):
     def __init__(self, file_path, old_len, new_len):
         """The size of the file changed after binary path substitution
@@ -285,9 +390,14 @@ def __init__(self, msg):
 
 class CannotGrowString(BinaryTextReplaceError):
     def __init__(self, old, new):
+        self.old, self.new = old, new
         msg = "Cannot replace {!r} with {!r} because the new prefix is longer.".format(old, new)
         super().__init__(msg)
 
+    def __reduce__(self):
+        # Can be raised in worker processes
+        return type(self), (self.old, self.new)
+
 
 class CannotShrinkCString(BinaryTextReplaceError):
     def __init__(self, old, new, full_old_string):
@@ -295,7 +405,12 @@ def __init__(self, old, new, full_old_string):
         # unicode, which would be really bad user experience: error in error.
         # We have no clue if we actually deal with a real C-string nor what
         # encoding it has.
+        self.old, self.new, self.full_old_string = old, new, full_old_string
         msg = "Cannot replace {!r} with {!r} in the C-string {!r}.".format(
             old, new, full_old_string
         )
         super().__init__(msg)
+
+    def __reduce__(self):
+        # Can be raised in worker processes
+        return type(self), (self.old, self.new, self.full_old_string)
@@ -36,6 +36,7 @@
 import spack.caches
 import spack.config
 import spack.error
+import spack.package_metadata
 import spack.patch
 import spack.provider_index
 import spack.spec
@@ -467,6 +468,14 @@ def needs_update(self, pkg):
         """
         return False
 
+    def is_outdated(self):
+        """Whether the index that was read must be regenerated for every package.
+
+        This is the case e.g. when the index was written in a format that is not
+        supported anymore.
+        """
+        return False
+
     @abc.abstractmethod
     def read(self, stream):
         """Read this index from a provided file object."""
@@ -542,6 +551,25 @@ def update(self, pkg_fullname):
         self.index.update_package(pkg_fullname)
 
 
+class MetadataIndexer(Indexer):
+    """Lifecycle methods for the declarative metadata of packages."""
+
+    def _create(self):
+        return spack.package_metadata.PackageMetadataIndex(self.repository)
+
+    def is_outdated(self):
+        return self.index.outdated
+
+    def read(self, stream):
+        self.index = spack.package_metadata.PackageMetadataIndex.from_json(stream, self.repository)
+
+    def update(self, pkg_fullname):
+        self.index.update_package(pkg_fullname.split(".")[-1])
+
+    def write(self, stream):
+        self.index.to_json(stream)
+
+
 class RepoIndex:
     """Container class that manages a set of Indexers for a Repo.
 
@@ -587,10 +615,27 @@ def __getitem__(self, name):
             raise KeyError("no such index: %s" % name)
 
         if name not in self.indexes:
-            self._build_all_indexes()
+            # Regenerating an index is expensive, since it requires loading packages, so
+            # all indexes are regenerated together. Up-to-date indexes are read on demand.
+            if self._needs_update(name):
+                self._build_all_indexes()
+            else:
+                self.indexes[name] = self._build_index(name, indexer)
 
         return self.indexes[name]
 
+    def _cache_filename(self, name: str) -> str:
+        # Filename of the index cache (we assume they're all json)
+        return f"{name}/{self.namespace}-index.json"
+
+    def _needs_update(self, name: str) -> bool:
+        """Whether the cached index with the given name is missing or older than some
+        package file."""
+        cache_filename = self._cache_filename(name)
+        if not self.cache.init_entry(cache_filename):
+            return True
+        return bool(self.checker.modified_since(self.cache.mtime(cache_filename)))
+
     def _build_all_indexes(self):
         """Build all the indexes at once.
 
@@ -605,8 +650,7 @@ def _build_all_indexes(self):
     def _build_index(self, name: str, indexer: Indexer):
         """Determine which packages need an update, and update indexes."""
 
-        # Filename of the provider index cache (we assume they're all json)
-        cache_filename = f"{name}/{self.namespace}-index.json"
+        cache_filename = self._cache_filename(name)
 
         # Compute which packages needs to be updated in the cache
         index_mtime = self.cache.mtime(cache_filename)
@@ -618,16 +662,20 @@ def _build_index(self, name: str, indexer: Indexer):
             with self.cache.read_transaction(cache_filename) as f:
                 indexer.read(f)
 
-        else:
-            # Otherwise update it and rewrite the cache file
+        if not index_existed or needs_update or indexer.is_outdated():
+            # Otherwise (re)generate it and rewrite the cache file
             with self.cache.write_transaction(cache_filename) as (old, new):
                 indexer.read(old) if old else indexer.create()
 
-                # Compute which packages needs to be updated **again** in case someone updated them
-                # while we waited for the lock
-                new_index_mtime = self.cache.mtime(cache_filename)
-                if new_index_mtime != index_mtime:
-                    needs_update = self.checker.modified_since(new_index_mtime)
+                if indexer.is_outdated():
+                    indexer.create()
+                    needs_update = list(self.checker)
+                else:
+                    # Compute which packages needs to be updated **again** in case someone
+                    # updated them while we waited for the lock
+                    new_index_mtime = self.cache.mtime(cache_filename)
+                    if new_index_mtime != index_mtime:
+                        needs_update = self.checker.modified_since(new_index_mtime)
 
                 for pkg_name in needs_update:
                     indexer.update(f"{self.namespace}.{pkg_name}")
@@ -852,6 +900,14 @@ def get_pkg_class(self, pkg_name):
         """Find a class for the spec's package and return the class object."""
         return self.repo_for_pkg(pkg_name).get_pkg_class(pkg_name)
 
+    def package_metadata(self, pkg_name):
+        """Get the declarative metadata of a package, without importing its module."""
+        return self.repo_for_pkg(pkg_name).package_metadata(pkg_name)
+
+    def all_package_metadata(self):
+        for name in self.all_package_names():
+            yield self.package_metadata(name)
+
     @autospec
     def dump_provenance(self, spec, path):
         """Dump provenance information for a spec to a particular path.
@@ -1098,6 +1154,7 @@ def index(self):
             self._repo_index.add_indexer("providers", ProviderIndexer(self))
             self._repo_index.add_indexer("tags", TagIndexer(self))
             self._repo_index.add_indexer("patches", PatchIndexer(self))
+            self._repo_index.add_indexer("metadata", MetadataIndexer(self))
         return self._repo_index
 
     @property
@@ -1115,6 +1172,28 @@ def patch_index(self):
         """Index of patches and packages they're defined on."""
         return self.index["patches"]
 
+    @property
+    def metadata_index(self):
+        """Index of the declarative metadata of the packages in this repo."""
+        return self.index["metadata"]
+
+    def package_metadata(self, pkg_name: str) -> spack.package_metadata.PackageMetadata:
+        """Get the declarative metadata of a package, without importing its module.
+
+        Packages with attributes set in ``packages.yaml`` are loaded, since the
+        configuration can change what is read from their class.
+        """
+        namespace, pkg_name = self.partition_package_name(pkg_name)
+        if not self.exists(pkg_name):
+            raise UnknownPackageError(pkg_name, self)
+
+        metadata_index = self.metadata_index
+        package_config = spack.config.get("packages").get(pkg_name, {})
+        if pkg_name not in metadata_index or "package_attributes" in package_config:
+            pkg_cls = self.get_pkg_class(pkg_name)
+            return spack.package_metadata.PackageMetadata.from_package_class(pkg_cls)
+        return metadata_index[pkg_name]
+
     @autospec
     def providers_for(self, vpkg_spec):
         providers = self.provider_index.providers_for(vpkg_spec)
@@ -25,6 +25,7 @@
         "properties": {"hash_algorithm": {"type": "string"}, "hash": {"type": "string"}},
     },
     "buildcache_layout_version": {"type": "number"},
+    "binary_cache_compression": {"type": "string", "enum": ["gzip", "zstd"]},
 }
 
 schema = {
@@ -28,12 +28,14 @@
             "unify": {
                 "oneOf": [{"type": "boolean"}, {"type": "string", "enum": ["when_possible"]}]
             },
+            "split_independent_roots": {"type": "boolean"},
             "duplicates": {
                 "type": "object",
                 "properties": {
                     "strategy": {"type": "string", "enum": ["none", "minimal", "full"]}
                 },
             },
+            "package_facts_cache": {"type": "boolean"},
         },
     }
 }
@@ -81,9 +81,12 @@
             "dirty": {"type": "boolean"},
             "build_language": {"type": "string"},
             "build_jobs": {"type": "integer", "minimum": 1},
+            "concurrent_packages": {"type": "integer", "minimum": 1},
+            "binary_install_jobs": {"type": "integer", "minimum": 1},
             "ccache": {"type": "boolean"},
             "concretizer": {"type": "string", "enum": ["original", "clingo"]},
             "db_lock_timeout": {"type": "integer", "minimum": 1},
+            "db_binary_index": {"type": "boolean"},
             "package_lock_timeout": {
                 "anyOf": [{"type": "integer", "minimum": 1}, {"type": "null"}]
             },
@@ -24,6 +24,7 @@
 
 import spack
 import spack.binary_distribution
+import spack.caches
 import spack.cmd
 import spack.compilers
 import spack.config
@@ -32,6 +33,7 @@
 import spack.directives
 import spack.environment as ev
 import spack.error
+import spack.mirror
 import spack.package_base
 import spack.package_prefs
 import spack.parser
@@ -39,8 +41,11 @@
 import spack.repo
 import spack.spec
 import spack.store
+import spack.target
 import spack.util.crypto
+import spack.util.file_cache
 import spack.util.path
+import spack.util.spack_json
 import spack.util.timer
 import spack.variant
 import spack.version as vn
@@ -697,6 +702,268 @@ class RequirementRule(NamedTuple):
     message: Optional[str]
 
 
+def _logic_program_files(setup: "SpackSolverSetup") -> List[str]:
+    """Return the logic programs that are loaded on top of the problem facts"""
+    files = ["concretize.lp", "heuristic.lp"]
+    if spack.config.CONFIG.get("concretizer:duplicates:strategy", "none") != "none":
+        files.append("heuristic_separate.lp")
+    files.extend(["os_compatibility.lp", "display.lp"])
+    if not setup.concretize_everything:
+        files.append("when_possible.lp")
+    return files
+
+
+@llnl.util.lang.memoized
+def _logic_program(name: str) -> str:
+    """Return the text of one of the logic programs shipped with Spack, reading
+    it from disk only once per process."""
+    with open(os.path.join(os.path.dirname(__file__), name)) as f:
+        return f.read()
+
+
+class _LocalId(int):
+    """Condition id allocated while recording the facts of a single package. These
+    ids are relative to the package, and are shifted when the facts are emitted."""
+
+
+class _FactsRecorder:
+    """Stand-in for ProblemInstanceBuilder that keeps facts as AspFunction objects"""
+
+    def __init__(self):
+        self.facts: List[AspFunction] = []
+
+    def fact(self, atom: AspFunction) -> None:
+        self.facts.append(atom)
+
+    def append(self, rule: str) -> None:
+        raise ValueError("rules cannot be recorded as package facts")
+
+    def title(self, header: str, char: str) -> None:
+        pass
+
+    def h1(self, header: str) -> None:
+        pass
+
+    def h2(self, header: str) -> None:
+        pass
+
+    def newline(self):
+        pass
+
+
+def _encode_fact_arg(arg):
+    if isinstance(arg, _LocalId):
+        return {"id": int(arg)}
+    elif isinstance(arg, AspFunction):
+        return {"fn": arg.name, "args": [_encode_fact_arg(x) for x in arg.args]}
+    elif isinstance(arg, (bool, int)):
+        return arg
+    return str(arg)
+
+
+def _decode_fact_arg(arg, first_id: int):
+    if isinstance(arg, dict):
+        if "id" in arg:
+            return first_id + arg["id"]
+        return AspFunction(arg["fn"], tuple(_decode_fact_arg(x, first_id) for x in arg["args"]))
+    return arg
+
+
+class PackageFacts:
+    """Facts that follow from the directives of a single package, i.e. its variants,
+    conflicts, provided virtuals and dependencies, in a serializable form.
+
+    Besides the facts, this records the version, target and compiler constraints
+    that the facts refer to, since they are defined later in the solve.
+    """
+
+    def __init__(self, data: dict):
+        self.data = data
+
+    @staticmethod
+    def from_recording(
+        recorder: _FactsRecorder,
+        num_ids: int,
+        version_constraints,
+        target_constraints,
+        compiler_version_constraints,
+        variant_values,
+    ) -> "PackageFacts":
+        return PackageFacts(
+            {
+                "facts": [[f.name, [_encode_fact_arg(x) for x in f.args]] for f in recorder.facts],
+                "ids": num_ids,
+                "version_constraints": sorted(
+                    [name, str(versions)] for name, versions in version_constraints
+                ),
+                "target_constraints": sorted(str(t) for t in target_constraints),
+                "compiler_version_constraints": sorted(
+                    str(c) for c in compiler_version_constraints
+                ),
+                "variant_values": sorted(
+                    (list(x) for x in variant_values), key=lambda x: [str(y) for y in x]
+                ),
+            }
+        )
+
+    @property
+    def num_ids(self) -> int:
+        return self.data["ids"]
+
+    def facts(self, first_id: int) -> Iterator[AspFunction]:
+        """Yield the facts, with condition ids starting at ``first_id``"""
+        for name, args in self.data["facts"]:
+            yield AspFunction(name, tuple(_decode_fact_arg(x, first_id) for x in args))
+
+    def version_constraints(self):
+        return [(name, vn.VersionList(v)) for name, v in self.data["version_constraints"]]
+
+    def target_constraints(self):
+        return [spack.target.Target(t) for t in self.data["target_constraints"]]
+
+    def compiler_version_constraints(self):
+        return [spack.spec.CompilerSpec(c) for c in self.data["compiler_version_constraints"]]
+
+    def variant_values(self):
+        return [tuple(x) for x in self.data["variant_values"]]
+
+
+@llnl.util.lang.memoized
+def _solver_digest() -> str:
+    """Digest of the code generating the facts, so that cached facts are invalidated
+    when the solver, or the modules it uses to translate directives, change"""
+    import spack.main
+
+    hasher = spack.util.crypto.hashlib.sha256(spack.main.get_version().encode("utf-8"))
+    modules = [
+        __file__,
+        os.path.join(os.path.dirname(__file__), "core.py"),
+        spack.spec.__file__,
+        spack.variant.__file__,
+        spack.directives.__file__,
+        spack.package_base.__file__,
+    ]
+    version_dir = os.path.dirname(vn.__file__)
+    modules.extend(
+        os.path.join(version_dir, f) for f in sorted(os.listdir(version_dir)) if f.endswith(".py")
+    )
+    for module in modules:
+        with open(module, "rb") as f:
+            hasher.update(f.read())
+    return hasher.hexdigest()
+
+
+def _module_stamp(module_name: str) -> Optional[Tuple[str, int, int]]:
+    """Path, modification time and size of the file defining a module, if any"""
+    path = getattr(sys.modules.get(module_name), "__file__", None)
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return path, st.st_mtime_ns, st.st_size
+
+
+def _referenced_packages(pkg_cls) -> List[str]:
+    """Names of the other packages and virtuals that the directives of a package refer to"""
+    specs: List[spack.spec.Spec] = []
+    for when, deps_by_name in pkg_cls.dependencies.items():
+        specs.append(when)
+        specs.extend(dep.spec for dep in deps_by_name.values())
+    for when, conflict_specs in pkg_cls.conflicts.items():
+        specs.append(when)
+        specs.extend(spack.spec.Spec(conflict_spec) for conflict_spec, _ in conflict_specs)
+    for when, provided in pkg_cls.provided.items():
+        specs.append(when)
+        specs.extend(provided)
+    specs.extend(pkg_cls.provided_together)
+    for _, whens in pkg_cls.variants.values():
+        specs.extend(whens)
+    names = set(node.name for spec in specs for node in spec.traverse() if node.name)
+    names.discard(pkg_cls.name)
+    return sorted(names)
+
+
+def _referenced_package_stamp(name: str) -> List:
+    """Whether a package referenced in directives is virtual, and otherwise the stamp of its
+    package.py. Facts refer to virtuals differently, and variants of other packages are
+    validated against their definition."""
+    if spack.repo.PATH.is_virtual(name):
+        return [name, True]
+    try:
+        st = os.stat(spack.repo.PATH.filename_for_package_name(name))
+    except (OSError, spack.repo.UnknownPackageError, spack.repo.UnknownNamespaceError):
+        return [name, False]
+    return [name, False, st.st_mtime_ns, st.st_size]
+
+
+class PackageFactsCache:
+    """Stores the facts derived from each package's directives in Spack's misc cache.
+
+    There is one entry per package, keyed on the files that define the package class
+    and its bases, the packages and virtuals its directives refer to, the inputs of the
+    solve that change these facts, and the solver code. An outdated entry is simply
+    overwritten.
+    """
+
+    #: Bump when the format of the entries changes
+    version = 1
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(pkg_cls, *, provided: List[str], tests: bool, repos: List[str]) -> str:
+        """Digest identifying the facts of a package class"""
+        stamps = [_module_stamp(cls.__module__) for cls in pkg_cls.__mro__]
+        data = [
+            PackageFactsCache.version,
+            _solver_digest(),
+            repos,
+            pkg_cls.fullname,
+            [stamp for stamp in stamps if stamp is not None],
+            [_referenced_package_stamp(name) for name in _referenced_packages(pkg_cls)],
+            provided,
+            tests,
+        ]
+        return spack.util.crypto.hashlib.sha256(
+            spack.util.spack_json.dump(data).encode("utf-8")
+        ).hexdigest()
+
+    @staticmethod
+    def _cache_key(pkg_cls) -> str:
+        return os.path.join("solver-facts", f"{pkg_cls.fullname}.json")
+
+    def fetch(self, pkg_cls, key: str) -> Optional[PackageFacts]:
+        """Return the cached facts of a package, or None if missing or outdated"""
+        cache = spack.caches.MISC_CACHE
+        cache_key = self._cache_key(pkg_cls)
+        try:
+            if cache.init_entry(cache_key):
+                with cache.read_transaction(cache_key) as f:
+                    entry = spack.util.spack_json.load(f)
+                if entry.get("key") == key:
+                    self.hits += 1
+                    return PackageFacts(entry["data"])
+        except (OSError, ValueError, KeyError, spack.util.file_cache.CacheError) as e:
+            tty.debug(f"[PACKAGE FACTS CACHE] cannot read facts of {pkg_cls.fullname}: {e}")
+
+        self.misses += 1
+        return None
+
+    def store(self, pkg_cls, key: str, facts: PackageFacts) -> None:
+        cache = spack.caches.MISC_CACHE
+        cache_key = self._cache_key(pkg_cls)
+        try:
+            cache.init_entry(cache_key)
+            with cache.write_transaction(cache_key) as (_, new):
+                spack.util.spack_json.dump({"key": key, "data": facts.data}, new)
+        except (OSError, spack.util.file_cache.CacheError) as e:
+            tty.debug(f"[PACKAGE FACTS CACHE] cannot write facts of {pkg_cls.fullname}: {e}")
+
+
 class PyclingoDriver:
     def __init__(self, cores=True):
         """Driver for the Python clingo interface.
@@ -743,16 +1010,9 @@ def solve(self, setup, specs, reuse=None, output=None, control=None, allow_depre
         timer.start("load")
         # Add the problem instance
         self.control.add("base", [], asp_problem)
-        # Load the file itself
-        parent_dir = os.path.dirname(__file__)
-        self.control.load(os.path.join(parent_dir, "concretize.lp"))
-        self.control.load(os.path.join(parent_dir, "heuristic.lp"))
-        if spack.config.CONFIG.get("concretizer:duplicates:strategy", "none") != "none":
-            self.control.load(os.path.join(parent_dir, "heuristic_separate.lp"))
-        self.control.load(os.path.join(parent_dir, "os_compatibility.lp"))
-        self.control.load(os.path.join(parent_dir, "display.lp"))
-        if not setup.concretize_everything:
-            self.control.load(os.path.join(parent_dir, "when_possible.lp"))
+        # Add the logic programs, which are read from disk only once
+        for name in _logic_program_files(setup):
+            self.control.add("base", [], _logic_program(name))
         timer.stop("load")
 
         # Grounding is the first step in the solve -- it turns our facts
@@ -817,6 +1077,9 @@ def on_model(model):
 
         if output.timers:
             timer.write_tty()
+            if setup.package_facts_cache is not None:
+                cache = setup.package_facts_cache
+                print(f"    package facts cache: {cache.hits} hits, {cache.misses} misses")
             print()
 
         if output.stats:
@@ -935,6 +1198,9 @@ def __init__(self, tests: bool = False):
 
         # Caches to optimize the setup phase of the solver
         self.target_specs_cache = None
+        self.package_facts_cache: Optional[PackageFactsCache] = None
+        if spack.config.CONFIG.get("concretizer:package_facts_cache", False):
+            self.package_facts_cache = PackageFactsCache()
 
         # whether to add installed/binary hashes to the solve
         self.tests = tests
@@ -1087,17 +1353,8 @@ def pkg_rules(self, pkg, tests):
         self.pkg_version_rules(pkg)
         self.gen.newline()
 
-        # variants
-        self.variant_rules(pkg)
-
-        # conflicts
-        self.conflict_rules(pkg)
-
-        # virtuals
-        self.package_provider_rules(pkg)
-
-        # dependencies
-        self.package_dependencies_rules(pkg)
+        # variants, conflicts, virtuals and dependencies
+        self.package_definition_rules(pkg)
 
         # virtual preferences
         self.virtual_preferences(
@@ -1111,6 +1368,91 @@ def pkg_rules(self, pkg, tests):
         self.trigger_rules()
         self.effect_rules()
 
+    def package_definition_rules(self, pkg):
+        """Emit the facts that follow from the directives in a package.py file.
+
+        These facts are the same across solves, unless the package changes, so they are
+        taken from the package facts cache when it is enabled.
+        """
+        if self.package_facts_cache is None:
+            self.variant_rules(pkg)
+            self.conflict_rules(pkg)
+            self.package_provider_rules(pkg)
+            self.package_dependencies_rules(pkg)
+            return
+
+        provided = sorted(v for v in pkg.provided_virtual_names() if v in self.possible_virtuals)
+        tests = self.tests is True or (
+            not isinstance(self.tests, bool) and bool(self.tests) and pkg.name in self.tests
+        )
+        repos = [repo.root for repo in spack.repo.PATH.repos]
+        key = self.package_facts_cache.key(pkg, provided=provided, tests=tests, repos=repos)
+        facts = self.package_facts_cache.fetch(pkg, key)
+        if facts is None:
+            facts = self._record_package_facts(pkg)
+            self.package_facts_cache.store(pkg, key, facts)
+
+        first_id = next(self._id_counter)
+        for f in facts.facts(first_id):
+            self.gen.fact(f)
+        self._id_counter = itertools.count(first_id + facts.num_ids)
+
+        self.version_constraints.update(facts.version_constraints())
+        self.target_constraints.update(facts.target_constraints())
+        self.compiler_version_constraints.update(facts.compiler_version_constraints())
+        self.variant_values_from_specs.update(facts.variant_values())
+
+    def _record_package_facts(self, pkg) -> PackageFacts:
+        """Compute the facts for the directives in a package.py file, in isolation from
+        the rest of the problem, so that they can be reused in other solves.
+        """
+        saved = (
+            self.gen,
+            self._id_counter,
+            self._trigger_cache,
+            self._effect_cache,
+            self.version_constraints,
+            self.target_constraints,
+            self.compiler_version_constraints,
+            self.variant_values_from_specs,
+        )
+        recorder = _FactsRecorder()
+        ids = itertools.count()
+        self.gen = recorder  # type: ignore[assignment]
+        self._id_counter = (_LocalId(i) for i in ids)
+        self._trigger_cache = collections.defaultdict(dict)
+        self._effect_cache = collections.defaultdict(dict)
+        self.version_constraints = set()
+        self.target_constraints = set()
+        self.compiler_version_constraints = set()
+        self.variant_values_from_specs = set()
+        try:
+            self.variant_rules(pkg)
+            self.conflict_rules(pkg)
+            self.package_provider_rules(pkg)
+            self.package_dependencies_rules(pkg)
+            self.trigger_rules()
+            self.effect_rules()
+            return PackageFacts.from_recording(
+                recorder,
+                next(ids),
+                self.version_constraints,
+                self.target_constraints,
+                self.compiler_version_constraints,
+                self.variant_values_from_specs,
+            )
+        finally:
+            (
+                self.gen,
+                self._id_counter,
+                self._trigger_cache,
+                self._effect_cache,
+                self.version_constraints,
+                self.target_constraints,
+                self.compiler_version_constraints,
+                self.variant_values_from_specs,
+            ) = saved
+
     def trigger_rules(self):
         """Flushes all the trigger rules collected so far, and clears the cache."""
         self.gen.h2("Trigger conditions")
@@ -3370,6 +3712,22 @@ def _check_input_and_extract_concrete_specs(specs):
                 spack.spec.Spec.ensure_valid_variants(s)
         return reusable
 
+    @staticmethod
+    def _possible_package_names(specs) -> Optional[Set[str]]:
+        """Return the names of the packages that may appear in the solution, so that
+        buildcaches with a sharded index only fetch what is needed, or None if they
+        cannot be determined.
+        """
+        if not spack.mirror.MirrorCollection(binary=True) or not all(s.name for s in specs):
+            return None
+        try:
+            names = set(
+                spack.package_base.possible_dependencies(*specs, virtuals=set(), depflag=dt.ALL)
+            )
+        except spack.repo.UnknownEntityError:
+            return None
+        return names | set(spack.repo.PATH.packages_with_tags("runtime"))
+
     def _reusable_specs(self, specs):
         reusable_specs = []
         if self.reuse:
@@ -3386,7 +3744,9 @@ def _reusable_specs(self, specs):
             try:
                 reusable_specs.extend(
                     s
-                    for s in spack.binary_distribution.update_cache_and_get_specs()
+                    for s in spack.binary_distribution.update_cache_and_get_specs(
+                        names=self._possible_package_names(specs)
+                    )
                     if _is_reusable(s, packages, local=False)
                 )
             except (spack.binary_distribution.FetchCacheError, IndexError):
@@ -59,7 +59,7 @@
 import re
 import socket
 import warnings
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple, Union
 
 import llnl.path
 import llnl.string
@@ -82,6 +82,7 @@
 import spack.provider_index
 import spack.repo
 import spack.solver
+import spack.spec_hashing
 import spack.store
 import spack.target
 import spack.traverse as traverse
@@ -1301,6 +1302,61 @@ def copy(self, *args, **kwargs):
         return self.wrapped_obj.copy(*args, **kwargs)
 
 
+class SatisfiesCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class SatisfiesCache:
+    """Bounded, least recently used cache of the results of ``Spec.satisfies`` for
+    concrete specs checked against abstract constraints with dependencies.
+
+    Entries are keyed on the structure of the abstract spec, and on the DAG hash of the
+    concrete one. Whether a name is virtual depends on the package repository, so the
+    cache is emptied when ``spack.repo.PATH`` is swapped.
+    """
+
+    def __init__(self, maxsize: int = 16384):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "collections.OrderedDict[tuple, bool]" = collections.OrderedDict()
+        self._repo: Any = None
+
+    def satisfies(self, concrete: "Spec", abstract: "Spec") -> bool:
+        if self._repo is not spack.repo.PATH:
+            self._data.clear()
+            self._repo = spack.repo.PATH
+
+        key = (abstract._structural_key(), concrete.dag_hash())
+        result = self._data.get(key)
+        if result is not None:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return result
+
+        self.misses += 1
+        result = concrete._satisfies(abstract, deps=True)
+        self._data[key] = result
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return result
+
+    def cache_info(self) -> SatisfiesCacheInfo:
+        """Return the number of hits and misses, like ``functools.lru_cache`` does."""
+        return SatisfiesCacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hits = self.misses = 0
+
+
+#: Process-wide cache used by ``Spec.satisfies``
+SATISFIES_CACHE = SatisfiesCache()
+
+
 @lang.lazy_lexicographic_ordering(set_hash=False)
 class Spec:
     #: Cache for spec's prefix, computed lazily in the corresponding property
@@ -1993,57 +2049,12 @@ def replace_hash(self):
 
         self._dup(self.lookup_hash())
 
-    def to_node_dict(self, hash=ht.dag_hash):
-        """Create a dictionary representing the state of this Spec.
-
-        ``to_node_dict`` creates the content that is eventually hashed by
-        Spack to create identifiers like the DAG hash (see
-        ``dag_hash()``).  Example result of ``to_node_dict`` for the
-        ``sqlite`` package::
-
-            {
-                'sqlite': {
-                    'version': '3.28.0',
-                    'arch': {
-                        'platform': 'darwin',
-                        'platform_os': 'mojave',
-                        'target': 'x86_64',
-                    },
-                    'compiler': {
-                        'name': 'apple-clang',
-                        'version': '10.0.0',
-                    },
-                    'namespace': 'builtin',
-                    'parameters': {
-                        'fts': 'true',
-                        'functions': 'false',
-                        'cflags': [],
-                        'cppflags': [],
-                        'cxxflags': [],
-                        'fflags': [],
-                        'ldflags': [],
-                        'ldlibs': [],
-                    },
-                    'dependencies': {
-                        'readline': {
-                            'hash': 'zvaa4lhlhilypw5quj3akyd3apbq5gap',
-                            'type': ['build', 'link'],
-                        }
-                    },
-                }
-            }
-
-        Note that the dictionary returned does *not* include the hash of
-        the *root* of the spec, though it does include hashes for each
-        dependency, and (optionally) the package file corresponding to
-        each node.
-
-        See ``to_dict()`` for a "complete" spec hash, with hashes for
-        each node and nodes for each dependency (instead of just their
-        hashes).
+    def _node_dict_without_dependencies(self, include_package_hash=True):
+        """The part of ``to_node_dict()`` that depends only on this node, and not on the
+        hashes of its dependencies.
 
         Arguments:
-            hash (spack.hash_types.SpecHashDescriptor) type of hash to generate.
+            include_package_hash (bool): whether to include the package hash, if known
         """
         d = syaml.syaml_dict()
 
@@ -2093,7 +2104,7 @@ def to_node_dict(self, hash=ht.dag_hash):
 
         if (
             self._concrete
-            and hash.package_hash
+            and include_package_hash
             and hasattr(self, "_package_hash")
             and self._package_hash
         ):
@@ -2108,6 +2119,61 @@ def to_node_dict(self, hash=ht.dag_hash):
             if not isinstance(package_hash, str) and isinstance(package_hash, bytes):
                 package_hash = package_hash.decode("utf-8")
             d["package_hash"] = package_hash
+        return d
+
+    def to_node_dict(self, hash=ht.dag_hash):
+        """Create a dictionary representing the state of this Spec.
+
+        ``to_node_dict`` creates the content that is eventually hashed by
+        Spack to create identifiers like the DAG hash (see
+        ``dag_hash()``).  Example result of ``to_node_dict`` for the
+        ``sqlite`` package::
+
+            {
+                'sqlite': {
+                    'version': '3.28.0',
+                    'arch': {
+                        'platform': 'darwin',
+                        'platform_os': 'mojave',
+                        'target': 'x86_64',
+                    },
+                    'compiler': {
+                        'name': 'apple-clang',
+                        'version': '10.0.0',
+                    },
+                    'namespace': 'builtin',
+                    'parameters': {
+                        'fts': 'true',
+                        'functions': 'false',
+                        'cflags': [],
+                        'cppflags': [],
+                        'cxxflags': [],
+                        'fflags': [],
+                        'ldflags': [],
+                        'ldlibs': [],
+                    },
+                    'dependencies': {
+                        'readline': {
+                            'hash': 'zvaa4lhlhilypw5quj3akyd3apbq5gap',
+                            'type': ['build', 'link'],
+                        }
+                    },
+                }
+            }
+
+        Note that the dictionary returned does *not* include the hash of
+        the *root* of the spec, though it does include hashes for each
+        dependency, and (optionally) the package file corresponding to
+        each node.
+
+        See ``to_dict()`` for a "complete" spec hash, with hashes for
+        each node and nodes for each dependency (instead of just their
+        hashes).
+
+        Arguments:
+            hash (spack.hash_types.SpecHashDescriptor) type of hash to generate.
+        """
+        d = self._node_dict_without_dependencies(hash.package_hash)
 
         # Note: Relies on sorting dict by keys later in algorithm.
         deps = self._dependencies_dict(depflag=hash.depflag)
@@ -3110,9 +3176,9 @@ def _finalize_concretization(self):
         # Assign dag_hash (this *could* be done lazily, but it's assigned anyway in
         # ensure_no_deprecated, and it's clearer to see explicitly where it happens).
         # Any specs that were concrete before finalization will already have a cached
-        # DAG hash.
-        for spec in self.traverse():
-            spec._cached_hash(ht.dag_hash)
+        # DAG hash. The process hash, needed to hash concrete specs, is computed in the
+        # same pass since it shares most of the serialized node with the DAG hash.
+        spack.spec_hashing.compute_hashes([self])
 
     def concretized(self, tests=False):
         """This is a non-destructive version of concretize().
@@ -3855,12 +3921,32 @@ def _intersects_dependencies(self, other):
     def satisfies(self, other: Union[str, "Spec"], deps: bool = True) -> bool:
         """Return True if all concrete specs matching self also match other, otherwise False.
 
+        Results for concrete specs checked against constraints on dependencies are
+        memoized in ``SATISFIES_CACHE``.
+
         Args:
             other: spec to be satisfied
             deps: if True descend to dependencies, otherwise only check root node
         """
         other = self._autospec(other)
+        if deps and other._dependencies and self.concrete and not other.concrete:
+            return SATISFIES_CACHE.satisfies(self, other)
+        return self._satisfies(other, deps)
+
+    def _structural_key(self) -> tuple:
+        """Return a hashable key that is equal for specs with the same nodes and edges,
+        including the virtuals on the edges."""
+        return tuple(
+            (
+                edge.parent.name if edge.parent else None,
+                edge.depflag,
+                edge.virtuals,
+                lang.tuplify(edge.spec._cmp_node),
+            )
+            for edge in self.traverse_edges(root=True, cover="edges")
+        )
 
+    def _satisfies(self, other: "Spec", deps: bool) -> bool:
         if other.concrete:
             # The left-hand side must be the same singleton with identical hash. Notice that
             # package hashes can be different for otherwise indistinguishable concrete Spec
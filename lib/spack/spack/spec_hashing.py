@@ -0,0 +1,128 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Compute the hashes of every node in one or more spec DAGs in a single pass.
+
+``Spec.dag_hash()`` serializes a node and asks each child for its hash, recursing
+on demand. When the hashes of a whole DAG are needed (e.g. at the end of
+concretization, or when writing an environment lockfile) this module walks the DAG
+once, from the leaves up, so that:
+
+1. every child hash is already known when its parents are serialized, and
+2. the part of a node that doesn't depend on its dependencies is serialized only
+   once, and shared among all the hash types being computed.
+"""
+import functools
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+import spack.deptypes as dt
+import spack.hash_types as ht
+import spack.spec
+import spack.traverse
+import spack.util.hash
+import spack.util.spack_json as sjson
+
+#: Hashes computed by default by ``compute_hashes()``
+DEFAULT_HASHES = (ht.dag_hash, ht.process_hash)
+
+
+class _Edge(NamedTuple):
+    depflag: dt.DepFlag
+    child: int
+    #: JSON text of the dependency entry, before and after the hash
+    prefix: str
+    suffix: str
+
+
+def _edges(node: "spack.spec.Spec") -> List[_Edge]:
+    """Return the edges to the dependencies of a node in the order used by
+    ``Spec.to_node_dict()``, with the parts of their entries not depending on the hash
+    already serialized."""
+    edges = sorted(node.edges_to_dependencies(), key=lambda x: (x.spec.name, x.depflag))
+    return [
+        _Edge(
+            edge.depflag, id(edge.spec), *_edge_json(edge.spec.name, edge.depflag, edge.virtuals)
+        )
+        for edge in edges
+    ]
+
+
+@functools.lru_cache(maxsize=4096)
+def _edge_json(name: str, depflag: dt.DepFlag, virtuals: Tuple[str, ...]) -> Tuple[str, str]:
+    parameters = {"deptypes": dt.flag_to_tuple(depflag), "virtuals": virtuals}
+    return f'{{"name":{sjson.dump(name)},', f',"parameters":{sjson.dump(parameters)}}}'
+
+
+def compute_hashes(
+    specs: Iterable["spack.spec.Spec"], hashes: Sequence[ht.SpecHashDescriptor] = DEFAULT_HASHES
+) -> List[Tuple["spack.spec.Spec", Dict[str, str]]]:
+    """Compute the requested hashes for all the nodes reachable from the input specs.
+
+    Nodes are visited in topological order, leaves first. Hashes that are already
+    cached on a node are reused, and newly computed hashes are cached on concrete
+    nodes, exactly as ``Spec._cached_hash()`` would do.
+
+    Args:
+        specs: roots of the DAGs to be hashed
+        hashes: hash types to compute. Hashes with a custom computation (like
+            ``ht.package_hash``) are not supported.
+
+    Returns:
+        List of ``(spec, {hash name: hash value})`` tuples, leaves first
+    """
+    for hash in hashes:
+        if hash.override is not None:
+            raise ValueError(f"cannot compute '{hash.name}' hashes in batch")
+
+    nodes = spack.traverse.traverse_nodes(specs, order="topo", deptype=dt.ALL, key=id)
+    computed: Dict[int, Dict[str, str]] = {}
+    result = []
+    for node in reversed(list(nodes)):
+        node_hashes = {}
+        # The parts of the node dictionary not depending on the hash of children,
+        # serialized once and shared among hash types
+        serialized: Dict[Any, Any] = {}
+        for hash in hashes:
+            value = getattr(node, hash.attr, None)
+            if not value:
+                value = _hash_node(node, hash, computed, serialized)
+                if node.concrete:
+                    setattr(node, hash.attr, value)
+            node_hashes[hash.name] = value
+
+        computed[id(node)] = node_hashes
+        result.append((node, node_hashes))
+
+    return result
+
+
+def _hash_node(
+    node: "spack.spec.Spec",
+    hash: ht.SpecHashDescriptor,
+    computed: Dict[int, Dict[str, str]],
+    serialized: Dict[Any, Any],
+) -> str:
+    # Spliced specs need the hash of their build spec, which is not part of the DAG
+    if node._build_spec:
+        return node.spec_hash(hash)
+
+    if hash.package_hash not in serialized:
+        serialized[hash.package_hash] = sjson.dump(
+            node._node_dict_without_dependencies(hash.package_hash)
+        )
+    json_text = serialized[hash.package_hash]
+
+    if "edges" not in serialized:
+        serialized["edges"] = _edges(node)
+
+    # Must produce the same text as sjson.dump(node.to_node_dict(hash))
+    dependencies = ",".join(
+        f'{edge.prefix}"{hash.name}":"{computed[edge.child][hash.name]}"{edge.suffix}'
+        for edge in serialized["edges"]
+        if not edge.depflag or hash.depflag & edge.depflag
+    )
+    if dependencies:
+        json_text = f'{json_text[:-1]},"dependencies":[{dependencies}]}}'
+
+    return spack.util.hash.b32_hash(json_text)
@@ -156,6 +156,7 @@ class Store:
             truncated to this length
         upstreams: optional list of upstream databases
         lock_cfg: lock configuration for the database
+        binary_db_index: whether to write a binary index next to the database
     """
 
     def __init__(
@@ -166,6 +167,7 @@ def __init__(
         hash_length: Optional[int] = None,
         upstreams: Optional[List[spack.database.Database]] = None,
         lock_cfg: spack.database.LockConfiguration = spack.database.NO_LOCK,
+        binary_db_index: bool = False,
     ) -> None:
         self.root = root
         self.unpadded_root = unpadded_root or root
@@ -173,7 +175,10 @@ def __init__(
         self.hash_length = hash_length
         self.upstreams = upstreams
         self.lock_cfg = lock_cfg
-        self.db = spack.database.Database(root, upstream_dbs=upstreams, lock_cfg=lock_cfg)
+        self.binary_db_index = binary_db_index
+        self.db = spack.database.Database(
+            root, upstream_dbs=upstreams, lock_cfg=lock_cfg, binary_index=binary_db_index
+        )
 
         timeout_format_str = (
             f"{str(lock_cfg.package_timeout)}s" if lock_cfg.package_timeout else "No timeout"
@@ -203,6 +208,7 @@ def __reduce__(self):
             self.hash_length,
             self.upstreams,
             self.lock_cfg,
+            self.binary_db_index,
         )
 
 
@@ -230,6 +236,7 @@ def create(configuration: ConfigurationType) -> Store:
         hash_length=hash_length,
         upstreams=upstreams,
         lock_cfg=spack.database.lock_configuration(configuration),
+        binary_db_index=configuration.get("config:db_binary_index", False),
     )
 
 
@@ -9,6 +9,7 @@
 import json
 import os
 import platform
+import shutil
 import sys
 import tarfile
 import urllib.error
@@ -463,6 +464,114 @@ def test_generate_index_missing(monkeypatch, tmpdir, mutable_config):
         assert "libelf" not in cache_list
 
 
+@pytest.mark.usefixtures("install_mockery_mutable_config", "mock_packages", "mock_fetch")
+def test_update_index_incremental(tmp_path, mutable_config):
+    """Ensure that applying the deltas recorded by push gives the same index as a rebuild"""
+    mirror_dir = tmp_path / "mirror_dir"
+    cache_dir = mirror_dir / "build_cache"
+    deltas_dir = cache_dir / bindist.INDEX_DELTAS_RELATIVE_PATH
+
+    def _read_index():
+        return json.loads((cache_dir / "index.json").read_text())
+
+    install_cmd("--no-cache", "libdwarf", "trivial-install-test-package")
+    buildcache_cmd("push", "-u", "--update-index", str(mirror_dir), "libdwarf")
+    assert not list(deltas_dir.iterdir())
+
+    buildcache_cmd("push", "-u", str(mirror_dir), "trivial-install-test-package")
+    assert len(list(deltas_dir.iterdir())) == 1
+
+    buildcache_cmd("update-index", "--incremental", str(mirror_dir))
+    assert not list(deltas_dir.iterdir())
+    incremental = _read_index()
+    assert len(incremental["database"]["installs"]) == 3
+
+    buildcache_cmd("update-index", str(mirror_dir))
+    assert _read_index() == incremental
+
+
+def test_apply_index_deltas():
+    def _record(h, deps=(), in_buildcache=True):
+        node = {"name": h, "hash": h, "dependencies": [{"name": d, "hash": d} for d in deps]}
+        return {"spec": node, "ref_count": 0, "in_buildcache": in_buildcache}
+
+    installs = {"b": _record("b"), "a": _record("a", deps=["b"])}
+    added = {"c": _record("c", deps=["b", "d"]), "d": _record("d")}
+    bindist._apply_index_deltas(
+        installs,
+        [{"added": ["c"], "removed": [], "nodes": {h: r["spec"] for h, r in added.items()}}],
+    )
+    assert {h: r["in_buildcache"] for h, r in installs.items()} == {
+        "a": True,
+        "b": True,
+        "c": True,
+        "d": False,
+    }
+    assert {h: r["ref_count"] for h, r in installs.items()} == {"a": 0, "b": 2, "c": 0, "d": 1}
+
+    # Dependencies not in the build cache are dropped with their last dependent
+    bindist._apply_index_deltas(installs, [{"added": [], "removed": ["c", "a"], "nodes": {}}])
+    assert installs == {"b": _record("b")}
+
+
+def test_index_shards():
+    def _record(name, h, deps=()):
+        node = {"name": name, "hash": h, "dependencies": [{"name": "x", "hash": d} for d in deps]}
+        return {"spec": node, "ref_count": 0, "in_buildcache": True}
+
+    installs = {
+        "aaa1": _record("foo", "aaa1", deps=["bbb1"]),
+        "aaa2": _record("bar", "aaa2"),
+        "bbb1": _record("bar", "bbb1"),
+    }
+    shards = {key: set(records) for key, records in bindist._index_shards(installs).items()}
+    assert shards == {
+        "hash/aa": {"aaa1", "aaa2", "bbb1"},
+        "hash/bb": {"bbb1"},
+        "name/foo": {"aaa1", "bbb1"},
+        "name/bar": {"aaa2", "bbb1"},
+    }
+
+
+@pytest.mark.usefixtures("install_mockery_mutable_config", "mock_packages", "mock_fetch")
+def test_update_index_sharded(tmp_path, mutable_config, mock_binary_index):
+    """Ensure that clients fetch only the shards of the packages they need"""
+    mirror_dir = tmp_path / "mirror_dir"
+    shards_dir = mirror_dir / "build_cache" / bindist.INDEX_SHARDS_RELATIVE_PATH
+
+    install_cmd("--no-cache", "libdwarf", "trivial-install-test-package")
+    buildcache_cmd("push", "-u", str(mirror_dir), "libdwarf", "trivial-install-test-package")
+    buildcache_cmd("update-index", "--sharded", str(mirror_dir))
+    manifest = json.loads((shards_dir / "manifest.json").read_text())["index-shards"]
+    assert {"name/libdwarf", "name/libelf", "name/trivial-install-test-package"} <= set(
+        manifest["shards"]
+    )
+
+    mirror_cmd("add", "test-mirror", str(mirror_dir))
+    specs = bindist.update_cache_and_get_specs(names=["libdwarf"])
+    assert {s.name for s in specs} == {"libdwarf", "libelf"}
+    (entry,) = bindist.BINARY_INDEX._local_index_cache.values()
+    assert "index_path" not in entry and entry["shards"]
+
+    # Fetched shards are persisted, and looking up a hash fetches the shard of its prefix
+    index = bindist.BinaryCacheIndex(bindist.BINARY_INDEX._index_cache_root)
+    index.regenerate_spec_cache()
+    assert {s.name for s in index.get_all_built_specs()} == {"libdwarf", "libelf"}
+    trivial = spack.store.STORE.db.query_one("trivial-install-test-package")
+    (result,) = index.find_built_spec(trivial)
+    assert result["spec"] == trivial
+    (entry,) = index._local_index_cache.values()
+    assert len(entry["shards"]) > 1
+
+    # Updating the index without sharding removes the shards
+    buildcache_cmd("update-index", str(mirror_dir))
+    assert not shards_dir.exists()
+    specs = bindist.update_cache_and_get_specs(names=["libdwarf"])
+    assert {s.name for s in specs} == {"libdwarf", "libelf", "trivial-install-test-package"}
+    (entry,) = bindist.BINARY_INDEX._local_index_cache.values()
+    assert "index_path" in entry and "shards" not in entry
+
+
 def test_generate_indices_key_error(monkeypatch, capfd):
     def mock_list_url(url, recursive=False):
         print("mocked list_url({0}, {1})".format(url, recursive))
@@ -671,6 +780,28 @@ def test_text_relocate_if_needed(install_mockery, mock_fetch, monkeypatch, capfd
     assert join_path("bin", "secretexe") not in manifest["text_to_relocate"]
 
 
+@pytest.mark.not_on_windows("Uses ELF binaries")
+def test_binaries_with_prefix_are_indexed(install_mockery, mock_fetch):
+    """The manifest records which binaries contain a prefix, so that the others can be
+    skipped during relocation."""
+    spec = Spec("needs-text-relocation").concretized()
+    install_cmd(str(spec))
+
+    true_exe = shutil.which("true")
+    if true_exe is None:
+        pytest.skip("no binary to copy")
+    shutil.copy(true_exe, join_path(spec.prefix.bin, "clean"))
+    with_prefix = join_path(spec.prefix.bin, "with-prefix")
+    shutil.copy(true_exe, with_prefix)
+    with open(with_prefix, "ab") as f:
+        f.write(str(spec.prefix).encode("utf-8"))
+
+    manifest = get_buildfile_manifest(spec)
+    assert join_path("bin", "clean") in manifest["binary_to_relocate"]
+    assert join_path("bin", "with-prefix") in manifest["binary_to_relocate"]
+    assert manifest["binary_with_prefix"] == [join_path("bin", "with-prefix")]
+
+
 def test_etag_fetching_304():
     # Test conditional fetch with etags. If the remote hasn't modified the file
     # it returns 304, which is an HTTPError in urllib-land. That should be
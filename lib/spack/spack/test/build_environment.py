@@ -17,7 +17,12 @@
 import spack.package_base
 import spack.spec
 import spack.util.spack_yaml as syaml
-from spack.build_environment import UseMode, _static_to_shared_library, dso_suffix
+from spack.build_environment import (
+    RunEnvironmentCache,
+    UseMode,
+    _static_to_shared_library,
+    dso_suffix,
+)
 from spack.context import Context
 from spack.paths import build_env_path
 from spack.util.cpus import determine_number_of_jobs
@@ -715,3 +720,50 @@ def test_build_system_globals_only_set_on_root_during_build(default_mock_concret
     for depth, spec in root.traverse(depth=True, root=True):
         for variable in build_variables:
             assert hasattr(spec.package.module, variable) == should_be_set(depth)
+
+
+def test_run_environment_is_cached(mutable_database, monkeypatch):
+    """Modifications to the run environment from package methods are cached in the metadata
+    directory of installed specs, and replayed without executing the methods."""
+    root = mutable_database.query_one("mpileaks ^mpich")
+    cache_files = [RunEnvironmentCache.cache_file(s) for s in root.traverse()]
+    for path in cache_files:
+        if os.path.exists(path):
+            os.unlink(path)
+
+    context = spack.build_environment.SetupContext(root, context=Context.RUN)
+    assert not context.run_env_modifications_are_cached()
+    expected = context.get_env_modifications().to_list()
+    assert os.path.exists(RunEnvironmentCache.cache_file(root))
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("modifications should be cached")
+
+    for s in root.traverse():
+        monkeypatch.setattr(type(s.package), "setup_run_environment", _fail)
+        monkeypatch.setattr(type(s.package), "setup_dependent_run_environment", _fail)
+
+    context = spack.build_environment.SetupContext(root, context=Context.RUN)
+    assert context.run_env_modifications_are_cached()
+    assert context.get_env_modifications().to_list() == expected
+
+    # A change to a file defining a base of the package classes invalidates the cache
+    base_file = inspect.getfile(spack.package_base.PackageBase)
+    file_hash = spack.build_environment._file_hash
+    with monkeypatch.context() as m:
+        m.setattr(
+            spack.build_environment,
+            "_file_hash",
+            lambda path: "changed" if path == base_file else file_hash(path),
+        )
+        context = spack.build_environment.SetupContext(root, context=Context.RUN)
+        assert not context.run_env_modifications_are_cached()
+
+    # So does a new commit of Spack
+    monkeypatch.setattr(spack.build_environment, "_spack_version", lambda: "0.0.0 (0000000)")
+    context = spack.build_environment.SetupContext(root, context=Context.RUN)
+    assert not context.run_env_modifications_are_cached()
+
+    for path in cache_files:
+        if os.path.exists(path):
+            os.unlink(path)
@@ -0,0 +1,67 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import json
+
+import pytest
+
+import spack.benchmark
+from spack.main import SpackCommand, SpackCommandError
+
+benchmark = SpackCommand("benchmark")
+
+
+def test_benchmark_list():
+    out = benchmark("list")
+    for name in ("concretize", "spec-parse", "spec-dag", "spec-batch-hashes", "database", "view"):
+        assert name in out
+
+
+def test_benchmark_unknown_name():
+    with pytest.raises(SpackCommandError):
+        benchmark("run", "not-a-benchmark")
+
+
+def test_benchmark_run_and_compare(tmp_path):
+    baseline, current = str(tmp_path / "baseline.json"), str(tmp_path / "current.json")
+    benchmark("run", "--scale", "0.001", "-r", "2", "-o", baseline, "spec-parse")
+
+    with open(baseline) as f:
+        results = json.load(f)
+    assert results["scale"] == 0.001
+    phases = results["benchmarks"]["spec-parse"]["phases"]
+    assert set(phases) == {"parse", "format"}
+    assert all(len(p["times"]) == 2 and p["min"] <= p["median"] for p in phases.values())
+
+    # The same results have no slowdown
+    out = benchmark("compare", baseline, baseline)
+    assert "spec-parse/parse" in out
+
+    # Make the current run twice as slow as the baseline in one phase
+    results["benchmarks"]["spec-parse"]["phases"]["parse"]["min"] *= 2
+    with open(current, "w") as f:
+        json.dump(results, f)
+    out = benchmark("compare", "--threshold", "0.5", baseline, current, fail_on_error=False)
+    assert benchmark.returncode == 1
+    assert "1 phases are slower" in out
+
+
+def test_compare_results():
+    def _results(**phases):
+        return {"benchmarks": {"a": {"phases": {k: {"min": v} for k, v in phases.items()}}}}
+
+    comparisons = spack.benchmark.compare(_results(x=1.0, y=2.0, z=1.0), _results(x=1.05, y=3.0))
+    assert [(c.phase, c.ratio) for c in comparisons] == [("x", 1.05), ("y", 1.5)]
+    assert [c.phase for c in spack.benchmark.slowdowns(comparisons, 0.1)] == ["y"]
+
+
+@pytest.mark.maybeslow
+def test_all_benchmarks_run(tmp_path):
+    """Run every benchmark on tiny workloads, to check that they keep working."""
+    with spack.benchmark.mock_session(str(tmp_path)):
+        context = spack.benchmark.Context(str(tmp_path), scale=0.001)
+        benchmarks = spack.benchmark.all_benchmarks()
+        results = spack.benchmark.run(benchmarks.values(), context, repeat=1)
+    assert set(results["benchmarks"]) == set(benchmarks)
+    assert all(r["phases"] for r in results["benchmarks"].values())
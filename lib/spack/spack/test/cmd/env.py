@@ -16,6 +16,7 @@
 import llnl.util.link_tree
 import llnl.util.tty as tty
 
+import spack.binary_distribution
 import spack.cmd.env
 import spack.config
 import spack.environment as ev
@@ -23,10 +24,12 @@
 import spack.environment.environment
 import spack.environment.shell
 import spack.error
+import spack.main
 import spack.modules
 import spack.package_base
 import spack.paths
 import spack.repo
+import spack.store
 import spack.util.spack_json as sjson
 from spack.cmd.env import _env_create
 from spack.main import SpackCommand, SpackCommandError
@@ -2674,6 +2677,68 @@ def test_env_activate_default_view_root_unconditional(mutable_mock_env_path):
     )
 
 
+def test_env_activate_is_cached(mutable_mock_env_path, monkeypatch):
+    """Check that activating an environment twice reads the environment only once, and that
+    writing the environment invalidates the cache."""
+    env("create", "test")
+    first = env("activate", "--sh", "test")
+    ev.deactivate()
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("the activation should be cached")
+
+    with monkeypatch.context() as m:
+        m.setattr(spack.environment.shell, "activate", _fail)
+        assert env("activate", "--sh", "test") == first
+        # Different arguments are cached separately
+        with pytest.raises(AssertionError):
+            env("activate", "--sh", "--without-view", "test")
+
+    # Deactivation is cached too
+    monkeypatch.setenv(ev.spack_env_view_var, ev.default_view_name)
+    ev.activate(ev.read("test"))
+    first = spack.environment.shell.deactivate().to_list()
+    with monkeypatch.context() as m:
+        m.setattr(ev.Environment, "rm_view_from_env", _fail)
+        ev.activate(ev.read("test"))
+        assert spack.environment.shell.deactivate().to_list() == first
+
+    with ev.read("test") as e:
+        assert os.listdir(ev.activation_cache_path(e.path))
+        e.write()
+        assert not os.path.exists(ev.activation_cache_path(e.path))
+
+
+def test_env_activation_cache_key(
+    tmp_path: pathlib.Path, mock_packages, mutable_database, monkeypatch
+):
+    """Check that the activation cache is invalidated by changes to included configuration,
+    to the package files of locked specs, to Spack itself, and to the installation database."""
+    (tmp_path / "spack.yaml").write_text("spack:\n  specs: [a]\n  include: [included.yaml]\n")
+    (tmp_path / "included.yaml").write_text("config: {}\n")
+    first = spack.environment.shell.activation_cache_file(str(tmp_path), "activate")
+    assert spack.environment.shell.activation_cache_file(str(tmp_path), "activate") == first
+
+    (tmp_path / "included.yaml").write_text("config:\n  verify_ssl: false\n")
+    second = spack.environment.shell.activation_cache_file(str(tmp_path), "activate")
+    assert second != first
+
+    monkeypatch.setattr(spack.main, "get_version", lambda: "0.0.0 (0000000)")
+    third = spack.environment.shell.activation_cache_file(str(tmp_path), "activate")
+    assert third != second
+
+    # Installing or uninstalling specs rewrites the database index
+    index_path = spack.store.STORE.db._index_path
+    st = os.stat(index_path)
+    os.utime(index_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    assert spack.environment.shell.activation_cache_file(str(tmp_path), "activate") != third
+
+    lockfile = {"concrete_specs": {"abcd": {"name": "a", "namespace": "builtin.mock"}}}
+    assert spack.environment.shell._package_files(sjson.dump(lockfile).encode()) == [
+        spack.repo.PATH.filename_for_package_name("builtin.mock.a")
+    ]
+
+
 def test_env_activate_custom_view(tmp_path: pathlib.Path, mock_packages):
     """Check that an environment can be activated with a non-default view."""
     env_template = tmp_path / "spack.yaml"
@@ -3147,13 +3212,14 @@ def test_activate_default(monkeypatch):
     assert not ev.exists("default")
 
     # Activating it the first time should create it
-    env("activate", "--sh")
-    env("deactivate", "--sh")
+    assert "SPACK_ENV" in env("activate", "--sh")
+    ev.deactivate()
     assert ev.exists("default")
 
-    # Activating it while it already exists should work
-    env("activate", "--sh")
-    env("deactivate", "--sh")
+    # Activating it while it already exists should work. The second activation is cached, and
+    # does not activate the environment in this process.
+    assert "SPACK_ENV" in env("activate", "--sh")
+    ev.deactivate()
     assert ev.exists("default")
 
     env("remove", "-y", "default")
@@ -3478,6 +3544,102 @@ def test_environment_depfile_makefile(depfile_flags, expected_installs, tmpdir,
     assert len(specs_that_make_would_install) == len(set(specs_that_make_would_install))
 
 
+def test_environment_depfile_makefile_batches(tmpdir, mock_packages):
+    """Test that specs installed from a build cache are installed in batches, in which specs
+    don't depend on each other."""
+    make = Executable("make")
+    makefile = str(tmpdir.join("Makefile"))
+    with ev.create("test") as e:
+        add("dttop")
+        concretize()
+        env(
+            "depfile",
+            "-o",
+            makefile,
+            "--make-disable-jobserver",
+            "--make-prefix=prefix",
+            "--use-buildcache=package:never,dependencies:only",
+            "--make-batch-size=2",
+        )
+
+    out = make("-n", "-f", makefile, output=str)
+    installs = [line for line in out.splitlines() if line.startswith("spack")]
+
+    # The root is built from sources on its own, after all the batches.
+    assert "--use-buildcache=only" not in installs[-1]
+    assert f"/{e.matching_spec('dttop').dag_hash()} #" in installs[-1]
+
+    # Link and run dependencies are installed at most two at a time, and dependencies come
+    # before their dependents.
+    installed = set()
+    for line in installs[:-1]:
+        assert "--only=package --use-buildcache=only" in line
+        names = line.split("# ")[1].split()
+        assert 1 <= len(names) <= 2
+        batch = [e.matching_spec(name) for name in names]
+        for spec in batch:
+            deps = spec.dependencies(deptype=("link", "run"))
+            assert all(dep.name in installed for dep in deps)
+        installed.update(spec.name for spec in batch)
+
+    assert installed == {
+        "dtbuild1",
+        "dtlink1",
+        "dtlink2",
+        "dtlink3",
+        "dtlink4",
+        "dtlink5",
+        "dtrun1",
+        "dtrun2",
+        "dtrun3",
+    }
+
+    # Without build caches nothing is batched in auto mode
+    with e:
+        env("depfile", "-o", makefile, "--make-disable-jobserver", "--make-batch-size=2")
+    out = make("-n", "-f", makefile, output=str)
+    assert "--use-buildcache=only" not in out
+    assert len(_parse_dry_run_package_installs(out)) == 12
+
+
+def test_environment_depfile_makefile_batches_auto(tmpdir, mock_packages, monkeypatch):
+    """Test that in auto mode, specs found in the index of a build cache are installed from it
+    in batches, and their build dependencies are not installed."""
+    make = Executable("make")
+    makefile = str(tmpdir.join("Makefile"))
+    with ev.create("test") as e:
+        add("dttop")
+        concretize()
+    binaries = ["dtlink1", "dtlink3", "dtlink4", "dtlink5", "dtrun1", "dtrun3"]
+    requested = []
+
+    def _update_cache_and_get_specs(names=None):
+        requested.extend(names)
+        return [e.matching_spec(name) for name in binaries]
+
+    monkeypatch.setattr(
+        spack.binary_distribution, "update_cache_and_get_specs", _update_cache_and_get_specs
+    )
+    with e:
+        env("depfile", "-o", makefile, "--make-disable-jobserver", "--make-batch-size=2")
+    assert set(requested) == set(s.name for s in e.matching_spec("dttop").traverse())
+
+    out = make("-n", "-f", makefile, output=str)
+    installs = [line for line in out.splitlines() if line.startswith("spack")]
+    batched = [
+        Spec(name).name
+        for line in installs
+        if "--only=package --use-buildcache=only" in line
+        for name in line.split("# ")[1].split()
+    ]
+    assert sorted(batched) == binaries
+
+    # The build dependency of dtrun3 is not needed, while dtbuild1 and its dependencies are
+    # still built from sources.
+    built = [Spec(line.split("# ")[1]).name for line in installs if "--use-buildcache" not in line]
+    assert sorted(built) == ["dtbuild1", "dtbuild2", "dtlink2", "dtrun2", "dttop"]
+
+
 def test_depfile_safe_format():
     """Test that depfile.MakefileSpec.safe_format() escapes target names."""
 
@@ -1180,6 +1180,37 @@ def install_use_buildcache(opt):
             install_use_buildcache(opt)
 
 
+@pytest.mark.not_on_windows("Buildcache not supported on windows")
+def test_install_from_buildcache_pipeline(
+    mock_packages,
+    mock_fetch,
+    mock_archive,
+    mock_binary_index,
+    tmpdir,
+    install_mockery_mutable_config,
+):
+    """Make sure binary packages can be fetched and extracted ahead of their installation."""
+    mirror_dir = tmpdir.join("mirror_dir")
+    install("dependent-install")
+    buildcache("push", "-u", "-f", mirror_dir.strpath, "dependent-install", "dependency-install")
+    uninstall("-y", "-a")
+    mirror("add", "test-mirror", "file://{0}".format(mirror_dir.strpath))
+
+    spack.config.set("config:binary_install_jobs", 4)
+    out = install("--no-check-signature", "--cache-only", "dependent-install")
+
+    assert "Extracting dependency-install" in out
+    assert "Extracting dependent-install" in out
+    assert "Binary install pipeline throughput" in out
+    for name in ("dependency-install", "dependent-install"):
+        prefix = spack.store.STORE.db.query_one(name).prefix
+        assert os.path.exists(os.path.join(prefix, ".spack", "binary_distribution"))
+
+    # No staging directory is left behind
+    parent = os.path.dirname(spack.store.STORE.db.query_one("dependent-install").prefix)
+    assert not [d for d in os.listdir(parent) if d.endswith(".staging")]
+
+
 @pytest.mark.not_on_windows("Windows logger I/O operation on closed file when install fails")
 @pytest.mark.regression("34006")
 @pytest.mark.disable_clean_stage_check
@@ -3,6 +3,7 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+import inspect
 import os.path
 import re
 
@@ -11,6 +12,7 @@
 import spack.config
 import spack.main
 import spack.modules
+import spack.package_base
 import spack.store
 
 module = spack.main.SpackCommand("module")
@@ -87,6 +89,52 @@ def test_remove_and_add(database, module_type):
         assert os.path.exists(item)
 
 
+@pytest.mark.db
+def test_refresh_skips_up_to_date_module_files(database, mutable_config, tmp_path, monkeypatch):
+    """Tests that refresh only writes module files whose inputs changed."""
+    spack.config.set("modules:default:roots", {"tcl": str(tmp_path)})
+    module("tcl", "refresh", "-y", "--delete-tree", "libelf")
+    filename = _module_files("tcl", "libelf")[0]
+    index = spack.modules.common.read_module_index(str(tmp_path))
+    assert all(entry.digest for entry in index.values())
+
+    def marked_refresh(*args):
+        with open(filename, "w") as f:
+            f.write("not regenerated")
+        module("tcl", "refresh", "-y", *args, "libelf")
+        with open(filename) as f:
+            return f.read() != "not regenerated"
+
+    # Nothing changed
+    assert not marked_refresh()
+
+    # A file defining a base class of the package changed
+    base_file = inspect.getfile(spack.package_base.PackageBase)
+    file_digest = spack.modules.common._file_digest
+    with monkeypatch.context() as m:
+        m.setattr(
+            spack.modules.common,
+            "_file_digest",
+            lambda path: "changed" if path == base_file else file_digest(path),
+        )
+        assert marked_refresh()
+        assert not marked_refresh()
+    assert marked_refresh()
+
+    # The rules that apply to the spec changed
+    tcl_configuration = spack.config.get("modules:default:tcl", {})
+    tcl_configuration["libelf"] = {"environment": {"set": {"FOO": "bar"}}}
+    spack.config.set("modules:default:tcl", tcl_configuration)
+    monkeypatch.setattr(spack.modules.tcl, "configuration_registry", {})
+    assert marked_refresh()
+    with open(filename) as f:
+        assert "FOO" in f.read()
+    assert not marked_refresh()
+
+    # Regeneration is forced
+    assert marked_refresh("--force")
+
+
 @pytest.mark.db
 @pytest.mark.parametrize("cli_args", [["libelf"], ["--full-path", "libelf"]])
 def test_find(database, cli_args, module_type):
@@ -13,6 +13,7 @@
 
 import llnl.util.lang
 
+import spack.caches
 import spack.compilers
 import spack.concretize
 import spack.config
@@ -23,6 +24,7 @@
 import spack.platforms
 import spack.repo
 import spack.solver.asp
+import spack.util.file_cache
 import spack.variant as vt
 from spack.concretize import find_spec
 from spack.spec import CompilerSpec, Spec
@@ -2604,3 +2606,56 @@ def test_reusable_externals_different_spec(mock_packages, tmpdir):
         {"mpich": {"externals": [{"spec": "mpich@4.1 +debug", "prefix": tmpdir.strpath}]}},
         local=False,
     )
+
+
+@pytest.mark.parametrize("spec_str", ["mpileaks", "hypre", "conditional-variant-pkg@2.0"])
+def test_package_facts_cache(spec_str, mutable_config, mock_packages, tmpdir, monkeypatch):
+    """Tests that facts taken from the package facts cache give the same result as the
+    facts computed from the package directives.
+    """
+    monkeypatch.setattr(spack.caches, "MISC_CACHE", spack.util.file_cache.FileCache(str(tmpdir)))
+    expected = Spec(spec_str).concretized()
+
+    spack.config.set("concretizer:package_facts_cache", True)
+    first = Spec(spec_str).concretized()
+    assert first.dag_hash() == expected.dag_hash()
+    assert tmpdir.join("solver-facts").listdir()
+
+    # The second solve must not recompute any package facts
+    def _fail(*args, **kwargs):
+        raise AssertionError("package facts were not taken from the cache")
+
+    monkeypatch.setattr(spack.solver.asp.SpackSolverSetup, "_record_package_facts", _fail)
+    second = Spec(spec_str).concretized()
+    assert second.dag_hash() == expected.dag_hash()
+
+
+def test_package_facts_cache_disabled(mutable_config, mock_packages, monkeypatch):
+    """Tests that package facts are not recorded when the cache is disabled"""
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("package facts are recorded with the cache disabled")
+
+    monkeypatch.setattr(spack.solver.asp.SpackSolverSetup, "_record_package_facts", _fail)
+    spack.config.set("concretizer:package_facts_cache", False)
+    Spec("mpileaks").concretized()
+
+
+def test_package_facts_cache_key_covers_referenced_packages(mock_packages):
+    """Tests that the facts of a package are invalidated when a package its directives
+    refer to changes."""
+    mpileaks = spack.repo.PATH.get_pkg_class("mpileaks")
+    assert {"callpath", "mpi"} <= set(spack.solver.asp._referenced_packages(mpileaks))
+
+    def key():
+        return spack.solver.asp.PackageFactsCache.key(mpileaks, provided=[], tests=False, repos=[])
+
+    before = key()
+    callpath = spack.repo.PATH.filename_for_package_name("callpath")
+    st = os.stat(callpath)
+    try:
+        os.utime(callpath, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+        assert key() != before
+    finally:
+        os.utime(callpath, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert key() == before
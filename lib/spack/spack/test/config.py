@@ -7,6 +7,7 @@
 import getpass
 import io
 import os
+import sys
 import tempfile
 from datetime import date
 
@@ -860,6 +861,60 @@ def test_config_parse_list_in_dict(tmpdir):
         assert "mirrors.yaml:5" in str(e)
 
 
+def test_read_config_file_from_cache(tmp_path, monkeypatch):
+    """Tests that parsed configuration files are cached, and that the cache is not used
+    once the file changes.
+    """
+    cache = spack.config.ConfigFileCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(spack.config, "CONFIG_FILE_CACHE", cache)
+    filename = str(tmp_path / "config.yaml")
+    schema = spack.schema.config.schema
+    with open(filename, "w") as f:
+        f.write("config::\n  verify_ssl: false\n")
+
+    data = spack.config.read_config_file(filename, schema)
+    _, cached = cache.read(filename, schema)
+    assert cached == data
+
+    # Cached data preserves line information and overrides
+    key = next(iter(cached))
+    assert key.override
+    assert cached[key]["verify_ssl"] is False
+    assert syaml.dump_config(cached, stream=None, blame=True) == syaml.dump_config(
+        data, stream=None, blame=True
+    )
+
+    # A different schema does not use the cached data
+    _, cached = cache.read(filename, None)
+    assert cached is None
+
+    # Modifying the file invalidates the cached data
+    with open(filename, "w") as f:
+        f.write("config:\n  verify_ssl: true\n")
+    _, cached = cache.read(filename, schema)
+    assert cached is None
+    assert spack.config.read_config_file(filename, schema)["config"]["verify_ssl"] is True
+
+    # A corrupted cache is ignored
+    with open(cache._entry_path(filename), "wb") as f:
+        f.write(b"garbage")
+    assert spack.config.read_config_file(filename, schema)["config"]["verify_ssl"] is True
+    _, cached = cache.read(filename, schema)
+    assert cached["config"]["verify_ssl"] is True
+
+    # Entries that others can write to are not unpickled
+    if sys.platform != "win32":
+        os.chmod(cache._entry_path(filename), 0o666)
+        _, cached = cache.read(filename, schema)
+        assert cached is None
+
+    # Errors are still reported with their location
+    with open(filename, "w") as f:
+        f.write("config:\n  verify_ssl: true\n  checksum: foobar\n")
+    with pytest.raises(spack.config.ConfigFormatError, match="config.yaml:3"):
+        spack.config.read_config_file(filename, schema)
+
+
 def test_bad_config_section(mock_low_high_config):
     """Test that getting or setting a bad section gives an error."""
     with pytest.raises(spack.config.ConfigSectionError):
@@ -489,6 +489,12 @@ def mock_fetch_cache(monkeypatch):
     monkeypatch.setattr(spack.caches, "FETCH_CACHE", MockCache())
 
 
+@pytest.fixture(autouse=True)
+def disable_config_file_cache(monkeypatch):
+    """Prevents tests from reading and writing parsed configuration files in the user cache."""
+    monkeypatch.setattr(spack.config, "CONFIG_FILE_CACHE", None)
+
+
 @pytest.fixture()
 def mock_binary_index(monkeypatch, tmpdir_factory):
     """Changes the directory for the binary index and creates binary index for
@@ -1086,3 +1086,117 @@ def test_database_construction_doesnt_use_globals(tmpdir, config, nullify_global
     lock_cfg = lock_cfg or spack.database.lock_configuration(config)
     db = spack.database.Database(str(tmpdir), lock_cfg=lock_cfg)
     assert os.path.exists(db.database_directory)
+
+
+def test_binary_index_write_and_read(mutable_database):
+    """Tests that a database read lazily from the binary index answers queries like the
+    database read from index.json, and materializes only the records it needs.
+    """
+    mutable_database.binary_index = True
+    with mutable_database.write_transaction():
+        pass
+    assert os.path.exists(mutable_database._binary_index_path)
+
+    expected = spack.database.Database(mutable_database.root)
+    expected._read_from_file(expected._index_path)
+
+    db = spack.database.Database(mutable_database.root)
+    db._read()
+    assert isinstance(db._data, spack.database.LazyInstallRecords)
+    assert db._installed_prefixes == expected._installed_prefixes
+
+    # Lookups by hash and by name don't materialize unrelated records
+    mpileaks = expected.query_one("mpileaks ^mpich")
+    assert db.get_by_hash(mpileaks.dag_hash()) == [mpileaks]
+    assert set(db._data._records) == set(s.dag_hash() for s in mpileaks.traverse())
+    assert db.query("callpath") == expected.query("callpath")
+    assert len(db._data._records) < len(expected._data)
+
+    # Full queries, including virtuals, give the same results
+    assert db.query() == expected.query()
+    assert db.query("mpi") == expected.query("mpi")
+    assert db.query(installed=any) == expected.query(installed=any)
+
+
+def test_binary_index_stays_consistent_with_json(mutable_database):
+    """Tests that records added and removed through a lazily read database are written to
+    both indexes, and that an outdated binary index is not used.
+    """
+    mutable_database.binary_index = True
+    with mutable_database.write_transaction():
+        pass
+
+    db = spack.database.Database(mutable_database.root, binary_index=True)
+    with db.write_transaction():
+        libelf = db.query_one("libelf")
+        db._remove(libelf)
+        db._add(libelf, spack.store.STORE.layout, explicit=True)
+        assert db.query_one("libelf", installed=any) == libelf
+
+    expected = spack.database.Database(mutable_database.root)
+    expected._read_from_file(expected._index_path)
+    assert expected.get_record("libelf").explicit
+
+    fresh = spack.database.Database(mutable_database.root)
+    fresh._read()
+    assert isinstance(fresh._data, spack.database.LazyInstallRecords)
+    assert fresh.get_record("libelf").explicit
+    assert fresh.query(installed=any) == expected.query(installed=any)
+
+    # Writing without the binary index removes it
+    with fresh.write_transaction():
+        pass
+    assert not os.path.exists(fresh._binary_index_path)
+
+
+@pytest.mark.parametrize(
+    "query_args,query_kwargs",
+    [
+        (("mpileaks",), {}),
+        (("callpath",), {"installed": any}),
+        (("mpi",), {}),
+        ((), {"explicit": True}),
+        ((), {"installed": any, "explicit": True}),
+    ],
+)
+def test_query_scans_only_candidates(query_args, query_kwargs, database, monkeypatch):
+    """Microbenchmark for queries: the secondary indexes must keep the number of records
+    that are scanned equal to the number of matches, independently of the database size.
+    """
+    scanned = []
+    install_type_matches = spack.database.InstallRecord.install_type_matches
+
+    def _count_scans(self, installed):
+        scanned.append(self)
+        return install_type_matches(self, installed)
+
+    monkeypatch.setattr(spack.database.InstallRecord, "install_type_matches", _count_scans)
+    with database.read_transaction():
+        results = database.query_local(*query_args, **query_kwargs)
+        total = len(database._data)
+
+    assert results
+    assert len(scanned) == len(results)
+    assert len(scanned) < total
+
+    # Results come in the order of the records, as without indexes
+    hashes = set(s.dag_hash() for s in results)
+    assert [s.dag_hash() for s in results] == [h for h in database._data if h in hashes]
+
+
+def test_query_indexes_follow_updates(mutable_database):
+    """Tests that the secondary indexes are updated when records change"""
+    assert mutable_database.query("mpileaks", explicit=True)
+    libelf = mutable_database.query_one("libelf")
+    assert not mutable_database.query(explicit=True, hashes=[libelf.dag_hash()])
+
+    mutable_database.update_explicit(libelf, True)
+    assert mutable_database.query(explicit=True, hashes=[libelf.dag_hash()]) == [libelf]
+
+    mpileaks = mutable_database.query_one("mpileaks ^zmpi")
+    mutable_database.remove(mpileaks)
+    assert mpileaks not in mutable_database.query("mpileaks", installed=any)
+
+    now = datetime.datetime.now()
+    assert not mutable_database.query(start_date=now)
+    assert mutable_database.query(end_date=now) == mutable_database.query()
@@ -11,12 +11,14 @@
 
 import llnl.util.filesystem as fs
 
+import spack.config
 import spack.environment as ev
 import spack.spec
 from spack.environment.environment import (
     EnvironmentManifestFile,
     SpackEnvironmentViewError,
     _error_on_nonempty_view_dir,
+    _independent_root_clusters,
 )
 from spack.spec_list import UndefinedReferenceError
 
@@ -813,3 +815,41 @@ def test_deconcretize_then_concretize_does_not_error(mutable_mock_env_path, mock
     assert len(e.concrete_roots()) == 3
     all_root_hashes = set(x.dag_hash() for x in e.concrete_roots())
     assert len(all_root_hashes) == 2
+
+
+def test_independent_root_clusters(mock_packages, config):
+    """Roots that cannot share link or run dependencies end up in different clusters, while
+    roots that can share some are kept together.
+    """
+    specs = [spack.spec.Spec(x) for x in ("mpileaks", "libdwarf", "c", "a")]
+    clusters = _independent_root_clusters(specs)
+    names = sorted(sorted(specs[i].name for i in cluster) for cluster in clusters)
+    # mpileaks and libdwarf may both link to libelf, a and c have nothing in common
+    assert names == [["a"], ["c"], ["libdwarf", "mpileaks"]]
+
+
+@pytest.mark.only_clingo("Parallel unified concretization requires clingo")
+def test_split_independent_roots_matches_joint_solve(tmp_path, mock_packages, config):
+    """Concretizing independent groups of roots in separate processes must give the same
+    result as a single unified solve.
+    """
+    manifest = tmp_path / "spack.yaml"
+    manifest.write_text(
+        """
+    spack:
+      specs:
+      - mpileaks
+      - libdwarf
+      - c
+      concretizer:
+        unify: true
+    """
+    )
+    with ev.Environment(tmp_path) as env:
+        env.concretize()
+        expected = {s.name: s.dag_hash() for s in env.concrete_roots()}
+
+    with spack.config.override("concretizer:split_independent_roots", True):
+        with ev.Environment(tmp_path) as env:
+            env.concretize(force=True)
+            assert {s.name: s.dag_hash() for s in env.concrete_roots()} == expected
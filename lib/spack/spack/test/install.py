@@ -220,10 +220,14 @@ def test_install_times(install_mockery, mock_fetch, mutable_mock_repo):
         times = sjson.load(timefile.read())
 
     # The order should be maintained
-    phases = [x["name"] for x in times["phases"]]
+    phases = [x["name"] for x in times["phases"] if "/" not in x["path"]]
     assert phases == ["stage", "one", "two", "three", "install", "post-install"]
     assert all(isinstance(x["seconds"], float) for x in times["phases"])
 
+    # Each post-install hook is timed
+    hooks = {x["name"] for x in times["phases"] if x["path"].startswith("post-install/")}
+    assert {"sbang", "write_install_manifest"} <= hooks
+
 
 def test_flatten_deps(install_mockery, mock_fetch, mutable_mock_repo):
     """Explicitly test the flattening code for coverage purposes."""
@@ -27,6 +27,7 @@
 import spack.repo
 import spack.spec
 import spack.store
+import spack.util.cpus
 import spack.util.lock as lk
 import spack.version
 
@@ -1437,3 +1438,68 @@ def test_print_install_test_log_failures(
     spack.installer.print_install_test_log(pkg)
     out = capfd.readouterr()[0]
     assert "See test results at" in out
+
+
+def test_concurrent_install(install_mockery, mock_fetch, mutable_config, monkeypatch):
+    """Test that independent packages are built at the same time, and that the
+    builds are still committed to the database in the parent process."""
+    spack.config.set("config:concurrent_packages", 2)
+    const_arg = installer_args(["mpileaks"], {"fake": True})
+    installer = create_installer(const_arg)
+    assert installer.max_active_tasks == 2
+
+    active_counts = []
+    wait_for_active_task = inst.PackageInstaller._wait_for_active_task
+
+    def _wait(installer):
+        active_counts.append(len(installer.active_tasks))
+        return wait_for_active_task(installer)
+
+    monkeypatch.setattr(inst.PackageInstaller, "_wait_for_active_task", _wait)
+    installer.install()
+
+    spec = const_arg[0][0]
+    assert not installer.active_tasks
+    assert max(active_counts) == 2
+    for s in spec.traverse():
+        assert inst.package_id(s.package) in installer.installed
+        assert spack.store.STORE.db.query_one(s, installed=True)
+
+
+@pytest.mark.parametrize("build_jobs,concurrent_packages,expected", [(8, 4, 2), (2, 4, 1)])
+def test_concurrent_install_jobs_share(
+    install_mockery, mutable_config, build_jobs, concurrent_packages, expected
+):
+    """Test that the global job budget is split across concurrent builds."""
+    spack.config.set("config:build_jobs", build_jobs)
+    spack.config.set("config:concurrent_packages", concurrent_packages)
+    installer = create_installer(installer_args(["trivial-install-test-package"]))
+    assert installer._build_jobs_share() == min(expected, spack.util.cpus.cpus_available())
+
+
+@pytest.mark.disable_clean_stage_check
+def test_concurrent_install_failure(install_mockery, mock_fetch, mutable_config, capfd):
+    """Test that a failed build in the background skips the dependents and is
+    reported at the end of the installation."""
+    spack.config.set("config:concurrent_packages", 2)
+    const_arg = installer_args(["a", "failing-build"], {"fake": False})
+    installer = create_installer(const_arg)
+
+    with pytest.raises(inst.InstallError, match="Installation request failed"):
+        installer.install()
+
+    assert not installer.active_tasks
+    assert inst.package_id(const_arg[0][0].package) in installer.installed
+    assert inst.package_id(const_arg[1][0].package) in installer.failed
+    assert "Expected failure" in capfd.readouterr()[1]
+
+
+def test_binary_pipeline_stage_throughput():
+    """Overlapping intervals of concurrent workers are counted once."""
+    stage = inst.StageThroughput("fetch")
+    stage.record(1000000, 0.0, 2.0)
+    stage.record(1000000, 1.0, 3.0)
+    stage.record(2000000, 5.0, 6.0)
+    assert stage.packages == 3
+    assert stage.elapsed == pytest.approx(4.0)
+    assert str(stage) == "fetch: 3 packages, 4.0 MB in 4.000s (1.0 MB/s)"
@@ -77,6 +77,24 @@ def test_log_python_output_with_invalid_utf8(capfd, tmpdir):
         assert capfd.readouterr()[0] == ""
 
 
+def test_log_output_large(capfd, tmpdir):
+    # Output spanning many reads of the writer daemon, with colors, carriage returns and a
+    # force echo region, is logged exactly as line by line.
+    lines = [f"\x1b[1mline\x1b[0m {i}\r\n" if i % 3 else f"line {i}\r" for i in range(100000)]
+    expected = "".join(f"line {i}\n" for i in range(100000))
+    with tmpdir.as_cwd():
+        with log.log_output("foo.txt") as logger:
+            sys.stdout.write("".join(lines[:50000]))
+            with logger.force_echo():
+                print("echo")
+            sys.stdout.write("".join(lines[50000:]))
+
+        with open("foo.txt") as f:
+            assert f.read() == expected.replace("line 50000\n", "echo\nline 50000\n")
+
+        assert capfd.readouterr()[0] == "echo\n"
+
+
 def test_log_python_output_and_echo_output(capfd, tmpdir):
     with tmpdir.as_cwd():
         # echo two lines
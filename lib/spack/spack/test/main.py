@@ -8,8 +8,12 @@
 
 import llnl.util.filesystem as fs
 
+import spack.caches
+import spack.cmd
+import spack.main
 import spack.paths
 import spack.util.executable as exe
+import spack.util.file_cache
 import spack.util.git
 from spack.main import get_version, main
 
@@ -97,3 +101,46 @@ def test_get_version_bad_git(tmpdir, working_env, monkeypatch):
 
     monkeypatch.setattr(spack.util.git, "git", lambda: exe.which(bad_git))
     assert spack.spack_version == get_version()
+
+
+def test_command_descriptions_are_cached(tmp_path, monkeypatch):
+    """Tests that command modules are not imported to get their descriptions, once those
+    are in the cache.
+    """
+    monkeypatch.setattr(spack.caches, "MISC_CACHE", spack.util.file_cache.FileCache(str(tmp_path)))
+    expected = spack.main.command_descriptions()
+    assert expected["install"]["section"] == "build"
+
+    def _fail(cmd_name):
+        raise AssertionError(f"command module {cmd_name} should not be imported")
+
+    monkeypatch.setattr(spack.cmd, "get_module", _fail)
+    assert spack.main.command_descriptions() == expected
+
+    # Help doesn't need the command modules, and the placeholders are completed on demand
+    parser = spack.main.make_argument_parser()
+    assert "spack help --all" in parser.format_help_sections("long")
+    assert "install" in parser.command_placeholders
+
+    monkeypatch.undo()
+    parser.add_command("install")
+    assert "install" not in parser.command_placeholders
+    assert "--overwrite" in parser.subparsers.choices["install"].format_help()
+
+
+def test_parse_import_times():
+    lines = [
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 |     c",
+        "import time:        50 |        150 |   b",
+        "import time:        20 |         20 |   d",
+        "import time:        10 |        180 | a",
+        "import time:         5 |          5 | e",
+        "some other output",
+    ]
+    times = {x.module: x for x in spack.main.parse_import_times(lines)}
+    assert set(times) == {"a", "b", "c", "d", "e"}
+    assert times["c"] == spack.main.ImportTime("c", 100, 100, "b")
+    assert times["b"].parent == "a" and times["d"].parent == "a"
+    assert times["a"].parent == "" and times["e"].parent == ""
+    assert times["a"].cumulative_us == 180
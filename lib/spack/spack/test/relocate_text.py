@@ -237,3 +237,54 @@ def test_relocate_text_filters_redundant_entries():
     replacer_2 = relocate_text.TextFilePrefixReplacer.from_strings_or_bytes(mapping)
     assert not replacer_1.prefix_to_prefix
     assert not replacer_2.prefix_to_prefix
+
+
+@pytest.mark.parametrize("mmap_min_size", [0, 1 << 20])
+def test_binary_replacement_in_file(tmp_path, monkeypatch, mmap_min_size):
+    """Binaries are patched the same way, whether they are memory-mapped or not."""
+    monkeypatch.setattr(relocate_text, "MMAP_MIN_SIZE", mmap_min_size)
+    binary = tmp_path / "binary"
+    binary.write_bytes(b"\0/old/prefix/lib\0 data /old/prefix\0")
+    clean = tmp_path / "clean"
+    clean.write_bytes(b"\0/other/prefix/lib\0")
+
+    replacer = relocate_text.BinaryFilePrefixReplacer.from_strings_or_bytes(
+        {"/old/prefix": "/nw/prefix"}
+    )
+    assert replacer.apply([str(binary), str(clean)]) == [str(binary)]
+    assert binary.read_bytes() == b"\0//nw/prefix/lib\0 data //nw/prefix\0"
+    assert clean.read_bytes() == b"\0/other/prefix/lib\0"
+
+
+def test_apply_to_files_in_worker_processes(tmp_path, monkeypatch):
+    monkeypatch.setattr(relocate_text, "PARALLEL_MIN_SIZE", 0)
+    text_files, binaries = [], []
+    for i in range(8):
+        text_file = tmp_path / f"text-{i}"
+        text_file.write_bytes(b"#!/old/prefix/bin/sh\n" * (i + 1))
+        text_files.append(str(text_file))
+        binary = tmp_path / f"binary-{i}"
+        binary.write_bytes(b"\0/old/prefix/lib\0" if i % 2 else b"\0/other/lib\0")
+        binaries.append(str(binary))
+
+    text_replacer = relocate_text.TextFilePrefixReplacer.from_strings_or_bytes(
+        {"/old/prefix": "/a/much/longer/prefix"}
+    )
+    binary_replacer = relocate_text.BinaryFilePrefixReplacer.from_strings_or_bytes(
+        {"/old/prefix": "/nw/prefix"}
+    )
+    result = relocate_text.apply_to_files(
+        [(text_replacer, text_files), (binary_replacer, binaries)], processes=2
+    )
+
+    assert sorted(result.changed_files) == sorted(text_files + binaries[1::2])
+    assert result.bytes_scanned == 21 * 36 + 4 * 17 + 4 * 12
+    assert (tmp_path / "text-0").read_bytes() == b"#!/a/much/longer/prefix/bin/sh\n"
+    assert (tmp_path / "binary-1").read_bytes() == b"\0//nw/prefix/lib\0"
+
+    # Errors in the workers are re-raised with their type
+    longer = relocate_text.BinaryFilePrefixReplacer.from_strings_or_bytes(
+        {"/other/lib": "/a/much/longer/lib"}
+    )
+    with pytest.raises(relocate_text.CannotGrowString):
+        relocate_text.apply_to_files([(longer, binaries)], processes=2)
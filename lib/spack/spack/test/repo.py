@@ -3,10 +3,13 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 import os
+import time
 
 import pytest
 
+import spack.deptypes as dt
 import spack.package_base
+import spack.package_metadata
 import spack.paths
 import spack.repo
 
@@ -193,3 +196,57 @@ def test_path_computation_with_names(method_name, mock_repo_path):
     unqualified = method("mpileaks")
     qualified = method("builtin.mock.mpileaks")
     assert qualified == unqualified
+
+
+@pytest.mark.parametrize(
+    "pkg_name", ["mpileaks", "multivalue-variant", "conditional-variant-pkg", "mpich", "noversion"]
+)
+def test_package_metadata_matches_package_class(pkg_name, mock_packages):
+    """Tests that the metadata read from the repository index is the same as the one
+    found on the package class.
+    """
+    pkg_cls = mock_packages.get_pkg_class(pkg_name)
+    metadata = mock_packages.package_metadata(pkg_name)
+
+    assert metadata.fullname == pkg_cls.fullname
+    assert metadata.__doc__ == pkg_cls.__doc__
+    assert metadata.homepage == pkg_cls.homepage
+    assert metadata.maintainers == pkg_cls.maintainers
+    assert set(metadata.versions) == set(pkg_cls.versions)
+    for deptype in dt.ALL_TYPES:
+        depflag = dt.flag_from_string(deptype)
+        assert metadata.dependencies_of_type(depflag) == pkg_cls.dependencies_of_type(depflag)
+
+    assert set(metadata.variants) == set(pkg_cls.variants)
+    for name, (variant, whens) in pkg_cls.variants.items():
+        metadata_variant, metadata_whens = metadata.variants[name]
+        assert metadata_variant.default == variant.default
+        assert metadata_variant.description == variant.description
+        assert metadata_whens == whens
+
+    assert metadata.provided == pkg_cls.provided
+
+
+def test_package_metadata_index_follows_package_files(tmpdir, mock_packages, monkeypatch):
+    """Tests that the metadata index is updated when packages are added, and regenerated when
+    it was written in another format.
+    """
+    builder = spack.repo.MockRepositoryBuilder(tmpdir, namespace="metadata")
+    builder.add_package("foo")
+    with spack.repo.use_repositories(builder.root, override=False) as repos:
+        assert set(repos.get_repo("metadata").metadata_index) == {"foo"}
+
+    builder.add_package("bar", dependencies=[("foo", None, None)])
+    future = time.time() + 100
+    os.utime(builder.recipe_filename("bar"), (future, future))
+    with spack.repo.use_repositories(builder.root, override=False) as repos:
+        repo = repos.get_repo("metadata")
+        repo._pkg_checker.invalidate()
+        assert set(repo.metadata_index) == {"foo", "bar"}
+        assert repos.package_metadata("bar").dependencies_of_type(dt.LINK) == {"foo"}
+
+    monkeypatch.setattr(spack.package_metadata, "_INDEX_FORMAT", -1)
+    with spack.repo.use_repositories(builder.root, override=False) as repos:
+        metadata_index = repos.get_repo("metadata").metadata_index
+        assert set(metadata_index) == {"foo", "bar"}
+        assert not metadata_index.outdated
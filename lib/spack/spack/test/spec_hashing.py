@@ -0,0 +1,51 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import pytest
+
+import spack.benchmark.spec
+import spack.hash_types as ht
+import spack.spec
+import spack.spec_hashing
+
+
+@pytest.mark.parametrize("spec_str", ["mpileaks", "hdf5~mpi", "splice-t ^splice-h+foo"])
+def test_batch_hashes_match_node_hashes(spec_str, default_mock_concretization):
+    root = default_mock_concretization(spec_str)
+    expected = {id(s): (s.dag_hash(), s.process_hash()) for s in root.traverse()}
+
+    for node in root.traverse():
+        node.clear_cached_hashes(ignore=(ht.package_hash.attr,))
+    result = spack.spec_hashing.compute_hashes([root])
+
+    assert len(result) == len(expected)
+    for node, hashes in result:
+        assert (hashes["hash"], hashes["process_hash"]) == expected[id(node)]
+        # Hashes must be cached on the concrete specs
+        assert node._hash == hashes["hash"]
+        assert node._process_hash == hashes["process_hash"]
+
+
+def test_batch_hashes_are_bottom_up(default_mock_concretization):
+    root = default_mock_concretization("mpileaks")
+    seen = set()
+    for node, _ in spack.spec_hashing.compute_hashes([root]):
+        assert all(id(child) in seen for child in node.dependencies())
+        seen.add(id(node))
+    assert spack.spec_hashing.compute_hashes([root])[-1][0] is root
+
+
+def test_batch_hashes_reject_package_hash(default_mock_concretization):
+    root = default_mock_concretization("mpileaks")
+    with pytest.raises(ValueError, match="package_hash"):
+        spack.spec_hashing.compute_hashes([root], hashes=(ht.package_hash,))
+
+
+def test_batch_hashes_on_synthetic_dag():
+    root = spack.benchmark.spec.synthetic_dag(200)
+    result = dict((id(s), h["hash"]) for s, h in spack.spec_hashing.compute_hashes([root]))
+
+    for node in root.traverse():
+        node.clear_cached_hashes(ignore=(ht.package_hash.attr,))
+    assert all(result[id(s)] == s.dag_hash() for s in root.traverse())
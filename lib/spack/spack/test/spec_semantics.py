@@ -9,6 +9,7 @@
 
 import spack.directives
 import spack.error
+import spack.spec
 from spack.error import SpecError, UnsatisfiableSpecError
 from spack.spec import (
     ArchSpec,
@@ -1534,3 +1535,23 @@ def test_old_format_strings_trigger_error(default_mock_concretization):
     s = Spec("a").concretized()
     with pytest.raises(SpecFormatStringError):
         s.format("${PACKAGE}-${VERSION}-${HASH}")
+
+
+def test_satisfies_cache(default_mock_concretization):
+    concrete = default_mock_concretization("mpileaks ^mpich")
+    cache = spack.spec.SatisfiesCache(maxsize=2)
+    constraints = ["mpileaks ^mpich@3:", "mpileaks ^[virtuals=mpi] mpich", "^zmpi", "^mpi@:1"]
+    for constraint in constraints:
+        expected = concrete._satisfies(Spec(constraint), deps=True)
+        assert cache.satisfies(concrete, Spec(constraint)) is expected
+        assert cache.satisfies(concrete, Spec(constraint)) is expected
+
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (4, 4, 2)
+
+    # The least recently used entries are evicted
+    cache.satisfies(concrete, Spec(constraints[0]))
+    assert cache.cache_info().misses == 5
+
+    # Edges with different virtuals are different constraints
+    assert Spec("^[virtuals=mpi] mpich")._structural_key() != Spec("^mpich")._structural_key()
@@ -5,13 +5,25 @@
 
 import gzip
 import hashlib
+import io
 import os
 import shutil
 import tarfile
+from contextlib import closing
 from pathlib import Path, PurePath
 
+import pytest
+
+import spack.util.archive
 import spack.util.crypto
-from spack.util.archive import gzip_compressed_tarfile, reproducible_tarfile_from_prefix
+from spack.util.archive import (
+    BlockCompressor,
+    BlockDecompressor,
+    compressed_tarfile,
+    gzip_compressed_tarfile,
+    reproducible_tarfile_from_prefix,
+    tarfile_stream,
+)
 
 
 def test_gzip_compressed_tarball_is_reproducible(tmpdir):
@@ -155,3 +167,92 @@ def test_gzip_compressed_tarball_is_reproducible(tmpdir):
                 == spack.util.crypto.checksum_stream(hashlib.sha256, f)
                 == spack.util.crypto.checksum_stream(hashlib.sha256, g)
             )
+
+
+def _random_bytes(size: int) -> bytes:
+    # Compressible, but not trivially so
+    return b"".join(hashlib.sha256(str(i // 7).encode()).digest() for i in range(size // 32))
+
+
+@pytest.mark.parametrize("size", [0, 1000, 5 * 1024 + 3])
+def test_block_compressor_is_independent_of_jobs(size):
+    """The output only depends on the data, and it can be read by any gzip decompressor"""
+    data = _random_bytes(size)
+    outputs = []
+    for jobs in (1, 4):
+        out = io.BytesIO()
+        with closing(
+            BlockCompressor(out, spack.util.archive.gzip_member, jobs=jobs, block_size=1024)
+        ) as f:
+            f.write(data[:100])
+            f.write(memoryview(data[100:]))
+        outputs.append(out.getvalue())
+
+    assert outputs[0] == outputs[1]
+    assert gzip.decompress(outputs[0]) == data
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_tarfile_stream_round_trip(tmp_path, jobs, monkeypatch):
+    """Tarballs compressed in blocks are extracted in parallel, others serially"""
+    monkeypatch.setattr(spack.util.archive, "BLOCK_SIZE", 4096)
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "data").write_bytes(_random_bytes(50000))
+
+    with gzip_compressed_tarfile(str(tmp_path / "blocks.tar.gz"), jobs=jobs) as (tar, _, _):
+        reproducible_tarfile_from_prefix(tar, str(root))
+    with tarfile.open(str(tmp_path / "serial.tar.gz"), "w:gz") as tar:
+        tar.add(str(root), arcname="root")
+
+    for name in ("blocks.tar.gz", "serial.tar.gz"):
+        destination = tmp_path / name.replace(".", "-")
+        with tarfile_stream(str(tmp_path / name), jobs=jobs) as tar:
+            tar.extractall(str(destination))
+        (extracted,) = destination.glob("**/data")
+        assert extracted.read_bytes() == (root / "data").read_bytes()
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_zstd_block_round_trip(tmp_path, jobs, monkeypatch):
+    """Blocks compressed with zstd are read back in parallel, and by any zstd decompressor"""
+    zstandard = pytest.importorskip("zstandard")
+    data = _random_bytes(5 * 1024 + 3)
+    out = io.BytesIO()
+    with closing(
+        BlockCompressor(out, spack.util.archive.zstd_frame, jobs=jobs, block_size=1024)
+    ) as f:
+        f.write(data)
+    frames = io.BytesIO(out.getvalue())
+    header = frames.read(12)
+    with closing(
+        BlockDecompressor(
+            spack.util.archive._zstd_frames(frames, header),
+            spack.util.archive._unzstd_frame,
+            jobs=jobs,
+        )
+    ) as f:
+        assert f.read() == data
+    reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(out.getvalue()))
+    assert reader.read() == data
+
+    monkeypatch.setattr(spack.util.archive, "BLOCK_SIZE", 4096)
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "data").write_bytes(_random_bytes(50000))
+    path = str(tmp_path / "blocks.tar.zst")
+    with compressed_tarfile(path, "zstd", jobs=jobs) as (tar, _, _):
+        reproducible_tarfile_from_prefix(tar, str(root))
+    with tarfile_stream(path, jobs=jobs) as tar:
+        tar.extractall(str(tmp_path / "extracted"))
+    (extracted,) = (tmp_path / "extracted").glob("**/data")
+    assert extracted.read_bytes() == (root / "data").read_bytes()
+
+
+def test_tarfile_stream_detects_corruption(tmp_path):
+    member = bytearray(spack.util.archive.gzip_member(b"x" * 10000))
+    member[-5] ^= 0xFF
+    (tmp_path / "corrupted.tar.gz").write_bytes(bytes(member))
+    with pytest.raises(tarfile.ReadError):
+        with tarfile_stream(str(tmp_path / "corrupted.tar.gz"), jobs=2) as tar:
+            tar.getmembers()
@@ -4,6 +4,7 @@
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
 """Test Spack's environment utility functions."""
+import json
 import os
 import sys
 
@@ -179,3 +180,26 @@ def test_escape_double_quotes_in_shell_modifications():
         cmds = to_validate.shell_modifications()
         assert 'export VAR="$PATH:$ANOTHER_PATH"' in cmds
         assert r'export QUOTED_VAR="\"MY_VAL\""' in cmds
+
+
+def test_environment_modifications_to_list_round_trip():
+    env = envutil.EnvironmentModifications()
+    env.set("SET", "value", force=True)
+    env.set_path("SET_PATH", ["/a", "/b"], separator=";")
+    env.append_path("PATH", "/c")
+    env.prepend_path("PATH", "/d")
+    env.remove_path("PATH", "/e")
+    env.append_flags("FLAGS", "-O2")
+    env.remove_flags("FLAGS", "-g")
+    env.unset("UNSET")
+    env.deprioritize_system_paths("PATH")
+    env.prune_duplicate_paths("PATH")
+
+    data = env.to_list()
+    assert json.loads(json.dumps(data)) == data
+
+    result = envutil.EnvironmentModifications.from_list(data)
+    assert [type(x) for x in result] == [type(x) for x in env]
+    assert [x.separator for x in result] == [x.separator for x in env]
+    assert list(result) == list(env)
+    assert result.env_modifications[0].force
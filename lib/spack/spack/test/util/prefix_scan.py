@@ -0,0 +1,61 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import os
+
+import pytest
+
+import spack.util.prefix_scan as ps
+
+pytestmark = pytest.mark.not_on_windows("does not run on windows")
+
+
+@pytest.fixture()
+def prefix(tmp_path):
+    (tmp_path / "bin").mkdir()
+    (tmp_path / "lib").mkdir()
+    (tmp_path / "bin" / "script").write_bytes(b"#!/bin/sh\necho hello\n")
+    (tmp_path / "lib" / "libfoo.so").write_bytes(b"\x7fELF" + b"\0" * 60)
+    (tmp_path / "lib" / "data.txt").write_text("hello")
+    (tmp_path / "lib" / "empty").touch()
+    os.link(tmp_path / "lib" / "libfoo.so", tmp_path / "lib" / "libfoo.so.1")
+    os.symlink("libfoo.so", tmp_path / "lib" / "libfoo.so.2")
+    os.symlink("lib", tmp_path / "lib64")
+    return tmp_path
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_prefix_scan(prefix, jobs):
+    scan = ps.PrefixScan(str(prefix), jobs=jobs)
+    assert set(scan.dirs) == {str(prefix / "bin"), str(prefix / "lib")}
+    assert set(scan.symlinks) == {str(prefix / "lib" / "libfoo.so.2"), str(prefix / "lib64")}
+    kinds = {f.rel_path: f.kind for f in scan.files}
+    assert kinds == {
+        os.path.join("bin", "script"): ps.SCRIPT,
+        os.path.join("lib", "libfoo.so"): ps.ELF,
+        os.path.join("lib", "libfoo.so.1"): ps.ELF,
+        os.path.join("lib", "data.txt"): ps.OTHER,
+        os.path.join("lib", "empty"): ps.OTHER,
+    }
+
+    # Hardlinks are reported once on request
+    assert len(scan.files_of_kind(ps.ELF)) == 2
+    assert len(scan.files_of_kind(ps.ELF, unique=True)) == 1
+
+    # The scan is done once, until it is invalidated
+    (prefix / "bin" / "other").write_bytes(b"#!/bin/bash\n")
+    assert len(scan.files_of_kind(ps.SCRIPT)) == 1
+    scan.invalidate()
+    assert len(scan.files_of_kind(ps.SCRIPT)) == 2
+
+
+def test_prefix_scan_map():
+    scan = ps.PrefixScan("/", jobs=3)
+    assert scan.map(lambda x: x * x, range(100)) == [x * x for x in range(100)]
+
+    def _fail(x):
+        raise ValueError(x)
+
+    with pytest.raises(ValueError):
+        scan.map(_fail, range(10))
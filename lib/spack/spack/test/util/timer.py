@@ -90,6 +90,8 @@ def test_timer_stop_stops_all():
     assert t.duration("second") == 2.0
     assert t.duration("third") == 1.0
     assert t.duration() == 4.0
+    assert t.path("third") == "first/second/third"
+    assert t.path("not-a-timer") == "not-a-timer"
 
 
 def test_stopping_unstarted_timer_is_no_error():
@@ -1015,3 +1015,47 @@ def test_semver_regex(tag, expected):
         assert result is None
     else:
         assert result.group() == expected
+
+
+def test_standard_versions_are_interned():
+    assert StandardVersion.from_string("1.2.3") is StandardVersion.from_string("1.2.3")
+    assert Version("1.2.3") is Version("1.2.3")
+
+
+@pytest.mark.parametrize(
+    "lhs,rhs",
+    [
+        ("1.2", "1.10"),
+        ("1.2", "1.2.0"),
+        ("1.2", "1.2a"),
+        ("1.2-beta", "1.2.1"),
+        ("1.a", "1.1"),
+        ("1.2", "develop"),
+        ("stable", "develop"),
+        ("main", "develop"),
+        ("1.2rc1", "1.2rc2"),
+    ],
+)
+def test_sort_key_follows_version_order(lhs, rhs):
+    lhs, rhs = Version(lhs), Version(rhs)
+    assert lhs < rhs and lhs.key < rhs.key
+    assert Version(str(lhs)).key == lhs.key and hash(Version(str(lhs))) == hash(lhs)
+
+
+@pytest.mark.parametrize(
+    "vlist,other,expected",
+    [
+        ("1.0:1.2,1.4,2.0:", "1.3", False),
+        ("1.0:1.2,1.4,2.0:", "1.3:1.3.5", False),
+        ("1.0:1.2,1.4,2.0:", "1.3:1.4", True),
+        ("1.0:1.2,1.4,2.0:", "1.1.3", True),
+        ("1.0:1.2,1.4,2.0:", "1.5:1.9", False),
+        ("1.0:1.2,1.4,2.0:", "1.5:", True),
+        ("=1.2,git.ref=1.2", "1.2.0:1.2.3", False),
+        ("=1.2,git.ref=1.2", "1.2", True),
+    ],
+)
+def test_version_list_intersects_bisect(vlist, other, expected):
+    vlist, other = ver(vlist), ver(other)
+    assert vlist.intersects(other) is expected
+    assert any(v.intersects(other) for v in vlist) is expected
@@ -65,3 +65,73 @@ def pkg_a_add_files_to_view(view, merge_map, skip_if_exists=True):
     view.add_specs(a, b)
     assert os.path.lexists(os.path.join(view_dir, "file"))
     assert os.path.lexists(os.path.join(view_dir, "subdir", "file"))
+
+
+def _view_contents(root):
+    contents = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        for name in dirnames + filenames:
+            path = os.path.join(dirpath, name)
+            rel_path = os.path.relpath(path, root)
+            contents[rel_path] = os.readlink(path) if os.path.islink(path) else None
+    return contents
+
+
+@pytest.mark.not_on_windows("Incremental views require symlinks")
+@pytest.mark.parametrize(
+    "old_names,new_names",
+    [
+        (["b", "a"], ["a"]),
+        (["b", "a"], ["a", "c"]),
+        (["b", "a"], ["c", "b", "a"]),
+        (["a", "b"], ["b", "a"]),
+        (["a"], ["a", "b", "c"]),
+        (["a", "b", "c"], []),
+    ],
+)
+def test_update_view_incrementally(mock_packages, tmp_path, old_names, new_names):
+    """Tests that a view derived from another one is the same as one created from scratch"""
+    specs = {}
+    for name in ("a", "b", "c"):
+        spec = Spec(name)
+        spec.prefix = str(tmp_path / "store" / name)
+        spec._mark_concrete()
+        specs[name] = spec
+
+        prefix = tmp_path / "store" / name
+        (prefix / ".spack").mkdir(parents=True)
+        (prefix / ".spack" / "spec.json").write_text(name)
+        (prefix / "bin").mkdir()
+        (prefix / "bin" / name).write_text(name)
+        (prefix / "share" / "common").mkdir(parents=True)
+        (prefix / "share" / "common" / "file").write_text(name)
+        (prefix / "share" / f"only-{name}").mkdir()
+
+    def view_at(path):
+        path.mkdir()
+        return SimpleFilesystemView(str(path), DirectoryLayout(str(path)), ignore_conflicts=True)
+
+    old_view = view_at(tmp_path / "old")
+    old_view.add_specs(*(specs[n] for n in old_names))
+    old_view.write_state([specs[n] for n in old_names])
+
+    new_specs = [specs[n] for n in new_names]
+    expected = view_at(tmp_path / "expected")
+    expected.add_specs(*new_specs)
+    expected.write_state(new_specs)
+
+    updated = view_at(tmp_path / "updated")
+    assert updated.update_specs(str(tmp_path / "old"), *new_specs)
+    updated.write_state(new_specs)
+
+    assert _view_contents(str(tmp_path / "updated")) == _view_contents(str(tmp_path / "expected"))
+    assert updated.shared_files == expected.shared_files
+
+
+def test_update_view_without_state(mock_packages, tmp_path):
+    """Tests that a view without recorded state cannot be updated incrementally"""
+    (tmp_path / "old").mkdir()
+    (tmp_path / "new").mkdir()
+    view = SimpleFilesystemView(str(tmp_path / "new"), DirectoryLayout(str(tmp_path / "new")))
+    assert not view.update_specs(str(tmp_path / "old"))
+    assert not os.listdir(str(tmp_path / "new"))
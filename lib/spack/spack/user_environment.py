@@ -109,7 +109,9 @@ def environment_modifications_for_specs(
 
     # Dynamic environment changes (setup_run_environment etc)
     setup_context = spack.build_environment.SetupContext(*specs, context=Context.RUN)
-    if set_package_py_globals:
+    # Globals are only needed to run the setup methods of packages, which is not necessary when
+    # their modifications are all cached
+    if set_package_py_globals and not setup_context.run_env_modifications_are_cached():
         setup_context.set_all_package_py_globals()
     env.extend(setup_context.get_env_modifications())
 
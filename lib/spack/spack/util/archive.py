@@ -2,15 +2,43 @@
 # Spack Project Developers. See the top-level COPYRIGHT file for details.
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import collections
+import concurrent.futures
 import errno
+import functools
+import gzip
 import hashlib
 import io
 import os
 import pathlib
+import struct
 import tarfile
+import zlib
 from contextlib import closing, contextmanager
-from gzip import GzipFile
-from typing import Callable, Dict, Tuple
+from typing import BinaryIO, Callable, Deque, Dict, Iterator, Optional, Tuple
+
+import spack.util.cpus
+
+try:
+    import zstandard
+
+    ZSTD_SUPPORTED = True
+except ImportError:
+    ZSTD_SUPPORTED = False
+
+#: Compressions supported for tarballs created by ``compressed_tarfile``
+COMPRESSIONS = ("gzip", "zstd")
+
+#: Size of the blocks of uncompressed data that are compressed independently, in parallel
+BLOCK_SIZE = 1 << 20
+
+#: Identifier of the subfield in the extra field of gzip members that holds the size of the
+#: member. Members with this subfield can be located without decompressing the previous ones.
+GZIP_SIZE_SUBFIELD = b"SZ"
+
+#: Magic number of the skippable zstd frames that hold the size of the next frame, as written
+#: by ``pzstd``
+ZSTD_SIZE_FRAME_MAGIC = 0x184D2A50
 
 
 class ChecksumWriter(io.BufferedIOBase):
@@ -93,31 +121,296 @@ def readline(self, size=-1):
         raise OSError(errno.EBADF, "readline() on write-only object")
 
 
+def gzip_member(data: bytes, level: int = 6) -> bytes:
+    """Return a gzip member with the data passed as input. The header is normalized like with
+    ``gzip --no-name`` (no file name and zero mtime), and has the size of the member in a
+    subfield of its extra field."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    body = compressor.compress(data) + compressor.flush()
+    xfl = 2 if level == 9 else 4 if level == 1 else 0
+    size = 20 + len(body) + 8
+    header = struct.pack("<BBBBIBBH", 0x1F, 0x8B, 8, gzip.FEXTRA, 0, xfl, 255, 8)
+    subfield = GZIP_SIZE_SUBFIELD + struct.pack("<HI", 4, size)
+    trailer = struct.pack("<II", zlib.crc32(data), len(data) & 0xFFFFFFFF)
+    return header + subfield + body + trailer
+
+
+def _gunzip_member(member: bytes) -> bytes:
+    """Decompress a member written by ``gzip_member``."""
+    decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+    data = decompressor.decompress(member[20:-8])
+    crc, size = struct.unpack("<II", member[-8:])
+    if not decompressor.eof or zlib.crc32(data) != crc or len(data) & 0xFFFFFFFF != size:
+        raise tarfile.ReadError("corrupted gzip member")
+    return data
+
+
+def zstd_frame(data: bytes, level: int = 3) -> bytes:
+    """Return a zstd frame with the data passed as input, preceded by a skippable frame with
+    its size, like ``pzstd`` does."""
+    frame = zstandard.ZstdCompressor(level=level, write_checksum=True).compress(data)
+    return struct.pack("<III", ZSTD_SIZE_FRAME_MAGIC, 4, len(frame)) + frame
+
+
+def _unzstd_frame(frame: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(frame)
+
+
+class BlockCompressor(io.BufferedIOBase):
+    """Write-only file object that splits the data written to it in blocks of fixed size, which
+    are compressed independently in a pool of threads, and written in order to another file
+    object. The output depends only on the data and the compression function, not on the number
+    of threads, so it is reproducible."""
+
+    def __init__(
+        self,
+        fileobj: BinaryIO,
+        compress: Callable[[bytes], bytes],
+        jobs: Optional[int] = None,
+        block_size: int = BLOCK_SIZE,
+    ):
+        """
+        Args:
+            fileobj: file object the compressed blocks are written to. It is not closed.
+            compress: function compressing a block of data, including empty ones
+            jobs: number of threads (default: the number of build jobs)
+            block_size: size of the uncompressed blocks
+        """
+        self.fileobj = fileobj
+        self.compress = compress
+        self.jobs = jobs or spack.util.cpus.determine_number_of_jobs(parallel=True)
+        self.block_size = block_size
+        self._buffer = bytearray()
+        self._blocks = 0
+        self._offset = 0
+        self._pending: Deque[concurrent.futures.Future] = collections.deque()
+        self._executor = (
+            concurrent.futures.ThreadPoolExecutor(max_workers=self.jobs) if self.jobs > 1 else None
+        )
+
+    def write(self, data):
+        if self.fileobj is None:
+            raise ValueError("write() on closed file")
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            self._submit(bytes(self._buffer[: self.block_size]))
+            del self._buffer[: self.block_size]
+        length = len(data) if isinstance(data, (bytes, bytearray)) else memoryview(data).nbytes
+        self._offset += length
+        return length
+
+    def tell(self):
+        """Return the number of uncompressed bytes written so far, like ``GzipFile``"""
+        return self._offset
+
+    def _submit(self, block: bytes) -> None:
+        self._blocks += 1
+        if self._executor is None:
+            self.fileobj.write(self.compress(block))
+            return
+        self._pending.append(self._executor.submit(self.compress, block))
+        # Bound the memory used by blocks that are compressed, but not written yet
+        while len(self._pending) > 2 * self.jobs:
+            self.fileobj.write(self._pending.popleft().result())
+
+    def close(self):
+        if self.fileobj is None:
+            return
+        try:
+            # An empty input is compressed as one empty block, so that the output is valid
+            if self._buffer or not self._blocks:
+                self._submit(bytes(self._buffer))
+            while self._pending:
+                self.fileobj.write(self._pending.popleft().result())
+        finally:
+            if self._executor is not None:
+                for future in self._pending:
+                    future.cancel()
+                self._executor.shutdown()
+            self.fileobj = None
+            super().close()
+
+    def readable(self):
+        return False
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+
+class BlockDecompressor(io.RawIOBase):
+    """Read-only file object with the data of compressed blocks decompressed in a pool of
+    threads, in order."""
+
+    def __init__(
+        self,
+        blocks: Iterator[bytes],
+        decompress: Callable[[bytes], bytes],
+        jobs: Optional[int] = None,
+    ):
+        """
+        Args:
+            blocks: compressed blocks
+            decompress: function decompressing a block
+            jobs: number of threads (default: the number of build jobs)
+        """
+        self.blocks = blocks
+        self.decompress = decompress
+        self.jobs = jobs or spack.util.cpus.determine_number_of_jobs(parallel=True)
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.jobs)
+        self._pending: Deque[concurrent.futures.Future] = collections.deque()
+        self._data = memoryview(b"")
+
+    def _fill(self) -> None:
+        for block in self.blocks:
+            self._pending.append(self._executor.submit(self.decompress, block))
+            if len(self._pending) >= 2 * self.jobs:
+                break
+
+    def readinto(self, b):
+        while not self._data:
+            self._fill()
+            if not self._pending:
+                return 0
+            self._data = memoryview(self._pending.popleft().result())
+        n = min(len(b), len(self._data))
+        b[:n] = self._data[:n]
+        self._data = self._data[n:]
+        return n
+
+    def close(self):
+        for future in self._pending:
+            future.cancel()
+        self._executor.shutdown()
+        super().close()
+
+    def readable(self):
+        return True
+
+
+def _read_exactly(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise tarfile.ReadError("unexpected end of compressed data")
+    return data
+
+
+def _gzip_members(f: BinaryIO, first: bytes) -> Iterator[bytes]:
+    """Yield the gzip members written by ``gzip_member``, starting with the header of the
+    first one, which was already read."""
+    header = first
+    while header:
+        if len(header) < 20 or header[12:14] != GZIP_SIZE_SUBFIELD:
+            raise tarfile.ReadError("gzip member without size")
+        (size,) = struct.unpack("<I", header[16:20])
+        yield header + _read_exactly(f, size - 20)
+        header = f.read(20)
+
+
+def _zstd_frames(f: BinaryIO, first: bytes) -> Iterator[bytes]:
+    """Yield the zstd frames written by ``zstd_frame``, starting with the skippable frame with
+    the size of the first one, which was already read."""
+    header = first
+    while header:
+        if len(header) < 12:
+            raise tarfile.ReadError("unexpected end of compressed data")
+        magic, _, size = struct.unpack("<III", header)
+        if magic != ZSTD_SIZE_FRAME_MAGIC:
+            raise tarfile.ReadError("zstd frame without size")
+        yield _read_exactly(f, size)
+        header = f.read(12)
+
+
+def _is_sized_gzip_member(header: bytes) -> bool:
+    return (
+        header[:4] == b"\x1f\x8b\x08" + bytes([gzip.FEXTRA])
+        and header[10:12] == b"\x08\x00"
+        and header[12:14] == GZIP_SIZE_SUBFIELD
+    )
+
+
 @contextmanager
-def gzip_compressed_tarfile(path):
-    """Create a reproducible, gzip compressed tarfile, and keep track of shasums of both the
-    compressed and uncompressed tarfile. Reproduciblity is achived by normalizing the gzip header
-    (no file name and zero mtime).
+def tarfile_stream(path: str, jobs: Optional[int] = None) -> Iterator[tarfile.TarFile]:
+    """Open a possibly compressed tarfile for reading its members in order, as a stream.
+
+    Blocks written by ``compressed_tarfile`` are decompressed in parallel. Other tarfiles
+    compressed with gzip, bzip2, xz or zstd are decompressed serially.
+
+    Args:
+        path: path of the tarfile
+        jobs: number of threads (default: the number of build jobs)
+    """
+    with open(path, "rb") as f:
+        header = f.read(20)
+        if _is_sized_gzip_member(header):
+            reader: BinaryIO = io.BufferedReader(
+                BlockDecompressor(_gzip_members(f, header), _gunzip_member, jobs)
+            )
+        elif header[:4] == struct.pack("<I", ZSTD_SIZE_FRAME_MAGIC) and ZSTD_SUPPORTED:
+            f.seek(12)
+            reader = io.BufferedReader(
+                BlockDecompressor(_zstd_frames(f, header[:12]), _unzstd_frame, jobs)
+            )
+        elif header[:4] == b"\x28\xb5\x2f\xfd" and ZSTD_SUPPORTED:
+            f.seek(0)
+            reader = zstandard.ZstdDecompressor().stream_reader(f)
+        else:
+            # Let tarfile detect other compressions
+            f.seek(0)
+            with tarfile.open(fileobj=f, mode="r|*") as tar:
+                yield tar
+            return
+
+        with closing(reader), tarfile.open(fileobj=reader, mode="r|") as tar:
+            yield tar
+
+
+@contextmanager
+def compressed_tarfile(path: str, compression: str = "gzip", jobs: Optional[int] = None):
+    """Create a reproducible, compressed tarfile, and keep track of shasums of both the
+    compressed and uncompressed tarfile.
+
+    The tarfile is compressed in independent blocks, in parallel. With gzip, each block is a
+    gzip member with its size in the extra field, like in BGZF. With zstd, each block is a
+    frame (the format of ``pzstd``). Both can be decompressed by the standard tools, and in
+    parallel by ``tarfile_stream``.
+
+    Args:
+        path: path of the tarfile
+        compression: one of ``COMPRESSIONS``
+        jobs: number of threads (default: the number of build jobs)
 
     Yields a tuple of the following:
         tarfile.TarFile: tarfile object
-        ChecksumWriter: checksum of the gzip compressed tarfile
+        ChecksumWriter: checksum of the compressed tarfile
         ChecksumWriter: checksum of the uncompressed tarfile
     """
-    # Create gzip compressed tarball of the install prefix
-    # 1) Use explicit empty filename and mtime 0 for gzip header reproducibility.
-    #    If the filename="" is dropped, Python will use fileobj.name instead.
-    #    This should effectively mimick `gzip --no-name`.
-    # 2) On AMD Ryzen 3700X and an SSD disk, we have the following on compression speed:
+    # On AMD Ryzen 3700X and an SSD disk, we have the following on compression speed:
     # compresslevel=6 gzip default: llvm takes 4mins, roughly 2.1GB
     # compresslevel=9 python default: llvm takes 12mins, roughly 2.1GB
-    # So we follow gzip.
-    with open(path, "wb") as f, ChecksumWriter(f) as gzip_checksum, closing(
-        GzipFile(filename="", mode="wb", compresslevel=6, mtime=0, fileobj=gzip_checksum)
-    ) as gzip_file, ChecksumWriter(gzip_file) as tarfile_checksum, tarfile.TarFile(
+    # So we follow gzip. Blocks of 1MB make the output about 0.5% larger than a single stream.
+    if compression == "gzip":
+        compress = functools.partial(gzip_member, level=6)
+    elif compression == "zstd":
+        if not ZSTD_SUPPORTED:
+            raise ValueError("zstd compression requires the zstandard Python module")
+        compress = functools.partial(zstd_frame, level=3)
+    else:
+        raise ValueError(f"unknown compression: {compression}")
+
+    with open(path, "wb") as f, ChecksumWriter(f) as compressed_checksum, closing(
+        BlockCompressor(compressed_checksum, compress, jobs, BLOCK_SIZE)
+    ) as compressed_file, ChecksumWriter(compressed_file) as tarfile_checksum, tarfile.TarFile(
         name="", mode="w", fileobj=tarfile_checksum
     ) as tar:
-        yield tar, gzip_checksum, tarfile_checksum
+        yield tar, compressed_checksum, tarfile_checksum
+
+
+def gzip_compressed_tarfile(path, jobs: Optional[int] = None):
+    """Create a reproducible, gzip compressed tarfile. See ``compressed_tarfile``."""
+    return compressed_tarfile(path, "gzip", jobs)
 
 
 def default_path_to_name(path: str) -> str:
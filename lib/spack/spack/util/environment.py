@@ -418,6 +418,24 @@ def execute(self, env: MutableMapping[str, str]):
         env[self.name] = self.separator.join(directories)
 
 
+#: Serialized name of each kind of modification, matching the method of
+#: ``EnvironmentModifications`` that creates it
+_MODIFIER_NAMES: Dict[type, str] = {
+    SetEnv: "set",
+    AppendFlagsEnv: "append_flags",
+    UnsetEnv: "unset",
+    RemoveFlagsEnv: "remove_flags",
+    SetPath: "set_path",
+    AppendPath: "append_path",
+    PrependPath: "prepend_path",
+    RemovePath: "remove_path",
+    DeprioritizeSystemPaths: "deprioritize_system_paths",
+    PruneDuplicatePaths: "prune_duplicate_paths",
+}
+
+_MODIFIER_TYPES = {name: cls for cls, name in _MODIFIER_NAMES.items()}
+
+
 class EnvironmentModifications:
     """Keeps track of requests to modify the current environment."""
 
@@ -617,6 +635,45 @@ def clear(self):
         """Clears the current list of modifications."""
         self.env_modifications = []
 
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Returns the modifications as a list of JSON serializable dictionaries, which can be
+        read back with ``from_list``. Traces are not serialized."""
+        result = []
+        for item in self.env_modifications:
+            entry: Dict[str, Any] = {
+                "action": _MODIFIER_NAMES[type(item)],
+                "name": item.name,
+                "separator": item.separator,
+            }
+            if isinstance(item, SetPath):
+                entry["value"] = [str(x) for x in item.value]
+            elif isinstance(item, NameValueModifier):
+                entry["value"] = str(item.value)
+            if isinstance(item, SetEnv):
+                entry["force"] = item.force
+                entry["raw"] = item.raw
+            result.append(entry)
+        return result
+
+    @staticmethod
+    def from_list(data: List[Dict[str, Any]]) -> "EnvironmentModifications":
+        """Returns the modifications serialized by ``to_list``."""
+        env = EnvironmentModifications()
+        for entry in data:
+            cls = _MODIFIER_TYPES[entry["action"]]
+            item: Union[NameModifier, NameValueModifier]
+            if cls is SetEnv:
+                item = SetEnv(
+                    entry["name"], entry["value"], force=entry["force"], raw=entry["raw"]
+                )
+                item.separator = entry["separator"]
+            elif issubclass(cls, NameValueModifier):
+                item = cls(entry["name"], entry["value"], separator=entry["separator"])
+            else:
+                item = cls(entry["name"], separator=entry["separator"])
+            env.env_modifications.append(item)
+        return env
+
     def reversed(self) -> "EnvironmentModifications":
         """Returns the EnvironmentModifications object that will reverse self
 
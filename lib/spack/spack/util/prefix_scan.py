@@ -0,0 +1,163 @@
+# Copyright 2013-2024 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Single pass scan of an installation prefix.
+
+Post-install hooks each need a subset of the files in a prefix: ELF files to patch,
+scripts with long shebangs, every entry for the install manifest. A :class:`PrefixScan`
+walks the prefix once, and classifies regular files by peeking at their magic bytes,
+so that each hook only opens the files it is interested in. The per-file work of the
+hooks is then run in a pool of threads.
+"""
+import concurrent.futures
+import os
+import stat
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple, TypeVar
+
+import spack.util.cpus
+
+#: Kinds of files, as determined by their first bytes
+ELF = "elf"
+SCRIPT = "script"
+OTHER = "other"
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def file_kind(path: str) -> str:
+    """Return the kind of a regular file, from its magic bytes."""
+    try:
+        with open(path, "rb") as f:
+            magic = f.read(4)
+    except OSError:
+        return OTHER
+    if magic == b"\x7fELF":
+        return ELF
+    elif magic.startswith(b"#!"):
+        return SCRIPT
+    return OTHER
+
+
+class ScannedFile(NamedTuple):
+    #: absolute path of the file
+    path: str
+    #: path of the file relative to the prefix
+    rel_path: str
+    #: result of ``os.lstat`` at the time of the scan
+    stat: os.stat_result
+    #: one of ``ELF``, ``SCRIPT`` or ``OTHER``. Files that are not regular are ``OTHER``
+    kind: str
+
+
+class PrefixScan:
+    """Directories, symlinks and files in a prefix, scanned lazily the first time they are
+    needed. Symlinked directories are listed with the symlinks, and never entered.
+
+    The scan is not updated when files are changed, so the stat results of files may be
+    stale. Code adding or removing files in the prefix must call :meth:`invalidate`.
+    """
+
+    def __init__(self, prefix: str, jobs: Optional[int] = None):
+        """
+        Args:
+            prefix: directory to scan
+            jobs: number of threads used to process files (default: the number of build
+                jobs)
+        """
+        self.prefix = str(prefix)
+        self.jobs = jobs or spack.util.cpus.determine_number_of_jobs(parallel=True)
+        self._scan: Optional[Tuple[List[str], List[str], List[ScannedFile]]] = None
+
+    def invalidate(self) -> None:
+        """Scan the prefix again the next time its content is needed."""
+        self._scan = None
+
+    @property
+    def dirs(self) -> List[str]:
+        """Absolute paths of the directories in the prefix, excluding the prefix itself"""
+        return self._scanned()[0]
+
+    @property
+    def symlinks(self) -> List[str]:
+        """Absolute paths of the symlinks in the prefix, to files or directories"""
+        return self._scanned()[1]
+
+    @property
+    def files(self) -> List[ScannedFile]:
+        """Entries of the prefix that are neither directories nor symlinks"""
+        return self._scanned()[2]
+
+    def files_of_kind(self, kind: str, unique: bool = False) -> List[ScannedFile]:
+        """Return the files of a given kind.
+
+        Args:
+            kind: one of ``ELF``, ``SCRIPT`` or ``OTHER``
+            unique: if True, only one path is returned for files hardlinked to each other
+        """
+        result, seen = [], set()
+        for f in self.files:
+            if f.kind != kind:
+                continue
+            if unique and f.stat.st_nlink > 1:
+                identifier = (f.stat.st_dev, f.stat.st_ino)
+                if identifier in seen:
+                    continue
+                seen.add(identifier)
+            result.append(f)
+        return result
+
+    def map(self, fn: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        """Apply a function to each item in a pool of threads, and return the results in
+        order. Exceptions raised by the function are propagated.
+
+        Per-file work is dominated by I/O, hashing and subprocesses, which release the GIL,
+        so threads are enough. Items are processed in chunks, to keep the overhead low for
+        prefixes with many small files.
+        """
+        items = list(items)
+        if self.jobs <= 1 or len(items) <= 1:
+            return [fn(item) for item in items]
+
+        def _process(chunk: List[T]) -> List[R]:
+            return [fn(item) for item in chunk]
+
+        size = max(1, len(items) // (4 * self.jobs))
+        chunks = [items[i : i + size] for i in range(0, len(items), size)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            return [result for chunk in executor.map(_process, chunks) for result in chunk]
+
+    def _scanned(self) -> Tuple[List[str], List[str], List[ScannedFile]]:
+        if self._scan is not None:
+            return self._scan
+
+        dirs: List[str] = []
+        symlinks: List[str] = []
+        entries: List[Tuple[str, str, os.stat_result]] = []
+        stack = [(self.prefix, "")]
+        while stack:
+            directory, rel_directory = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        rel_path = os.path.join(rel_directory, entry.name)
+                        if entry.is_symlink():
+                            symlinks.append(entry.path)
+                        elif entry.is_dir(follow_symlinks=False):
+                            dirs.append(entry.path)
+                            stack.append((entry.path, rel_path))
+                        else:
+                            entries.append(
+                                (entry.path, rel_path, entry.stat(follow_symlinks=False))
+                            )
+            except OSError:
+                continue
+
+        def _classify(entry: Tuple[str, str, os.stat_result]) -> ScannedFile:
+            path, rel_path, s = entry
+            kind = file_kind(path) if stat.S_ISREG(s.st_mode) else OTHER
+            return ScannedFile(path, rel_path, s, kind)
+
+        self._scan = dirs, symlinks, self.map(_classify, entries)
+        return self._scan
@@ -36,6 +36,9 @@ def stop(self, name=None):
     def duration(self, name=None):
         return 0.0
 
+    def path(self, name):
+        return name
+
     @contextmanager
     def measure(self, name):
         yield self
@@ -115,6 +118,17 @@ def duration(self, name=global_timer_name):
         else:
             return 0.0
 
+    def path(self, name):
+        """
+        Get the path of a named timer, which is its name prefixed by the names
+        of the timers it is nested in, separated by ``/``.
+
+        Arguments:
+            name (str): name of the timer
+        """
+        self._flatten()
+        return self._timers[name].path if name in self._timers else name
+
     @contextmanager
     def measure(self, name):
         """
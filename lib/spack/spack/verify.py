@@ -6,7 +6,7 @@
 import hashlib
 import os
 import stat
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import llnl.util.tty as tty
 
@@ -15,6 +15,7 @@
 import spack.util.file_permissions as fp
 import spack.util.spack_json as sjson
 from spack.package_base import spack_times_log
+from spack.util.prefix_scan import PrefixScan
 
 
 def compute_hash(path: str, block_size: int = 1048576) -> str:
@@ -48,7 +49,13 @@ def create_manifest_entry(path: str) -> Dict[str, Any]:
     return data
 
 
-def write_manifest(spec):
+def write_manifest(spec, scan: Optional[PrefixScan] = None):
+    """Write the manifest of the files in the prefix of a spec, unless it already has one.
+
+    Args:
+        spec: spec whose prefix is recorded
+        scan: scan of the prefix, if it was already done
+    """
     manifest_file = os.path.join(
         spec.prefix,
         spack.store.STORE.layout.metadata_dir,
@@ -58,11 +65,9 @@ def write_manifest(spec):
     if not os.path.exists(manifest_file):
         tty.debug("Writing manifest file: No manifest from binary")
 
-        manifest = {}
-        for root, dirs, files in os.walk(spec.prefix):
-            for entry in list(dirs + files):
-                path = os.path.join(root, entry)
-                manifest[path] = create_manifest_entry(path)
+        scan = scan or PrefixScan(spec.prefix)
+        paths = scan.dirs + scan.symlinks + [f.path for f in scan.files]
+        manifest = dict(zip(paths, scan.map(create_manifest_entry, paths)))
         manifest[spec.prefix] = create_manifest_entry(spec.prefix)
 
         with open(manifest_file, "w") as f:
@@ -168,6 +173,10 @@ def check_spec_manifest(spec):
             if entry == spack_times_log:
                 continue
 
+            # Do not check the cached run environment, which is updated after installation
+            if entry == spack.store.STORE.layout.env_modifications_file_name:
+                continue
+
             data = manifest.pop(path, {})
             results += check_entry(path, data)
 
@@ -6,7 +6,7 @@
 import numbers
 import re
 from bisect import bisect_left
-from typing import List, Optional, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 from spack.util.spack_yaml import syaml_dict
 
@@ -81,6 +81,21 @@ def __ge__(self, other):
         return self > other or self == other
 
 
+def _sort_key(version: tuple) -> tuple:
+    """Return a flat tuple that sorts like the components of a version, and that is compared
+    without calling back into Python code. Each component takes two items: a tag, that sorts
+    strings before numbers before infinity-like versions, and its value."""
+    key: List[Union[int, str]] = []
+    for c in version:
+        if isinstance(c, int):
+            key.extend((1, c))
+        elif isinstance(c.data, int):
+            key.extend((2, c.data))
+        else:
+            key.extend((0, c.data))
+    return tuple(key)
+
+
 def parse_string_components(string: str) -> Tuple[tuple, tuple]:
     string = string.strip()
 
@@ -93,23 +108,37 @@ def parse_string_components(string: str) -> Tuple[tuple, tuple]:
     return version, separators
 
 
+#: Versions parsed with ``StandardVersion.from_string``, by string
+_interned_versions: Dict[str, "StandardVersion"] = {}
+
+
 class ConcreteVersion:
     pass
 
 
 class StandardVersion(ConcreteVersion):
-    """Class to represent versions"""
+    """Class to represent versions.
+
+    Instances are immutable: versions parsed from the same string are the same object.
+    """
 
-    __slots__ = ["version", "string", "separators"]
+    __slots__ = ["version", "string", "separators", "key"]
 
     def __init__(self, string: Optional[str], version: tuple, separators: tuple):
         self.string = string
         self.version = version
         self.separators = separators
+        self.key = _sort_key(version)
 
     @staticmethod
     def from_string(string: str):
-        return StandardVersion(string, *parse_string_components(string))
+        try:
+            return _interned_versions[string]
+        except KeyError:
+            pass
+        v = StandardVersion(string, *parse_string_components(string))
+        _interned_versions[string] = v
+        return v
 
     @staticmethod
     def typemin():
@@ -124,17 +153,17 @@ def __bool__(self):
 
     def __eq__(self, other):
         if isinstance(other, StandardVersion):
-            return self.version == other.version
+            return self.key == other.key
         return False
 
     def __ne__(self, other):
         if isinstance(other, StandardVersion):
-            return self.version != other.version
+            return self.key != other.key
         return True
 
     def __lt__(self, other):
         if isinstance(other, StandardVersion):
-            return self.version < other.version
+            return self.key < other.key
         if isinstance(other, ClosedOpenRange):
             # Use <= here so that Version(x) < ClosedOpenRange(Version(x), ...).
             return self <= other.lo
@@ -142,7 +171,7 @@ def __lt__(self, other):
 
     def __le__(self, other):
         if isinstance(other, StandardVersion):
-            return self.version <= other.version
+            return self.key <= other.key
         if isinstance(other, ClosedOpenRange):
             # Versions are never equal to ranges, so follow < logic.
             return self <= other.lo
@@ -150,7 +179,7 @@ def __le__(self, other):
 
     def __ge__(self, other):
         if isinstance(other, StandardVersion):
-            return self.version >= other.version
+            return self.key >= other.key
         if isinstance(other, ClosedOpenRange):
             # Versions are never equal to ranges, so follow > logic.
             return self > other.lo
@@ -158,7 +187,7 @@ def __ge__(self, other):
 
     def __gt__(self, other):
         if isinstance(other, StandardVersion):
-            return self.version > other.version
+            return self.key > other.key
         if isinstance(other, ClosedOpenRange):
             return self > other.lo
         return NotImplemented
@@ -205,7 +234,7 @@ def __repr__(self) -> str:
         return f'Version("{str(self)}")'
 
     def __hash__(self):
-        return hash(self.version)
+        return hash(self.key)
 
     def __contains__(rhs, lhs):
         # We should probably get rid of `x in y` for versions, since
@@ -218,7 +247,7 @@ def __contains__(rhs, lhs):
 
     def intersects(self, other: Union["StandardVersion", "GitVersion", "ClosedOpenRange"]) -> bool:
         if isinstance(other, StandardVersion):
-            return self == other
+            return self.key == other.key
         return other.intersects(self)
 
     def overlaps(self, other) -> bool:
@@ -594,11 +623,14 @@ def up_to(self, index) -> StandardVersion:
 
 
 class ClosedOpenRange:
+    __slots__ = ["lo", "hi", "_hash"]
+
     def __init__(self, lo: StandardVersion, hi: StandardVersion):
-        if hi < lo:
+        if hi.key < lo.key:
             raise EmptyRangeError(f"{lo}..{hi} is an empty range")
         self.lo: StandardVersion = lo
         self.hi: StandardVersion = hi
+        self._hash: Optional[int] = None
 
     @classmethod
     def from_version_range(cls, lo: StandardVersion, hi: StandardVersion):
@@ -622,49 +654,51 @@ def __repr__(self):
         return str(self)
 
     def __hash__(self):
-        # prev_version for backward compat.
-        return hash((self.lo, prev_version(self.hi)))
+        if self._hash is None:
+            # prev_version for backward compat.
+            self._hash = hash((self.lo, prev_version(self.hi)))
+        return self._hash
 
     def __eq__(self, other):
         if isinstance(other, StandardVersion):
             return False
         if isinstance(other, ClosedOpenRange):
-            return (self.lo, self.hi) == (other.lo, other.hi)
+            return self.lo.key == other.lo.key and self.hi.key == other.hi.key
         return NotImplemented
 
     def __ne__(self, other):
         if isinstance(other, StandardVersion):
             return True
         if isinstance(other, ClosedOpenRange):
-            return (self.lo, self.hi) != (other.lo, other.hi)
+            return self.lo.key != other.lo.key or self.hi.key != other.hi.key
         return NotImplemented
 
     def __lt__(self, other):
         if isinstance(other, StandardVersion):
             return other > self
         if isinstance(other, ClosedOpenRange):
-            return (self.lo, self.hi) < (other.lo, other.hi)
+            return (self.lo.key, self.hi.key) < (other.lo.key, other.hi.key)
         return NotImplemented
 
     def __le__(self, other):
         if isinstance(other, StandardVersion):
             return other >= self
         if isinstance(other, ClosedOpenRange):
-            return (self.lo, self.hi) <= (other.lo, other.hi)
+            return (self.lo.key, self.hi.key) <= (other.lo.key, other.hi.key)
         return NotImplemented
 
     def __ge__(self, other):
         if isinstance(other, StandardVersion):
             return other <= self
         if isinstance(other, ClosedOpenRange):
-            return (self.lo, self.hi) >= (other.lo, other.hi)
+            return (self.lo.key, self.hi.key) >= (other.lo.key, other.hi.key)
         return NotImplemented
 
     def __gt__(self, other):
         if isinstance(other, StandardVersion):
             return other < self
         if isinstance(other, ClosedOpenRange):
-            return (self.lo, self.hi) > (other.lo, other.hi)
+            return (self.lo.key, self.hi.key) > (other.lo.key, other.hi.key)
         return NotImplemented
 
     def __contains__(rhs, lhs):
@@ -674,22 +708,22 @@ def __contains__(rhs, lhs):
 
     def intersects(self, other: Union[ConcreteVersion, "ClosedOpenRange", "VersionList"]):
         if isinstance(other, StandardVersion):
-            return self.lo <= other < self.hi
+            return self.lo.key <= other.key < self.hi.key
         if isinstance(other, GitVersion):
-            return self.lo <= other.ref_version < self.hi
+            return self.lo.key <= other.ref_version.key < self.hi.key
         if isinstance(other, ClosedOpenRange):
-            return (self.lo < other.hi) and (other.lo < self.hi)
+            return self.lo.key < other.hi.key and other.lo.key < self.hi.key
         if isinstance(other, VersionList):
-            return any(self.intersects(rhs) for rhs in other)
+            return other.intersects(self)
         raise ValueError(f"Unexpected type {type(other)}")
 
     def satisfies(self, other: Union["ClosedOpenRange", ConcreteVersion, "VersionList"]):
         if isinstance(other, ConcreteVersion):
             return False
         if isinstance(other, ClosedOpenRange):
-            return not (self.lo < other.lo or other.hi < self.hi)
+            return other.lo.key <= self.lo.key and self.hi.key <= other.hi.key
         if isinstance(other, VersionList):
-            return any(self.satisfies(rhs) for rhs in other)
+            return any(self.satisfies(rhs) for rhs in other._neighbors(self))
         raise ValueError(other)
 
     def overlaps(self, other: Union["ClosedOpenRange", ConcreteVersion, "VersionList"]) -> bool:
@@ -722,13 +756,19 @@ def intersection(self, other: Union["ClosedOpenRange", ConcreteVersion]):
             return other if self.intersects(other) else VersionList()
 
         # range - range -> range or nothing.
-        max_lo = max(self.lo, other.lo)
-        min_hi = min(self.hi, other.hi)
-        return ClosedOpenRange(max_lo, min_hi) if max_lo < min_hi else VersionList()
+        max_lo = self.lo if self.lo.key >= other.lo.key else other.lo
+        min_hi = self.hi if self.hi.key <= other.hi.key else other.hi
+        return ClosedOpenRange(max_lo, min_hi) if max_lo.key < min_hi.key else VersionList()
 
 
 class VersionList:
-    """Sorted, non-redundant list of Version and ClosedOpenRange elements."""
+    """Sorted, non-redundant list of Version and ClosedOpenRange elements.
+
+    Elements are pairwise disjoint, so the elements that may contain, or intersect, a
+    version or a range are found by bisection.
+    """
+
+    __slots__ = ["versions"]
 
     def __init__(self, vlist=None):
         self.versions: List[StandardVersion, GitVersion, ClosedOpenRange] = []
@@ -743,17 +783,23 @@ def __init__(self, vlist=None):
                 for v in vlist:
                     self.add(ver(v))
 
+    def _neighbors(self, item) -> list:
+        """Return the only elements that can contain ``item``, which is a concrete version
+        or a range."""
+        i = bisect_left(self.versions, item)
+        return self.versions[max(0, i - 1) : i + 1]
+
     def add(self, item):
         if isinstance(item, ConcreteVersion):
-            i = bisect_left(self, item)
+            i = bisect_left(self.versions, item)
             # Only insert when prev and next are not intersected.
-            if (i == 0 or not item.intersects(self[i - 1])) and (
-                i == len(self) or not item.intersects(self[i])
+            if (i == 0 or not item.intersects(self.versions[i - 1])) and (
+                i == len(self.versions) or not item.intersects(self.versions[i])
             ):
                 self.versions.insert(i, item)
 
         elif isinstance(item, ClosedOpenRange):
-            i = bisect_left(self, item)
+            i = bisect_left(self.versions, item)
 
             # Note: can span multiple concrete versions to the left,
             # For instance insert 1.2: into [1.2, hash=1.2, 1.3]
@@ -817,7 +863,9 @@ def satisfies(self, other) -> bool:
         # This exploits the fact that version lists are "reduced" and normalized, so we can
         # never have a list like [1:3, 2:4] since that would be normalized to [1:4]
         if isinstance(other, VersionList):
-            return all(any(lhs.satisfies(rhs) for rhs in other) for lhs in self)
+            return all(
+                any(lhs.satisfies(rhs) for rhs in other._neighbors(lhs)) for lhs in self.versions
+            )
 
         if isinstance(other, (ConcreteVersion, ClosedOpenRange)):
             return all(lhs.satisfies(other) for lhs in self)
@@ -836,8 +884,18 @@ def intersects(self, other):
                     o += 1
             return False
 
-        if isinstance(other, (ClosedOpenRange, StandardVersion)):
-            return any(v.intersects(other) for v in self)
+        if isinstance(other, StandardVersion):
+            return any(v.intersects(other) for v in self._neighbors(other))
+
+        if isinstance(other, ClosedOpenRange):
+            # Elements intersecting the range are contiguous, and can start just before it
+            i = bisect_left(self.versions, other)
+            for v in self.versions[max(0, i - 1) :]:
+                if v.intersects(other):
+                    return True
+                if v >= other.hi:
+                    break
+            return False
 
         raise ValueError(f"Unsupported type {type(other)}")
 
@@ -871,12 +929,10 @@ def union(self, other: "VersionList"):
     def intersection(self, other: "VersionList") -> "VersionList":
         result = VersionList()
         for lhs, rhs in ((self, other), (other, self)):
-            for x in lhs:
-                i = bisect_left(rhs.versions, x)
-                if i > 0:
-                    result.add(rhs[i - 1].intersection(x))
-                if i < len(rhs):
-                    result.add(rhs[i].intersection(x))
+            for x in lhs.versions:
+                for y in rhs._neighbors(x):
+                    if y.intersects(x):
+                        result.add(y.intersection(x))
         return result
 
     def intersect(self, other) -> bool:
@@ -891,8 +947,10 @@ def intersect(self, other) -> bool:
 
     def __contains__(self, other):
         if isinstance(other, (ClosedOpenRange, StandardVersion)):
-            i = bisect_left(self, other)
-            return (i > 0 and other in self[i - 1]) or (i < len(self) and other in self[i])
+            i = bisect_left(self.versions, other)
+            return (i > 0 and other in self.versions[i - 1]) or (
+                i < len(self.versions) and other in self.versions[i]
+            )
 
         if isinstance(other, VersionList):
             return all(item in self for item in other)
@@ -399,9 +399,9 @@ SPACK_ALIASES="concretise:concretize;containerise:containerize;rm:remove"
 _spack() {
     if $list_options
     then
-        SPACK_COMPREPLY="-h --help -H --all-help --color -c --config -C --config-scope -d --debug --timestamp --pdb -e --env -D --env-dir -E --no-env --use-env-repo -k --insecure -l --enable-locks -L --disable-locks -m --mock -b --bootstrap -p --profile --sorted-profile --lines -v --verbose --stacktrace --backtrace -V --version --print-shell-vars"
+        SPACK_COMPREPLY="-h --help -H --all-help --color -c --config -C --config-scope -d --debug --timestamp --pdb -e --env -D --env-dir -E --no-env --use-env-repo -k --insecure -l --enable-locks -L --disable-locks -m --mock -b --bootstrap -p --profile --sorted-profile --lines --startup-profile -v --verbose --stacktrace --backtrace -V --version --print-shell-vars"
     else
-        SPACK_COMPREPLY="add arch audit blame bootstrap build-env buildcache cd change checksum ci clean clone commands compiler compilers concretize concretise config containerize containerise create debug deconcretize dependencies dependents deprecate dev-build develop diff docs edit env extensions external fetch find gc gpg graph help info install license list load location log-parse logs maintainers make-installer mark mirror module patch pkg providers pydoc python reindex remove rm repo resource restage solve spec stage style tags test test-env tutorial undevelop uninstall unit-test unload url verify versions view"
+        SPACK_COMPREPLY="add arch audit benchmark blame bootstrap build-env buildcache cd change checksum ci clean clone commands compiler compilers concretize concretise config containerize containerise create debug deconcretize dependencies dependents deprecate dev-build develop diff docs edit env extensions external fetch find gc gpg graph help info install license list load location log-parse logs maintainers make-installer mark mirror module patch pkg providers pydoc python reindex remove rm repo resource restage solve spec stage style tags test test-env tutorial undevelop uninstall unit-test unload url verify versions view"
     fi
 }
 
@@ -462,6 +462,37 @@ _spack_audit_list() {
     SPACK_COMPREPLY="-h --help"
 }
 
+_spack_benchmark() {
+    if $list_options
+    then
+        SPACK_COMPREPLY="-h --help"
+    else
+        SPACK_COMPREPLY="list run compare"
+    fi
+}
+
+_spack_benchmark_list() {
+    SPACK_COMPREPLY="-h --help"
+}
+
+_spack_benchmark_run() {
+    if $list_options
+    then
+        SPACK_COMPREPLY="-h --help -r --repeat --scale -o --output"
+    else
+        SPACK_COMPREPLY=""
+    fi
+}
+
+_spack_benchmark_compare() {
+    if $list_options
+    then
+        SPACK_COMPREPLY="-h --help --threshold"
+    else
+        SPACK_COMPREPLY=""
+    fi
+}
+
 _spack_blame() {
     if $list_options
     then
@@ -571,7 +602,7 @@ _spack_buildcache() {
 _spack_buildcache_push() {
     if $list_options
     then
-        SPACK_COMPREPLY="-h --help -f --force --allow-root -a --unsigned -u --signed --key -k --update-index --rebuild-index --spec-file --only --fail-fast --base-image --tag -t -j --jobs"
+        SPACK_COMPREPLY="-h --help -f --force --allow-root -a --unsigned -u --signed --key -k --update-index --rebuild-index --spec-file --only --fail-fast --compression --base-image --tag -t -j --jobs"
     else
         _mirrors
     fi
@@ -580,7 +611,7 @@ _spack_buildcache_push() {
 _spack_buildcache_create() {
     if $list_options
     then
-        SPACK_COMPREPLY="-h --help -f --force --allow-root -a --unsigned -u --signed --key -k --update-index --rebuild-index --spec-file --only --fail-fast --base-image --tag -t -j --jobs"
+        SPACK_COMPREPLY="-h --help -f --force --allow-root -a --unsigned -u --signed --key -k --update-index --rebuild-index --spec-file --only --fail-fast --compression --base-image --tag -t -j --jobs"
     else
         _mirrors
     fi
@@ -650,7 +681,7 @@ _spack_buildcache_sync() {
 _spack_buildcache_update_index() {
     if $list_options
     then
-        SPACK_COMPREPLY="-h --help -k --keys"
+        SPACK_COMPREPLY="-h --help -k --keys --incremental --sharded"
     else
         _mirrors
     fi
@@ -659,7 +690,7 @@ _spack_buildcache_update_index() {
 _spack_buildcache_rebuild_index() {
     if $list_options
     then
-        SPACK_COMPREPLY="-h --help -k --keys"
+        SPACK_COMPREPLY="-h --help -k --keys --incremental --sharded"
     else
         _mirrors
     fi
@@ -1126,7 +1157,7 @@ _spack_env_revert() {
 _spack_env_depfile() {
     if $list_options
     then
-        SPACK_COMPREPLY="-h --help --make-prefix --make-target-prefix --make-disable-jobserver --use-buildcache -o --output -G --generator"
+        SPACK_COMPREPLY="-h --help --make-prefix --make-target-prefix --make-disable-jobserver --make-batch-size --use-buildcache -o --output -G --generator"
     else
         _all_packages
     fi
@@ -1299,7 +1330,7 @@ _spack_info() {
 _spack_install() {
     if $list_options
     then
-        SPACK_COMPREPLY="-h --help --only -u --until -j --jobs --overwrite --fail-fast --keep-prefix --keep-stage --dont-restage --use-cache --no-cache --cache-only --use-buildcache --include-build-deps --no-check-signature --show-log-on-error --source -n --no-checksum --deprecated -v --verbose --fake --only-concrete --add --no-add -f --file --clean --dirty --test --log-format --log-file --help-cdash --cdash-upload-url --cdash-build --cdash-site --cdash-track --cdash-buildstamp -y --yes-to-all -U --fresh --reuse --reuse-deps"
+        SPACK_COMPREPLY="-h --help --only -u --until -j --jobs -p --concurrent-packages --overwrite --fail-fast --keep-prefix --keep-stage --dont-restage --use-cache --no-cache --cache-only --use-buildcache --include-build-deps --no-check-signature --show-log-on-error --source -n --no-checksum --deprecated -v --verbose --fake --only-concrete --add --no-add -f --file --clean --dirty --test --log-format --log-file --help-cdash --cdash-upload-url --cdash-build --cdash-site --cdash-track --cdash-buildstamp -y --yes-to-all -U --fresh --reuse --reuse-deps"
     else
         _all_packages
     fi
@@ -1490,7 +1521,7 @@ _spack_module_lmod() {
 _spack_module_lmod_refresh() {
     if $list_options
     then
-        SPACK_COMPREPLY="-h --help --delete-tree --upstream-modules -y --yes-to-all"
+        SPACK_COMPREPLY="-h --help --delete-tree --upstream-modules --force -y --yes-to-all -j --jobs"
     else
         _installed_packages
     fi
@@ -1544,7 +1575,7 @@ _spack_module_tcl() {
 _spack_module_tcl_refresh() {
     if $list_options
     then
-        SPACK_COMPREPLY="-h --help --delete-tree --upstream-modules -y --yes-to-all"
+        SPACK_COMPREPLY="-h --help --delete-tree --upstream-modules --force -y --yes-to-all -j --jobs"
     else
         _installed_packages
     fi
@@ -347,10 +347,11 @@ complete -c spack --erase
 # Everything below here is auto-generated.
 
 # spack
-set -g __fish_spack_optspecs_spack h/help H/all-help color= c/config= C/config-scope= d/debug timestamp pdb e/env= D/env-dir= E/no-env use-env-repo k/insecure l/enable-locks L/disable-locks m/mock b/bootstrap p/profile sorted-profile= lines= v/verbose stacktrace backtrace V/version print-shell-vars=
+set -g __fish_spack_optspecs_spack h/help H/all-help color= c/config= C/config-scope= d/debug timestamp pdb e/env= D/env-dir= E/no-env use-env-repo k/insecure l/enable-locks L/disable-locks m/mock b/bootstrap p/profile sorted-profile= lines= startup-profile v/verbose stacktrace backtrace V/version print-shell-vars=
 complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a add -d 'add a spec to an environment'
 complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a arch -d 'print architecture information about this machine'
 complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a audit -d 'audit configuration files, packages, etc.'
+complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a benchmark -d 'measure the performance of Spack on synthetic workloads'
 complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a blame -d 'show contributors to packages'
 complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a bootstrap -d 'manage bootstrap configuration'
 complete -c spack -n '__fish_spack_using_command_pos 0 ' -f -a build-env -d 'run a command in a spec\'s install environment, or dump its environment to screen or file'
@@ -469,6 +470,8 @@ complete -c spack -n '__fish_spack_using_command ' -l sorted-profile -r -f -a so
 complete -c spack -n '__fish_spack_using_command ' -l sorted-profile -r -d 'profile and sort'
 complete -c spack -n '__fish_spack_using_command ' -l lines -r -f -a lines
 complete -c spack -n '__fish_spack_using_command ' -l lines -r -d 'lines of profile output or \'all\' (default: 20)'
+complete -c spack -n '__fish_spack_using_command ' -l startup-profile -f -a startup_profile
+complete -c spack -n '__fish_spack_using_command ' -l startup-profile -d 'report the time spent importing each module during startup'
 complete -c spack -n '__fish_spack_using_command ' -s v -l verbose -f -a verbose
 complete -c spack -n '__fish_spack_using_command ' -s v -l verbose -d 'print additional output during builds'
 complete -c spack -n '__fish_spack_using_command ' -l stacktrace -f -a stacktrace
@@ -549,6 +552,39 @@ set -g __fish_spack_optspecs_spack_audit_list h/help
 complete -c spack -n '__fish_spack_using_command audit list' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command audit list' -s h -l help -d 'show this help message and exit'
 
+# spack benchmark
+set -g __fish_spack_optspecs_spack_benchmark h/help
+complete -c spack -n '__fish_spack_using_command_pos 0 benchmark' -f -a list -d 'list the available benchmarks'
+complete -c spack -n '__fish_spack_using_command_pos 0 benchmark' -f -a run -d 'run benchmarks'
+complete -c spack -n '__fish_spack_using_command_pos 0 benchmark' -f -a compare -d 'compare the results of two runs'
+complete -c spack -n '__fish_spack_using_command benchmark' -s h -l help -f -a help
+complete -c spack -n '__fish_spack_using_command benchmark' -s h -l help -d 'show this help message and exit'
+
+# spack benchmark list
+set -g __fish_spack_optspecs_spack_benchmark_list h/help
+complete -c spack -n '__fish_spack_using_command benchmark list' -s h -l help -f -a help
+complete -c spack -n '__fish_spack_using_command benchmark list' -s h -l help -d 'show this help message and exit'
+
+# spack benchmark run
+set -g __fish_spack_optspecs_spack_benchmark_run h/help r/repeat= scale= o/output=
+
+complete -c spack -n '__fish_spack_using_command benchmark run' -s h -l help -f -a help
+complete -c spack -n '__fish_spack_using_command benchmark run' -s h -l help -d 'show this help message and exit'
+complete -c spack -n '__fish_spack_using_command benchmark run' -s r -l repeat -r -f -a repeat
+complete -c spack -n '__fish_spack_using_command benchmark run' -s r -l repeat -r -d 'number of times each benchmark is run (default: 3)'
+complete -c spack -n '__fish_spack_using_command benchmark run' -l scale -r -f -a scale
+complete -c spack -n '__fish_spack_using_command benchmark run' -l scale -r -d 'factor applied to the size of the workloads (default: 1.0)'
+complete -c spack -n '__fish_spack_using_command benchmark run' -s o -l output -r -f -a output
+complete -c spack -n '__fish_spack_using_command benchmark run' -s o -l output -r -d 'write the results as JSON to this file'
+
+# spack benchmark compare
+set -g __fish_spack_optspecs_spack_benchmark_compare h/help threshold=
+
+complete -c spack -n '__fish_spack_using_command benchmark compare' -s h -l help -f -a help
+complete -c spack -n '__fish_spack_using_command benchmark compare' -s h -l help -d 'show this help message and exit'
+complete -c spack -n '__fish_spack_using_command benchmark compare' -l threshold -r -f -a threshold
+complete -c spack -n '__fish_spack_using_command benchmark compare' -l threshold -r -d 'relative slowdown reported as a regression (default: 0.1)'
+
 # spack blame
 set -g __fish_spack_optspecs_spack_blame h/help t/time p/percent g/git json
 complete -c spack -n '__fish_spack_using_command_pos 0 blame' $__fish_spack_force_files -a '(__fish_spack_packages)'
@@ -698,7 +734,7 @@ complete -c spack -n '__fish_spack_using_command buildcache' -s h -l help -f -a
 complete -c spack -n '__fish_spack_using_command buildcache' -s h -l help -d 'show this help message and exit'
 
 # spack buildcache push
-set -g __fish_spack_optspecs_spack_buildcache_push h/help f/force a/allow-root u/unsigned signed k/key= update-index spec-file= only= fail-fast base-image= t/tag= j/jobs=
+set -g __fish_spack_optspecs_spack_buildcache_push h/help f/force a/allow-root u/unsigned signed k/key= update-index spec-file= only= fail-fast compression= base-image= t/tag= j/jobs=
 complete -c spack -n '__fish_spack_using_command_pos_remainder 1 buildcache push' -f -k -a '(__fish_spack_specs)'
 complete -c spack -n '__fish_spack_using_command buildcache push' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command buildcache push' -s h -l help -d 'show this help message and exit'
@@ -720,6 +756,8 @@ complete -c spack -n '__fish_spack_using_command buildcache push' -l only -r -f
 complete -c spack -n '__fish_spack_using_command buildcache push' -l only -r -d 'select the buildcache mode. The default is to build a cache for the package along with all its dependencies. Alternatively, one can decide to build a cache for only the package or only the dependencies'
 complete -c spack -n '__fish_spack_using_command buildcache push' -l fail-fast -f -a fail_fast
 complete -c spack -n '__fish_spack_using_command buildcache push' -l fail-fast -d 'stop pushing on first failure (default is best effort)'
+complete -c spack -n '__fish_spack_using_command buildcache push' -l compression -r -f -a 'gzip zstd'
+complete -c spack -n '__fish_spack_using_command buildcache push' -l compression -r -d 'compression of the tarballs. zstd requires the zstandard Python module, and tarballs compressed with it use build cache layout version 3, which older versions of Spack ignore'
 complete -c spack -n '__fish_spack_using_command buildcache push' -l base-image -r -f -a base_image
 complete -c spack -n '__fish_spack_using_command buildcache push' -l base-image -r -d 'specify the base image for the buildcache'
 complete -c spack -n '__fish_spack_using_command buildcache push' -l tag -s t -r -f -a tag
@@ -728,7 +766,7 @@ complete -c spack -n '__fish_spack_using_command buildcache push' -s j -l jobs -
 complete -c spack -n '__fish_spack_using_command buildcache push' -s j -l jobs -r -d 'explicitly set number of parallel jobs'
 
 # spack buildcache create
-set -g __fish_spack_optspecs_spack_buildcache_create h/help f/force a/allow-root u/unsigned signed k/key= update-index spec-file= only= fail-fast base-image= t/tag= j/jobs=
+set -g __fish_spack_optspecs_spack_buildcache_create h/help f/force a/allow-root u/unsigned signed k/key= update-index spec-file= only= fail-fast compression= base-image= t/tag= j/jobs=
 complete -c spack -n '__fish_spack_using_command_pos_remainder 1 buildcache create' -f -k -a '(__fish_spack_specs)'
 complete -c spack -n '__fish_spack_using_command buildcache create' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command buildcache create' -s h -l help -d 'show this help message and exit'
@@ -750,6 +788,8 @@ complete -c spack -n '__fish_spack_using_command buildcache create' -l only -r -
 complete -c spack -n '__fish_spack_using_command buildcache create' -l only -r -d 'select the buildcache mode. The default is to build a cache for the package along with all its dependencies. Alternatively, one can decide to build a cache for only the package or only the dependencies'
 complete -c spack -n '__fish_spack_using_command buildcache create' -l fail-fast -f -a fail_fast
 complete -c spack -n '__fish_spack_using_command buildcache create' -l fail-fast -d 'stop pushing on first failure (default is best effort)'
+complete -c spack -n '__fish_spack_using_command buildcache create' -l compression -r -f -a 'gzip zstd'
+complete -c spack -n '__fish_spack_using_command buildcache create' -l compression -r -d 'compression of the tarballs. zstd requires the zstandard Python module, and tarballs compressed with it use build cache layout version 3, which older versions of Spack ignore'
 complete -c spack -n '__fish_spack_using_command buildcache create' -l base-image -r -f -a base_image
 complete -c spack -n '__fish_spack_using_command buildcache create' -l base-image -r -d 'specify the base image for the buildcache'
 complete -c spack -n '__fish_spack_using_command buildcache create' -l tag -s t -r -f -a tag
@@ -862,20 +902,28 @@ complete -c spack -n '__fish_spack_using_command buildcache sync' -l manifest-gl
 complete -c spack -n '__fish_spack_using_command buildcache sync' -l manifest-glob -r -d 'a quoted glob pattern identifying copy manifest files'
 
 # spack buildcache update-index
-set -g __fish_spack_optspecs_spack_buildcache_update_index h/help k/keys
+set -g __fish_spack_optspecs_spack_buildcache_update_index h/help k/keys incremental sharded
 
 complete -c spack -n '__fish_spack_using_command buildcache update-index' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command buildcache update-index' -s h -l help -d 'show this help message and exit'
 complete -c spack -n '__fish_spack_using_command buildcache update-index' -s k -l keys -f -a keys
 complete -c spack -n '__fish_spack_using_command buildcache update-index' -s k -l keys -d 'if provided, key index will be updated as well as package index'
+complete -c spack -n '__fish_spack_using_command buildcache update-index' -l incremental -f -a incremental
+complete -c spack -n '__fish_spack_using_command buildcache update-index' -l incremental -d 'only apply the specs pushed since the last update to the existing index'
+complete -c spack -n '__fish_spack_using_command buildcache update-index' -l sharded -f -a sharded
+complete -c spack -n '__fish_spack_using_command buildcache update-index' -l sharded -d 'also split the index in shards, so clients fetch only the specs they need'
 
 # spack buildcache rebuild-index
-set -g __fish_spack_optspecs_spack_buildcache_rebuild_index h/help k/keys
+set -g __fish_spack_optspecs_spack_buildcache_rebuild_index h/help k/keys incremental sharded
 
 complete -c spack -n '__fish_spack_using_command buildcache rebuild-index' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command buildcache rebuild-index' -s h -l help -d 'show this help message and exit'
 complete -c spack -n '__fish_spack_using_command buildcache rebuild-index' -s k -l keys -f -a keys
 complete -c spack -n '__fish_spack_using_command buildcache rebuild-index' -s k -l keys -d 'if provided, key index will be updated as well as package index'
+complete -c spack -n '__fish_spack_using_command buildcache rebuild-index' -l incremental -f -a incremental
+complete -c spack -n '__fish_spack_using_command buildcache rebuild-index' -l incremental -d 'only apply the specs pushed since the last update to the existing index'
+complete -c spack -n '__fish_spack_using_command buildcache rebuild-index' -l sharded -f -a sharded
+complete -c spack -n '__fish_spack_using_command buildcache rebuild-index' -l sharded -d 'also split the index in shards, so clients fetch only the specs they need'
 
 # spack cd
 set -g __fish_spack_optspecs_spack_cd h/help m/module-dir r/spack-root i/install-dir p/package-dir P/packages s/stage-dir S/stages source-dir b/build-dir e/env= first
@@ -1615,7 +1663,7 @@ complete -c spack -n '__fish_spack_using_command env revert' -s y -l yes-to-all
 complete -c spack -n '__fish_spack_using_command env revert' -s y -l yes-to-all -d 'assume "yes" is the answer to every confirmation request'
 
 # spack env depfile
-set -g __fish_spack_optspecs_spack_env_depfile h/help make-prefix= make-disable-jobserver use-buildcache= o/output= G/generator=
+set -g __fish_spack_optspecs_spack_env_depfile h/help make-prefix= make-disable-jobserver make-batch-size= use-buildcache= o/output= G/generator=
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 env depfile' -f -k -a '(__fish_spack_specs)'
 complete -c spack -n '__fish_spack_using_command env depfile' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command env depfile' -s h -l help -d 'show this help message and exit'
@@ -1623,6 +1671,8 @@ complete -c spack -n '__fish_spack_using_command env depfile' -l make-prefix -l
 complete -c spack -n '__fish_spack_using_command env depfile' -l make-prefix -l make-target-prefix -r -d 'prefix Makefile targets (and variables) with <TARGET>/<name>'
 complete -c spack -n '__fish_spack_using_command env depfile' -l make-disable-jobserver -f -a jobserver
 complete -c spack -n '__fish_spack_using_command env depfile' -l make-disable-jobserver -d 'disable POSIX jobserver support'
+complete -c spack -n '__fish_spack_using_command env depfile' -l make-batch-size -r -f -a batch_size
+complete -c spack -n '__fish_spack_using_command env depfile' -l make-batch-size -r -d 'install specs from a build cache in batches of at most N specs'
 complete -c spack -n '__fish_spack_using_command env depfile' -l use-buildcache -r -f -a use_buildcache
 complete -c spack -n '__fish_spack_using_command env depfile' -l use-buildcache -r -d 'when using `only`, redundant build dependencies are pruned from the DAG'
 complete -c spack -n '__fish_spack_using_command env depfile' -s o -l output -r -f -a output
@@ -1931,7 +1981,7 @@ complete -c spack -n '__fish_spack_using_command info' -l variants-by-name -f -a
 complete -c spack -n '__fish_spack_using_command info' -l variants-by-name -d 'list variants in strict name order; don\'t group by condition'
 
 # spack install
-set -g __fish_spack_optspecs_spack_install h/help only= u/until= j/jobs= overwrite fail-fast keep-prefix keep-stage dont-restage use-cache no-cache cache-only use-buildcache= include-build-deps no-check-signature show-log-on-error source n/no-checksum deprecated v/verbose fake only-concrete add no-add f/file= clean dirty test= log-format= log-file= help-cdash cdash-upload-url= cdash-build= cdash-site= cdash-track= cdash-buildstamp= y/yes-to-all U/fresh reuse reuse-deps
+set -g __fish_spack_optspecs_spack_install h/help only= u/until= j/jobs= p/concurrent-packages= overwrite fail-fast keep-prefix keep-stage dont-restage use-cache no-cache cache-only use-buildcache= include-build-deps no-check-signature show-log-on-error source n/no-checksum deprecated v/verbose fake only-concrete add no-add f/file= clean dirty test= log-format= log-file= help-cdash cdash-upload-url= cdash-build= cdash-site= cdash-track= cdash-buildstamp= y/yes-to-all U/fresh reuse reuse-deps
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 install' -f -k -a '(__fish_spack_specs)'
 complete -c spack -n '__fish_spack_using_command install' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command install' -s h -l help -d 'show this help message and exit'
@@ -1941,6 +1991,8 @@ complete -c spack -n '__fish_spack_using_command install' -s u -l until -r -f -a
 complete -c spack -n '__fish_spack_using_command install' -s u -l until -r -d 'phase to stop after when installing (default None)'
 complete -c spack -n '__fish_spack_using_command install' -s j -l jobs -r -f -a jobs
 complete -c spack -n '__fish_spack_using_command install' -s j -l jobs -r -d 'explicitly set number of parallel jobs'
+complete -c spack -n '__fish_spack_using_command install' -s p -l concurrent-packages -r -f -a concurrent_packages
+complete -c spack -n '__fish_spack_using_command install' -s p -l concurrent-packages -r -d 'maximum number of packages to build concurrently'
 complete -c spack -n '__fish_spack_using_command install' -l overwrite -f -a overwrite
 complete -c spack -n '__fish_spack_using_command install' -l overwrite -d 'reinstall an existing spec, even if it has dependents'
 complete -c spack -n '__fish_spack_using_command install' -l fail-fast -f -a fail_fast
@@ -2343,7 +2395,7 @@ complete -c spack -n '__fish_spack_using_command module lmod' -s n -l name -r -f
 complete -c spack -n '__fish_spack_using_command module lmod' -s n -l name -r -d 'named module set to use from modules configuration'
 
 # spack module lmod refresh
-set -g __fish_spack_optspecs_spack_module_lmod_refresh h/help delete-tree upstream-modules y/yes-to-all
+set -g __fish_spack_optspecs_spack_module_lmod_refresh h/help delete-tree upstream-modules force y/yes-to-all j/jobs=
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 module lmod refresh' -f -a '(__fish_spack_installed_specs)'
 complete -c spack -n '__fish_spack_using_command module lmod refresh' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command module lmod refresh' -s h -l help -d 'show this help message and exit'
@@ -2351,8 +2403,12 @@ complete -c spack -n '__fish_spack_using_command module lmod refresh' -l delete-
 complete -c spack -n '__fish_spack_using_command module lmod refresh' -l delete-tree -d 'delete the module file tree before refresh'
 complete -c spack -n '__fish_spack_using_command module lmod refresh' -l upstream-modules -f -a upstream_modules
 complete -c spack -n '__fish_spack_using_command module lmod refresh' -l upstream-modules -d 'generate modules for packages installed upstream'
+complete -c spack -n '__fish_spack_using_command module lmod refresh' -l force -f -a force
+complete -c spack -n '__fish_spack_using_command module lmod refresh' -l force -d 'regenerate module files even when what they are generated from did not change'
 complete -c spack -n '__fish_spack_using_command module lmod refresh' -s y -l yes-to-all -f -a yes_to_all
 complete -c spack -n '__fish_spack_using_command module lmod refresh' -s y -l yes-to-all -d 'assume "yes" is the answer to every confirmation request'
+complete -c spack -n '__fish_spack_using_command module lmod refresh' -s j -l jobs -r -f -a jobs
+complete -c spack -n '__fish_spack_using_command module lmod refresh' -s j -l jobs -r -d 'explicitly set number of parallel jobs'
 
 # spack module lmod find
 set -g __fish_spack_optspecs_spack_module_lmod_find h/help full-path r/dependencies
@@ -2405,7 +2461,7 @@ complete -c spack -n '__fish_spack_using_command module tcl' -s n -l name -r -f
 complete -c spack -n '__fish_spack_using_command module tcl' -s n -l name -r -d 'named module set to use from modules configuration'
 
 # spack module tcl refresh
-set -g __fish_spack_optspecs_spack_module_tcl_refresh h/help delete-tree upstream-modules y/yes-to-all
+set -g __fish_spack_optspecs_spack_module_tcl_refresh h/help delete-tree upstream-modules force y/yes-to-all j/jobs=
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 module tcl refresh' -f -a '(__fish_spack_installed_specs)'
 complete -c spack -n '__fish_spack_using_command module tcl refresh' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command module tcl refresh' -s h -l help -d 'show this help message and exit'
@@ -2413,8 +2469,12 @@ complete -c spack -n '__fish_spack_using_command module tcl refresh' -l delete-t
 complete -c spack -n '__fish_spack_using_command module tcl refresh' -l delete-tree -d 'delete the module file tree before refresh'
 complete -c spack -n '__fish_spack_using_command module tcl refresh' -l upstream-modules -f -a upstream_modules
 complete -c spack -n '__fish_spack_using_command module tcl refresh' -l upstream-modules -d 'generate modules for packages installed upstream'
+complete -c spack -n '__fish_spack_using_command module tcl refresh' -l force -f -a force
+complete -c spack -n '__fish_spack_using_command module tcl refresh' -l force -d 'regenerate module files even when what they are generated from did not change'
 complete -c spack -n '__fish_spack_using_command module tcl refresh' -s y -l yes-to-all -f -a yes_to_all
 complete -c spack -n '__fish_spack_using_command module tcl refresh' -s y -l yes-to-all -d 'assume "yes" is the answer to every confirmation request'
+complete -c spack -n '__fish_spack_using_command module tcl refresh' -s j -l jobs -r -f -a jobs
+complete -c spack -n '__fish_spack_using_command module tcl refresh' -s j -l jobs -r -d 'explicitly set number of parallel jobs'
 
 # spack module tcl find
 set -g __fish_spack_optspecs_spack_module_tcl_find h/help full-path r/dependencies